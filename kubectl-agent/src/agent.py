@@ -10,11 +10,24 @@ import websockets
 from websockets.exceptions import ConnectionClosed
 import uuid
 import hashlib
+import base64
+import zlib
 from aiohttp import web
 
 
 RECONNECT_INTERVAL = 30
 HEARTBEAT_INTERVAL = 60
+# Commands for one cluster run concurrently up to this cap; the rest queue.
+MAX_CONCURRENT_COMMANDS = int(os.getenv('KUBECTL_MAX_CONCURRENT_COMMANDS', '4'))
+# stdout beyond this many bytes is discarded and the output marked truncated.
+OUTPUT_MAX_BYTES = int(os.getenv('KUBECTL_OUTPUT_MAX_BYTES', str(10 * 1024 * 1024)))
+# Outputs larger than one chunk are zlib-compressed and streamed in
+# base64 frames of at most this many compressed bytes.
+OUTPUT_CHUNK_BYTES = int(os.getenv('KUBECTL_OUTPUT_CHUNK_BYTES', str(256 * 1024)))
+READ_SIZE = 64 * 1024
+# Advertised by backends that reassemble command_output_chunk frames. Older
+# backends omit it and get every output inline in the command_response.
+CHUNKED_OUTPUT_CAPABILITY = 'chunked_output'
 
 logging.basicConfig(
     level=logging.INFO,
@@ -23,6 +36,77 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+class OutputStream:
+    """Collects a command's stdout, truncating and streaming large outputs.
+
+    Output stays in memory until it exceeds one chunk; after that it is fed
+    through a zlib compressor and sent as ``command_output_chunk`` frames
+    while the command is still running. Without *chunked* (the backend did
+    not advertise support) the whole output is kept and returned inline.
+    """
+
+    def __init__(self, agent: 'KubectlAgent', command_id: Optional[str], chunked: bool = True):
+        self.agent = agent
+        self.command_id = command_id
+        self.chunked = chunked and command_id is not None
+        self.buffer = bytearray()
+        self.total = 0
+        self.truncated = False
+        self.compressor = None
+        self.pending = bytearray()
+        self.chunks_sent = 0
+
+    async def consume(self, reader: asyncio.StreamReader):
+        while True:
+            data = await reader.read(READ_SIZE)
+            if not data:
+                return
+            if self.truncated:
+                continue  # keep draining so kubectl does not block on a full pipe
+            room = OUTPUT_MAX_BYTES - self.total
+            if len(data) > room:
+                data = data[:room]
+                self.truncated = True
+            self.total += len(data)
+            await self.write(data)
+            if self.truncated:
+                await self.write(f"\n... [output truncated at {OUTPUT_MAX_BYTES} bytes]\n".encode())
+
+    async def write(self, data: bytes):
+        if self.compressor is None:
+            self.buffer += data
+            if not self.chunked or len(self.buffer) <= OUTPUT_CHUNK_BYTES:
+                return
+            self.compressor = zlib.compressobj()
+            data, self.buffer = bytes(self.buffer), bytearray()
+        self.pending += self.compressor.compress(data)
+        while len(self.pending) >= OUTPUT_CHUNK_BYTES:
+            await self.send_chunk(bytes(self.pending[:OUTPUT_CHUNK_BYTES]))
+            del self.pending[:OUTPUT_CHUNK_BYTES]
+
+    async def send_chunk(self, data: bytes):
+        await self.agent.send_message({
+            'type': 'command_output_chunk',
+            'command_id': self.command_id,
+            'seq': self.chunks_sent,
+            'data': base64.b64encode(data).decode('ascii'),
+        })
+        self.chunks_sent += 1
+
+    async def finish(self) -> dict:
+        """Flush remaining output; returns the output fields of the response."""
+        fields = {'truncated': self.truncated}
+        if self.compressor is None:
+            fields['output'] = self.buffer.decode(errors='replace')
+            return fields
+        self.pending += self.compressor.flush()
+        for start in range(0, len(self.pending), OUTPUT_CHUNK_BYTES):
+            await self.send_chunk(bytes(self.pending[start:start + OUTPUT_CHUNK_BYTES]))
+        self.pending = bytearray()
+        fields.update({'encoding': 'zlib', 'chunks': self.chunks_sent})
+        return fields
+
+
 class KubectlAgent:
     def __init__(self):
         self.ws_endpoint = os.getenv('NEXT_PUBLIC_WEBSOCKET_URL')
@@ -40,6 +124,10 @@ class KubectlAgent:
         self.connected = False
         self.shutdown = False
         self.health_server = None
+        self.command_semaphore = asyncio.Semaphore(MAX_CONCURRENT_COMMANDS)
+        self.command_tasks: dict = {}
+        # Set from the backend's 'connected' frame on every (re)connect.
+        self.backend_capabilities: frozenset = frozenset()
         if not self.ws_endpoint:
             raise ValueError("NEXT_PUBLIC_WEBSOCKET_URL environment variable is required")
         if not self.agent_token:
@@ -58,6 +146,7 @@ class KubectlAgent:
                 ping_timeout=10
             )
             self.connected = True
+            self.backend_capabilities = frozenset()
             await self.send_message({
                 'type': 'register',
                 'cluster_id': self.cluster_id,
@@ -86,35 +175,81 @@ class KubectlAgent:
             except Exception as e:
                 logger.error(f"Heartbeat error: {e}")
     
-    async def execute_kubectl_command(self, command: str, timeout: int = 60) -> dict:
-        """Execute kubectl command and return results."""
+    async def execute_kubectl_command(self, command: str, timeout: int = 60, command_id: Optional[str] = None) -> dict:
+        """Execute kubectl command and return results.
+
+        stdout is read incrementally and capped at OUTPUT_MAX_BYTES.  When
+        *command_id* is given, the backend advertised chunked output and the
+        output outgrows one chunk, it is streamed as compressed
+        ``command_output_chunk`` frames and the returned result carries
+        ``encoding``/``chunks`` instead of ``output``.
+        """
         try:
             proc = await asyncio.create_subprocess_exec(
                 'kubectl', *command.split(),
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
             )
+        except Exception as e:
+            return {'success': False, 'error': str(e), 'return_code': 1}
+
+        stream = OutputStream(
+            self, command_id, chunked=CHUNKED_OUTPUT_CAPABILITY in self.backend_capabilities
+        )
+        try:
             try:
-                stdout_b, stderr_b = await asyncio.wait_for(
-                    proc.communicate(), timeout=timeout
+                _, stderr_b, _ = await asyncio.wait_for(
+                    asyncio.gather(stream.consume(proc.stdout), proc.stderr.read(), proc.wait()),
+                    timeout=timeout,
                 )
             except asyncio.TimeoutError:
-                proc.kill()
-                await proc.wait()
                 return {
                     'success': False,
                     'error': f'Command timed out after {timeout} seconds',
                     'return_code': 124,
                 }
-            return {
+            result = {
                 'success': proc.returncode == 0,
-                'output': stdout_b.decode(errors='replace'),
                 'error': stderr_b.decode(errors='replace') if proc.returncode != 0 else None,
                 'return_code': proc.returncode,
             }
+            result.update(await stream.finish())
+            return result
         except Exception as e:
             return {'success': False, 'error': str(e), 'return_code': 1}
-    
+        finally:
+            # Covers timeout and cancellation: never leave kubectl running.
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+
+    async def run_command(self, command_id: str, command: str, timeout: int):
+        """Run one command under the concurrency cap and send its response."""
+        try:
+            async with self.command_semaphore:
+                logger.info(f"Executing kubectl command: {command[:100]}")
+                result = await self.execute_kubectl_command(command, timeout, command_id)
+        except asyncio.CancelledError:
+            logger.info(f"Cancelled kubectl command {command_id}")
+            result = {'success': False, 'error': 'Command cancelled', 'return_code': 130}
+        finally:
+            self.command_tasks.pop(command_id, None)
+        await self.send_message({'type': 'command_response', 'command_id': command_id, **result})
+
+    def cancel_command(self, command_id: str) -> bool:
+        task = self.command_tasks.get(command_id)
+        if task is None or task.done():
+            return False
+        task.cancel()
+        return True
+
+    async def cancel_all_commands(self):
+        tasks = list(self.command_tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.command_tasks.clear()
+
     async def message_loop(self):
         try:
             async for message_text in self.websocket:
@@ -123,6 +258,7 @@ class KubectlAgent:
                     msg_type = message.get('type')
                     
                     if msg_type == 'connected':
+                        self.backend_capabilities = frozenset(message.get('capabilities') or ())
                         logger.info(f"Connected to backend as {message.get('cluster_name')}")
                     elif msg_type == 'heartbeat_ack':
                         pass
@@ -130,9 +266,13 @@ class KubectlAgent:
                         command_id = message.get('command_id')
                         command = message.get('command', '')
                         timeout = message.get('timeout', 60)
-                        logger.info(f"Executing kubectl command: {command[:100]}")
-                        result = await self.execute_kubectl_command(command, timeout)
-                        await self.send_message({'type': 'command_response', 'command_id': command_id, **result})
+                        self.command_tasks[command_id] = asyncio.create_task(
+                            self.run_command(command_id, command, timeout)
+                        )
+                    elif msg_type == 'cancel_command':
+                        command_id = message.get('command_id')
+                        if not self.cancel_command(command_id):
+                            logger.debug(f"No running command to cancel: {command_id}")
                     elif msg_type:
                         logger.warning(f"Unknown message type: {msg_type}")
                         
@@ -164,6 +304,8 @@ class KubectlAgent:
                             await task
                         except asyncio.CancelledError:
                             pass
+                    # Responses cannot reach the backend once the socket is gone.
+                    await self.cancel_all_commands()
                 if not self.shutdown:
                     logger.info(f"Reconnecting in {RECONNECT_INTERVAL} seconds...")
                     await asyncio.sleep(RECONNECT_INTERVAL)
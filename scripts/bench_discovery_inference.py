@@ -0,0 +1,190 @@
+"""Benchmark Phase 3 connection inference with and without ``NodeIndex``.
+
+Builds a synthetic AWS-style inventory (default 50k nodes) plus enrichment
+data whose references resolve through ``node_lookup`` (Lambda event source
+mappings, SNS subscriptions incl. HTTPS endpoints, EventBridge rules and
+IAM policies), then times ``run_all_inference`` twice:
+
+  * before: engines receive the raw node list (linear-scan lookups)
+  * after:  engines receive a ``NodeIndex`` built once per run
+
+Both runs must produce identical edges.
+
+Run from the repository root with the server requirements installed (the
+script puts ``server/`` on ``sys.path`` itself):
+
+    python scripts/bench_discovery_inference.py --nodes 50000
+
+scripts/ is not part of the server image, so to run it in the aurora-server
+container copy it in first and point PYTHONPATH at the app:
+
+    docker cp scripts/bench_discovery_inference.py aurora-server:/tmp/
+    docker exec -e PYTHONPATH=/app aurora-server python /tmp/bench_discovery_inference.py --nodes 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "server"))
+
+_ACCOUNT = "123456789012"
+_REGION = "us-east-1"
+
+
+def _arn(service: str, resource: str) -> str:
+    return f"arn:aws:{service}:{_REGION}:{_ACCOUNT}:{resource}"
+
+
+def build_inventory(node_count: int, refs: int, seed: int = 7) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Return ``(graph_nodes, enrichment_data)`` for a synthetic AWS org."""
+    rng = random.Random(seed)
+    kinds = [
+        ("serverless_function", "lambda", "function:fn-{i}"),
+        ("message_queue", "sqs", "queue-{i}"),
+        ("pubsub_topic", "sns", "topic-{i}"),
+        ("event_rule", "events", "rule/rule-{i}"),
+        ("vm", "ec2", "instance/i-{i:08x}"),
+        ("storage_bucket", "s3", "bucket-{i}"),
+        ("database", "rds", "db:db-{i}"),
+        ("dns_zone", "route53", "hostedzone/zone-{i}"),
+    ]
+    nodes: List[Dict[str, Any]] = []
+    by_kind: Dict[str, List[Dict[str, Any]]] = {k[0]: [] for k in kinds}
+    for i in range(node_count):
+        resource_type, service, resource = kinds[i % len(kinds)]
+        resource = resource.format(i=i)
+        name = resource.split("/")[-1].split(":")[-1]
+        if resource_type == "dns_zone":
+            name = f"zone-{i}.example.internal"
+        node = {
+            "name": name,
+            "resource_type": resource_type,
+            "provider": "aws",
+            "cloud_resource_id": _arn(service, resource),
+            "endpoint": f"https://{name}.{_REGION}.svc.example.internal" if i % 3 == 0 else "",
+        }
+        nodes.append(node)
+        by_kind[resource_type].append(node)
+
+    def pick(kind: str) -> Dict[str, Any]:
+        return rng.choice(by_kind[kind])
+
+    endpoint_nodes = [n for n in nodes if n["endpoint"]]
+    enrichment: Dict[str, Any] = {
+        "lambda_event_sources": [
+            {
+                "FunctionArn": pick("serverless_function")["cloud_resource_id"],
+                "EventSourceArn": pick("message_queue")["cloud_resource_id"],
+            }
+            for _ in range(refs)
+        ],
+        "sns_subscriptions": [
+            {
+                "TopicArn": pick("pubsub_topic")["cloud_resource_id"],
+                "Protocol": "https",
+                # Substring of a node endpoint, as SNS HTTP endpoints often are
+                "Endpoint": rng.choice(endpoint_nodes)["endpoint"].split("://", 1)[1].split(".")[0]
+                + f".{_REGION}.svc",
+            }
+            for _ in range(refs // 2)
+        ]
+        + [
+            {
+                "TopicArn": pick("pubsub_topic")["cloud_resource_id"],
+                "Protocol": "lambda",
+                "Endpoint": pick("serverless_function")["cloud_resource_id"],
+            }
+            for _ in range(refs // 2)
+        ],
+        "eventbridge_rules": [
+            {
+                "Name": pick("event_rule")["name"],
+                "Arn": "",
+                "Targets": [{"Arn": pick("serverless_function")["cloud_resource_id"]}],
+            }
+            for _ in range(refs)
+        ],
+        "iam_policies": {
+            pick("vm")["name"]: [
+                {
+                    "Statement": [
+                        {
+                            "Effect": "Allow",
+                            "Action": ["s3:GetObject"],
+                            "Resource": [pick("storage_bucket")["cloud_resource_id"]],
+                        }
+                    ]
+                }
+            ]
+            for _ in range(refs)
+        },
+    }
+    return nodes, enrichment
+
+
+def _canonical(edges: List[Dict[str, Any]]) -> List[Tuple[Any, ...]]:
+    return sorted(
+        (e["from_service"], e["to_service"], e["dependency_type"], e["confidence"])
+        for e in edges
+    )
+
+
+def run(node_count: int, refs: int) -> Dict[str, Any]:
+    from services.discovery.inference import connection_inference
+
+    nodes, enrichment = build_inventory(node_count, refs)
+
+    original_builder = connection_inference.build_node_index
+    connection_inference.build_node_index = list  # engines see the raw list
+    try:
+        start = time.perf_counter()
+        before_edges = connection_inference.run_all_inference("bench", nodes, enrichment)
+        before_s = time.perf_counter() - start
+    finally:
+        connection_inference.build_node_index = original_builder
+
+    start = time.perf_counter()
+    after_edges = connection_inference.run_all_inference("bench", nodes, enrichment)
+    after_s = time.perf_counter() - start
+
+    if _canonical(before_edges) != _canonical(after_edges):
+        raise SystemExit("FATAL: indexed run produced different edges")
+
+    return {
+        "nodes": node_count,
+        "references": refs,
+        "edges": len(after_edges),
+        "before_s": round(before_s, 3),
+        "after_s": round(after_s, 3),
+        "speedup": round(before_s / after_s, 1) if after_s else float("inf"),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=50_000)
+    parser.add_argument("--refs", type=int, default=2_000, help="references per enrichment category")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    # storage/secret_store expect list-shaped iam_policies and log an
+    # exception on the dict shape used here; that is independent of lookups.
+    logging.getLogger("services.discovery").setLevel(logging.CRITICAL)
+
+    result = run(args.nodes, args.refs)
+    print(
+        f"Phase 3 inference over {result['nodes']} nodes / {result['references']} refs per category "
+        f"({result['edges']} edges): before {result['before_s']}s, after {result['after_s']}s "
+        f"({result['speedup']}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""Benchmark the output-redaction scanner on realistic tool output.
+
+Generates a corpus shaped like what Aurora's tools actually return --
+``kubectl get pods -o wide``, ``kubectl describe pod``, ``kubectl get secret
+-o yaml``, JSON application logs from ``kubectl logs`` and CloudWatch
+``filter-log-events`` responses -- with a sprinkling of planted credentials,
+then times two scanners over every document:
+
+  * before: ``_scan_full`` (per-rule substring check, regex over the whole text)
+  * after:  ``_scan_unsafe`` (single-pass keyword prefilter, windowed regexes)
+
+and reports throughput in MB/s. Both scanners must return identical findings.
+
+Run from the repository root with the server requirements installed (the
+script puts ``server/`` on ``sys.path`` itself):
+
+    python scripts/bench_output_redaction.py --docs 40 --size 400000
+
+scripts/ is not part of the server image, so to run it in the aurora-server
+container copy it in first and point PYTHONPATH at the app:
+
+    docker cp scripts/bench_output_redaction.py aurora-server:/tmp/
+    docker exec -e PYTHONPATH=/app aurora-server python /tmp/bench_output_redaction.py --docs 40 --size 400000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import string
+import sys
+import time
+from typing import Callable, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "server"))
+
+_NAMESPACES = ["default", "payments", "checkout", "kube-system", "monitoring", "ingress-nginx"]
+_STATUSES = ["Running"] * 8 + ["CrashLoopBackOff", "Pending", "Completed", "OOMKilled"]
+_LOG_MESSAGES = [
+    "GET /api/v1/orders/{id} 200 {ms}ms",
+    "POST /api/v1/payments 502 upstream connect error",
+    "token refresh scheduled in {ms}s for client checkout-web",
+    "cache miss for key session:{id}",
+    "retrying request to auth-service (attempt {n}/5)",
+    "connection pool exhausted: active={n} idle=0 max=50",
+    "Authentication-Results: spf=pass smtp.mailfrom=alerts@example.com",
+    "processed batch id={id} records={n} lag_ms={ms}",
+]
+
+
+def _rand(rng: random.Random, alphabet: str, n: int) -> str:
+    return "".join(rng.choice(alphabet) for _ in range(n))
+
+
+def _planted_secret(rng: random.Random) -> str:
+    alnum = string.ascii_letters + string.digits
+    return rng.choice([
+        "AWS_ACCESS_KEY_ID=AKIA" + _rand(rng, string.ascii_uppercase + "234567", 16),
+        "GITHUB_TOKEN=ghp_" + _rand(rng, alnum, 36),
+        "DB_PASSWORD=" + _rand(rng, alnum, 24),
+        "Authorization: Bearer eyJ" + _rand(rng, alnum, 30) + ".eyJ" + _rand(rng, alnum, 40)
+        + "." + _rand(rng, alnum, 43),
+        "SLACK_BOT_TOKEN=xoxb-" + _rand(rng, string.digits, 11) + "-" + _rand(rng, string.digits, 12)
+        + "-" + _rand(rng, alnum, 24),
+    ])
+
+
+def _kubectl_get_pods(rng: random.Random) -> str:
+    rows = ["NAMESPACE     NAME                                READY   STATUS    RESTARTS   AGE    IP            NODE"]
+    for _ in range(rng.randint(20, 60)):
+        ns = rng.choice(_NAMESPACES)
+        name = f"{rng.choice(['api', 'worker', 'web', 'auth-service'])}-{_rand(rng, 'abcdef0123456789', 10)}-{_rand(rng, 'abcdefghijklmnopqrstuvwxyz', 5)}"
+        rows.append(
+            f"{ns:<13} {name:<35} 1/1     {rng.choice(_STATUSES):<9} {rng.randint(0, 40):<10} "
+            f"{rng.randint(1, 90)}d    10.0.{rng.randint(0, 255)}.{rng.randint(0, 255)}   ip-10-0-{rng.randint(0, 255)}-{rng.randint(0, 255)}.ec2.internal"
+        )
+    return "\n".join(rows) + "\n"
+
+
+def _kubectl_describe(rng: random.Random) -> str:
+    name = f"api-{_rand(rng, 'abcdef0123456789', 10)}"
+    env = "\n".join(
+        f"      {k}:  {v}" for k, v in [
+            ("LOG_LEVEL", "info"),
+            ("API_BASE_URL", "https://api.internal.example.com"),
+            ("SECRET_KEY", "<set to the key 'secret-key' in secret 'api-secrets'>  Optional: false"),
+            ("AUTH_AUDIENCE", "checkout"),
+        ]
+    )
+    events = "\n".join(
+        f"  Warning  BackOff    {rng.randint(1, 59)}m (x{rng.randint(2, 300)} over 3h)  kubelet  Back-off restarting failed container api in pod {name}"
+        for _ in range(rng.randint(3, 12))
+    )
+    return (
+        f"Name:             {name}\nNamespace:        {rng.choice(_NAMESPACES)}\nPriority:         0\n"
+        f"Service Account:  default\nNode:             ip-10-0-1-12.ec2.internal/10.0.1.12\n"
+        f"Status:           Running\nContainers:\n  api:\n    Image:          123456789012.dkr.ecr.us-east-1.amazonaws.com/api:1.4.{rng.randint(0, 99)}\n"
+        f"    Environment:\n{env}\nEvents:\n  Type     Reason     Age                  From     Message\n{events}\n"
+    )
+
+
+def _kubectl_secret_yaml(rng: random.Random) -> str:
+    alnum = string.ascii_letters + string.digits
+    return (
+        "apiVersion: v1\nkind: Secret\nmetadata:\n"
+        f"  name: app-secrets-{rng.randint(1, 99)}\n  namespace: {rng.choice(_NAMESPACES)}\ntype: Opaque\ndata:\n"
+        f"  password: {_rand(rng, alnum, 32)}==\n  username: YWRtaW4=\n"
+    )
+
+
+def _kubectl_logs(rng: random.Random) -> str:
+    lines = []
+    for _ in range(rng.randint(50, 200)):
+        msg = rng.choice(_LOG_MESSAGES).format(
+            id=_rand(rng, "0123456789abcdef", 12), ms=rng.randint(1, 900), n=rng.randint(1, 50)
+        )
+        lines.append(json.dumps({
+            "ts": f"2026-03-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}.{rng.randint(0, 999):03d}Z",
+            "level": rng.choice(["info", "info", "info", "warn", "error"]),
+            "logger": rng.choice(["http", "db", "auth", "worker"]),
+            "trace_id": _rand(rng, "0123456789abcdef", 32),
+            "msg": msg,
+        }))
+    return "\n".join(lines) + "\n"
+
+
+def _cloudwatch_events(rng: random.Random) -> str:
+    events = []
+    for _ in range(rng.randint(40, 120)):
+        events.append({
+            "logStreamName": f"2026/03/{rng.randint(1, 28):02d}/[$LATEST]{_rand(rng, '0123456789abcdef', 32)}",
+            "timestamp": 1772000000000 + rng.randint(0, 10 ** 9),
+            "message": (
+                f"START RequestId: {_rand(rng, '0123456789abcdef', 8)}-{_rand(rng, '0123456789abcdef', 4)} Version: $LATEST\n"
+                if rng.random() < 0.2 else
+                f"[ERROR] {rng.choice(['TimeoutError', 'KeyError', 'ClientError'])}: "
+                f"An error occurred (AccessDenied) when calling the GetObject operation: Access Denied\n"
+            ),
+            "ingestionTime": 1772000000000 + rng.randint(0, 10 ** 9),
+            "eventId": _rand(rng, string.digits, 56),
+        })
+    return json.dumps({"events": events, "searchedLogStreams": []}, indent=2) + "\n"
+
+
+_GENERATORS = [_kubectl_get_pods, _kubectl_describe, _kubectl_secret_yaml, _kubectl_logs, _cloudwatch_events]
+
+
+def build_corpus(docs: int, size: int, secret_rate: float, seed: int = 11) -> List[str]:
+    """Return ``docs`` tool outputs of roughly ``size`` chars each."""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(docs):
+        parts: List[str] = []
+        length = 0
+        while length < size:
+            part = rng.choice(_GENERATORS)(rng)
+            if rng.random() < secret_rate:
+                part += _planted_secret(rng) + "\n"
+            parts.append(part)
+            length += len(part)
+        corpus.append("".join(parts)[:size])
+    return corpus
+
+
+def _time(scanner: Callable[[str], list], corpus: List[str]) -> tuple[float, list]:
+    start = time.perf_counter()
+    results = [scanner(doc) for doc in corpus]
+    return time.perf_counter() - start, results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=20)
+    parser.add_argument("--size", type=int, default=400_000, help="chars per document")
+    parser.add_argument("--secret-rate", type=float, default=0.05, help="chance a section carries a planted credential")
+    args = parser.parse_args()
+
+    from utils.security.output_redaction import _scan_full, _scan_unsafe
+
+    corpus = build_corpus(args.docs, args.size, args.secret_rate)
+    megabytes = sum(len(doc.encode("utf-8")) for doc in corpus) / 1e6
+
+    _scan_unsafe(corpus[0])  # warm the regex caches
+    before, expected = _time(_scan_full, corpus)
+    after, actual = _time(_scan_unsafe, corpus)
+    findings = sum(len(r) for r in expected)
+
+    print(f"corpus: {args.docs} docs, {megabytes:.1f} MB, {findings} findings")
+    print(f"  before (full-text regexes):   {before:7.2f}s  {megabytes / before:7.2f} MB/s")
+    print(f"  after  (keyword prefilter):   {after:7.2f}s  {megabytes / after:7.2f} MB/s")
+    print(f"  speedup: {before / after:.1f}x")
+    if actual != expected:
+        mismatched = sum(1 for a, e in zip(actual, expected) if a != e)
+        raise SystemExit(f"FINDINGS MISMATCH in {mismatched} document(s)")
+    print("  findings identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Benchmark token accounting over a growing RCA transcript.
+
+Builds a 300-message transcript shaped like a background RCA run -- the alert
+prompt, assistant reasoning, and tool results from ``kubectl``, ``kubectl
+logs`` and CloudWatch -- and re-costs the whole history after every appended
+message, the way the context manager checks the context window each turn:
+
+  * before: resolve the encoding and re-tokenize every message on every call
+  * after:  ``LLMUsageTracker.count_tokens_from_messages`` (memoized per content)
+
+Both must agree exactly for texts under ``TOKEN_ESTIMATE_MIN_CHARS``. It then
+compares the sampled estimate against a full encode for a few multi-MB tool
+outputs.
+
+Run inside the aurora-server container so the package imports cleanly:
+
+    docker exec aurora-server python /app/scripts/bench_token_accounting.py --messages 300
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "server"))
+
+from bench_output_redaction import build_corpus  # noqa: E402
+
+_REASONING = [
+    "The alert fired for elevated 5xx on checkout. Checking pod health in the payments namespace first.",
+    "Several pods are in CrashLoopBackOff; pulling recent logs from the failing container.",
+    "Logs show connection pool exhaustion against the auth-service. Looking at CloudWatch for upstream errors.",
+    "AccessDenied on GetObject lines up with the deploy at 14:02. Comparing the IAM policy revisions.",
+]
+
+
+def build_transcript(messages: int, seed: int = 7) -> List[SimpleNamespace]:
+    """Alternate assistant reasoning and tool output of 2-40 KB, after an alert prompt."""
+    rng = random.Random(seed)
+    outputs = build_corpus(messages, 40_000, secret_rate=0.0, seed=seed)
+    transcript = [SimpleNamespace(content="Investigate alert: HighErrorRate on checkout-web (severity=critical).")]
+    for index in range(1, messages):
+        if index % 2:
+            transcript.append(SimpleNamespace(content=rng.choice(_REASONING) + f" (step {index})"))
+        else:
+            transcript.append(SimpleNamespace(content=outputs[index][: rng.randint(2_000, 40_000)]))
+    return transcript
+
+
+def _uncached_count(messages, encoding_name: str) -> int:
+    import tiktoken
+
+    total = 0
+    for message in messages:
+        encoding = tiktoken.get_encoding(encoding_name)
+        total += len(encoding.encode(str(message.content), disallowed_special=()))
+    return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=300)
+    parser.add_argument("--model", default="gpt-4o")
+    parser.add_argument("--large-mb", type=float, default=4.0, help="size of each tool output for the estimator check")
+    args = parser.parse_args()
+
+    from chat.backend.agent.utils.llm_usage_tracker import (
+        LLMUsageTracker,
+        _encoding_name_for,
+        _get_encoding,
+    )
+
+    encoding_name = _encoding_name_for(args.model)
+    transcript = build_transcript(args.messages)
+    megabytes = sum(len(m.content.encode("utf-8")) for m in transcript) / 1e6
+    _get_encoding(encoding_name)  # load the BPE files outside the timings
+
+    start = time.perf_counter()
+    expected = [_uncached_count(transcript[: n + 1], encoding_name) for n in range(len(transcript))]
+    before = time.perf_counter() - start
+
+    LLMUsageTracker.clear_token_cache()
+    start = time.perf_counter()
+    actual = [
+        LLMUsageTracker.count_tokens_from_messages(transcript[: n + 1], args.model) for n in range(len(transcript))
+    ]
+    after = time.perf_counter() - start
+    stats = LLMUsageTracker.get_token_cache_stats()
+
+    print(f"transcript: {len(transcript)} messages, {megabytes:.1f} MB, {expected[-1]} tokens ({encoding_name})")
+    print(f"  before (re-tokenize every call): {before:7.2f}s")
+    print(f"  after  (memoized per content):   {after:7.2f}s  hits={stats['hits']} misses={stats['misses']}")
+    print(f"  speedup: {before / after:.1f}x")
+    if actual != expected:
+        raise SystemExit("TOKEN COUNT MISMATCH")
+    print("  counts identical")
+
+    size = int(args.large_mb * 1_000_000)
+    encoding = _get_encoding(encoding_name)
+    print(f"estimator on {args.large_mb:.0f} MB tool outputs:")
+    for index, text in enumerate(build_corpus(3, size, secret_rate=0.0, seed=23)):
+        start = time.perf_counter()
+        exact = len(encoding.encode(text, disallowed_special=()))
+        full = time.perf_counter() - start
+        LLMUsageTracker.clear_token_cache()
+        start = time.perf_counter()
+        estimate = LLMUsageTracker.count_tokens(text, args.model)
+        sampled = time.perf_counter() - start
+        print(
+            f"  doc {index}: exact={exact} estimate={estimate} error={abs(estimate - exact) / exact:.2%} "
+            f"full={full * 1000:.0f}ms sampled={sampled * 1000:.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
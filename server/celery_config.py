@@ -143,6 +143,10 @@ celery_app.conf.update(
             'task': 'services.actions.scheduler.run_scheduled_actions',
             'schedule': 60.0,  # Check every minute
         },
+        'refresh-incident-metric-rollups': {
+            'task': 'services.metrics.tasks.refresh_incident_metric_rollups',
+            'schedule': 300.0,  # Every 5 minutes
+        },
     },
     beat_schedule_filename='celerybeat-schedule',
     worker_hijack_root_logger=False
@@ -207,6 +211,12 @@ try:
 except ImportError as e:
     logging.warning(f"Failed to import discovery tasks: {e}")
 
+try:
+    import services.metrics.tasks  # noqa: F401
+    logging.info("Metric rollup tasks imported successfully")
+except ImportError as e:
+    logging.warning(f"Failed to import metric rollup tasks: {e}")
+
 try:
     import chat.background.prediscovery_task  # noqa: F401
     logging.info("Prediscovery task imported successfully")
@@ -256,11 +266,12 @@ if hasattr(celery_app, 'tasks'):
 import threading
 
 try:
-    from celery.signals import worker_process_init
+    from celery.signals import worker_process_init, worker_process_shutdown
 except (ImportError, ModuleNotFoundError):
     # Tests stub celery as MagicMock when the package isn't installed (see
     # tests/conftest.py), so celery.signals isn't importable outside workers.
     worker_process_init = None
+    worker_process_shutdown = None
 
 _prewarm_ready = threading.Event()
 
@@ -305,3 +316,15 @@ if worker_process_init is not None:
 else:
     # No worker signal hook (e.g. pytest stubs celery) — don't block task code.
     _prewarm_ready.set()
+
+
+if worker_process_shutdown is not None:
+
+    @worker_process_shutdown.connect
+    def _flush_llm_usage(**kwargs):
+        """Write buffered LLM usage rows before the child exits (atexit may not run)."""
+        try:
+            from chat.backend.agent.utils.llm_usage_writer import flush_usage
+            flush_usage()
+        except Exception as e:
+            logging.getLogger(__name__).warning("Failed to flush LLM usage on shutdown: %s", e)
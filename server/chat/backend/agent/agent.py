@@ -269,7 +269,8 @@ class Agent:
             from langchain.agents import create_agent
             from langchain_core.callbacks import BaseCallbackHandler
             from .tools.cloud_tools import get_cloud_tools, set_user_context, set_tool_capture
-            from .middleware import ContextTrimMiddleware, _ForceToolChoice
+            from .middleware import ContextTrimMiddleware, LLMAdmissionMiddleware, _ForceToolChoice
+            from .utils.llm_admission import request_priority
 
             logging.info(f"agentic_tool_flow: State has user_id {state.user_id} and session_id {state.session_id}")
             # Set user context for tools
@@ -621,6 +622,17 @@ class Agent:
                     0, _ForceToolChoice("trigger_rca", provider=tool_choice_provider)
                 )
 
+            # Innermost: wait for a cross-worker LLM admission ticket, sized from
+            # the final (trimmed) request. Interactive chat queues ahead of
+            # background RCA, and earlier sub-agent waves ahead of later ones.
+            middlewares.append(LLMAdmissionMiddleware(
+                model_name,
+                priority=request_priority(
+                    getattr(state, "is_background", False),
+                    getattr(state, "rca_wave", 0),
+                ),
+            ))
+
             # Mark the stable system prompt with an Anthropic cache_control
             # breakpoint so turns 2..N of a session bill the prefix as a 0.1x
             # cache read. No-op for non-Anthropic models and tiny prompts.
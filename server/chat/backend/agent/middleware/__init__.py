@@ -1,7 +1,8 @@
 from .context_trim import ContextSafetyMiddleware
 from .force_tool import ForceToolChoice as _ForceToolChoice
+from .llm_admission import LLMAdmissionMiddleware
 
 # Backward-compatible alias
 ContextTrimMiddleware = ContextSafetyMiddleware
 
-__all__ = ["ContextSafetyMiddleware", "ContextTrimMiddleware", "_ForceToolChoice"]
+__all__ = ["ContextSafetyMiddleware", "ContextTrimMiddleware", "LLMAdmissionMiddleware", "_ForceToolChoice"]
@@ -0,0 +1,100 @@
+"""Middleware that routes every agent model call through the LLM admission scheduler."""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Optional
+
+from langchain.agents.middleware import AgentMiddleware
+from langchain.agents.middleware.types import ModelRequest, ModelResponse
+from langchain_core.messages.utils import count_tokens_approximately
+
+from ..utils.llm_admission import acquire, acquire_async, release, report_rate_limited
+
+logger = logging.getLogger(__name__)
+
+
+def _estimate_tokens(request: ModelRequest) -> int:
+    try:
+        tokens = count_tokens_approximately(request.messages)
+    except Exception:
+        tokens = 0
+    system_prompt = getattr(request, "system_prompt", None)
+    if isinstance(system_prompt, str):
+        tokens += len(system_prompt) // 4
+    return tokens
+
+
+def _response_tokens(response: Any) -> Optional[int]:
+    """Provider-reported total tokens of the response messages, if any."""
+    messages = getattr(response, "result", None) or []
+    total = 0
+    for message in messages:
+        usage = getattr(message, "usage_metadata", None)
+        if usage:
+            total += usage.get("total_tokens") or 0
+    return total or None
+
+
+def _rate_limit_retry_after(exc: BaseException) -> Optional[float]:
+    """Retry-After seconds (0 when absent) if ``exc`` is a provider 429, else None."""
+    response = getattr(exc, "response", None)
+    status = getattr(exc, "status_code", None) or getattr(response, "status_code", None)
+    if status != 429 and "ratelimit" not in type(exc).__name__.lower():
+        return None
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after") or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class LLMAdmissionMiddleware(AgentMiddleware):
+    """Wait for a scheduler ticket before each model call and release it after.
+
+    Args:
+        model_name: Model key the budgets are looked up by (``provider/model``).
+        priority: Queue priority from ``llm_admission.request_priority``.
+    """
+
+    def __init__(self, model_name: str, priority: int):
+        self.model_name = model_name
+        self.priority = priority
+
+    def _on_error(self, exc: BaseException) -> None:
+        retry_after = _rate_limit_retry_after(exc)
+        if retry_after is not None:
+            report_rate_limited(self.model_name, retry_after or None)
+
+    async def awrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], Awaitable[ModelResponse]],
+    ) -> ModelResponse:
+        ticket = await acquire_async(self.model_name, _estimate_tokens(request), self.priority)
+        actual_tokens = None
+        try:
+            response = await handler(request)
+            actual_tokens = _response_tokens(response)
+            return response
+        except Exception as exc:
+            self._on_error(exc)
+            raise
+        finally:
+            await asyncio.to_thread(release, ticket, actual_tokens)
+
+    def wrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], ModelResponse],
+    ) -> ModelResponse:
+        ticket = acquire(self.model_name, _estimate_tokens(request), self.priority)
+        actual_tokens = None
+        try:
+            response = handler(request)
+            actual_tokens = _response_tokens(response)
+            return response
+        except Exception as exc:
+            self._on_error(exc)
+            raise
+        finally:
+            release(ticket, actual_tokens)
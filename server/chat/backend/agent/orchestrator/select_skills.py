@@ -21,6 +21,12 @@ _SUBAGENT_SKILL_BUDGET = 4_000  # tokens — budget for skill bodies appended to
 # when no skill claims it.
 _CLOUD_PROVIDERS = frozenset({"aws", "gcp", "azure", "ovh", "scaleway"})
 
+# Per-tool cache TTLs (seconds) for the RCA tool cache; tools without
+# ``cache_ttl`` use tool_cache's default. Live telemetry goes stale within
+# minutes, reference material (runbooks, docs) barely changes during an RCA.
+_TTL_LIVE = 120
+_TTL_REFERENCE = 3600
+
 # Capability tag dispatch table for the most-commonly-used RCA tools.
 # Tools NOT listed here default to: mutates=False, cacheable=False, capability_tags=[]
 # (i.e. they stay available to the lead but excluded from sub-agent tool subsets).
@@ -29,17 +35,19 @@ _TOOL_METADATA: dict = {
     # per-command by the guardrails layer (signature matcher + LLM judge), not
     # by this static flag. Sub-agents need cloud_exec to actually query state.
     "cloud_exec": {"capability_tags": ["runtime_state", "metrics", "logs", "observability"], "mutates": False, "cacheable": False},
+    # Pages oversized cloud_exec results by output_ref; goes wherever cloud_exec goes.
+    "read_cloud_output": {"capability_tags": ["runtime_state", "metrics", "logs", "observability"], "mutates": False, "cacheable": False},
     "on_prem_kubectl": {"capability_tags": ["runtime_state", "observability"], "mutates": False, "cacheable": False},
     "terminal_exec": {"capability_tags": ["runtime_state"], "mutates": False, "cacheable": False},
     "tailscale_ssh": {"capability_tags": ["runtime_state"], "mutates": False, "cacheable": False},
     # Observability platforms — read-only query tools
-    "query_datadog": {"capability_tags": ["metrics", "observability", "error_tracking", "logs"], "mutates": False, "cacheable": True},
-    "query_newrelic": {"capability_tags": ["metrics", "observability", "error_tracking"], "mutates": False, "cacheable": True},
-    "query_dynatrace": {"capability_tags": ["metrics", "observability", "error_tracking"], "mutates": False, "cacheable": True},
+    "query_datadog": {"capability_tags": ["metrics", "observability", "error_tracking", "logs"], "mutates": False, "cacheable": True, "cache_ttl": _TTL_LIVE},
+    "query_newrelic": {"capability_tags": ["metrics", "observability", "error_tracking"], "mutates": False, "cacheable": True, "cache_ttl": _TTL_LIVE},
+    "query_dynatrace": {"capability_tags": ["metrics", "observability", "error_tracking"], "mutates": False, "cacheable": True, "cache_ttl": _TTL_LIVE},
     "query_opsgenie": {"capability_tags": ["on_call", "ticket_history"], "mutates": False, "cacheable": True},
-    "search_splunk": {"capability_tags": ["logs", "observability"], "mutates": False, "cacheable": True},
-    "list_splunk_indexes": {"capability_tags": ["logs"], "mutates": False, "cacheable": True},
-    "list_splunk_sourcetypes": {"capability_tags": ["logs"], "mutates": False, "cacheable": True},
+    "search_splunk": {"capability_tags": ["logs", "observability"], "mutates": False, "cacheable": True, "cache_ttl": _TTL_LIVE},
+    "list_splunk_indexes": {"capability_tags": ["logs"], "mutates": False, "cacheable": True, "cache_ttl": _TTL_REFERENCE},
+    "list_splunk_sourcetypes": {"capability_tags": ["logs"], "mutates": False, "cacheable": True, "cache_ttl": _TTL_REFERENCE},
     "spinnaker_rca": {"capability_tags": ["ci_cd"], "mutates": False, "cacheable": True},
     # Source control — read-only
     "github_rca": {"capability_tags": ["source_control_read", "ci_cd"], "mutates": False, "cacheable": True},
@@ -50,14 +58,14 @@ _TOOL_METADATA: dict = {
     # github_apply_fix is NOT exposed to agents — see note in cloud_tools.py.
     "iac_tool": {"capability_tags": ["iac"], "mutates": True, "cacheable": False},
     # Runbooks + knowledge base
-    "confluence_runbook_parse": {"capability_tags": ["runbooks", "knowledge_base"], "mutates": False, "cacheable": True},
-    "knowledge_base_search": {"capability_tags": ["knowledge_base", "runbooks"], "mutates": False, "cacheable": True},
+    "confluence_runbook_parse": {"capability_tags": ["runbooks", "knowledge_base"], "mutates": False, "cacheable": True, "cache_ttl": _TTL_REFERENCE},
+    "knowledge_base_search": {"capability_tags": ["knowledge_base", "runbooks"], "mutates": False, "cacheable": True, "cache_ttl": _TTL_REFERENCE},
     # Ticket / incident history
     "list_incidentio_incidents": {"capability_tags": ["ticket_history", "on_call"], "mutates": False, "cacheable": True},
     "get_incidentio_incident": {"capability_tags": ["ticket_history", "on_call"], "mutates": False, "cacheable": True},
     "get_incidentio_timeline": {"capability_tags": ["ticket_history", "on_call"], "mutates": False, "cacheable": True},
     # General research
-    "web_search": {"capability_tags": ["knowledge_base"], "mutates": False, "cacheable": True},
+    "web_search": {"capability_tags": ["knowledge_base"], "mutates": False, "cacheable": True, "cache_ttl": _TTL_REFERENCE},
     # Bitbucket — source control + CI (mirror of github tagging)
     "bitbucket_repos": {"capability_tags": ["source_control_read"], "mutates": False, "cacheable": True},
     "bitbucket_branches": {"capability_tags": ["source_control_read"], "mutates": False, "cacheable": True},
@@ -68,25 +76,25 @@ _TOOL_METADATA: dict = {
     "cloudbees_rca": {"capability_tags": ["ci_cd"], "mutates": False, "cacheable": True},
     "jenkins_rca": {"capability_tags": ["ci_cd"], "mutates": False, "cacheable": True},
     # Cloudflare — read-only query tools; cloudflare_action mutates
-    "query_cloudflare": {"capability_tags": ["metrics", "observability", "logs"], "mutates": False, "cacheable": True},
+    "query_cloudflare": {"capability_tags": ["metrics", "observability", "logs"], "mutates": False, "cacheable": True, "cache_ttl": _TTL_LIVE},
     "cloudflare_list_zones": {"capability_tags": ["observability"], "mutates": False, "cacheable": True},
     "cloudflare_action": {"capability_tags": [], "mutates": True, "cacheable": False},
     # Confluence runbook-search (confluence_runbook_parse already above)
-    "confluence_search_similar": {"capability_tags": ["runbooks", "knowledge_base"], "mutates": False, "cacheable": True},
-    "confluence_search_runbooks": {"capability_tags": ["runbooks", "knowledge_base"], "mutates": False, "cacheable": True},
-    "confluence_fetch_page": {"capability_tags": ["runbooks", "knowledge_base"], "mutates": False, "cacheable": True},
+    "confluence_search_similar": {"capability_tags": ["runbooks", "knowledge_base"], "mutates": False, "cacheable": True, "cache_ttl": _TTL_REFERENCE},
+    "confluence_search_runbooks": {"capability_tags": ["runbooks", "knowledge_base"], "mutates": False, "cacheable": True, "cache_ttl": _TTL_REFERENCE},
+    "confluence_fetch_page": {"capability_tags": ["runbooks", "knowledge_base"], "mutates": False, "cacheable": True, "cache_ttl": _TTL_REFERENCE},
     # Coroot — observability platform
     "coroot_get_incidents": {"capability_tags": ["ticket_history", "observability"], "mutates": False, "cacheable": True},
     "coroot_get_incident_detail": {"capability_tags": ["ticket_history", "observability"], "mutates": False, "cacheable": True},
     "coroot_get_applications": {"capability_tags": ["runtime_state", "observability"], "mutates": False, "cacheable": True},
     "coroot_get_app_detail": {"capability_tags": ["runtime_state", "observability"], "mutates": False, "cacheable": True},
-    "coroot_get_app_logs": {"capability_tags": ["logs", "observability"], "mutates": False, "cacheable": True},
-    "coroot_get_traces": {"capability_tags": ["metrics", "observability"], "mutates": False, "cacheable": True},
+    "coroot_get_app_logs": {"capability_tags": ["logs", "observability"], "mutates": False, "cacheable": True, "cache_ttl": _TTL_LIVE},
+    "coroot_get_traces": {"capability_tags": ["metrics", "observability"], "mutates": False, "cacheable": True, "cache_ttl": _TTL_LIVE},
     "coroot_get_service_map": {"capability_tags": ["runtime_state", "observability"], "mutates": False, "cacheable": True},
-    "coroot_query_metrics": {"capability_tags": ["metrics", "observability"], "mutates": False, "cacheable": True},
+    "coroot_query_metrics": {"capability_tags": ["metrics", "observability"], "mutates": False, "cacheable": True, "cache_ttl": _TTL_LIVE},
     "coroot_get_deployments": {"capability_tags": ["ci_cd"], "mutates": False, "cacheable": True},
     "coroot_get_nodes": {"capability_tags": ["runtime_state"], "mutates": False, "cacheable": True},
-    "coroot_get_overview_logs": {"capability_tags": ["logs", "observability"], "mutates": False, "cacheable": True},
+    "coroot_get_overview_logs": {"capability_tags": ["logs", "observability"], "mutates": False, "cacheable": True, "cache_ttl": _TTL_LIVE},
     "coroot_get_node_detail": {"capability_tags": ["runtime_state"], "mutates": False, "cacheable": True},
     "coroot_get_risks": {"capability_tags": ["observability"], "mutates": False, "cacheable": True},
     # Jira — ticket history (read) vs mutate (write)
@@ -97,20 +105,20 @@ _TOOL_METADATA: dict = {
     "jira_update_issue": {"capability_tags": [], "mutates": True, "cacheable": False},
     "jira_link_issues": {"capability_tags": [], "mutates": True, "cacheable": False},
     # Notion — read-only investigation tools (write tools default to mutates=True via the catch-all below)
-    "notion_search": {"capability_tags": ["runbooks", "knowledge_base"], "mutates": False, "cacheable": True},
-    "notion_fetch": {"capability_tags": ["runbooks", "knowledge_base"], "mutates": False, "cacheable": True},
+    "notion_search": {"capability_tags": ["runbooks", "knowledge_base"], "mutates": False, "cacheable": True, "cache_ttl": _TTL_REFERENCE},
+    "notion_fetch": {"capability_tags": ["runbooks", "knowledge_base"], "mutates": False, "cacheable": True, "cache_ttl": _TTL_REFERENCE},
     "notion_query_database": {"capability_tags": ["knowledge_base"], "mutates": False, "cacheable": True},
     "notion_query_data_source": {"capability_tags": ["knowledge_base"], "mutates": False, "cacheable": True},
     "notion_get_block_children": {"capability_tags": ["knowledge_base"], "mutates": False, "cacheable": True},
     # SharePoint
-    "sharepoint_search": {"capability_tags": ["runbooks", "knowledge_base"], "mutates": False, "cacheable": True},
-    "sharepoint_fetch_page": {"capability_tags": ["runbooks", "knowledge_base"], "mutates": False, "cacheable": True},
-    "sharepoint_fetch_document": {"capability_tags": ["runbooks", "knowledge_base"], "mutates": False, "cacheable": True},
+    "sharepoint_search": {"capability_tags": ["runbooks", "knowledge_base"], "mutates": False, "cacheable": True, "cache_ttl": _TTL_REFERENCE},
+    "sharepoint_fetch_page": {"capability_tags": ["runbooks", "knowledge_base"], "mutates": False, "cacheable": True, "cache_ttl": _TTL_REFERENCE},
+    "sharepoint_fetch_document": {"capability_tags": ["runbooks", "knowledge_base"], "mutates": False, "cacheable": True, "cache_ttl": _TTL_REFERENCE},
     "sharepoint_create_page": {"capability_tags": [], "mutates": True, "cacheable": False},
     # ThousandEyes — network observability
     "thousandeyes_list_tests": {"capability_tags": ["metrics", "observability"], "mutates": False, "cacheable": True},
     "thousandeyes_get_test_detail": {"capability_tags": ["metrics", "observability"], "mutates": False, "cacheable": True},
-    "thousandeyes_get_test_results": {"capability_tags": ["metrics", "observability"], "mutates": False, "cacheable": True},
+    "thousandeyes_get_test_results": {"capability_tags": ["metrics", "observability"], "mutates": False, "cacheable": True, "cache_ttl": _TTL_LIVE},
     "thousandeyes_get_alerts": {"capability_tags": ["ticket_history", "observability"], "mutates": False, "cacheable": True},
     "thousandeyes_get_alert_rules": {"capability_tags": ["observability"], "mutates": False, "cacheable": True},
     "thousandeyes_get_agents": {"capability_tags": ["runtime_state"], "mutates": False, "cacheable": True},
@@ -130,6 +138,17 @@ def _get_tool_meta(tool) -> dict:
     return {**base, **tool_md, **override}
 
 
+def _has_cloud_provider(user_id: str) -> bool:
+    """True if the user has a first-class cloud provider connected."""
+    try:
+        from chat.background.rca_prompt_builder import get_user_providers
+        connected_providers = get_user_providers(user_id) or []
+        return any(p.lower() in _CLOUD_PROVIDERS for p in connected_providers)
+    except Exception:
+        logger.exception("select_skills: failed to resolve connected providers for user")
+        return False
+
+
 def get_available_capability_tags(user_id: str) -> set:
     """Return capability tags reachable for *this* user.
 
@@ -144,13 +163,7 @@ def get_available_capability_tags(user_id: str) -> set:
         # Mirror select_tools_for_role's cloud_exec special-case: it's also
         # valid when a first-class cloud provider (gcp/aws/azure) is connected,
         # not just when an ovh/scaleway/tailscale skill claims it.
-        has_cloud_provider = False
-        try:
-            from chat.background.rca_prompt_builder import get_user_providers
-            connected_providers = get_user_providers(user_id) or []
-            has_cloud_provider = any(p.lower() in _CLOUD_PROVIDERS for p in connected_providers)
-        except Exception:
-            logger.exception("select_skills: failed to resolve connected providers for tags")
+        has_cloud_provider = _has_cloud_provider(user_id)
         tools = get_cloud_tools()
         tags: set = set()
         for t in tools:
@@ -203,13 +216,7 @@ def select_tools_for_role(user_id: str, role: Any, all_tools: list) -> list:
     # `cloud_exec` is a built-in (not skill-owned) but only useful when the
     # user has at least one cloud provider connected. Otherwise the brief
     # already tells the LLM not to call it — strip it to save tokens.
-    has_cloud_provider = False
-    try:
-        from chat.background.rca_prompt_builder import get_user_providers
-        connected_providers = get_user_providers(user_id) or []
-        has_cloud_provider = any(p.lower() in _CLOUD_PROVIDERS for p in connected_providers)
-    except Exception:
-        logger.exception("select_skills: failed to resolve connected providers for user")
+    has_cloud_provider = _has_cloud_provider(user_id)
 
     candidates: list = []
     dropped_unconnected: list = []
@@ -235,6 +242,9 @@ def select_tools_for_role(user_id: str, role: Any, all_tools: list) -> list:
             dropped_cloud_exec = True
             continue
         candidates.append((tool, meta))
+    # read_cloud_output only pages results that cloud_exec stored.
+    if not any(getattr(tool, "name", "") == "cloud_exec" for tool, _meta in candidates):
+        candidates = [(tool, meta) for tool, meta in candidates if getattr(tool, "name", "") != "read_cloud_output"]
     if dropped_unconnected:
         logger.info(
             "select_skills: role=%s dropped %d unconnected tools: %s",
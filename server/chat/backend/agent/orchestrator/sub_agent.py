@@ -238,6 +238,13 @@ def _read_summary_from_storage(incident_id: str, agent_id: str, user_id: str) ->
         return None
 
 
+def _as_wave(value) -> int:
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
 async def sub_agent_node(input_dict: dict) -> dict:
     agent_id = input_dict.get("agent_id", "unknown")
     incident_id = input_dict.get("parent_incident_id", "")
@@ -503,6 +510,7 @@ async def _run(input_dict: dict) -> FindingRef:
             is_background=True,
             mode="ask",
             model=sub_agent_model,
+            rca_wave=_as_wave(input_dict.get("wave")),
         )
 
         postgres_client = PostgreSQLClient()
@@ -17,7 +17,7 @@ from chat.backend.agent.orchestrator.dispatcher import (
     DISPATCH_SUBAGENT_TOOL_NAME,
     dispatch_tool_call_id,
 )
-from chat.backend.agent.orchestrator.tool_cache import get_cache_hit_count
+from chat.backend.agent.orchestrator.tool_cache import get_cache_stats
 from chat.backend.agent.orchestrator.triage import _apply_per_role_caps
 from utils.log_sanitizer import hash_for_log
 
@@ -248,9 +248,10 @@ async def _synthesis(state: State) -> dict:
     new_history = existing_history + [history_entry]
 
     if is_terminal:
+        cache_stats = get_cache_stats(incident_id)
         logger.info(
-            "synthesis: incident=%s wave=%d cache_hits=%d",
-            inc_hash, new_wave, get_cache_hit_count(incident_id),
+            "synthesis: incident=%s wave=%d cache_hits=%d cache_misses=%d cache_coalesced=%d",
+            inc_hash, new_wave, cache_stats["hits"], cache_stats["misses"], cache_stats["coalesced"],
         )
         return {
             "synthesis_wave": new_wave,
@@ -1,23 +1,50 @@
-"""Redis-backed per-incident tool result cache for the multi-agent RCA orchestrator."""
+"""Redis-backed per-incident tool result cache for the multi-agent RCA orchestrator.
+
+Identical calls are single-flighted: within a process, concurrent callers
+await the first caller's in-flight future; across workers, the first caller
+takes a Redis pending marker (``SET NX``) and the others poll for its result
+until the marker is released.  A waiter whose leader fails or is cancelled
+runs the call itself, so errors are never shared.
+"""
 
 import asyncio
 import hashlib
 import json
 import logging
-from collections import OrderedDict
+import time
+import uuid
 from functools import wraps
-from typing import Any, Callable, Coroutine, Optional
+from typing import Any, Callable, Coroutine, Dict, Optional
+
+from cachetools import LRUCache
 
-from utils.cache.redis_client import get_redis_client
+from utils.cache.redis_client import get_many, get_redis_client
 from utils.cloud.cloud_utils import _state_var
 
 logger = logging.getLogger(__name__)
 
 _DEFAULT_TTL = 600   # seconds — standard tool results
 _KEY_PREFIX = "rca_tool_cache"
+_PENDING_SUFFIX = ":pending"
+_PENDING_TTL = 120   # seconds — upper bound on a leader's call; waiters give up after this
+_POLL_INITIAL = 0.05
+_POLL_MAX = 0.5
 _HIT_COUNTER_LIMIT = 1024  # bound long-running worker memory
 
-_hit_counters: "OrderedDict[str, int]" = OrderedDict()
+# Compare-and-delete so a leader never releases a marker that expired and
+# was re-taken by another worker.
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+_STAT_FIELDS = ("hits", "misses", "coalesced")
+
+_stats: "LRUCache[str, Dict[str, int]]" = LRUCache(maxsize=_HIT_COUNTER_LIMIT)
+_inflight: Dict[str, asyncio.Future] = {}
+_MISSING = object()
 
 
 def _get_redis():
@@ -32,8 +59,105 @@ def _cache_key(incident_id: str, tool_name: str, args: tuple, kwargs: dict) -> s
     return f"{_KEY_PREFIX}:{incident_id}:{digest}"
 
 
+def _record(incident_id: str, outcome: str) -> int:
+    counters = _stats.get(incident_id)
+    if counters is None:
+        counters = _stats[incident_id] = dict.fromkeys(_STAT_FIELDS, 0)
+    counters[outcome] += 1
+    return counters[outcome]
+
+
 def get_cache_hit_count(incident_id: str) -> int:
-    return _hit_counters.get(incident_id, 0)
+    return _stats.get(incident_id, {}).get("hits", 0)
+
+
+def get_cache_stats(incident_id: str) -> Dict[str, int]:
+    """Per-incident counters: ``hits`` (served from Redis), ``misses`` (call
+    executed) and ``coalesced`` (served from another caller's in-flight call)."""
+    return dict(_stats.get(incident_id) or dict.fromkeys(_STAT_FIELDS, 0))
+
+
+async def _redis_get(client, key: str) -> Any:
+    """Cached value for *key*, or ``_MISSING``."""
+    if not client:
+        return _MISSING
+    try:
+        cached = await asyncio.to_thread(client.get, key)
+        if cached is not None:
+            return json.loads(cached)
+    except Exception as exc:
+        logger.debug("RCA tool cache get error: %s", exc)
+    return _MISSING
+
+
+async def _acquire_pending(client, key: str) -> Optional[str]:
+    """Take the cross-worker pending marker; returns its token, or None if held elsewhere.
+
+    Without Redis every caller leads (in-process coalescing still applies).
+    """
+    token = uuid.uuid4().hex
+    if not client:
+        return token
+    try:
+        acquired = await asyncio.to_thread(
+            client.set, key + _PENDING_SUFFIX, token, nx=True, ex=_PENDING_TTL
+        )
+    except Exception as exc:
+        logger.debug("RCA tool cache pending-marker error: %s", exc)
+        return token
+    return token if acquired else None
+
+
+async def _release_pending(client, key: str, token: str) -> None:
+    if not client:
+        return
+    try:
+        await asyncio.to_thread(client.eval, _RELEASE_SCRIPT, 1, key + _PENDING_SUFFIX, token)
+    except Exception as exc:
+        logger.debug("RCA tool cache pending-release error: %s", exc)
+
+
+def _poll(client, key: str) -> tuple:
+    """(cached value, pending marker) in one round trip."""
+    cached, pending = get_many(client, [key, key + _PENDING_SUFFIX])
+    return cached, pending is not None
+
+
+async def _await_remote(client, key: str) -> Any:
+    """Poll for another worker's result until its pending marker goes away."""
+    deadline = time.monotonic() + _PENDING_TTL
+    delay = _POLL_INITIAL
+    while time.monotonic() < deadline:
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, _POLL_MAX)
+        try:
+            cached, pending = await asyncio.to_thread(_poll, client, key)
+        except Exception as exc:
+            logger.debug("RCA tool cache poll error: %s", exc)
+            return _MISSING
+        if cached is not None:
+            try:
+                return json.loads(cached)
+            except Exception as exc:
+                logger.debug("RCA tool cache get error: %s", exc)
+                return _MISSING
+        if not pending:
+            # Leader finished without caching (error or unserializable result);
+            # MGET is atomic, so there is no result to re-read.
+            return _MISSING
+    return _MISSING
+
+
+async def _await_local(future: asyncio.Future) -> Any:
+    """Result of an in-process leader, or ``_MISSING`` if it failed."""
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        if future.cancelled():
+            return _MISSING
+        raise
+    except Exception:
+        return _MISSING
 
 
 def cache_decorator(coro_fn: Callable[..., Coroutine], *, tool_name: str,
@@ -57,30 +181,65 @@ def cache_decorator(coro_fn: Callable[..., Coroutine], *, tool_name: str,
         except Exception:
             logger.exception("RCA tool cache: failed to initialize Redis client")
             client = None
-        if client:
-            try:
-                cached = await asyncio.to_thread(client.get, key)
-                if cached is not None:
-                    _hit_counters[incident_id] = _hit_counters.get(incident_id, 0) + 1
-                    _hit_counters.move_to_end(incident_id)
-                    while len(_hit_counters) > _HIT_COUNTER_LIMIT:
-                        _hit_counters.popitem(last=False)
-                    logger.debug(
-                        "RCA tool cache HIT: incident=%s tool=%s hits=%d",
-                        incident_id, tool_name, _hit_counters[incident_id],
-                    )
-                    return json.loads(cached)
-            except Exception as exc:
-                logger.debug("RCA tool cache get error: %s", exc)
 
-        result = await coro_fn(*args, **kwargs)
-        if client:
+        cached = await _redis_get(client, key)
+        if cached is not _MISSING:
+            hits = _record(incident_id, "hits")
+            logger.debug(
+                "RCA tool cache HIT: incident=%s tool=%s hits=%d",
+                incident_id, tool_name, hits,
+            )
+            return cached
+
+        # In-process single-flight. Futures are loop-bound, so callers on a
+        # different event loop fall through to the Redis marker instead.
+        loop = asyncio.get_running_loop()
+        inflight = _inflight.get(key)
+        if inflight is not None and inflight.get_loop() is loop and not inflight.done():
+            value = await _await_local(inflight)
+            if value is not _MISSING:
+                _record(incident_id, "coalesced")
+                logger.debug("RCA tool cache COALESCED (local): incident=%s tool=%s", incident_id, tool_name)
+                return value
+
+        future = loop.create_future()
+        _inflight[key] = future
+        try:
+            token = await _acquire_pending(client, key)
+            if token is None:
+                value = await _await_remote(client, key)
+                if value is not _MISSING:
+                    _record(incident_id, "coalesced")
+                    logger.debug("RCA tool cache COALESCED (remote): incident=%s tool=%s", incident_id, tool_name)
+                    future.set_result(value)
+                    return value
+                token = await _acquire_pending(client, key)
+
+            _record(incident_id, "misses")
             try:
-                serialized = json.dumps(result, default=str)
-                await asyncio.to_thread(client.setex, key, ttl_seconds, serialized)
-            except Exception as exc:
-                logger.debug("RCA tool cache set error: %s", exc)
-        return result
+                result = await coro_fn(*args, **kwargs)
+                if client:
+                    try:
+                        serialized = json.dumps(result, default=str)
+                        await asyncio.to_thread(client.setex, key, ttl_seconds, serialized)
+                    except Exception as exc:
+                        logger.debug("RCA tool cache set error: %s", exc)
+            finally:
+                if token is not None:
+                    await _release_pending(client, key, token)
+            future.set_result(result)
+            return result
+        except BaseException as exc:
+            if not future.done():
+                if isinstance(exc, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(exc)
+                    future.exception()  # mark retrieved; waiters retry on their own
+            raise
+        finally:
+            if _inflight.get(key) is future:
+                del _inflight[key]
     return wrapper
 
 
@@ -89,8 +248,9 @@ def wrap_tool_with_cache(tool: Any, *, tool_metadata: dict) -> Any:
     per-incident Redis cache, when metadata marks the tool as safely cacheable.
 
     Metadata gate: ``cacheable=True`` AND ``mutates=False``. Anything else is
-    returned unmodified. Original tool is never mutated — sub-agent paths share
-    the singleton list returned by ``get_cloud_tools()``.
+    returned unmodified. ``cache_ttl`` (seconds) overrides the default TTL.
+    Original tool is never mutated — sub-agent paths share the singleton list
+    returned by ``get_cloud_tools()``.
     """
     if not tool_metadata.get("cacheable") or tool_metadata.get("mutates"):
         return tool
@@ -98,7 +258,11 @@ def wrap_tool_with_cache(tool: Any, *, tool_metadata: dict) -> Any:
     if coroutine is None or not asyncio.iscoroutinefunction(coroutine):
         return tool
     try:
-        wrapped = cache_decorator(coroutine, tool_name=getattr(tool, "name", "unknown"))
+        wrapped = cache_decorator(
+            coroutine,
+            tool_name=getattr(tool, "name", "unknown"),
+            ttl_seconds=int(tool_metadata.get("cache_ttl") or _DEFAULT_TTL),
+        )
         return tool.model_copy(update={"coroutine": wrapped})
     except (AttributeError, TypeError):
         logger.exception(
@@ -18,12 +18,15 @@ Environment Variables:
 - OPENAI_API_KEY: Direct OpenAI API key
 - ANTHROPIC_API_KEY: Direct Anthropic API key
 - GOOGLE_AI_API_KEY: Google AI Studio API key
+- LLM_MODEL_CACHE_SIZE: Chat model instances kept by the registry (default 32)
 """
 
 import logging
 import os
-from typing import Dict, List, Optional
+import threading
+from typing import Any, Dict, Hashable, List, Optional
 
+from cachetools import LRUCache
 from langchain_core.language_models.chat_models import BaseChatModel
 
 from .base_provider import BaseLLMProvider
@@ -34,6 +37,7 @@ from .google_provider import GoogleProvider
 from .vertex_provider import VertexAIProvider
 from .ollama_provider import OllamaProvider
 from .bedrock_provider import BedrockProvider
+from . import http_pool
 from ..model_mapper import ModelMapper
 
 logger = logging.getLogger(__name__)
@@ -49,13 +53,46 @@ _ENV_VAR_HINTS = {
     "openrouter": "OPENROUTER_API_KEY",
 }
 
+MODEL_CACHE_SIZE = int(os.getenv("LLM_MODEL_CACHE_SIZE", "32"))
+
+_UNCACHEABLE = object()
+
+
+def _freeze(value: Any):
+    """Turn kwargs into a hashable cache key part, or _UNCACHEABLE.
+
+    Only plain data is keyed; anything else (callbacks, clients, ...) can carry
+    per-call state, so models built with it are never shared.
+    """
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, dict):
+        items = []
+        for k, v in sorted(value.items(), key=lambda kv: str(kv[0])):
+            frozen = _freeze(v)
+            if frozen is _UNCACHEABLE:
+                return _UNCACHEABLE
+            items.append((k, frozen))
+        return tuple(items)
+    if isinstance(value, (list, tuple)):
+        # Empty lists are common for "no callbacks"
+        frozen_items = tuple(_freeze(v) for v in value)
+        if any(f is _UNCACHEABLE for f in frozen_items):
+            return _UNCACHEABLE
+        return ("__seq__",) + frozen_items
+    return _UNCACHEABLE
+
 
 class ProviderRegistry:
     """Registry of all available LLM providers."""
 
-    def __init__(self):
+    def __init__(self, model_cache_size: int = MODEL_CACHE_SIZE):
         """Initialize the provider registry."""
         self._providers: Dict[str, BaseLLMProvider] = {}
+        self._model_cache: "LRUCache[Hashable, BaseChatModel]" = LRUCache(maxsize=max(model_cache_size, 1))
+        self._model_cache_size = model_cache_size
+        self._cache_lock = threading.Lock()
+        self._cache_stats = {"hits": 0, "misses": 0, "evictions": 0, "uncacheable": 0}
         self._initialize_providers()
 
     def _initialize_providers(self):
@@ -203,6 +240,52 @@ class ProviderRegistry:
                 return name
         return ModelMapper.detect_provider(model) or ""
 
+    def get_chat_model(
+        self, model: str, temperature: float = 0.4, mode: Optional[str] = None, **kwargs
+    ) -> BaseChatModel:
+        """
+        Return a chat model for ``model``, reusing a cached instance when possible.
+
+        Instances are keyed on (provider, model, temperature, kwargs) and shared
+        across callers, so they must not be mutated; build a new one with different
+        kwargs instead. Calls with non-data kwargs (e.g. callbacks) always get a
+        fresh instance. The cache is LRU-bounded by ``LLM_MODEL_CACHE_SIZE``.
+        """
+        provider = self.get_provider_for_model(model, mode=mode)
+        frozen_kwargs = _freeze(kwargs)
+        if frozen_kwargs is _UNCACHEABLE or self._model_cache_size <= 0:
+            with self._cache_lock:
+                self._cache_stats["uncacheable"] += 1
+            return provider.get_chat_model(model, temperature=temperature, **kwargs)
+
+        key = (provider.provider_name, model, temperature, frozen_kwargs)
+        with self._cache_lock:
+            cached = self._model_cache.get(key)
+            if cached is not None:
+                self._cache_stats["hits"] += 1
+                return cached
+            self._cache_stats["misses"] += 1
+
+        # Build outside the lock; a concurrent miss for the same key just wastes one build
+        instance = provider.get_chat_model(model, temperature=temperature, **kwargs)
+        with self._cache_lock:
+            cached = self._model_cache.get(key)
+            if cached is not None:
+                return cached
+            if len(self._model_cache) >= self._model_cache.maxsize:
+                self._cache_stats["evictions"] += 1
+            self._model_cache[key] = instance
+        return instance
+
+    def get_model_cache_stats(self) -> Dict[str, int]:
+        """Model cache hit/miss/eviction counters plus the current size."""
+        with self._cache_lock:
+            return {**self._cache_stats, "size": len(self._model_cache)}
+
+    def clear_model_cache(self) -> None:
+        with self._cache_lock:
+            self._model_cache.clear()
+
     def get_provider_info(self) -> List[Dict]:
         """
         Get information about all providers.
@@ -237,6 +320,17 @@ def get_registry() -> ProviderRegistry:
     return _registry
 
 
+def _reset_after_fork() -> None:
+    """Drop models and HTTP clients inherited by a forked (Celery prefork) child."""
+    global _registry
+    _registry = None
+    http_pool.reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
 def create_chat_model(
     model: str, temperature: float = 0.4, provider_mode: Optional[str] = None, **kwargs
 ) -> BaseChatModel:
@@ -250,7 +344,8 @@ def create_chat_model(
         **kwargs: Additional parameters to pass to the provider
 
     Returns:
-        Configured LangChain chat model instance
+        Configured LangChain chat model instance. It may be shared with other
+        callers (see ProviderRegistry.get_chat_model) and must not be mutated.
 
     Raises:
         RuntimeError: If no suitable provider is available
@@ -266,14 +361,12 @@ def create_chat_model(
     if provider_mode is None:
         provider_mode = os.getenv("LLM_PROVIDER_MODE")
 
-    logger.info(f"Creating chat model: {model} (mode: {provider_mode})")
+    logger.debug(f"Creating chat model: {model} (mode: {provider_mode})")
 
-    # Get the appropriate provider
-    registry = get_registry()
-    provider = registry.get_provider_for_model(model, mode=provider_mode)
-
-    # Create and return the chat model
-    return provider.get_chat_model(model, temperature=temperature, **kwargs)
+    # Resolve the provider and reuse a cached instance where possible
+    return get_registry().get_chat_model(
+        model, temperature=temperature, mode=provider_mode, **kwargs
+    )
 
 
 def get_available_providers() -> Dict[str, bool]:
@@ -293,6 +386,20 @@ def get_available_providers() -> Dict[str, bool]:
     }
 
 
+def get_llm_client_stats() -> Dict[str, Dict[str, int]]:
+    """
+    Model cache counters and per-provider HTTP connection reuse.
+
+    Example:
+        >>> get_llm_client_stats()
+        {'models': {'hits': 41, 'misses': 3, ...}, 'connections': {'openai': {'requests': 44, 'new_connections': 2, ...}}}
+    """
+    return {
+        "models": get_registry().get_model_cache_stats(),
+        "connections": http_pool.get_connection_stats(),
+    }
+
+
 # Export key classes and functions
 __all__ = [
     "BaseLLMProvider",
@@ -307,4 +414,5 @@ __all__ = [
     "get_registry",
     "create_chat_model",
     "get_available_providers",
+    "get_llm_client_stats",
 ]
@@ -0,0 +1,103 @@
+"""
+Shared keep-alive HTTP clients for OpenAI-compatible providers.
+
+Each ChatOpenAI instance otherwise builds its own httpx client, so every new
+model instance pays a fresh TCP + TLS handshake. Providers pass these shared
+clients instead (one sync + one async client per provider), with HTTP/2 when
+the ``h2`` package is installed.
+
+Clients are dropped in forked children (Celery prefork workers): an httpx
+connection pool inherited across fork shares sockets with the parent.
+"""
+
+import importlib.util
+import logging
+import os
+import threading
+from typing import Any, Dict
+
+from cachetools import LRUCache
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - httpx ships with the openai SDK
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+HTTP_POOL_MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "100"))
+HTTP_POOL_MAX_KEEPALIVE = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "20"))
+HTTP_POOL_KEEPALIVE_EXPIRY = float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "60"))
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+# Connections remembered for reuse accounting; older ones count as new if seen again.
+_SEEN_CONNECTIONS_MAX = 4096
+
+_lock = threading.Lock()
+_clients: Dict[str, Dict[str, Any]] = {}
+_seen_connections: "LRUCache[int, bool]" = LRUCache(maxsize=_SEEN_CONNECTIONS_MAX)
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+def _record_response(provider_name: str, response) -> None:
+    stream = response.extensions.get("network_stream")
+    with _lock:
+        stats = _stats.setdefault(provider_name, {"requests": 0, "new_connections": 0, "reused_connections": 0})
+        stats["requests"] += 1
+        if stream is None:
+            return
+        key = id(stream)
+        if _seen_connections.get(key):  # get() also refreshes its recency
+            stats["reused_connections"] += 1
+        else:
+            _seen_connections[key] = True
+            stats["new_connections"] += 1
+
+
+def _build_clients(provider_name: str) -> Dict[str, Any]:
+    limits = httpx.Limits(
+        max_connections=HTTP_POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_POOL_MAX_KEEPALIVE,
+        keepalive_expiry=HTTP_POOL_KEEPALIVE_EXPIRY,
+    )
+
+    def on_response(response):
+        _record_response(provider_name, response)
+
+    async def on_response_async(response):
+        _record_response(provider_name, response)
+
+    logger.info(f"Creating shared HTTP clients for {provider_name} (http2={_HTTP2_AVAILABLE})")
+    return {
+        "http_client": httpx.Client(
+            limits=limits, http2=_HTTP2_AVAILABLE, event_hooks={"response": [on_response]}
+        ),
+        "http_async_client": httpx.AsyncClient(
+            limits=limits, http2=_HTTP2_AVAILABLE, event_hooks={"response": [on_response_async]}
+        ),
+    }
+
+
+def shared_http_client_kwargs(provider_name: str) -> Dict[str, Any]:
+    """Return ``http_client``/``http_async_client`` kwargs for a ChatOpenAI-based provider."""
+    if httpx is None:
+        return {}
+    with _lock:
+        clients = _clients.get(provider_name)
+        if clients is None:
+            clients = _clients[provider_name] = _build_clients(provider_name)
+        return dict(clients)
+
+
+def get_connection_stats() -> Dict[str, Dict[str, int]]:
+    """Per-provider request count and how many requests opened vs reused a connection."""
+    with _lock:
+        return {name: dict(stats) for name, stats in _stats.items()}
+
+
+def reset_after_fork() -> None:
+    """Forget clients inherited from the parent process without closing its sockets."""
+    global _lock
+    _lock = threading.Lock()
+    _clients.clear()
+    _seen_connections.clear()
+    _stats.clear()
@@ -12,6 +12,7 @@ from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_openai import ChatOpenAI
 
 from .base_provider import BaseLLMProvider
+from .http_pool import shared_http_client_kwargs
 from ..model_mapper import ModelMapper
 
 logger = logging.getLogger(__name__)
@@ -80,6 +81,8 @@ class OpenAIProvider(BaseLLMProvider):
                 f"Enabled reasoning=high+summary=auto + use_responses_api=True for {native_model}"
             )
 
+        # Reuse keep-alive connections across model instances
+        config.update(shared_http_client_kwargs("openai"))
 
         config.update(kwargs)
 
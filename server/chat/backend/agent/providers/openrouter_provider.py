@@ -12,6 +12,7 @@ from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_openai import ChatOpenAI
 
 from .base_provider import BaseLLMProvider
+from .http_pool import shared_http_client_kwargs
 from ..model_mapper import ModelMapper
 
 logger = logging.getLogger(__name__)
@@ -60,6 +61,8 @@ class OpenRouterProvider(BaseLLMProvider):
             "request_timeout": 120.0,
             "max_retries": 3,
             "stream_usage": True,
+            # Reuse keep-alive connections across model instances
+            **shared_http_client_kwargs("openrouter"),
         }
         config.update(kwargs)
 
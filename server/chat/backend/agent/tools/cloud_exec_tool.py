@@ -5,11 +5,14 @@ import re
 import shlex
 import subprocess
 import tempfile
+import threading
+import contextvars
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from utils.terminal.terminal_run import terminal_run
 import time
 import requests
 from chat.backend.agent.utils.llm_usage_tracker import LLMUsageTracker
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, Optional
 from langchain_core.tools import StructuredTool
 from pathlib import Path
 
@@ -24,7 +27,9 @@ _ISOLATED_HOME = "/home/appuser" if _POD_ISOLATION else str(Path.home())
 from utils.auth.cloud_auth import generate_contextual_access_token
 from utils.auth.cloud_auth import generate_azure_access_token
 from utils.secrets.secret_ref_utils import get_user_token_data, get_token_owner_id
-from .output_sanitizer import sanitize_command_output, filter_error_messages, truncate_json_fields
+from .output_sanitizer import sanitize_command_output, filter_error_messages
+from .cloud_output_tool import store_cloud_output
+from chat.backend.agent.utils.json_projection import build_preview, format_preview_summary, parse_json_output
 from .cloud_provider_utils import determine_target_provider_from_context
 from chat.backend.agent.prompt.prompt_builder import CLOUD_EXEC_PROVIDERS
 from chat.backend.agent.access import ModeAccessController
@@ -1196,6 +1201,107 @@ def get_command_timeout(command: str, user_timeout: int = None) -> int:
     return 60
 
 
+# Multi-account AWS fan-out. The worker pool is shared by every cloud_exec
+# call in the process so concurrent agents cannot multiply STS/CLI load.
+AWS_FANOUT_MAX_WORKERS = int(os.getenv("AWS_FANOUT_MAX_WORKERS", "16"))
+AWS_FANOUT_ACCOUNT_TIMEOUT_SECONDS = int(os.getenv("AWS_FANOUT_ACCOUNT_TIMEOUT_SECONDS", "120"))
+# Once this much time has passed and at least one account answered, return what
+# is done; stragglers keep running and the merged result is stored for
+# read_cloud_output under the returned output_ref.
+AWS_FANOUT_RETURN_AFTER_SECONDS = float(os.getenv("AWS_FANOUT_RETURN_AFTER_SECONDS", "45"))
+
+_aws_fanout_pool: Optional[ThreadPoolExecutor] = None
+_aws_fanout_pool_lock = threading.Lock()
+
+
+def _get_aws_fanout_pool() -> ThreadPoolExecutor:
+    global _aws_fanout_pool
+    with _aws_fanout_pool_lock:
+        if _aws_fanout_pool is None:
+            _aws_fanout_pool = ThreadPoolExecutor(max_workers=AWS_FANOUT_MAX_WORKERS, thread_name_prefix="aws-fanout")
+        return _aws_fanout_pool
+
+
+def _reset_aws_fanout_pool_after_fork() -> None:
+    # Worker threads do not survive fork; a child reusing the parent's executor would hang.
+    global _aws_fanout_pool, _aws_fanout_pool_lock
+    _aws_fanout_pool = None
+    _aws_fanout_pool_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_aws_fanout_pool_after_fork)
+
+
+def _assume_aws_account_env(user_id: str, conn: dict, workspace: dict, read_only: bool) -> dict:
+    """Assume one account's role and build its isolated CLI environment.
+
+    Unlike setup_aws_environment_isolated this does no DB lookups and no
+    GetCallerIdentity/alias validation: the caller resolves the workspace once
+    for the whole fan-out, and credentials come from the shared STS cache.
+    """
+    from utils.aws.aws_sts_client import assume_workspace_role
+    from utils.aws.aws_session_policies import get_read_only_session_policy
+
+    role_arn = conn.get("role_arn")
+    region = conn.get("region") or "us-east-1"
+    session_policy = None
+    if read_only:
+        if conn.get("read_only_role_arn"):
+            role_arn = conn["read_only_role_arn"]
+        else:
+            session_policy = get_read_only_session_policy()
+    if not role_arn:
+        raise ValueError("no role_arn")
+
+    creds = assume_workspace_role(
+        role_arn=role_arn,
+        external_id=workspace["aws_external_id"],
+        workspace_id=workspace["id"],
+        region=region,
+        session_policy=session_policy,
+        user_id=user_id,
+    )
+    return {
+        "PATH": os.environ.get("PATH", ""),
+        "HOME": _ISOLATED_HOME,
+        "USER": os.environ.get("USER", ""),
+        "AWS_ACCESS_KEY_ID": str(creds["accessKeyId"]),
+        "AWS_SECRET_ACCESS_KEY": str(creds["secretAccessKey"]),
+        "AWS_SESSION_TOKEN": str(creds["sessionToken"]),
+        "AWS_SECURITY_TOKEN": str(creds["sessionToken"]),
+        "AWS_DEFAULT_REGION": region,
+        "AURORA_AWS_ACCOUNT_ID": str(conn.get("account_id", "")),
+    }
+
+
+class _FanoutCollector:
+    """Collects per-account results; stores the merged result if the caller returned early."""
+
+    def __init__(self, expected: int, on_complete_after_detach):
+        self._lock = threading.Lock()
+        self._expected = expected
+        self._on_complete_after_detach = on_complete_after_detach
+        self._detached = False
+        self.results: Dict[str, dict] = {}
+
+    def add(self, result: dict) -> None:
+        with self._lock:
+            self.results[result.pop("account_id")] = result
+            finished = self._detached and len(self.results) == self._expected
+        if finished:
+            self._on_complete_after_detach(dict(self.results))
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            return dict(self.results)
+
+    def detach(self) -> Dict[str, dict]:
+        """Stop waiting; returns the results so far (later ones go to the completion hook)."""
+        with self._lock:
+            self._detached = True
+            return dict(self.results)
+
+
 def _cloud_exec_aws_multi_account(
     user_id: str,
     connections: list,
@@ -1207,11 +1313,14 @@ def _cloud_exec_aws_multi_account(
 ) -> str:
     """Execute an AWS CLI command across all connected accounts and merge results.
 
-    Each account gets its own STS credentials; the command runs in parallel
-    via ThreadPoolExecutor.  Results are returned as a JSON object keyed by
-    account_id so the agent can reason about per-account output.
+    Accounts run on a bounded shared pool, each with its own timeout, using
+    credentials from the shared STS cache. Results are keyed by account_id.
+    If some accounts are still running after AWS_FANOUT_RETURN_AFTER_SECONDS,
+    the finished ones are returned immediately and the complete result is
+    stored under ``output_ref`` for read_cloud_output once the rest finish.
     """
-    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from utils.workspace.workspace_utils import get_or_create_workspace
+    from .cloud_output_tool import new_output_ref, store_cloud_output
 
     current_mode = get_mode_from_context()
     allowed, read_only_message = ModeAccessController.ensure_cloud_command_allowed(
@@ -1230,14 +1339,32 @@ def _cloud_exec_aws_multi_account(
             "provider": "aws",
         })
 
+    # Resolved once here: worker threads do not inherit the mode contextvar.
+    read_only = ModeAccessController.is_read_only_mode(current_mode)
+    workspace = get_or_create_workspace(user_id, "default")
+    if not workspace or not workspace.get("aws_external_id"):
+        logger.error("Workspace for user %s missing aws_external_id", hash_for_log(user_id))
+        return json.dumps({
+            "success": False,
+            "error": "Failed to setup AWS environment: workspace has no external ID",
+            "multi_account": True,
+            "command": command,
+            "provider": "aws",
+        })
+
+    account_timeout = AWS_FANOUT_ACCOUNT_TIMEOUT_SECONDS
+    if timeout:
+        account_timeout = min(account_timeout, timeout)
+
     def _run_on_account(conn: dict) -> dict:
         account_id = conn.get("account_id", "unknown")
         region = conn.get("region") or "us-east-1"
+        started = time.perf_counter()
         try:
-            success, _region, auth_method, isolated_env = setup_aws_environment_isolated(
-                user_id, selected_region=region, target_account_id=account_id
-            )
-            if not success:
+            try:
+                isolated_env = _assume_aws_account_env(user_id, conn, workspace, read_only)
+            except Exception as e:
+                logger.error("Failed to assume role for account %s: %s", account_id, e)
                 return {"account_id": account_id, "region": region, "success": False,
                         "error": "Failed to assume role"}
 
@@ -1251,7 +1378,7 @@ def _cloud_exec_aws_multi_account(
             ):
                 cmd += " --output json"
 
-            effective_timeout = get_command_timeout(cmd, timeout)
+            effective_timeout = min(get_command_timeout(cmd, timeout), account_timeout)
             cmd_args = shlex.split(cmd)
             result = terminal_run(
                 cmd_args, capture_output=True, text=True,
@@ -1263,33 +1390,73 @@ def _cloud_exec_aws_multi_account(
                 "success": result.returncode == 0,
                 "output": result.stdout.strip() if result.returncode == 0 else result.stderr.strip(),
                 "return_code": result.returncode,
+                "elapsed_seconds": round(time.perf_counter() - started, 2),
             }
+        except subprocess.TimeoutExpired:
+            return {"account_id": account_id, "region": region, "success": False,
+                    "error": f"Timed out after {account_timeout}s", "timed_out": True}
         except Exception as e:
             logger.error("Multi-account exec failed for %s: %s", account_id, e)
             return {"account_id": account_id, "region": region, "success": False,
                     "error": str(e)[:300]}
 
-    account_results = {}
-    with ThreadPoolExecutor(max_workers=min(len(connections), 10)) as pool:
-        futures = {pool.submit(_run_on_account, c): c["account_id"] for c in connections}
-        for future in as_completed(futures):
-            res = future.result()
-            acct = res.pop("account_id")
-            account_results[acct] = res
+    output_ref = new_output_ref()
 
-    all_success = all(r.get("success") for r in account_results.values())
-    elapsed = time.perf_counter() - fn_start if fn_start else 0
-    logger.info("TIME: cloud_exec AWS multi-account (%d accounts) completed in %.2fs",
-                len(connections), elapsed)
+    def _merged(results: Dict[str, dict]) -> dict:
+        return {
+            "success": all(r.get("success") for r in results.values()),
+            "multi_account": True,
+            "accounts_queried": len(results),
+            "command": command,
+            "provider": "aws",
+            "results_by_account": results,
+        }
+
+    def _store_late_result(results: Dict[str, dict]) -> None:
+        store_cloud_output(user_id, command, json.dumps(_merged(results)), output_ref=output_ref)
+        logger.info("AWS multi-account fan-out finished in background; stored as %s", output_ref)
 
-    return json.dumps({
-        "success": all_success,
-        "multi_account": True,
-        "accounts_queried": len(account_results),
-        "command": command,
-        "provider": "aws",
-        "results_by_account": account_results,
-    })
+    collector = _FanoutCollector(len(connections), _store_late_result)
+
+    def _run_and_collect(conn: dict) -> None:
+        # Recorded before the future completes, so a finished future is always in the collector.
+        collector.add(_run_on_account(conn))
+
+    pool = _get_aws_fanout_pool()
+    futures = [
+        # One context copy per task: a Context cannot be entered by two threads at once.
+        pool.submit(contextvars.copy_context().run, _run_and_collect, conn)
+        for conn in connections
+    ]
+
+    return_after = time.monotonic() + AWS_FANOUT_RETURN_AFTER_SECONDS
+    pending = set(futures)
+    while pending:
+        remaining = return_after - time.monotonic()
+        if remaining <= 0 and collector.snapshot():
+            break
+        _done, pending = wait(pending, timeout=remaining if remaining > 0 else None, return_when=FIRST_COMPLETED)
+
+    account_results = collector.detach()
+    still_running = [
+        conn.get("account_id", "unknown") for conn in connections
+        if conn.get("account_id", "unknown") not in account_results
+    ]
+    elapsed = time.perf_counter() - fn_start if fn_start else 0
+    logger.info("TIME: cloud_exec AWS multi-account (%d/%d accounts) returned in %.2fs",
+                len(account_results), len(connections), elapsed)
+
+    response = _merged(account_results)
+    if still_running:
+        response["success"] = False
+        response["pending_accounts"] = still_running
+        response["output_ref"] = output_ref
+        response["partial_note"] = (
+            f"{len(still_running)} account(s) still running. The complete result for all "
+            f"{len(connections)} accounts will be available via "
+            f"read_cloud_output(output_ref=\"{output_ref}\") once they finish."
+        )
+    return json.dumps(response)
 
 
 def cloud_exec(provider: str, command: str, user_id: Optional[str] = None, session_id: Optional[str] = None, provider_preference: Optional[str] = None, timeout: Optional[int] = None, output_file: Optional[str] = None, account_id: Optional[str] = None) -> str:
@@ -2262,107 +2429,45 @@ Security & Compliance
         response_tokens = count_tokens(final_response)
         
         # Proactive sizing threshold (token-based only; no row caps)
-        # When responses exceed this, we auto-rerun with a projection preview.
+        # When responses exceed this, the stdout we already captured is projected
+        # locally and stored for paging via read_cloud_output -- the command is
+        # never re-run.
         FILTER_TOKEN_THRESHOLD = 30000
 
-        def _command_already_filtered(cmd: str) -> bool:
-            lowered = cmd.lower()
-            return any(flag in lowered for flag in ["--filter", "--query", "--limit", "--page-size", "--max-items"])
-
-        def _build_projection_command(provider_name: str, cmd: str) -> Tuple[Optional[str], Optional[str]]:
-            lowered = cmd.lower()
-            if provider_name.lower() in ['gcp', 'gcloud']:
-                if " list" in lowered:
-                    base_cmd = re.sub(r'--format[=\s]+[^\s]+', '', cmd).strip()
-                    projection = '--format="value(name,status)"'
-                    logger.info(f"[cloud_exec] projection builder (gcp list generic): base_cmd={base_cmd}, projection={projection}")
-                    return f"{base_cmd} {projection}", "Applied generic projection to reduce list output size"
-            elif provider_name.lower() == 'aws':
-                # Avoid provider-specific projections for AWS to prevent malformed queries on nested outputs.
-                # Let the caller warn and fall back to UI truncation if no safe generic projection exists.
-                return None, None
-            elif provider_name.lower() in ['azure', 'az']:
-                if " list" in lowered and "--query" not in lowered:
-                    query = "[].{name:name,id:id,location:location}"
-                    logger.info(f"[cloud_exec] projection builder (az list generic): query={query}")
-                    return f"{cmd} --query \"{query}\" --output json", "Applied generic projection to reduce list output size"
-            return None, None
-
         try:
-            parsed_data = None
-            if "data" in response:
-                parsed_data = response["data"]
-            elif "chat_output" in response:
-                # Best-effort parse for arrays to count items
-                try:
-                    parsed_data = json.loads(response["chat_output"])
-                except Exception:
-                    parsed_data = None
-
             logger.info(f"[cloud_exec] sizing check: response_tokens={response_tokens}, threshold={FILTER_TOKEN_THRESHOLD}")
-            needs_filter = response_tokens > FILTER_TOKEN_THRESHOLD
-            already_filtered = _command_already_filtered(command)
-            logger.info(f"[cloud_exec] filter decision: needs_filter={needs_filter}, already_filtered={already_filtered}, command={command}")
-
-            if needs_filter and not already_filtered:
+            if response_tokens > FILTER_TOKEN_THRESHOLD and actual_success and result.stdout.strip():
+                output_ref = store_cloud_output(user_id, command, result.stdout)
                 try:
-                    projection_cmd, projection_reason = _build_projection_command(provider, command)
-                except Exception as build_err:
-                    logger.warning(f"[cloud_exec] projection builder error: {build_err}")
-                    projection_cmd, projection_reason = None, None
-
-                logger.info(f"[cloud_exec] projection candidate: {projection_cmd} (reason={projection_reason})")
+                    parsed_output = parse_json_output(result.stdout)
+                except ValueError:
+                    parsed_output = None
 
-                if projection_cmd:
-                    logger.warning(f"Large response ({response_tokens} tokens) for command: {command[:100]}... retrying with projection preview.")
-                    try:
-                        filtered_result = terminal_run(
-                            shlex.split(projection_cmd),
-                            capture_output=True,
-                            text=True,
-                            timeout=effective_timeout,
-                            env=isolated_env,
-                            trusted=True
-                        )
-                        if filtered_result.returncode == 0:
-                            filtered_output = filtered_result.stdout.strip() or filtered_result.stderr
-                            filtered_output = sanitize_command_output(filtered_output)
-                            response["filter_applied"] = True
-                            response["filter_command"] = projection_cmd
-                            response["filter_reason"] = projection_reason
-                            response["original_command"] = command
-                            response["original_chat_output"] = response.get("chat_output")
-                            response["original_reference"] = "Full result available; rerun without projection or with a different filter if needed."
-                            try:
-                                filtered_data = json.loads(filtered_result.stdout)
-                                filtered_data = truncate_json_fields(filtered_data, max_field_length=10000)
-                                response["preview_data"] = filtered_data
-                            except Exception:
-                                response["preview_data"] = filtered_output
-                            # Surface the projected output to UI while keeping original for reference
-                            response["chat_output"] = filtered_output if isinstance(filtered_output, str) else str(filtered_output)
-                            response["data"] = response.get("preview_data")
-                            response["final_command"] = projection_cmd
-                            final_response = json.dumps(response, indent=2)
-                            response_tokens = count_tokens(final_response)
-                        else:
-                            logger.warning(f"Projection retry command failed (code {filtered_result.returncode}); returning original output.")
-                    except Exception as retry_error:
-                        logger.warning(f"Projection retry command errored: {retry_error}; returning original output.")
-                else:
-                    if projection_cmd:
-                        response["filter_suggestion"] = {
-                            "suggested_command": projection_cmd,
-                            "reason": projection_reason
-                        }
-                    final_response = json.dumps(response, indent=2)
-                    response_tokens = count_tokens(final_response)
+                if parsed_output is not None:
+                    preview = build_preview(parsed_output)
+                    logger.warning(
+                        f"Large response ({response_tokens} tokens) for command: {command[:100]}... "
+                        f"returning local projection preview (output_ref={output_ref})."
+                    )
+                    response["projection_applied"] = True
+                    response["preview_data"] = preview
+                    response["data"] = preview
+                    response["chat_output"] = format_preview_summary(preview)
+                    response.pop("output", None)
+                if output_ref:
+                    response["output_ref"] = output_ref
+                    response["original_reference"] = (
+                        f"Full result stored. Page through it with read_cloud_output(output_ref=\"{output_ref}\", "
+                        "offset, limit, fields, match) instead of re-running the command."
+                    )
+                final_response = json.dumps(response, indent=2, default=str)
+                response_tokens = count_tokens(final_response)
 
             # If still large or filtering unavailable, attach guidance note
             if response_tokens > FILTER_TOKEN_THRESHOLD:
                 response["large_output_note"] = (
                     f"Response is large ({response_tokens} tokens). "
-                    "UI may truncate to ~10KB per field. Apply provider projections (e.g., --format/--query) to reduce payload size without limiting rows."
+                    "UI may truncate to ~10KB per field. Use read_cloud_output with output_ref to page through it, or apply provider projections (e.g., --format/--query)."
                 )
                 final_response = json.dumps(response, indent=2)
         except Exception as sizing_error:
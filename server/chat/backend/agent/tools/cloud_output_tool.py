@@ -0,0 +1,203 @@
+"""
+Cloud Output Tool
+
+Keeps the full stdout of oversized cloud_exec calls so the agent can page
+through it instead of re-running the command. cloud_exec returns a local
+projection preview plus an ``output_ref``; ``read_cloud_output`` serves record
+pages (optionally narrowed to fields / an equality match) from the stored copy.
+
+Outputs live in Redis, zlib-compressed, scoped to the user and expiring after
+CLOUD_OUTPUT_TTL_SECONDS.
+"""
+
+import base64
+import json
+import logging
+import os
+import threading
+import uuid
+import zlib
+from typing import Any, List, Optional
+
+from cachetools import LRUCache
+from pydantic import BaseModel, Field
+
+from chat.backend.agent.utils.json_projection import (
+    find_records,
+    get_path,
+    parse_json_output,
+)
+
+logger = logging.getLogger(__name__)
+
+CLOUD_OUTPUT_TTL_SECONDS = int(os.getenv("CLOUD_OUTPUT_TTL_SECONDS", str(6 * 3600)))
+# Raw outputs larger than this are not stored (the preview is still returned).
+CLOUD_OUTPUT_MAX_BYTES = int(os.getenv("CLOUD_OUTPUT_MAX_BYTES", str(64 * 1024 * 1024)))
+_MAX_PAGE = 100
+_MAX_TEXT_LINES = 200
+# Parsed outputs kept per process so paging does not re-parse on every call.
+_PARSED_CACHE_SIZE = 4
+
+_parsed_cache: "LRUCache[str, Any]" = LRUCache(maxsize=_PARSED_CACHE_SIZE)
+_parsed_lock = threading.Lock()
+
+
+class ReadCloudOutputArgs(BaseModel):
+    output_ref: str = Field(description="The output_ref returned by cloud_exec for a large result")
+    offset: int = Field(default=0, description="Index of the first record (or line) to return")
+    limit: int = Field(default=25, description="Number of records (max 100) or text lines (max 200) to return")
+    fields: Optional[List[str]] = Field(
+        default=None,
+        description="Dotted field paths to return for each record, e.g. ['InstanceId', 'State.Name']",
+    )
+    match: Optional[str] = Field(
+        default=None,
+        description="Only return records where a field equals a value, written as 'field=value' (e.g. 'State.Name=stopped')",
+    )
+
+
+def new_output_ref() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def _storage_key(user_id: str, output_ref: str) -> str:
+    return f"cloud_output:{user_id}:{output_ref}"
+
+
+def store_cloud_output(user_id: str, command: str, stdout: str, output_ref: Optional[str] = None) -> Optional[str]:
+    """Store raw stdout for later paging and return its reference, or None.
+
+    ``output_ref`` lets callers hand out a reference before the output exists
+    (multi-account fan-outs that finish in the background).
+    """
+    if not user_id or not stdout:
+        return None
+    raw = stdout.encode("utf-8")
+    if len(raw) > CLOUD_OUTPUT_MAX_BYTES:
+        logger.info(f"[CloudOutput] Not storing {len(raw):,}-byte output (limit {CLOUD_OUTPUT_MAX_BYTES:,})")
+        return None
+    try:
+        from utils.cache.redis_client import get_redis_client
+
+        client = get_redis_client()
+        if client is None:
+            return None
+        output_ref = output_ref or new_output_ref()
+        payload = json.dumps({
+            "command": command,
+            "data": base64.b64encode(zlib.compress(raw, 6)).decode("ascii"),
+        })
+        client.set(_storage_key(user_id, output_ref), payload, ex=CLOUD_OUTPUT_TTL_SECONDS)
+        return output_ref
+    except Exception as e:
+        logger.warning(f"[CloudOutput] Failed to store output: {e}")
+        return None
+
+
+def _load_cloud_output(user_id: str, output_ref: str) -> Optional[dict]:
+    from utils.cache.redis_client import get_redis_client
+
+    client = get_redis_client()
+    if client is None:
+        return None
+    payload = client.get(_storage_key(user_id, output_ref))
+    if not payload:
+        return None
+    stored = json.loads(payload)
+    stored["stdout"] = zlib.decompress(base64.b64decode(stored.pop("data"))).decode("utf-8")
+    return stored
+
+
+def _parsed_output(user_id: str, output_ref: str) -> Optional[dict]:
+    cache_key = _storage_key(user_id, output_ref)
+    with _parsed_lock:
+        parsed = _parsed_cache.get(cache_key)
+    if parsed is not None:
+        return parsed
+
+    stored = _load_cloud_output(user_id, output_ref)
+    if stored is None:
+        return None
+    try:
+        data = parse_json_output(stored["stdout"])
+        records_path, records = find_records(data)
+        if records:
+            parsed = {"command": stored["command"], "records_path": records_path, "records": records}
+        else:
+            parsed = {"command": stored["command"], "lines": json.dumps(data, indent=1, default=str).splitlines()}
+    except ValueError:
+        parsed = {"command": stored["command"], "lines": stored["stdout"].splitlines()}
+
+    with _parsed_lock:
+        _parsed_cache[cache_key] = parsed
+    return parsed
+
+
+def _matches(record: dict, field: str, expected: str) -> bool:
+    value = get_path(record, field)
+    if isinstance(value, bool):
+        return str(value).lower() == expected.lower()
+    return value is not None and str(value) == expected
+
+
+def read_cloud_output(
+    output_ref: str,
+    offset: int = 0,
+    limit: int = 25,
+    fields: Optional[List[str]] = None,
+    match: Optional[str] = None,
+    user_id: str | None = None,
+    **kwargs,
+) -> str:
+    """Page through the stored full output of a large cloud_exec call."""
+    if not user_id:
+        return json.dumps({"error": "No user context available."})
+    if not output_ref:
+        return json.dumps({"error": "output_ref is required."})
+
+    offset = max(0, int(offset or 0))
+    limit = max(1, int(limit or 25))
+
+    try:
+        parsed = _parsed_output(user_id, output_ref.strip())
+    except Exception:
+        logger.exception("[CloudOutput] Failed to load stored output")
+        return json.dumps({"error": "Failed to load stored output."})
+
+    if parsed is None:
+        return json.dumps({
+            "status": "not_found",
+            "message": "No stored output with that reference (it may have expired). Re-run the command with a narrower filter.",
+        })
+
+    if "lines" in parsed:
+        lines = parsed["lines"]
+        page = lines[offset:offset + min(limit, _MAX_TEXT_LINES)]
+        return json.dumps({
+            "status": "ok",
+            "command": parsed["command"],
+            "total_lines": len(lines),
+            "offset": offset,
+            "lines": page,
+            "next_offset": offset + len(page) if offset + len(page) < len(lines) else None,
+        })
+
+    records = parsed["records"]
+    if match:
+        field, sep, expected = match.partition("=")
+        if not sep:
+            return json.dumps({"error": "match must be written as 'field=value'."})
+        records = [record for record in records if _matches(record, field.strip(), expected.strip())]
+
+    page = records[offset:offset + min(limit, _MAX_PAGE)]
+    if fields:
+        page = [{path: get_path(record, path) for path in fields} for record in page]
+    return json.dumps({
+        "status": "ok",
+        "command": parsed["command"],
+        "records_path": parsed["records_path"],
+        "total_count": len(records),
+        "offset": offset,
+        "records": page,
+        "next_offset": offset + len(page) if offset + len(page) < len(records) else None,
+    }, default=str)
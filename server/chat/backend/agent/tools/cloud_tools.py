@@ -46,6 +46,7 @@ from chat.backend.constants import MAX_TOOL_OUTPUT_CHARS
 from .gitlab_tool import gitlab_tool, GitLabToolArgs
 from routes.gitlab.gitlab_api_utils import is_gitlab_connected
 from .cloud_exec_tool import cloud_exec
+from .cloud_output_tool import read_cloud_output, ReadCloudOutputArgs
 
 from .zip_file_tool import analyze_zip_file
 from .cloud_provider_utils import determine_target_provider_from_context
@@ -1345,6 +1346,7 @@ Once you identify which account has the issue, pass account_id (e.g. 'account')
     if get_connected_providers(user_id) and not is_pr_review:
         tool_functions.append((run_iac_tool, "iac_tool"))
         tool_functions.append((cloud_exec_wrapper, "cloud_exec"))
+        tool_functions.append((read_cloud_output, "read_cloud_output"))
 
     # trigger_rca: available when user clicked the RCA button (UI) OR when
     # running as a background agent (Slack, Celery) where there's no UI to gate it.
@@ -1655,6 +1657,19 @@ Once you identify which account has the issue, pass account_id (e.g. 'account')
                 ),
                 args_schema=SavePostmortemArgs,
             )
+        elif name == 'read_cloud_output':
+            tool = StructuredTool.from_function(
+                func=final_func,
+                name=name,
+                description=(
+                    "Page through the full stored result of a large cloud_exec call. When "
+                    "cloud_exec returns projection_applied with an output_ref, its data is only a "
+                    "preview (schema, sampled records, value counts); use this to read specific "
+                    "records instead of re-running the command. Supports offset/limit paging, "
+                    "'fields' to select dotted field paths, and 'match' ('field=value') to filter."
+                ),
+                args_schema=ReadCloudOutputArgs,
+            )
         elif name == 'list_artifacts':
             from .artifact_tool import ListArtifactsArgs
             tool = StructuredTool.from_function(
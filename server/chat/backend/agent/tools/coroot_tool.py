@@ -14,6 +14,7 @@ from typing import Any, Callable, Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
+from chat.backend.agent.utils.log_templates import compress_log_entries
 from connectors.coroot_connector.client import CorootAPIError, CorootClient, get_coroot_client
 from utils.auth.token_management import get_token_data
 
@@ -24,6 +25,10 @@ MAX_LIST_ITEMS = 100
 MAX_METRIC_DATAPOINTS = 120
 LOOKBACK_HOURS_MAX = 720  # 30 days
 MAX_LIMIT = 200
+_LOG_TEMPLATES_NOTE = (
+    "Log entries were compressed into templates (<*> marks variable tokens). "
+    "Use message_filter with a template's literal text to see individual entries."
+)
 STATUS_LABELS = {0: "UNKNOWN", 1: "OK", 2: "INFO", 3: "WARNING", 4: "CRITICAL"}
 
 
@@ -583,6 +588,16 @@ def coroot_get_app_logs(
             "attributes": e.get("attributes"),
         })
 
+    log_templates = compress_log_entries(entries, message="message", timestamp="timestamp", severity="severity")
+    if log_templates:
+        return _safe_json({
+            "app_id": app_id,
+            "source": raw.get("source", source),
+            "total_entries": len(entries),
+            "log_templates": log_templates,
+            "_message": _LOG_TEMPLATES_NOTE,
+        })
+
     items, trunc_meta = _truncate_list(
         entries, len(entries),
         hint="Use severity/message_filter to narrow, or reduce lookback_hours/limit.",
@@ -834,6 +849,20 @@ def coroot_get_overview_logs(
             "attributes": e.get("attributes"),
         })
 
+    log_templates = compress_log_entries(
+        entries,
+        # Leading application name keeps each app's templates apart.
+        message=lambda e: f"[{e.get('application')}] {e.get('message')}",
+        timestamp="timestamp",
+        severity="severity",
+    )
+    if log_templates:
+        return _safe_json({
+            "total_entries": len(entries),
+            "log_templates": log_templates,
+            "_message": _LOG_TEMPLATES_NOTE,
+        })
+
     items, trunc_meta = _truncate_list(
         entries, len(entries),
         hint="Use severity/message_filter to narrow, or reduce lookback_hours/limit.",
@@ -9,6 +9,7 @@ from typing import Any, Optional
 
 from pydantic import BaseModel, Field
 
+from chat.backend.agent.utils.log_templates import compress_log_entries
 from routes.datadog.config import MAX_OUTPUT_SIZE, MAX_RESULTS_CAP
 from routes.datadog.datadog_routes import (
     DatadogAPIError,
@@ -608,6 +609,20 @@ def query_datadog(
 
         results_list = result.get("results", [])
         serialized = [json.dumps(item) for item in results_list]
+        if resource_type == "logs":
+            log_templates = compress_log_entries(
+                results_list,
+                message="attributes.message",
+                timestamp="attributes.timestamp",
+                severity="attributes.status",
+                serialized_size=sum(len(item_str) for item_str in serialized),
+            )
+            if log_templates:
+                del result["results"]
+                result["log_templates"] = log_templates
+                result["note"] = ("Logs were compressed into log templates (<*> marks variable tokens). "
+                                  "Query a template's literal text to see its individual logs.")
+                return json.dumps(result)
         truncated_results, was_truncated = _truncate_results(results_list, serialized)
         if was_truncated:
             result["results"] = truncated_results
@@ -148,7 +148,8 @@ def github_commit(
                         "branch": branch,
                         "files": terraform_files,
                         "message": commit_message
-                    }
+                    },
+                    user_id=user_id
                 )
             
             # Run the async operations in a separate thread
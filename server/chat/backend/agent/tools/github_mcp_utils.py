@@ -40,7 +40,8 @@ def call_github_mcp_sync(
         return await _mcp_manager.call_mcp_tool(
             server_type="github",
             tool_name=tool_name,
-            arguments=arguments
+            arguments=arguments,
+            user_id=user_id
         )
 
     try:
@@ -6,11 +6,24 @@ Uses hybrid search (semantic + keyword) with source attribution.
 """
 
 import logging
+import os
+import re
+import threading
 
 from pydantic import BaseModel, Field
 
 logger = logging.getLogger(__name__)
 
+# Warm the KB search cache with likely queries when an RCA starts.
+KB_SEARCH_PREFETCH = os.getenv("KB_SEARCH_PREFETCH", "true").lower() in ("1", "true", "yes")
+KB_PREFETCH_MAX_QUERIES = 4
+_DEFAULT_LIMIT = 5
+_ERROR_TERM = re.compile(
+    r"\b([A-Za-z]*(?:Error|Exception|Killed|BackOff)|[45]\d{2}|timeout|timed out|latency|oom"
+    r"|crash\w*|unavailable|refused|denied|failed|failure|deadlock|throttl\w*|saturat\w*)\b",
+    re.IGNORECASE,
+)
+
 
 class KnowledgeBaseSearchArgs(BaseModel):
     """Arguments for knowledge base search."""
@@ -19,16 +32,30 @@ class KnowledgeBaseSearchArgs(BaseModel):
         description="Search query for the knowledge base. Be specific - include service names, error types, or topics."
     )
     limit: int = Field(
-        default=5,
+        default=_DEFAULT_LIMIT,
         description="Maximum number of results to return (1-10).",
         ge=1,
         le=10,
     )
 
 
+def _search(user_id: str, query: str, limit: int, org_id: str | None = None) -> list[dict]:
+    """Run a KB search with the parameters the agent tool uses (so prefetches share its cache)."""
+    from routes.knowledge_base.weaviate_client import search_knowledge_base as search_kb
+
+    return search_kb(
+        user_id=user_id,
+        query=query,
+        limit=limit,
+        alpha=0.5,
+        min_score=0.0,
+        org_id=org_id,
+    )
+
+
 def knowledge_base_search(
     query: str,
-    limit: int = 5,
+    limit: int = _DEFAULT_LIMIT,
     user_id: str | None = None,
     session_id: str | None = None,
     **kwargs,
@@ -58,16 +85,7 @@ def knowledge_base_search(
     limit = max(1, min(10, limit))
 
     try:
-        from routes.knowledge_base.weaviate_client import search_knowledge_base as search_kb
-
-        results = search_kb(
-            user_id=user_id,
-            query=query.strip(),
-            limit=limit,
-            alpha=0.5,
-            min_score=0.0,
-            org_id=kwargs.get("org_id"),
-        )
+        results = _search(user_id, query.strip(), limit, org_id=kwargs.get("org_id"))
 
         if not results:
             return f"No relevant documents found in knowledge base for: '{query}'\n\nConsider:\n- The knowledge base may not have documentation for this topic\n- Try a different search query with alternative terms\n- Proceed with standard investigation approach"
@@ -108,6 +126,73 @@ def knowledge_base_search(
         return f"Error searching knowledge base: {str(e)}\n\nProceeding without knowledge base context."
 
 
+def incident_search_queries(alert_title: str | None, alert_service: str | None) -> list[str]:
+    """Likely first KB searches for an incident: title, service, service + error terms, runbook."""
+    title = (alert_title or "").strip()[:200]
+    service = (alert_service or "").strip()
+    error_terms = []
+    for match in _ERROR_TERM.finditer(title):
+        term = match.group(1)
+        if term.lower() not in (t.lower() for t in error_terms):
+            error_terms.append(term)
+
+    candidates = [title, service]
+    if service and error_terms:
+        candidates.append(f"{service} {' '.join(error_terms[:3])}")
+    if service:
+        candidates.append(f"{service} runbook")
+
+    from routes.knowledge_base.search_cache import normalize_query
+
+    queries, seen = [], set()
+    for query in candidates:
+        normalized = normalize_query(query)
+        if normalized and normalized not in seen:
+            seen.add(normalized)
+            queries.append(query)
+    return queries[:KB_PREFETCH_MAX_QUERIES]
+
+
+def prefetch_incident_searches(user_id: str, incident_id: str) -> int:
+    """Run the likely KB searches for an incident so the agent's first searches hit the cache.
+
+    Returns the number of searches run.
+    """
+    from utils.auth.stateless_auth import set_rls_context
+    from utils.db.connection_pool import db_pool
+
+    with db_pool.get_admin_connection() as conn:
+        with conn.cursor() as cursor:
+            set_rls_context(cursor, conn, user_id, log_prefix="[KB Prefetch]")
+            cursor.execute(
+                "SELECT alert_title, alert_service FROM incidents WHERE id = %s",
+                (incident_id,),
+            )
+            row = cursor.fetchone()
+    if not row:
+        return 0
+
+    queries = incident_search_queries(row[0], row[1])
+    for query in queries:
+        _search(user_id, query, _DEFAULT_LIMIT)
+    logger.info(f"[KB Prefetch] Warmed {len(queries)} searches for incident {incident_id}")
+    return len(queries)
+
+
+def start_incident_prefetch(user_id: str, incident_id: str) -> None:
+    """Prefetch in a background thread; the RCA never waits on it."""
+    if not KB_SEARCH_PREFETCH or not user_id or not incident_id:
+        return
+
+    def _run():
+        try:
+            prefetch_incident_searches(user_id, str(incident_id))
+        except Exception as e:
+            logger.warning(f"[KB Prefetch] Failed for incident {incident_id}: {e}")
+
+    threading.Thread(target=_run, name="kb-prefetch", daemon=True).start()
+
+
 # Tool description for the agent
 KNOWLEDGE_BASE_SEARCH_DESCRIPTION = """Search your knowledge base for relevant documentation, runbooks, or infrastructure topology.
 
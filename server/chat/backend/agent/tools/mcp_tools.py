@@ -6,11 +6,10 @@ Extracted from cloud_tools.py to improve code organization and maintainability.
 """
 
 from typing import Any, Dict, Optional, List, Callable
-import threading
+import itertools
 import json
 import asyncio
 import logging
-import subprocess
 import tempfile
 import os
 import time
@@ -23,6 +22,8 @@ from pydantic import BaseModel, Field
 # Import required classes
 from langchain_core.tools import StructuredTool
 
+from .mcp_transport import MCPConnection, MCPServerPool, call_soon_on_mcp_loop, run_on_mcp_loop
+
 # Real MCP client integration
 REAL_MCP_ENABLED = True
 REAL_MCP_SERVER_PATHS = {
@@ -93,18 +94,24 @@ def summarize_mcp_tool_action(tool_name: str, kwargs: dict) -> str:
     
     return " ".join(parts) + ".\n\n"
 
+# Pooled MCP connections shared by every RealMCPServerManager instance
+_mcp_pool = MCPServerPool()
+# JSON-RPC ids must be unique per connection; connections are shared across managers
+_message_ids = itertools.count(2)
+
+
 # Real MCP server connection manager
 class RealMCPServerManager:
-    """Manages connections to real MCP servers via stdio transport."""
+    """Manages connections to real MCP servers via stdio transport.
+
+    Server processes live in a module-wide pool keyed by (user_id, server_type)
+    and are driven from the dedicated MCP event loop (see mcp_transport.py).
+    Requests are multiplexed by JSON-RPC id, so concurrent tool calls share a
+    process instead of queueing behind a per-server lock.
+    """
     
     def __init__(self):
-        self.server_processes = {}
-        self.server_sessions = {}
-        self.message_id = 1
-        self.lock = threading.Lock()
-        # Threading locks per server type to serialize MCP requests (stdio is sequential)
-        # Using threading.Lock instead of asyncio.Lock because calls come from different event loops
-        self._server_locks: Dict[str, threading.Lock] = {}
+        self.pool = _mcp_pool
         
         # Server configurations
         self.server_configs = {
@@ -128,78 +135,27 @@ class RealMCPServerManager:
         
     def get_next_message_id(self):
         """Get next message ID thread-safely."""
-        with self.lock:
-            self.message_id += 1
-            return self.message_id
-    
-    def _get_server_lock(self, server_type: str) -> threading.Lock:
-        """Get or create a threading lock for a server type to serialize MCP requests.
-        
-        Using threading.Lock instead of asyncio.Lock because MCP tool calls can come
-        from different event loops/threads, and asyncio.Lock is bound to a single loop.
-        """
-        with self.lock:  # Thread-safe creation
-            if server_type not in self._server_locks:
-                self._server_locks[server_type] = threading.Lock()
-            return self._server_locks[server_type]
+        return next(_message_ids)
+
+    @staticmethod
+    def _resolve_user_id(user_id: Optional[str]) -> Optional[str]:
+        """Fall back to the calling thread's user context when no user_id is given."""
+        if user_id:
+            return user_id
+        try:
+            from utils.cloud.cloud_utils import get_user_context
+            user_context = get_user_context()
+            return user_context.get('user_id') if isinstance(user_context, dict) else user_context
+        except ImportError:
+            return None
             
-    async def start_mcp_server(self, server_type: str, user_credentials: Dict = None) -> Optional[subprocess.Popen]:
-        """Start a real MCP server process."""
+    async def start_mcp_server(self, server_type: str, user_credentials: Dict = None) -> Optional[MCPConnection]:
+        """Start a real MCP server process (the MCP handshake is not performed here)."""
         # AWS MCP server disabled - dependency conflicts with boto3/rsa versions
         if server_type == "aws":
             logging.info("AWS MCP server is disabled")
             return None
         try:
-            # Check if server is already running
-            if server_type in self.server_processes:
-                process_info = self.server_processes[server_type]
-                if isinstance(process_info, dict):
-                    process = process_info.get("process")
-                    pid = process_info.get("pid")
-                else:
-                    # Handle legacy format where process_info is directly a subprocess.Popen object
-                    process = process_info
-                    pid = process.pid if process else None
-                
-                if process and process.poll() is None:  # Still running
-                    logging.info(f" MCP server {server_type} already running with PID {pid}")
-                    # For AWS and GitHub, force restart to ensure updated credentials
-                    if server_type in ["aws", "github"]:
-                        logging.info(f" Force restarting {server_type.upper()} MCP server for updated credentials")
-                        process.terminate()
-                        try:
-                            process.wait(timeout=5)
-                        except subprocess.TimeoutExpired:
-                            process.kill()
-                        del self.server_processes[server_type]
-                        logging.info(f" {server_type.upper()} MCP server restarted successfully")
-                    else:
-                        return process
-                else:
-                    # Process died, remove it
-                    logging.info(f"DEBUG: {server_type} process is dead, removing")
-                    del self.server_processes[server_type]
-            
-            # For AWS, always restart to ensure config files are created
-            if server_type == "aws":
-                if server_type in self.server_processes:
-                    process_info = self.server_processes[server_type]
-                    if isinstance(process_info, dict):
-                        process = process_info.get("process")
-                    else:
-                        process = process_info
-                    
-                    if process and process.poll() is None:
-                        logging.info(f" Terminating existing AWS MCP server process {process.pid}")
-                        process.terminate()
-                        try:
-                            process.wait(timeout=5)
-                        except subprocess.TimeoutExpired:
-                            process.kill()
-                    del self.server_processes[server_type]
-                    logging.info(f" AWS MCP server process cleared")
-            
-            
             server_path = REAL_MCP_SERVER_PATHS.get(server_type)
             if not server_path:
                 logging.warning(f"Unknown MCP server type: {server_type}")
@@ -298,231 +254,137 @@ output = json
                         env["GITHUB_PERSONAL_ACCESS_TOKEN"] = str(user_credentials["github"].get("access_token", ""))
                         env["GITHUB_TOOLSETS"] = "all"
 
-            
-            # Offload the blocking Popen spawn to a worker thread so we don't
-            # stall the event loop while the child is fork/exec'd. The returned
-            # Popen object is still used with its synchronous stdin/stdout
-            # pipes in send_mcp_message, so we keep subprocess.Popen here rather
-            # than switching to asyncio.create_subprocess_exec.
-            process = await asyncio.to_thread(
-                subprocess.Popen,
-                cmd,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                env=env,
-                text=True,
-                bufsize=1,
-            )
+            connection = await MCPConnection.spawn(server_type, cmd, env)
 
             # Give the process a moment to start
             startup_wait = 0.5
             await asyncio.sleep(startup_wait)
             
             # Check if process started successfully
-            if process.poll() is not None:
-                # Process has already exited
-                stdout, stderr = process.communicate()
-                logging.error(f" MCP server {server_type} failed to start. Exit code: {process.returncode}")
-                logging.error(f"Stdout: {stdout}")
-                logging.error(f"Stderr: {stderr}")
+            if not connection.alive:
+                logging.error(f" MCP server {server_type} failed to start. Exit code: {connection.process.returncode}")
+                await connection.close()
                 return None
             
-            # Store the process
-            self.server_processes[server_type] = process
-            
-            return process
+            return connection
             
         except Exception as e:
             logging.error(f" Failed to start MCP server {server_type}: {str(e)}")
             return None
     
-    async def send_mcp_message(self, server_type: str, message: Dict, timeout: int = None, _lock_held: bool = False) -> Optional[Dict]:
-        """Send a message to an MCP server and get response.
+    def _get_server_credentials(self, server_type: str, user_id: str = None) -> Dict:
+        """Fetch credentials for a server and nest them in the shape start_mcp_server expects."""
+        if not user_id:
+            return {}
+        flat_credentials = self.get_credentials_for_server(server_type, user_id)
+        if not flat_credentials:
+            return {}
+        logging.info(f" {server_type.capitalize()} credentials configured for MCP server")
+        
+        # Convert flat credentials to nested format for start_mcp_server
+        if server_type == "aws":
+            return {
+                "aws": {
+                    "access_key_id": flat_credentials.get("AWS_ACCESS_KEY_ID"),
+                    "secret_access_key": flat_credentials.get("AWS_SECRET_ACCESS_KEY"),
+                    "session_token": flat_credentials.get("AWS_SESSION_TOKEN"),
+                    "region": flat_credentials.get("AWS_DEFAULT_REGION", "us-east-1")
+                }
+            }
+        # elif server_type == "azure":
+        #     return {
+        #         "azure": {
+        #             "client_id": flat_credentials.get("AZURE_CLIENT_ID"),
+        #             "client_secret": flat_credentials.get("AZURE_CLIENT_SECRET"),
+        #             "tenant_id": flat_credentials.get("AZURE_TENANT_ID"),
+        #             "subscription_id": flat_credentials.get("AZURE_SUBSCRIPTION_ID")
+        #         }
+        #     }
+        if server_type == "github":
+            return {
+                "github": {
+                    "access_token": flat_credentials.get("GITHUB_PERSONAL_ACCESS_TOKEN"),
+                    "api_url": flat_credentials.get("GITHUB_API_URL", "https://api.github.com")
+                }
+            }
+        return {}
+
+    async def _open_connection(self, server_type: str, user_id: str = None) -> Optional[MCPConnection]:
+        """Pool factory: start a server process for this user and run the MCP handshake."""
+        # Credential lookups hit the database; keep them off the MCP loop
+        credentials = await asyncio.to_thread(self._get_server_credentials, server_type, user_id)
+        connection = await self.start_mcp_server(server_type, credentials)
+        if not connection:
+            logging.error(f" Failed to start MCP server {server_type}")
+            return None
         
-        IMPORTANT: MCP uses stdio which is sequential - only one request can be
-        processed at a time. We use a threading lock per server to serialize requests.
+        # Initialize with longer timeout for GitHub (Docker container) and Azure
+        timeout = 30 if server_type == "github" else 8
+        if not await self._initialize_mcp_server_with_timeout(connection, timeout=timeout):
+            logging.error(f" Failed to initialize MCP server {server_type}")
+            await connection.close()
+            return None
+        return connection
+    
+    async def send_mcp_message(self, server_type: str, message: Dict, timeout: int = None, user_id: str = None) -> Optional[Dict]:
+        """Send a message to an MCP server and get response.
         
-        Args:
-            _lock_held: Internal flag - if True, skip acquiring lock (caller already holds it)
+        Leases a pooled connection for (user_id, server_type), starting one if
+        none is running, and waits only for the response carrying this message's id.
         """
         # Use longer timeout for GitHub (Docker) and Azure which can be slow
         if timeout is None:
             timeout = 15 if server_type == "github" else 5
-        
-        # Get the lock for this server type to serialize requests
-        if _lock_held:
-            # Caller already holds the lock, execute directly
-            return await self._send_mcp_message_impl(server_type, message, timeout)
-        
-        server_lock = self._get_server_lock(server_type)
-        with server_lock:
-            return await self._send_mcp_message_impl(server_type, message, timeout)
-    
-    async def _send_mcp_message_impl(self, server_type: str, message: Dict, timeout: int) -> Optional[Dict]:
-        """Internal implementation of send_mcp_message (assumes lock is held)."""
+        user_id = self._resolve_user_id(user_id)
         try:
-            server_info = self.server_processes.get(server_type)
-            if not server_info or not server_info.get("process"):
+            return await run_on_mcp_loop(self._send_mcp_message_impl(server_type, message, timeout, user_id))
+        except Exception as e:
+            logging.error(f" Error sending message to MCP server {server_type}: {str(e)}")
+            return None
+    
+    async def _send_mcp_message_impl(self, server_type: str, message: Dict, timeout: int, user_id: Optional[str]) -> Optional[Dict]:
+        """Internal implementation of send_mcp_message (runs on the MCP loop)."""
+        key = (user_id, server_type)
+        async with self.pool.lease(key, lambda: self._open_connection(server_type, user_id)) as connection:
+            if connection is None:
                 logging.error(f" MCP server {server_type} not running")
                 return None
             
-            proc = server_info["process"]
-            message_id = message.get("id")
-            
-            # Check if process is still alive
-            if proc.poll() is not None:
-                logging.warning(f" MCP server {server_type} process has died, restarting...")
-                # Remove the dead process
-                del self.server_processes[server_type]
-                # Try to restart the server (use impl directly since we already hold the lock)
-                await self._initialize_mcp_server_impl(server_type)
-                # Get the new process
-                server_info = self.server_processes.get(server_type)
-                if not server_info or not server_info.get("process"):
-                    logging.error(f" Failed to restart MCP server {server_type}")
-                    return None
-                proc = server_info["process"]
-            
-            # Send message
-            proc.stdin.write(json.dumps(message) + "\n")
-            proc.stdin.flush()
-            
-            if message_id:
-                # Wait for response with timeout
-                start_time = time.time()
-                while time.time() - start_time < timeout:
-                    line = proc.stdout.readline()
-                    if not line:
-                        continue
-                    
-                    try:
-                        response = json.loads(line)
-                        # Handle notifications (messages without id)
-                        if "id" not in response:
-                            logging.debug(f" Received notification from {server_type}: {response}")
-                            continue
-                        
-                        if response.get("id") == message_id:
-                            return response
-                    except json.JSONDecodeError:
-                        continue
-                
-                logging.warning(f"Timeout waiting for response to message ID {message_id} from {server_type}")
-                return None
-            else:
+            if "id" not in message:
                 # For notifications, don't wait for response
+                await connection.notify(message)
                 return None
-                
-        except BrokenPipeError as e:
-            logging.error(f" Broken pipe error with MCP server {server_type}: {str(e)}")
-            # Remove the dead process and try to restart
-            if server_type in self.server_processes:
-                del self.server_processes[server_type]
-            logging.info(f" Attempting to restart MCP server {server_type}...")
-            await self._initialize_mcp_server_impl(server_type)
-            return None
-        except Exception as e:
-            logging.error(f" Error sending message to MCP server {server_type}: {str(e)}")
-            return None
+            
+            started = time.monotonic()
+            response = await connection.request(message, timeout)
+            self.pool.record_request(server_type, time.monotonic() - started, response is not None)
+            return response
     
     async def initialize_mcp_server(self, server_type: str, user_id: str = None) -> bool:
-        """Initialize MCP server with handshake.
+        """Make sure a pooled, initialized MCP server is running for this user.
         
-        Uses the same threading lock as send_mcp_message to prevent restarting
-        the server while requests are in flight.
+        Reuses a live process when one exists; concurrent callers wait on a
+        single start rather than each spawning their own.
         """
         # AWS MCP server disabled - dependency conflicts with boto3/rsa versions
         if server_type == "aws":
             logging.info("AWS MCP server is disabled")
             return False
         
-        # Acquire lock to prevent conflicts with in-flight requests
-        server_lock = self._get_server_lock(server_type)
+        if not self.server_configs.get(server_type):
+            logging.error(f" No server configuration found for {server_type}")
+            return False
         
-        with server_lock:
-            return await self._initialize_mcp_server_impl(server_type, user_id)
-    
-    async def _initialize_mcp_server_impl(self, server_type: str, user_id: str = None) -> bool:
-        """Internal implementation of initialize_mcp_server (called with lock held)."""
+        user_id = self._resolve_user_id(user_id)
         try:
-            # Get server configuration
-            server_config = self.server_configs.get(server_type)
-            if not server_config:
-                logging.error(f" No server configuration found for {server_type}")
-                return False
-            
-            # Set up credentials for the server
-            if user_id:
-                flat_credentials = self.get_credentials_for_server(server_type, user_id)
-                if flat_credentials:
-                    logging.info(f" {server_type.capitalize()} credentials configured for MCP server")
-                    
-                    # Convert flat credentials to nested format for start_mcp_server
-                    if server_type == "aws":
-                        credentials = {
-                            "aws": {
-                                "access_key_id": flat_credentials.get("AWS_ACCESS_KEY_ID"),
-                                "secret_access_key": flat_credentials.get("AWS_SECRET_ACCESS_KEY"),
-                                "session_token": flat_credentials.get("AWS_SESSION_TOKEN"),
-                                "region": flat_credentials.get("AWS_DEFAULT_REGION", "us-east-1")
-                            }
-                        }
-                    # elif server_type == "azure":
-                    #     credentials = {
-                    #         "azure": {
-                    #             "client_id": flat_credentials.get("AZURE_CLIENT_ID"),
-                    #             "client_secret": flat_credentials.get("AZURE_CLIENT_SECRET"),
-                    #             "tenant_id": flat_credentials.get("AZURE_TENANT_ID"),
-                    #             "subscription_id": flat_credentials.get("AZURE_SUBSCRIPTION_ID")
-                    #         }
-                    #     }
-                    elif server_type == "github":
-                        credentials = {
-                            "github": {
-                                "access_token": flat_credentials.get("GITHUB_PERSONAL_ACCESS_TOKEN"),
-                                "api_url": flat_credentials.get("GITHUB_API_URL", "https://api.github.com")
-                            }
-                        }
-                    else:
-                        credentials = {}
-                else:
-                    credentials = {}
-            else:
-                credentials = {}
-            
-            # Use our start_mcp_server method instead of direct subprocess.Popen
-            process = await self.start_mcp_server(server_type, credentials)
-            if not process:
-                logging.error(f" Failed to start MCP server {server_type}")
-                return False
-            
-            # Store process info
-            self.server_processes[server_type] = {
-                "process": process,
-                "pid": process.pid,
-                "command": server_config["command"]
-            }
-            
-            # Initialize with longer timeout for GitHub (Docker container) and Azure
-            timeout = 30 if server_type == "github" else 8
-            initialize_success = await self._initialize_mcp_server_with_timeout(server_type, timeout=timeout)
-            if not initialize_success:
-                logging.error(f" Failed to initialize MCP server {server_type}")
-                # Clean up the process
-                try:
-                    process.terminate()
-                    process.wait(timeout=2)
-                except:
-                    process.kill()
-                return False
-            return True
-            
+            return await run_on_mcp_loop(
+                self.pool.prestart((user_id, server_type), lambda: self._open_connection(server_type, user_id))
+            )
         except Exception as e:
             logging.error(f" Error starting MCP server {server_type}: {str(e)}")
             return False
     
-    async def list_mcp_tools(self, server_type: str) -> List[Dict]:
+    async def list_mcp_tools(self, server_type: str, user_id: str = None) -> List[Dict]:
         """Get list of tools from a real MCP server."""
         try:
             # For all MCP servers, try standard methods
@@ -533,7 +395,7 @@ output = json
                 "params": {}
             }
             
-            response = await self.send_mcp_message(server_type, list_tools_message)
+            response = await self.send_mcp_message(server_type, list_tools_message, user_id=user_id)
             if response and response.get("result"):
                 tools = response["result"].get("tools", [])
                 return tools
@@ -551,7 +413,7 @@ output = json
                             "method": method,
                             "params": {}
                         }
-                        alt_response = await self.send_mcp_message(server_type, alt_message)
+                        alt_response = await self.send_mcp_message(server_type, alt_message, user_id=user_id)
                         if alt_response and alt_response.get("result"):
                             tools = alt_response["result"].get("tools", [])
                             logging.info(f" Found {len(tools)} tools using method {method}")
@@ -567,7 +429,7 @@ output = json
             logging.error(f" Error listing MCP tools from {server_type}: {str(e)}")
             return []
     
-    async def call_mcp_tool(self, server_type: str, tool_name: str, arguments: Dict) -> Dict:
+    async def call_mcp_tool(self, server_type: str, tool_name: str, arguments: Dict, user_id: str = None) -> Dict:
         """Call a tool on a real MCP server."""
         try:
             # Standard MCP method for all servers
@@ -581,7 +443,7 @@ output = json
                 }
             }
             
-            response = await self.send_mcp_message(server_type, call_tool_message)
+            response = await self.send_mcp_message(server_type, call_tool_message, user_id=user_id)
             if response and response.get("result"):
                 result = response["result"]
                 return result
@@ -603,7 +465,7 @@ output = json
                             }
                         }
                         
-                        alt_response = await self.send_mcp_message(server_type, alt_message)
+                        alt_response = await self.send_mcp_message(server_type, alt_message, user_id=user_id)
                         if alt_response and alt_response.get("result"):
                             result = alt_response["result"]
                             return result
@@ -636,34 +498,14 @@ output = json
     
     def cleanup(self):
         """Clean up MCP server processes."""
-        for server_type, process in self.server_processes.items():
-            try:
-                if isinstance(process, dict):
-                    process_info = process
-                    process = process_info.get("process")
-                    pid = process_info.get("pid")
-                else:
-                    pid = process.pid if process else None
-
-                if process and process.poll() is None:  # Process is still running
-                    logging.info(f" Terminating MCP server {server_type}")
-                    process.terminate()
-                    try:
-                        process.wait(timeout=5)
-                    except subprocess.TimeoutExpired:
-                        logging.warning(f"Force killing MCP server {server_type}")
-                        process.kill()
-                        process.wait()
-            except Exception as e:
-                logging.error(f"Error terminating MCP server {server_type}: {str(e)}")
-        
-        self.server_processes.clear()
+        try:
+            self.pool.kill_all_nowait()
+        except Exception as e:
+            logging.error(f"Error terminating MCP servers: {str(e)}")
 
-    async def _initialize_mcp_server_with_timeout(self, server_type: str, timeout: int = 8) -> bool:
-        """Initialize MCP server with timeout.
-        
-        Note: This is always called with the server lock held.
-        """
+    async def _initialize_mcp_server_with_timeout(self, connection: MCPConnection, timeout: int = 8) -> bool:
+        """Run the MCP initialize handshake on a freshly started connection."""
+        server_type = connection.server_type
         try:
             # Send initialization message according to MCP protocol
             init_message = {
@@ -685,16 +527,16 @@ output = json
                 }
             }
             
-            response = await self.send_mcp_message(server_type, init_message, timeout=timeout, _lock_held=True)
+            response = await connection.request(init_message, timeout)
             if response and response.get("result"):
-                logging.info(f" Successfully initialized MCP server {server_type}")
+                logging.info(f" Successfully initialized MCP server {server_type} (PID {connection.pid})")
                 
                 # Send initialized notification
                 initialized_message = {
                     "jsonrpc": "2.0",
                     "method": "notifications/initialized"
                 }
-                await self.send_mcp_message(server_type, initialized_message, timeout=timeout, _lock_held=True)
+                await connection.notify(initialized_message)
                 
                 return True
             else:
@@ -808,6 +650,11 @@ output = json
 # Global MCP server manager
 _mcp_manager = RealMCPServerManager()
 
+
+def get_mcp_pool_stats() -> Dict[str, Dict[str, float]]:
+    """Per-server-type MCP pool counters: request/queue-wait/exec timings and open processes."""
+    return _mcp_pool.stats()
+
 # Cache for user credentials to avoid repeated database calls
 _user_credentials_cache = {}
 _cache_expiry = {}
@@ -846,6 +693,8 @@ def clear_credentials_cache(user_id: str = None):
         _langchain_tools_cache.clear()
         _langchain_tools_cache_expiry.clear()
         logging.info("Cleared all credentials and MCP tools cache")
+    # Pooled MCP servers were started with the old credentials in their environment
+    call_soon_on_mcp_loop(lambda: asyncio.ensure_future(_mcp_pool.close_user(user_id)))
 
 def get_user_cloud_credentials(user_id: str) -> Dict[str, Dict]:
     """Get user's cloud credentials from Aurora's authentication system with caching."""
@@ -1069,7 +918,7 @@ async def get_real_mcp_tools_for_user(user_id: str) -> List:
                 logging.info(f"Initializing {server_type} MCP server...")
                 success = await _mcp_manager.initialize_mcp_server(server_type, user_id)
                 if success:
-                    tools = await _mcp_manager.list_mcp_tools(server_type)
+                    tools = await _mcp_manager.list_mcp_tools(server_type, user_id)
                     if tools:
                         # Add server_type to each tool for later identification
                         for tool in tools:
@@ -1349,12 +1198,17 @@ def create_mcp_langchain_tools(real_mcp_tools: List, tool_capture=None, send_too
                     if server_type == "github":
                         actual_kwargs = {k: v for k, v in actual_kwargs.items() if v is not None}
                     
+                    # Resolve the user here: the worker thread below has no user context,
+                    # and pooled MCP servers are keyed by user
+                    mcp_user_id = _mcp_manager._resolve_user_id(None)
+                    
                     # Run the async call in a separate thread
                     result = run_async_in_thread(
                         _mcp_manager.call_mcp_tool(
                             server_type, 
                             original_tool_name, 
-                            actual_kwargs
+                            actual_kwargs,
+                            user_id=mcp_user_id
                         )
                     ) if run_async_in_thread else None
                     
@@ -1380,7 +1234,8 @@ def create_mcp_langchain_tools(real_mcp_tools: List, tool_capture=None, send_too
                                         _mcp_manager.call_mcp_tool(
                                             server_type,
                                             original_tool_name,
-                                            actual_kwargs
+                                            actual_kwargs,
+                                            user_id=mcp_user_id
                                         )
                                     ) if run_async_in_thread else None
                                     detail_text = _extract_detail_text(result)
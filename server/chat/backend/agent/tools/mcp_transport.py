@@ -0,0 +1,401 @@
+"""
+Asyncio JSON-RPC transport and process pool for stdio MCP servers.
+
+All MCP pipe I/O runs on one dedicated event loop thread. Agent tools call
+in from many short-lived loops (see run_async_in_thread in mcp_tools.py),
+and a reader task cannot be shared across loops. Callers hand their coroutine
+to that loop with ``run_on_mcp_loop`` and await the result on their own loop.
+
+Each MCPConnection owns a server process and one reader task. The reader
+matches responses to requests by JSON-RPC id, so several requests can be in
+flight on one process. MCPServerPool keeps up to ``MCP_POOL_MAX_PER_KEY``
+processes per (user_id, server_type). It closes processes that sit idle or
+outlive their credentials, and records how long callers wait for a
+connection versus how long the server takes to answer.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Processes kept per (user_id, server_type).
+MCP_POOL_MAX_PER_KEY = int(os.getenv("MCP_POOL_MAX_PER_KEY", "2"))
+# Concurrent requests multiplexed onto one process before another is spawned.
+MCP_MAX_IN_FLIGHT = int(os.getenv("MCP_MAX_IN_FLIGHT", "4"))
+# Idle processes are closed after this many seconds.
+MCP_POOL_IDLE_SECONDS = int(os.getenv("MCP_POOL_IDLE_SECONDS", "600"))
+# Processes stop taking new requests after this age so that credentials
+# passed at spawn time (e.g. 1h GitHub App installation tokens) are refreshed.
+MCP_POOL_MAX_AGE_SECONDS = int(os.getenv("MCP_POOL_MAX_AGE_SECONDS", "2700"))
+_SWEEP_INTERVAL = 30
+# asyncio's default 64 KiB line limit is too small for file-content responses.
+_STREAM_LIMIT = 64 * 1024 * 1024
+
+PoolKey = Tuple[Optional[str], str]
+
+
+# ---------------------------------------------------------------------------
+# Dedicated MCP event loop
+# ---------------------------------------------------------------------------
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _get_mcp_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever, name="mcp-transport", daemon=True
+            ).start()
+            _loop = loop
+        return _loop
+
+
+async def run_on_mcp_loop(coro: Awaitable) -> Any:
+    """Run ``coro`` on the MCP loop and await its result from the caller's loop."""
+    loop = _get_mcp_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        return await coro
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+
+def call_soon_on_mcp_loop(callback: Callable[[], Any]) -> None:
+    """Schedule a plain callback on the MCP loop if it has been started."""
+    loop = _loop
+    if loop is not None and not loop.is_closed():
+        loop.call_soon_threadsafe(callback)
+
+
+# ---------------------------------------------------------------------------
+# Connection
+# ---------------------------------------------------------------------------
+
+class MCPConnection:
+    """One stdio MCP server process with id-multiplexed JSON-RPC requests."""
+
+    def __init__(self, server_type: str, process: asyncio.subprocess.Process):
+        self.server_type = server_type
+        self.process = process
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.in_flight = 0
+        self._pending: Dict[Any, asyncio.Future] = {}
+        self._write_lock = asyncio.Lock()
+        self._closed = False
+        self._reader = asyncio.ensure_future(self._read_stdout())
+        self._stderr = asyncio.ensure_future(self._drain_stderr())
+
+    @classmethod
+    async def spawn(cls, server_type: str, cmd: List[str], env: Dict[str, str]) -> "MCPConnection":
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=env,
+            limit=_STREAM_LIMIT,
+        )
+        return cls(server_type, process)
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    @property
+    def alive(self) -> bool:
+        return not self._closed and self.process.returncode is None
+
+    async def _read_stdout(self) -> None:
+        try:
+            while True:
+                line = await self.process.stdout.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if not isinstance(message, dict) or "id" not in message:
+                    logger.debug(" Received notification from %s: %s", self.server_type, message)
+                    continue
+                future = self._pending.pop(message["id"], None)
+                if future is not None and not future.done():
+                    future.set_result(message)
+        except Exception as e:
+            logger.warning(" MCP %s reader stopped: %s", self.server_type, e)
+        finally:
+            self._closed = True
+            self._fail_pending()
+
+    async def _drain_stderr(self) -> None:
+        # An unread stderr pipe fills up and blocks the server mid-write.
+        try:
+            while await self.process.stderr.readline():
+                pass
+        except Exception:
+            pass
+
+    def _fail_pending(self) -> None:
+        for future in self._pending.values():
+            if not future.done():
+                future.set_result(None)
+        self._pending.clear()
+
+    async def _write(self, message: Dict) -> None:
+        async with self._write_lock:
+            self.process.stdin.write((json.dumps(message) + "\n").encode())
+            await self.process.stdin.drain()
+
+    async def request(self, message: Dict, timeout: float) -> Optional[Dict]:
+        """Send a request and wait for the response with the same id (None on timeout/exit)."""
+        if not self.alive:
+            return None
+        message_id = message["id"]
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message_id] = future
+        try:
+            await self._write(message)
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Timeout waiting for response to message ID {message_id} from {self.server_type}")
+            return None
+        except (BrokenPipeError, ConnectionResetError) as e:
+            logger.error(f" Broken pipe error with MCP server {self.server_type}: {e}")
+            self._closed = True
+            return None
+        finally:
+            self._pending.pop(message_id, None)
+
+    async def notify(self, message: Dict) -> None:
+        if self.alive:
+            try:
+                await self._write(message)
+            except (BrokenPipeError, ConnectionResetError):
+                self._closed = True
+
+    async def close(self) -> None:
+        self._closed = True
+        if self.process.returncode is None:
+            self.process.terminate()
+            try:
+                await asyncio.wait_for(self.process.wait(), 5)
+            except asyncio.TimeoutError:
+                logger.warning(f"Force killing MCP server {self.server_type}")
+                self.process.kill()
+                await self.process.wait()
+        self._fail_pending()
+        for task in (self._reader, self._stderr):
+            task.cancel()
+
+    def kill_nowait(self) -> None:
+        """Best-effort synchronous kill, for interpreter shutdown."""
+        self._closed = True
+        if self.process.returncode is None:
+            try:
+                self.process.kill()
+            except ProcessLookupError:
+                pass
+
+
+# ---------------------------------------------------------------------------
+# Pool
+# ---------------------------------------------------------------------------
+
+_STAT_FIELDS = (
+    "requests", "no_response", "spawns", "spawn_failures", "evictions",
+    "queue_wait_total", "queue_wait_max", "exec_total", "exec_max",
+)
+
+ConnectionFactory = Callable[[], Awaitable[Optional[MCPConnection]]]
+
+
+class MCPServerPool:
+    """Bounded pool of MCP connections per (user_id, server_type).
+
+    Must only be used from the MCP loop (see ``run_on_mcp_loop``).
+    """
+
+    def __init__(
+        self,
+        max_per_key: int = MCP_POOL_MAX_PER_KEY,
+        max_in_flight: int = MCP_MAX_IN_FLIGHT,
+        idle_seconds: float = MCP_POOL_IDLE_SECONDS,
+        max_age_seconds: float = MCP_POOL_MAX_AGE_SECONDS,
+    ):
+        self.max_per_key = max_per_key
+        self.max_in_flight = max_in_flight
+        self.idle_seconds = idle_seconds
+        self.max_age_seconds = max_age_seconds
+        self._conns: Dict[PoolKey, List[MCPConnection]] = {}
+        self._spawning: Dict[PoolKey, int] = {}
+        self._cond: Optional[asyncio.Condition] = None
+        self._sweeper: Optional[asyncio.Task] = None
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._stats_lock = threading.Lock()
+
+    def _condition(self) -> asyncio.Condition:
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+            self._sweeper = asyncio.ensure_future(self._sweep_forever())
+        return self._cond
+
+    def _usable(self, conn: MCPConnection, now: float) -> bool:
+        return conn.alive and now - conn.created_at < self.max_age_seconds
+
+    def _live(self, key: PoolKey) -> List[MCPConnection]:
+        now = time.monotonic()
+        return [c for c in self._conns.get(key, []) if self._usable(c, now)]
+
+    async def _spawn(self, key: PoolKey, factory: ConnectionFactory) -> Optional[MCPConnection]:
+        """Run ``factory`` with a spawn slot reserved; the caller must hold no lock."""
+        cond = self._condition()
+        try:
+            conn = await factory()
+        except Exception as e:
+            logger.error(f" Failed to start MCP server {key[1]}: {e}")
+            conn = None
+        async with cond:
+            self._spawning[key] -= 1
+            if conn is not None:
+                self._conns.setdefault(key, []).append(conn)
+                self._record(key[1], spawns=1)
+            else:
+                self._record(key[1], spawn_failures=1)
+            cond.notify_all()
+        return conn
+
+    async def prestart(self, key: PoolKey, factory: ConnectionFactory) -> bool:
+        """Make sure a usable connection exists for ``key`` (warm start)."""
+        cond = self._condition()
+        async with cond:
+            if self._live(key):
+                return True
+            if self._spawning.get(key):
+                await cond.wait_for(lambda: not self._spawning.get(key))
+                return bool(self._live(key))
+            self._spawning[key] = 1
+        return await self._spawn(key, factory) is not None
+
+    @asynccontextmanager
+    async def lease(self, key: PoolKey, factory: ConnectionFactory):
+        """Yield a connection with a request slot reserved (None if none could start)."""
+        cond = self._condition()
+        started = time.monotonic()
+        conn: Optional[MCPConnection] = None
+        reserved = False
+        async with cond:
+            while True:
+                live = self._live(key)
+                best = min(live, key=lambda c: c.in_flight, default=None)
+                if best is not None and best.in_flight < self.max_in_flight:
+                    conn = best
+                    conn.in_flight += 1
+                    break
+                if len(live) + self._spawning.get(key, 0) < self.max_per_key:
+                    self._spawning[key] = self._spawning.get(key, 0) + 1
+                    reserved = True
+                    break
+                await cond.wait()
+
+        if reserved:
+            conn = await self._spawn(key, factory)
+            if conn is not None:
+                async with cond:
+                    conn.in_flight += 1
+
+        self._record(key[1], queue_wait=time.monotonic() - started)
+        try:
+            yield conn
+        finally:
+            if conn is not None:
+                async with cond:
+                    conn.in_flight -= 1
+                    conn.last_used = time.monotonic()
+                    cond.notify_all()
+
+    def record_request(self, server_type: str, elapsed: float, answered: bool) -> None:
+        self._record(server_type, exec_time=elapsed, requests=1, no_response=int(not answered))
+
+    def _record(self, server_type: str, queue_wait: float = None, exec_time: float = None, **counts) -> None:
+        with self._stats_lock:
+            stats = self._stats.get(server_type)
+            if stats is None:
+                stats = self._stats[server_type] = dict.fromkeys(_STAT_FIELDS, 0)
+            for name, n in counts.items():
+                stats[name] += n
+            if queue_wait is not None:
+                stats["queue_wait_total"] += queue_wait
+                stats["queue_wait_max"] = max(stats["queue_wait_max"], queue_wait)
+            if exec_time is not None:
+                stats["exec_total"] += exec_time
+                stats["exec_max"] = max(stats["exec_max"], exec_time)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-server-type counters plus the number of open processes."""
+        with self._stats_lock:
+            snapshot = {k: dict(v, open=0) for k, v in self._stats.items()}
+        for (_user, server_type), conns in list(self._conns.items()):
+            entry = snapshot.setdefault(server_type, dict.fromkeys(_STAT_FIELDS, 0) | {"open": 0})
+            entry["open"] += sum(1 for c in conns if c.alive)
+        return snapshot
+
+    async def sweep(self) -> int:
+        """Close dead, idle and over-age connections that have nothing in flight."""
+        now = time.monotonic()
+        doomed: List[Tuple[PoolKey, MCPConnection]] = []
+        async with self._condition():
+            for key, conns in list(self._conns.items()):
+                keep = []
+                for conn in conns:
+                    idle = conn.in_flight == 0 and now - conn.last_used > self.idle_seconds
+                    retired = not self._usable(conn, now) and conn.in_flight == 0
+                    if idle or retired:
+                        doomed.append((key, conn))
+                    else:
+                        keep.append(conn)
+                if keep:
+                    self._conns[key] = keep
+                else:
+                    del self._conns[key]
+        for key, conn in doomed:
+            self._record(key[1], evictions=1)
+            await conn.close()
+        return len(doomed)
+
+    async def _sweep_forever(self) -> None:
+        while True:
+            await asyncio.sleep(_SWEEP_INTERVAL)
+            try:
+                closed = await self.sweep()
+                if closed:
+                    logger.info("Closed %d idle MCP server process(es); stats=%s", closed, self.stats())
+            except Exception as e:
+                logger.warning("MCP pool sweep failed: %s", e)
+
+    async def close_user(self, user_id: Optional[str] = None) -> None:
+        """Close every connection for ``user_id`` (all users when None)."""
+        async with self._condition():
+            keys = [k for k in self._conns if user_id is None or k[0] == user_id]
+            conns = [c for k in keys for c in self._conns.pop(k)]
+        for conn in conns:
+            await conn.close()
+
+    def kill_all_nowait(self) -> None:
+        for conns in list(self._conns.values()):
+            for conn in conns:
+                conn.kill_nowait()
+        self._conns.clear()
@@ -11,6 +11,7 @@ from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
+from chat.backend.agent.utils.log_templates import compress_log_entries
 from connectors.newrelic_connector.client import NewRelicClient, NewRelicAPIError
 from routes.newrelic.config import MAX_NRQL_LENGTH, MAX_OUTPUT_SIZE, MAX_RESULTS_CAP
 from routes.newrelic.newrelic_routes import (
@@ -324,6 +325,24 @@ def query_newrelic(
         result["region"] = client.region
 
         results_list = result.get("results", [])
+        # Log rows (SELECT ... FROM Log) compress into templates instead of being cut
+        if resource_type == "nrql" and results_list and all(
+            isinstance(row, dict) and "message" in row for row in results_list
+        ):
+            log_templates = compress_log_entries(
+                results_list,
+                message="message",
+                timestamp="timestamp",
+                severity=lambda row: row.get("level") or row.get("log.level") or row.get("severity"),
+            )
+            if log_templates:
+                del result["results"]
+                result["log_templates"] = log_templates
+                result["note"] = (
+                    "Log rows were compressed into log templates (<*> marks variable tokens). "
+                    "Filter with WHERE message LIKE '<template text>%' to see individual rows."
+                )
+                return json.dumps(result, default=str)
         truncated_results, was_truncated = _truncate_results(results_list)
         if was_truncated:
             result["results"] = truncated_results
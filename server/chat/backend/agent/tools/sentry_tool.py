@@ -11,6 +11,7 @@ from typing import Any, Dict, List, Optional, Tuple
 
 from pydantic import BaseModel, Field
 
+from chat.backend.agent.utils.log_templates import compress_log_entries
 from connectors.sentry_connector.client import SentryClient, SentryAPIError
 from routes.sentry.config import (
     MAX_OUTPUT_SIZE,
@@ -317,6 +318,21 @@ def query_sentry(
         result["region"] = client.region
 
         results_list = result.get("results", [])
+        if resource_type == "events":
+            log_templates = compress_log_entries(
+                results_list,
+                message=lambda event: event.get("message") or event.get("title"),
+                timestamp="timestamp",
+                severity="level",
+            )
+            if log_templates:
+                del result["results"]
+                result["log_templates"] = log_templates
+                result["note"] = (
+                    "Events were compressed into templates of their titles (<*> marks variable tokens). "
+                    "Query a template's literal text to see its individual events."
+                )
+                return json.dumps(result, default=str)
         truncated_results, was_truncated = _truncate_results(results_list)
         if was_truncated:
             result["results"] = truncated_results
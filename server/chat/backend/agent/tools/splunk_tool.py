@@ -8,6 +8,7 @@ from typing import Any, Dict, Optional
 import requests
 from pydantic import BaseModel, Field
 
+from chat.backend.agent.utils.log_templates import compress_log_entries
 from utils.auth.token_management import get_token_data
 
 logger = logging.getLogger(__name__)
@@ -205,6 +206,26 @@ def search_splunk(
         if len(results) > max_count:
             results = results[:max_count]
 
+        # Raw events (not transforming-command tables) compress into log templates
+        log_templates = None
+        if results and all(isinstance(r, dict) and "_raw" in r for r in results):
+            log_templates = compress_log_entries(
+                results,
+                message="_raw",
+                timestamp="_time",
+                severity=lambda r: r.get("log_level") or r.get("level") or r.get("severity"),
+            )
+        if log_templates:
+            return json.dumps({
+                "success": True,
+                "query": search_query,
+                "time_range": f"{earliest_time} to {latest_time}",
+                "result_count": len(results),
+                "log_templates": log_templates,
+                "note": "Events were compressed into log templates (<*> marks variable tokens). "
+                        "Search for a template's literal text to see its individual events.",
+            })
+
         # Truncate to fit output size limit
         original_count = len(results)
         results, was_truncated = _truncate_results(results)
@@ -12,17 +12,17 @@ logger = logging.getLogger(__name__)
 def handle_immediate_save(session_id: str, user_id: str, question: str) -> bool:
     """Append the user's UI message on receipt so a mid-turn websocket drop doesn't lose it.
 
-    Does NOT touch llm_context_history: ContextManager._execute_actual_save
-    fully replaces that column, so writing only the new HumanMessage here
-    would wipe the accumulated agent context. The end-of-stream save in
-    workflow.stream() is authoritative for llm_context_history.
+    Does NOT touch the LLM context: ContextManager._execute_actual_save
+    treats its input as the complete context and rewrites the session's log
+    when it does not extend the stored prefix, so saving only the new
+    HumanMessage here would wipe the accumulated agent context. The
+    end-of-stream save in workflow.stream() is authoritative for it.
     """
     try:
-        # NOTE: We intentionally do NOT save to llm_context_history here.
-        # save_context_history overwrites the entire column, which would
-        # replace the full conversation history with just [HumanMessage],
-        # destroying all prior context. The workflow handles the full
-        # context save after processing.
+        # NOTE: We intentionally do NOT save the LLM context here.
+        # save_context_history takes the complete conversation; passing just
+        # [HumanMessage] would replace all prior context. The workflow
+        # handles the context save after processing.
 
         # Save UI-formatted message immediately (append-based, safe)
         ui_messages = [{
@@ -0,0 +1,242 @@
+"""
+Local projection of oversized cloud CLI JSON output.
+
+Builds a compact, schema-aware preview of output we already captured instead
+of re-running the command with a provider projection (--format / --query):
+the main record array is located (top-level list, Azure ``value``, AWS
+``Reservations[].Instances`` and similar wrappers), then summarized as field
+schema, identity-field samples, per-field value counts and record counts.
+
+Works the same for AWS, GCP and Azure output since it only looks at shape.
+"""
+
+import json
+import re
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Records inspected to derive the schema and value counts.
+SCHEMA_SAMPLE_RECORDS = 500
+# Records included verbatim (projected onto the selected fields) in a preview.
+PREVIEW_RECORDS = 20
+MAX_PREVIEW_FIELDS = 10
+TOP_VALUES = 5
+# A field is reported with value counts only when it looks categorical.
+MAX_CATEGORICAL_CARDINALITY = 25
+_MAX_FIELD_DEPTH = 3
+_MAX_SCHEMA_FIELDS = 60
+_MAX_VALUE_CHARS = 200
+
+# Fields that identify or classify a cloud resource, in preference order.
+_IDENTITY_PATTERNS = [
+    re.compile(p, re.IGNORECASE) for p in (
+        r"^(name|displayName|id)$",
+        r"(^|\.)[A-Za-z]*(Id|Name|Arn)$",
+        r"^metadata\.(name|namespace)$",
+        r"(^|\.)(status|state)(\.Name|\.phase)?$",
+        r"(^|\.)(location|region|zone|availabilityZone)$",
+        r"(^|\.)[A-Za-z]*(Type|Tier|sku\.name|machineType|kind)$",
+        r"(^|\.)(createTime|creationTimestamp|LaunchTime|CreationDate|CreatedTime|timeCreated)$",
+    )
+]
+_JSON_WS = re.compile(r"\s*")
+
+
+def iter_json_documents(text: str) -> Iterator[Any]:
+    """Yield each JSON document in ``text``.
+
+    Handles a single document, NDJSON, and concatenated documents (paginated
+    CLI output), decoding one document at a time with ``raw_decode``.
+    """
+    decoder = json.JSONDecoder()
+    index = _JSON_WS.match(text, 0).end()
+    while index < len(text):
+        document, index = decoder.raw_decode(text, index)
+        yield document
+        index = _JSON_WS.match(text, index).end()
+
+
+def parse_json_output(text: str) -> Any:
+    """Parse CLI stdout; multiple documents are returned as a list."""
+    documents = list(iter_json_documents(text))
+    if len(documents) == 1:
+        return documents[0]
+    return documents
+
+
+def _is_record_list(value: Any) -> bool:
+    return isinstance(value, list) and bool(value) and all(isinstance(item, dict) for item in value[:50])
+
+
+def _record_candidates(data: Any, path: str, depth: int) -> Iterator[Tuple[str, List[dict]]]:
+    if _is_record_list(data):
+        yield path, data
+        # AWS-style wrappers: every record holds one nested record list
+        # (Reservations[].Instances, LoadBalancers[].Listeners, ...).
+        nested_keys = {key for key, value in data[0].items() if _is_record_list(value)}
+        for key in sorted(nested_keys):
+            if all(isinstance(item.get(key), list) for item in data[:50]):
+                flattened = [child for item in data for child in item.get(key) or [] if isinstance(child, dict)]
+                if len(flattened) > len(data):
+                    yield f"{path}[].{key}", flattened
+    elif isinstance(data, dict) and depth < _MAX_FIELD_DEPTH:
+        for key, value in data.items():
+            yield from _record_candidates(value, f"{path}.{key}" if path else key, depth + 1)
+
+
+def find_records(data: Any) -> Tuple[Optional[str], List[dict]]:
+    """Return (path, records) for the largest record array in ``data``.
+
+    The path is ``""`` for a top-level list and uses ``[]`` for flattened
+    nesting, e.g. ``Reservations[].Instances``. Returns (None, []) when the
+    output holds no list of objects.
+    """
+    best_path, best = None, []
+    for path, records in _record_candidates(data, "", 0):
+        if len(records) > len(best):
+            best_path, best = path, records
+    return best_path, best
+
+
+def get_path(record: Any, path: str) -> Any:
+    """Resolve a dotted field path (``State.Name``) against a record."""
+    value = record
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _flatten_fields(record: dict, prefix: str = "", depth: int = 0) -> Iterator[Tuple[str, Any]]:
+    for key, value in record.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict) and depth + 1 < _MAX_FIELD_DEPTH:
+            yield from _flatten_fields(value, f"{path}.", depth + 1)
+        else:
+            yield path, value
+
+
+def _type_name(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, (int, float)):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, list):
+        return "array"
+    return "object"
+
+
+def _sample(records: List[dict], size: int) -> List[dict]:
+    """Evenly spaced records, always including the first and last."""
+    if len(records) <= size:
+        return list(records)
+    step = (len(records) - 1) / (size - 1)
+    return [records[round(i * step)] for i in range(size)]
+
+
+def _compact(value: Any) -> Any:
+    if isinstance(value, str) and len(value) > _MAX_VALUE_CHARS:
+        return value[:_MAX_VALUE_CHARS] + "..."
+    if isinstance(value, list):
+        return f"<{len(value)} items>"
+    if isinstance(value, dict):
+        return f"<object with {len(value)} keys>"
+    return value
+
+
+def describe_schema(records: List[dict]) -> Dict[str, Dict[str, Any]]:
+    """Per-field types and presence ratio over a sample of the records."""
+    sample = _sample(records, SCHEMA_SAMPLE_RECORDS)
+    types: Dict[str, set] = {}
+    present: Counter = Counter()
+    for record in sample:
+        for path, value in _flatten_fields(record):
+            types.setdefault(path, set()).add(_type_name(value))
+            present[path] += 1
+    ordered = sorted(types, key=lambda path: -present[path])[:_MAX_SCHEMA_FIELDS]
+    return {
+        path: {"types": sorted(types[path]), "present": round(present[path] / len(sample), 2)}
+        for path in ordered
+    }
+
+
+def select_fields(schema: Dict[str, Dict[str, Any]], limit: int = MAX_PREVIEW_FIELDS) -> List[str]:
+    """Pick identity/classification fields, topped up with the most common scalars."""
+    scalar = [
+        path for path, info in schema.items()
+        if info["present"] >= 0.5 and not {"array", "object"} & set(info["types"])
+    ]
+    selected: List[str] = []
+    for pattern in _IDENTITY_PATTERNS:
+        for path in scalar:
+            if path not in selected and pattern.search(path):
+                selected.append(path)
+    for path in scalar:
+        if len(selected) >= limit:
+            break
+        if path not in selected:
+            selected.append(path)
+    return selected[:limit]
+
+
+def value_counts(records: List[dict], fields: List[str]) -> Dict[str, Dict[str, int]]:
+    """Top values of the categorical fields, counted over every record."""
+    counts: Dict[str, Dict[str, int]] = {}
+    for path in fields:
+        counter = Counter(
+            value for value in (get_path(record, path) for record in records)
+            if isinstance(value, (str, bool, int)) and not isinstance(value, float)
+        )
+        if 1 < len(counter) <= MAX_CATEGORICAL_CARDINALITY or (len(counter) == 1 and len(records) > 1):
+            counts[path] = {str(value): count for value, count in counter.most_common(TOP_VALUES)}
+    return counts
+
+
+def project_records(records: List[dict], fields: List[str]) -> List[Dict[str, Any]]:
+    return [{path: _compact(get_path(record, path)) for path in fields} for record in records]
+
+
+def build_preview(data: Any, preview_records: int = PREVIEW_RECORDS) -> Dict[str, Any]:
+    """Compact, schema-aware preview of parsed CLI output."""
+    path, records = find_records(data)
+    if not records:
+        if isinstance(data, dict):
+            return {
+                "shape": "object",
+                "keys": list(data)[:_MAX_SCHEMA_FIELDS],
+                "fields": {key: _compact(value) for key, value in list(data.items())[:_MAX_SCHEMA_FIELDS]},
+            }
+        if isinstance(data, list):
+            return {"shape": "list", "total_count": len(data), "sample": [_compact(v) for v in _sample(data, preview_records)]}
+        return {"shape": _type_name(data), "value": _compact(data)}
+
+    schema = describe_schema(records)
+    fields = select_fields(schema)
+    return {
+        "shape": "records",
+        "records_path": path,
+        "total_count": len(records),
+        "fields": fields,
+        "sample": project_records(_sample(records, preview_records), fields),
+        "value_counts": value_counts(records, fields),
+        "schema": schema,
+    }
+
+
+def format_preview_summary(preview: Dict[str, Any]) -> str:
+    """One-screen text summary of a preview for chat output."""
+    if preview.get("shape") != "records":
+        return f"Large {preview.get('shape')} output; see data for a compact preview."
+    location = preview["records_path"] or "top level"
+    lines = [
+        f"{preview['total_count']} records ({location}); {len(preview['sample'])} sampled "
+        f"with fields: {', '.join(preview['fields'])}."
+    ]
+    for field, counts in preview["value_counts"].items():
+        lines.append(f"{field}: " + ", ".join(f"{value}={count}" for value, count in counts.items()))
+    return "\n".join(lines)
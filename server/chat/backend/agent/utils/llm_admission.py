@@ -0,0 +1,455 @@
+"""
+Cross-worker admission scheduler for LLM calls.
+
+Every agent model call asks for a ticket before it is sent. Tickets are
+granted per model key (``provider/model``) against budgets shared by all
+Celery and web workers through Redis:
+
+- requests per minute and tokens per minute (fixed one-minute windows; a
+  request's tokens are estimated up front and corrected after the call),
+- concurrent in-flight calls (leases that expire if a worker dies),
+- a provider cooldown set when any caller gets a 429, so one rate-limit
+  response pauses everyone instead of each caller backing off alone.
+
+Waiting callers queue in a Redis sorted set ordered by priority, then
+arrival: interactive chat first, then background work by RCA wave. Only
+the first waiters that fit in the free budget are admitted, so a burst of
+background sub-agents cannot starve a chat turn. Callers wait instead of
+failing; after LLM_ADMISSION_MAX_WAIT_SECONDS (or when Redis is down) the
+call is let through.
+
+Budgets come from LLM_RATE_LIMITS, a JSON object keyed by model or provider
+(``{"anthropic": {"rpm": 50, "tpm": 400000, "concurrency": 8}}``), falling
+back to LLM_DEFAULT_RPM / LLM_DEFAULT_TPM / LLM_DEFAULT_CONCURRENCY. Zero
+means unlimited.
+"""
+
+import asyncio
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+LLM_DEFAULT_RPM = int(os.getenv("LLM_DEFAULT_RPM", "0"))
+LLM_DEFAULT_TPM = int(os.getenv("LLM_DEFAULT_TPM", "0"))
+LLM_DEFAULT_CONCURRENCY = int(os.getenv("LLM_DEFAULT_CONCURRENCY", "32"))
+LLM_ADMISSION_MAX_WAIT_SECONDS = float(os.getenv("LLM_ADMISSION_MAX_WAIT_SECONDS", "300"))
+# Lease on an in-flight call; expires if the worker dies mid-call.
+LLM_ADMISSION_LEASE_SECONDS = int(os.getenv("LLM_ADMISSION_LEASE_SECONDS", "600"))
+# Cooldown after a 429 when the provider gives no Retry-After.
+LLM_RATE_LIMIT_COOLDOWN_SECONDS = float(os.getenv("LLM_RATE_LIMIT_COOLDOWN_SECONDS", "10"))
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 100
+_MAX_WAVE = 99
+
+_KEY_PREFIX = "llm_admit"
+_POLL_INITIAL = 0.05
+_POLL_MAX = 1.0
+# Waiters that stop polling for this long are dropped from the queue.
+_WAITER_TTL_MS = 15_000
+_WINDOW_KEY_TTL_MS = 120_000
+
+# Upper bounds (seconds) of the wait-time histogram buckets; one overflow bucket follows.
+WAIT_BUCKETS_SECONDS = (0.1, 0.5, 1, 2, 5, 10, 30, 60, 120, 300)
+
+# KEYS: waiting zset, waiter heartbeats, leases zset, rpm window, tpm window, cooldown
+# ARGV: ticket, score, now_ms, est_tokens, rpm, tpm, concurrency, lease_ms, waiter_ttl_ms,
+#       window_left_ms, window_ttl_ms
+# Returns {admitted, retry_hint_ms, queue_depth}.
+_ADMIT_SCRIPT = """
+local now = tonumber(ARGV[3])
+local beats = redis.call('HGETALL', KEYS[2])
+for i = 1, #beats, 2 do
+    if tonumber(beats[i + 1]) < now - tonumber(ARGV[9]) then
+        redis.call('ZREM', KEYS[1], beats[i])
+        redis.call('HDEL', KEYS[2], beats[i])
+    end
+end
+redis.call('ZREMRANGEBYSCORE', KEYS[3], '-inf', now)
+redis.call('ZADD', KEYS[1], 'NX', ARGV[2], ARGV[1])
+redis.call('HSET', KEYS[2], ARGV[1], now)
+local depth = redis.call('ZCARD', KEYS[1])
+
+local cooldown = redis.call('PTTL', KEYS[6])
+if cooldown > 0 then
+    return {0, cooldown, depth}
+end
+
+local slots = depth
+local hint = 0
+local concurrency = tonumber(ARGV[7])
+if concurrency > 0 then
+    slots = math.min(slots, concurrency - redis.call('ZCARD', KEYS[3]))
+end
+local rpm = tonumber(ARGV[5])
+if rpm > 0 then
+    local free = rpm - tonumber(redis.call('GET', KEYS[4]) or '0')
+    if free < slots then
+        slots = free
+        hint = tonumber(ARGV[10])
+    end
+end
+local tpm = tonumber(ARGV[6])
+local est = tonumber(ARGV[4])
+if tpm > 0 then
+    local used = tonumber(redis.call('GET', KEYS[5]) or '0')
+    -- An oversized request still runs alone in an empty window.
+    if used > 0 and used + est > tpm then
+        slots = 0
+        hint = tonumber(ARGV[10])
+    end
+end
+
+if redis.call('ZRANK', KEYS[1], ARGV[1]) < slots then
+    redis.call('ZREM', KEYS[1], ARGV[1])
+    redis.call('HDEL', KEYS[2], ARGV[1])
+    redis.call('INCR', KEYS[4])
+    redis.call('PEXPIRE', KEYS[4], ARGV[11])
+    redis.call('INCRBY', KEYS[5], est)
+    redis.call('PEXPIRE', KEYS[5], ARGV[11])
+    redis.call('ZADD', KEYS[3], now + tonumber(ARGV[8]), ARGV[1])
+    return {1, 0, depth - 1}
+end
+return {0, hint, depth}
+"""
+
+
+@dataclass
+class _Limits:
+    rpm: int
+    tpm: int
+    concurrency: int
+
+
+@dataclass
+class AdmissionTicket:
+    """A granted (or bypassed) admission; pass back to ``release``."""
+
+    model_key: str
+    ticket_id: str
+    estimated_tokens: int
+    window: int
+    waited_seconds: float
+    leased: bool
+
+
+def _client():
+    from utils.cache.redis_client import get_redis_client
+
+    return get_redis_client()
+
+
+def _load_limit_overrides() -> Dict[str, dict]:
+    raw = os.getenv("LLM_RATE_LIMITS", "")
+    if not raw:
+        return {}
+    try:
+        overrides = json.loads(raw)
+        return overrides if isinstance(overrides, dict) else {}
+    except ValueError:
+        logger.warning("LLM_RATE_LIMITS is not valid JSON; using defaults")
+        return {}
+
+
+_limit_overrides = _load_limit_overrides()
+
+
+def get_limits(model_key: str) -> _Limits:
+    """Budgets for ``model_key``: exact model entry, then provider entry, then defaults."""
+    provider = model_key.split("/", 1)[0]
+    entry = _limit_overrides.get(model_key) or _limit_overrides.get(provider) or {}
+    return _Limits(
+        rpm=int(entry.get("rpm", LLM_DEFAULT_RPM)),
+        tpm=int(entry.get("tpm", LLM_DEFAULT_TPM)),
+        concurrency=int(entry.get("concurrency", LLM_DEFAULT_CONCURRENCY)),
+    )
+
+
+def request_priority(is_background: bool, wave: int = 0) -> int:
+    """Lower runs first: interactive chat, then background work by wave."""
+    if not is_background:
+        return PRIORITY_INTERACTIVE
+    return PRIORITY_BACKGROUND + min(max(int(wave or 0), 0), _MAX_WAVE)
+
+
+def _keys(model_key: str, window: int) -> List[str]:
+    base = f"{_KEY_PREFIX}:{model_key}"
+    return [
+        f"{base}:waiting",
+        f"{base}:heartbeats",
+        f"{base}:leases",
+        f"{base}:rpm:{window}",
+        f"{base}:tpm:{window}",
+        f"{base}:cooldown",
+    ]
+
+
+# ---------------------------------------------------------------------------
+# In-process metrics
+# ---------------------------------------------------------------------------
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, dict] = {}
+
+
+def _model_stats(model_key: str) -> dict:
+    stats = _stats.get(model_key)
+    if stats is None:
+        stats = _stats[model_key] = {
+            "admitted": 0,
+            "queued": 0,
+            "bypassed": 0,
+            "rate_limited": 0,
+            "waiting": 0,
+            "last_queue_depth": 0,
+            "wait_buckets": [0] * (len(WAIT_BUCKETS_SECONDS) + 1),
+            "total_wait_seconds": 0.0,
+        }
+    return stats
+
+
+def _note(model_key: str, **changes) -> None:
+    with _stats_lock:
+        stats = _model_stats(model_key)
+        for field, value in changes.items():
+            if field == "last_queue_depth":
+                stats[field] = value
+            else:
+                stats[field] += value
+
+
+def _note_wait(model_key: str, waited: float, bypassed: bool) -> None:
+    with _stats_lock:
+        stats = _model_stats(model_key)
+        stats["bypassed" if bypassed else "admitted"] += 1
+        stats["total_wait_seconds"] += waited
+        stats["wait_buckets"][bisect.bisect_left(WAIT_BUCKETS_SECONDS, waited)] += 1
+
+
+def get_admission_stats() -> Dict[str, dict]:
+    """Per-model counters, local waiters, wait-time histogram and current queue depth.
+
+    ``queue_depth`` is read from Redis and counts waiters on every worker;
+    the other fields cover calls made by this process.
+    """
+    labels = [f"<={b:g}s" for b in WAIT_BUCKETS_SECONDS] + [f">{WAIT_BUCKETS_SECONDS[-1]:g}s"]
+    with _stats_lock:
+        result = {}
+        for model_key, stats in _stats.items():
+            calls = stats["admitted"] + stats["bypassed"]
+            result[model_key] = {
+                **{k: v for k, v in stats.items() if k not in ("wait_buckets", "total_wait_seconds")},
+                "avg_wait_seconds": round(stats["total_wait_seconds"] / calls, 3) if calls else 0.0,
+                "wait_seconds": {label: n for label, n in zip(labels, stats["wait_buckets"]) if n},
+            }
+    for model_key, stats in result.items():
+        stats["queue_depth"] = get_queue_depth(model_key)
+    return result
+
+
+def get_queue_depth(model_key: str) -> int:
+    """Callers currently queued for ``model_key`` across all workers."""
+    try:
+        client = _client()
+        return int(client.zcard(_keys(model_key, 0)[0])) if client else 0
+    except Exception:
+        return 0
+
+
+# ---------------------------------------------------------------------------
+# Admission
+# ---------------------------------------------------------------------------
+
+
+_registered_script = None
+
+
+def _admit_script(client):
+    """The admission script as a redis-py Script: EVALSHA, reloading it on NOSCRIPT.
+
+    Callers poll every few hundred milliseconds while queued, so sending only
+    the SHA keeps the script body off the wire.
+    """
+    global _registered_script
+    if _registered_script is None:
+        _registered_script = client.register_script(_ADMIT_SCRIPT)
+    return _registered_script
+
+
+def _try_admit(client, model_key: str, ticket_id: str, score: float,
+               estimated_tokens: int, limits: _Limits):
+    """One admission attempt. Returns (admitted, retry_hint_seconds, window, queue_depth)."""
+    now_ms = int(time.time() * 1000)
+    window = now_ms // 60_000
+    window_left_ms = 60_000 - now_ms % 60_000
+    admitted, hint_ms, depth = _admit_script(client)(
+        keys=_keys(model_key, window),
+        args=[ticket_id, score, now_ms, estimated_tokens,
+              limits.rpm, limits.tpm, limits.concurrency,
+              LLM_ADMISSION_LEASE_SECONDS * 1000, _WAITER_TTL_MS, window_left_ms, _WINDOW_KEY_TTL_MS],
+        client=client,
+    )
+    return bool(admitted), int(hint_ms) / 1000.0, window, int(depth)
+
+
+def _withdraw(client, model_key: str, ticket_id: str) -> None:
+    keys = _keys(model_key, 0)
+    try:
+        pipe = client.pipeline(transaction=False)
+        pipe.zrem(keys[0], ticket_id)
+        pipe.hdel(keys[1], ticket_id)
+        pipe.execute()
+    except Exception as e:
+        logger.debug(f"[LLMAdmission] Failed to withdraw ticket for {model_key}: {e}")
+
+
+class _Waiter:
+    """State of one caller waiting for admission (shared by sync and async paths)."""
+
+    def __init__(self, model_key: str, estimated_tokens: int, priority: int):
+        self.model_key = model_key
+        self.estimated_tokens = max(int(estimated_tokens or 0), 0)
+        self.ticket_id = uuid.uuid4().hex
+        self.limits = get_limits(model_key)
+        self.start = time.monotonic()
+        # Priority first, then arrival; stays well inside a double's exact range.
+        self.score = priority * 1e13 + time.time() * 1000
+        self.delay = _POLL_INITIAL
+        self.client = None
+        self.queued = False
+        self.ticket: Optional[AdmissionTicket] = None
+
+    def _ticket(self, window: int, leased: bool) -> AdmissionTicket:
+        waited = time.monotonic() - self.start
+        _note_wait(self.model_key, waited, bypassed=not leased)
+        if waited >= 1:
+            logger.info(f"[LLMAdmission] {self.model_key}: admitted after {waited:.1f}s in queue")
+        return AdmissionTicket(self.model_key, self.ticket_id, self.estimated_tokens, window, waited, leased)
+
+    def attempt(self) -> Optional[float]:
+        """Try once. Returns None once a ticket is ready (see ``ticket``), else seconds to sleep."""
+        if self.client is None:
+            self.client = _client()
+        if self.client is None:
+            self.ticket = self._ticket(0, leased=False)
+            return None
+        try:
+            admitted, hint, window, depth = _try_admit(
+                self.client, self.model_key, self.ticket_id, self.score, self.estimated_tokens, self.limits,
+            )
+        except Exception as e:
+            logger.warning(f"[LLMAdmission] Scheduler unavailable for {self.model_key}, not throttling: {e}")
+            self.ticket = self._ticket(0, leased=False)
+            return None
+        _note(self.model_key, last_queue_depth=depth)
+        if admitted:
+            self.ticket = self._ticket(window, leased=True)
+            return None
+
+        if time.monotonic() - self.start >= LLM_ADMISSION_MAX_WAIT_SECONDS:
+            logger.warning(
+                f"[LLMAdmission] {self.model_key}: waited {LLM_ADMISSION_MAX_WAIT_SECONDS:g}s, "
+                f"proceeding without admission (queue depth {depth})"
+            )
+            _withdraw(self.client, self.model_key, self.ticket_id)
+            self.ticket = self._ticket(0, leased=False)
+            return None
+
+        if not self.queued:
+            self.queued = True
+            _note(self.model_key, queued=1, waiting=1)
+        sleep = min(max(hint, self.delay), _POLL_MAX)
+        self.delay = min(self.delay * 2, _POLL_MAX)
+        return sleep
+
+    def done(self) -> None:
+        if self.queued:
+            _note(self.model_key, waiting=-1)
+
+    def abandon(self) -> None:
+        if self.client is not None:
+            _withdraw(self.client, self.model_key, self.ticket_id)
+
+
+def acquire(model_key: str, estimated_tokens: int = 0, priority: int = PRIORITY_INTERACTIVE) -> AdmissionTicket:
+    """Block until a call to ``model_key`` may be sent."""
+    waiter = _Waiter(model_key, estimated_tokens, priority)
+    try:
+        while True:
+            sleep = waiter.attempt()
+            if sleep is None:
+                return waiter.ticket
+            time.sleep(sleep)
+    except BaseException:
+        waiter.abandon()
+        raise
+    finally:
+        waiter.done()
+
+
+async def acquire_async(model_key: str, estimated_tokens: int = 0,
+                        priority: int = PRIORITY_INTERACTIVE) -> AdmissionTicket:
+    """Async ``acquire``; Redis calls run in a thread so the event loop keeps going."""
+    waiter = _Waiter(model_key, estimated_tokens, priority)
+    try:
+        while True:
+            sleep = await asyncio.to_thread(waiter.attempt)
+            if sleep is None:
+                return waiter.ticket
+            await asyncio.sleep(sleep)
+    except BaseException:
+        await asyncio.to_thread(waiter.abandon)
+        raise
+    finally:
+        waiter.done()
+
+
+def release(ticket: AdmissionTicket, actual_tokens: Optional[int] = None) -> None:
+    """End the call's lease and charge any tokens above the estimate to its window."""
+    if not ticket.leased:
+        return
+    try:
+        client = _client()
+        if client is None:
+            return
+        keys = _keys(ticket.model_key, ticket.window)
+        pipe = client.pipeline(transaction=False)
+        pipe.zrem(keys[2], ticket.ticket_id)
+        extra = (actual_tokens or 0) - ticket.estimated_tokens
+        if extra > 0:
+            pipe.incrby(keys[4], extra)
+            pipe.pexpire(keys[4], _WINDOW_KEY_TTL_MS)
+        pipe.execute()
+    except Exception as e:
+        logger.debug(f"[LLMAdmission] Failed to release ticket for {ticket.model_key}: {e}")
+
+
+def report_rate_limited(model_key: str, retry_after_seconds: Optional[float] = None) -> None:
+    """Pause admissions for ``model_key`` on every worker after a 429."""
+    cooldown = retry_after_seconds or LLM_RATE_LIMIT_COOLDOWN_SECONDS
+    _note(model_key, rate_limited=1)
+    logger.warning(f"[LLMAdmission] {model_key}: provider rate limit, pausing admissions for {cooldown:g}s")
+    try:
+        client = _client()
+        if client is not None:
+            client.set(_keys(model_key, 0)[5], "1", px=max(int(cooldown * 1000), 1))
+    except Exception as e:
+        logger.debug(f"[LLMAdmission] Failed to set cooldown for {model_key}: {e}")
+
+
+def _reset_after_fork() -> None:
+    global _stats_lock
+    _stats_lock = threading.Lock()
+    _stats.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
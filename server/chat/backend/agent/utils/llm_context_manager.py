@@ -5,7 +5,6 @@ Handles the storage and retrieval of chat history formatted specifically for LLM
 This is separate from UI messages to maintain the exact format the agent expects.
 """
 
-import json
 import logging
 from typing import List, Dict, Any, Optional
 from datetime import datetime
@@ -39,24 +38,27 @@ class LLMContextManager:
         return sanitized
 
     @staticmethod
-    def serialize_message(message: Any) -> Dict[str, Any]:
-        """Convert a LangChain message object to a dict for storage."""
-        
-        # Get message type - normalize all AI message variants to 'ai'
+    def message_role(message: Any) -> str:
+        """Storage role for a LangChain message; all AI message variants map to 'ai'."""
         class_name = message.__class__.__name__
         if 'Human' in class_name:
-            msg_type = 'human'
+            return 'human'
         elif 'AI' in class_name:  # Handles AIMessage, AIMessageChunk
-            msg_type = 'ai'
+            return 'ai'
         elif 'System' in class_name:
-            msg_type = 'system'
+            return 'system'
         elif 'Tool' in class_name:
-            msg_type = 'tool'
+            return 'tool'
         elif hasattr(message, 'type'):
             # Fallback to .type attribute
-            msg_type = message.type
-        else:
-            msg_type = 'unknown'
+            return message.type
+        return 'unknown'
+
+    @staticmethod
+    def serialize_message(message: Any) -> Dict[str, Any]:
+        """Convert a LangChain message object to a dict for storage."""
+        
+        msg_type = LLMContextManager.message_role(message)
         
         # Get the content and sanitize it
         content = getattr(message, 'content', '')
@@ -161,31 +163,30 @@ class LLMContextManager:
         from .persistence.context_manager import ContextManager
         return ContextManager.save_context_history(session_id, user_id, messages, tool_capture)
     
+    @staticmethod
+    def append_context_history(session_id: str, user_id: str, messages: List[Any], tool_capture=None) -> bool:
+        """Append messages to the stored context without rewriting earlier ones."""
+        from .persistence.context_manager import ContextManager
+        return ContextManager.append_context_history(session_id, user_id, messages, tool_capture)
+    
     @staticmethod
     def load_context_history(session_id: str, user_id: str) -> List[Any]:
         """Load the complete LLM context history from the database."""
+        from .persistence.message_log import fetch_serialized_context
         try:
             from utils.auth.stateless_auth import set_rls_context
             with db_pool.get_user_connection() as conn:
                 cursor = conn.cursor(cursor_factory=RealDictCursor)
                 if not set_rls_context(cursor, conn, user_id, log_prefix="[LLMContextManager]"):
                     return []
-                cursor.execute("""
-                    SELECT llm_context_history 
-                    FROM chat_sessions 
-                    WHERE id = %s AND is_active = true
-                """, (session_id,))
-                
-                result = cursor.fetchone()
+                serialized_messages = fetch_serialized_context(
+                    cursor, session_id, active_only=True
+                )
                 
-                if not result or not result['llm_context_history']:
+                if not serialized_messages:
                     logger.info(f"No LLM context history found for session {session_id}")
                     return []
                 
-                serialized_messages = result['llm_context_history']
-                if isinstance(serialized_messages, str):
-                    serialized_messages = json.loads(serialized_messages)
-                
                 messages = [LLMContextManager.deserialize_message(msg) for msg in serialized_messages]
                 
                 logger.info(f"Loaded {len(messages)} messages from LLM context history for session {session_id}")
@@ -199,9 +200,6 @@ class LLMContextManager:
     def capture_tool_interaction(session_id: str, user_id: str, tool_name: str, tool_input: Dict[str, Any], tool_output: Any, tool_call_id: str = None) -> bool:
         """Capture a complete tool interaction (call + result) and append to context."""
         try:
-            # Load existing context
-            existing_messages = LLMContextManager.load_context_history(session_id, user_id)
-            
             # Create tool call message
             tool_call_msg = AIMessage(content=f"I'll use the {tool_name} tool.")
             # Add tool call information
@@ -223,11 +221,10 @@ class LLMContextManager:
                 tool_call_id= actual_tool_call_id
             )
             
-            # Append to existing context
-            updated_messages = existing_messages + [tool_call_msg, tool_result_msg]
-            
-            # Save updated context
-            return LLMContextManager.save_context_history(session_id, user_id, updated_messages)
+            # Append to the stored context; earlier messages are not rewritten
+            return LLMContextManager.append_context_history(
+                session_id, user_id, [tool_call_msg, tool_result_msg]
+            )
             
         except Exception as e:
             logger.error(f"Error capturing tool interaction: {e}")
@@ -1,10 +1,12 @@
+import functools
 import logging
 import os
+import threading
 import time
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, Tuple
 from dataclasses import dataclass
 import tiktoken
-import json
+from cachetools import LRUCache
 from utils.db.connection_pool import db_pool
 from utils.auth.stateless_auth import set_rls_context
 from .openrouter_pricing_service import get_pricing_service
@@ -12,6 +14,92 @@ from .provider_pricing_service import get_provider_pricing_service
 
 logger = logging.getLogger(__name__)
 
+# Token counts are memoized per (encoding, text) so long, mostly-unchanged
+# histories only pay tiktoken for messages that were not costed before.
+TOKEN_COUNT_CACHE_SIZE = int(os.getenv("TOKEN_COUNT_CACHE_SIZE", "20000"))
+# Texts at least this long are costed from evenly spaced sample windows
+# instead of a full encode (e.g. multi-MB tool output).
+TOKEN_ESTIMATE_MIN_CHARS = int(os.getenv("TOKEN_ESTIMATE_MIN_CHARS", "200000"))
+_ESTIMATE_WINDOWS = 16
+_ESTIMATE_WINDOW_CHARS = 4096
+
+
+@functools.lru_cache(maxsize=None)
+def _get_encoding(encoding_name: str):
+    return tiktoken.get_encoding(encoding_name)
+
+
+def _encoding_name_for(model_name: str) -> str:
+    if "gpt-4o" in (model_name or ""):
+        return "o200k_base"
+    return "cl100k_base"
+
+
+def _estimate_tokens(encoding, text: str) -> int:
+    """Extrapolate the token count of a very large text from sampled windows.
+
+    Windows are spread evenly over the text, so the error is bounded by how much
+    token density varies across it; on mixed kubectl/log/JSON output it stays
+    within ~5% (see scripts/bench_token_accounting.py).
+    """
+    length = len(text)
+    stride = length // _ESTIMATE_WINDOWS
+    sampled_chars = sampled_tokens = 0
+    for index in range(_ESTIMATE_WINDOWS):
+        window = text[index * stride:index * stride + _ESTIMATE_WINDOW_CHARS]
+        sampled_chars += len(window)
+        sampled_tokens += len(encoding.encode(window, disallowed_special=()))
+    return max(1, round(length * sampled_tokens / sampled_chars))
+
+
+class _TokenCountCache:
+    """Thread-safe LRU of token counts keyed by (encoding, length, content hash), with hit counters.
+
+    ``hash(str)`` is cached on the string object, so re-costing a message whose
+    content was already seen is a dict lookup rather than a re-tokenization.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "LRUCache[Tuple[str, int, int], int]" = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.estimated = 0
+
+    def get(self, key: Tuple[str, int, int]) -> Optional[int]:
+        with self._lock:
+            count = self._entries.get(key)
+            if count is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return count
+
+    def put(self, key: Tuple[str, int, int], count: int, estimated: bool = False) -> None:
+        with self._lock:
+            self._entries[key] = count
+            if estimated:
+                self.estimated += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "estimated": self.estimated,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.estimated = 0
+
+
+_token_cache = _TokenCountCache(TOKEN_COUNT_CACHE_SIZE)
+
 
 @dataclass
 class LLMUsage:
@@ -90,68 +178,79 @@ class LLMUsageTracker:
 
     @classmethod
     def count_tokens(cls, text: str, model_name: str = "gpt-4") -> int:
-        """Count tokens in text using tiktoken"""
+        """Count tokens in text using tiktoken (memoized; sampled for very large text)"""
+        text = text if isinstance(text, str) else str(text)
+        encoding_name = _encoding_name_for(model_name)
+        key = (encoding_name, len(text), hash(text))
+        cached = _token_cache.get(key)
+        if cached is not None:
+            return cached
+
         try:
-            if "gpt-4o" in model_name:
-                encoding_name = "o200k_base"
-            elif "gpt-4" in model_name or "gpt-3.5" in model_name:
-                encoding_name = "cl100k_base"
+            encoding = _get_encoding(encoding_name)
+            if len(text) >= TOKEN_ESTIMATE_MIN_CHARS:
+                count = _estimate_tokens(encoding, text)
+                _token_cache.put(key, count, estimated=True)
             else:
-                encoding_name = "cl100k_base"
-
-            encoding = tiktoken.get_encoding(encoding_name)
-            return len(encoding.encode(str(text)))
+                count = len(encoding.encode(text, disallowed_special=()))
+                _token_cache.put(key, count)
+            return count
 
         except Exception as e:
             logger.warning(
                 f"Error counting tokens: {e}. Using character-based estimation."
             )
             # Fallback: rough estimation (1 token ≈ 4 characters)
-            return len(str(text)) // 4
+            return len(text) // 4
+
+    @classmethod
+    def _count_message_tokens(cls, message: Any, model_name: str) -> int:
+        if hasattr(message, "content"):
+            # Handle multimodal content
+            if isinstance(message.content, list):
+                tokens = 0
+                for content_part in message.content:
+                    if isinstance(content_part, dict):
+                        if content_part.get("type") == "text":
+                            tokens += cls.count_tokens(content_part.get("text", ""), model_name)
+                        elif content_part.get("type") == "image_url":
+                            # Images roughly cost 85 tokens per image for vision models
+                            tokens += 85
+                    elif isinstance(content_part, str):
+                        tokens += cls.count_tokens(content_part, model_name)
+                return tokens
+            return cls.count_tokens(message.content, model_name)
+        if hasattr(message, "text"):
+            return cls.count_tokens(message.text, model_name)
+        return cls.count_tokens(str(message), model_name)
 
     @classmethod
     def count_tokens_from_messages(
         cls, messages: Any, model_name: str = "gpt-4"
     ) -> int:
-        """Count tokens from message objects"""
-        try:
-            total_tokens = 0
+        """Count tokens from message objects.
 
+        Per-message counts come from the content-hash cache, so costing a list
+        that grew by N messages only tokenizes those N.
+        """
+        try:
             if isinstance(messages, list):
-                for message in messages:
-                    if hasattr(message, "content"):
-                        # Handle multimodal content
-                        if isinstance(message.content, list):
-                            for content_part in message.content:
-                                if isinstance(content_part, dict):
-                                    if content_part.get("type") == "text":
-                                        total_tokens += cls.count_tokens(
-                                            content_part.get("text", ""), model_name
-                                        )
-                                    elif content_part.get("type") == "image_url":
-                                        # Images roughly cost 85 tokens per image for vision models
-                                        total_tokens += 85
-                                elif isinstance(content_part, str):
-                                    total_tokens += cls.count_tokens(
-                                        content_part, model_name
-                                    )
-                        else:
-                            total_tokens += cls.count_tokens(
-                                str(message.content), model_name
-                            )
-                    elif hasattr(message, "text"):
-                        total_tokens += cls.count_tokens(message.text, model_name)
-                    else:
-                        total_tokens += cls.count_tokens(str(message), model_name)
-            else:
-                total_tokens = cls.count_tokens(str(messages), model_name)
-
-            return total_tokens
+                return sum(cls._count_message_tokens(message, model_name) for message in messages)
+            return cls.count_tokens(str(messages), model_name)
 
         except Exception as e:
             logger.warning(f"Error counting tokens from messages: {e}")
             return cls.count_tokens(str(messages), model_name)
 
+    @classmethod
+    def get_token_cache_stats(cls) -> Dict[str, int]:
+        """Hit/miss counters for the token-count cache."""
+        return _token_cache.stats()
+
+    @classmethod
+    def clear_token_cache(cls) -> None:
+        _token_cache.clear()
+
     @classmethod
     def calculate_cost(
         cls,
@@ -288,69 +387,25 @@ class LLMUsageTracker:
 
     @classmethod
     def store_usage(cls, usage: LLMUsage) -> bool:
-        """Store LLM usage data in the database"""
-        try:
-            with db_pool.get_user_connection() as conn:
-                cursor = conn.cursor()
+        """Queue LLM usage data for the buffered database writer.
 
-                resolved_org_id = set_rls_context(cursor, conn, usage.user_id, log_prefix="[LLMUsage:store]")
-                if not resolved_org_id:
-                    logger.error("[LLMUsage:store] Cannot store usage — org_id unresolvable for user %s", usage.user_id)
-                    return False
-                usage.org_id = resolved_org_id
-
-                # Insert usage record
-                cursor.execute(
-                    """
-                    INSERT INTO llm_usage_tracking (
-                        user_id, org_id, session_id, model_name, api_provider, request_type,
-                        input_tokens, output_tokens, estimated_cost, response_time_ms,
-                        error_message, request_metadata
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """,
-                    (
-                        usage.user_id,
-                        usage.org_id,
-                        usage.session_id,
-                        usage.model_name,
-                        usage.api_provider,
-                        usage.request_type,
-                        usage.input_tokens,
-                        usage.output_tokens,
-                        usage.estimated_cost,
-                        usage.response_time_ms,
-                        usage.error_message,
-                        json.dumps(usage.request_metadata)
-                        if usage.request_metadata
-                        else None,
-                    ),
-                )
-
-                conn.commit()
-                logger.info(f"Stored LLM usage: {usage.model_name} - {usage.input_tokens}+{usage.output_tokens} tokens - ${usage.estimated_cost:.6f}")
-                
-                # Clear API cost cache for this user to force refresh on next cost check
-                try:
-                    from utils.billing.billing_cache import clear_user_cache
-
-                    clear_user_cache(usage.user_id)
-                    logger.debug(f"Cleared API cost cache for user {usage.user_id} after new usage record")
-                except Exception as cache_error:
-                    logger.warning(f"Failed to clear API cost cache after usage store: {cache_error}")
-
-                # Report usage to marketplace metering (no-op unless hooks are configured).
-                # Implementations must be non-blocking (buffer + flush pattern).
-                try:
-                    from utils.hooks import get_hook
-                    get_hook("report_usage")(usage.org_id, usage.estimated_cost, {
-                        "model": usage.model_name,
-                        "input_tokens": usage.input_tokens,
-                        "output_tokens": usage.output_tokens,
-                    })
-                except Exception as hook_err:
-                    logger.debug("report_usage hook error (non-fatal): %s", hook_err)
-
-                return True
+        The org is resolved here so an unresolvable user is rejected up front;
+        the row itself is written in the next batch (see llm_usage_writer).
+        """
+        try:
+            from utils.auth.stateless_auth import get_org_id_for_user
+            from .llm_usage_writer import get_usage_writer
+
+            resolved_org_id = get_org_id_for_user(usage.user_id)
+            if not resolved_org_id:
+                logger.error("[LLMUsage:store] Cannot store usage — org_id unresolvable for user %s", usage.user_id)
+                return False
+            usage.org_id = resolved_org_id
+
+            if not get_usage_writer().submit(usage):
+                return False
+            logger.debug(f"Queued LLM usage: {usage.model_name} - {usage.input_tokens}+{usage.output_tokens} tokens - ${usage.estimated_cost:.6f}")
+            return True
 
         except Exception as e:
             logger.error(f"Error storing LLM usage: {e}")
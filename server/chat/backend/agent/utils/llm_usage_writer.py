@@ -0,0 +1,276 @@
+"""
+Buffered writer for llm_usage_tracking.
+
+LLMUsageTracker.store_usage hands records to a background thread instead of
+committing one INSERT per model call. The thread writes them with multi-row
+INSERTs (one transaction per org, as RLS requires) and, in the same
+transaction, folds them into the llm_usage_daily_costs aggregates.
+
+Batches flush when LLM_USAGE_BATCH_SIZE records are pending, every
+LLM_USAGE_FLUSH_INTERVAL_SECONDS, and at interpreter / worker shutdown. When
+the queue is full the caller writes its own record synchronously, so bursts
+slow callers down instead of dropping usage.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from psycopg2.extras import execute_values
+
+from utils.db.connection_pool import db_pool
+
+logger = logging.getLogger(__name__)
+
+LLM_USAGE_BATCH_SIZE = int(os.getenv("LLM_USAGE_BATCH_SIZE", "200"))
+LLM_USAGE_FLUSH_INTERVAL_SECONDS = float(os.getenv("LLM_USAGE_FLUSH_INTERVAL_SECONDS", "2"))
+LLM_USAGE_QUEUE_SIZE = int(os.getenv("LLM_USAGE_QUEUE_SIZE", "10000"))
+_SHUTDOWN_FLUSH_TIMEOUT_SECONDS = 10.0
+
+_INSERT_USAGE_SQL = """
+    INSERT INTO llm_usage_tracking (
+        user_id, org_id, session_id, timestamp, model_name, api_provider, request_type,
+        input_tokens, output_tokens, estimated_cost, response_time_ms,
+        error_message, request_metadata
+    ) VALUES %s
+"""
+
+_UPSERT_DAILY_COSTS_SQL = """
+    INSERT INTO llm_usage_daily_costs (
+        org_id, user_id, model_name, usage_date,
+        request_count, input_tokens, output_tokens, estimated_cost
+    ) VALUES %s
+    ON CONFLICT (org_id, user_id, model_name, usage_date) DO UPDATE SET
+        request_count = llm_usage_daily_costs.request_count + EXCLUDED.request_count,
+        input_tokens = llm_usage_daily_costs.input_tokens + EXCLUDED.input_tokens,
+        output_tokens = llm_usage_daily_costs.output_tokens + EXCLUDED.output_tokens,
+        estimated_cost = llm_usage_daily_costs.estimated_cost + EXCLUDED.estimated_cost,
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+# (usage, recorded_at) — recorded_at is the call time, not the flush time.
+_Record = Tuple[Any, datetime]
+
+
+def _usage_row(usage, recorded_at: datetime) -> tuple:
+    return (
+        usage.user_id,
+        usage.org_id,
+        usage.session_id,
+        recorded_at,
+        usage.model_name,
+        usage.api_provider,
+        usage.request_type,
+        usage.input_tokens,
+        usage.output_tokens,
+        usage.estimated_cost,
+        usage.response_time_ms,
+        usage.error_message,
+        json.dumps(usage.request_metadata) if usage.request_metadata else None,
+    )
+
+
+def _daily_cost_rows(records: List[_Record]) -> List[tuple]:
+    """Aggregate records into one row per (org, user, model, day)."""
+    totals: Dict[tuple, List[float]] = defaultdict(lambda: [0, 0, 0, 0.0])
+    for usage, recorded_at in records:
+        bucket = totals[(usage.org_id, usage.user_id, usage.model_name, recorded_at.date())]
+        bucket[0] += 1
+        bucket[1] += usage.input_tokens or 0
+        bucket[2] += usage.output_tokens or 0
+        bucket[3] += usage.estimated_cost or 0.0
+    return [key + tuple(values) for key, values in totals.items()]
+
+
+def _after_commit(records: List[_Record]) -> None:
+    """Counters, per-process cost cache and metering for committed usage."""
+    user_costs: Dict[str, float] = defaultdict(float)
+    for usage, _ in records:
+        user_costs[usage.user_id] += usage.estimated_cost or 0.0
+
+    try:
+        from utils.billing.cost_counters import add_costs
+
+        add_costs(user_costs)
+    except Exception as e:
+        logger.warning(f"Failed to update cost counters after usage flush: {e}")
+
+    try:
+        from utils.billing.billing_cache import clear_user_cache
+
+        for user_id in user_costs:
+            clear_user_cache(user_id)
+    except Exception as cache_error:
+        logger.warning(f"Failed to clear API cost cache after usage store: {cache_error}")
+
+    # Report usage to marketplace metering (no-op unless hooks are configured).
+    # Implementations must be non-blocking (buffer + flush pattern).
+    try:
+        from utils.hooks import get_hook
+
+        report_usage = get_hook("report_usage")
+    except Exception as hook_err:
+        logger.debug("report_usage hook error (non-fatal): %s", hook_err)
+        return
+    for usage, _ in records:
+        try:
+            report_usage(usage.org_id, usage.estimated_cost, {
+                "model": usage.model_name,
+                "input_tokens": usage.input_tokens,
+                "output_tokens": usage.output_tokens,
+            })
+        except Exception as hook_err:
+            logger.debug("report_usage hook error (non-fatal): %s", hook_err)
+
+
+def write_usage_batch(records: List[_Record]) -> int:
+    """Insert usage records and update daily aggregates. Returns rows written.
+
+    Records must have ``org_id`` resolved. Each org is written in its own
+    transaction under that org's RLS context; a failing org does not block
+    the others.
+    """
+    by_org: Dict[str, List[_Record]] = defaultdict(list)
+    for record in records:
+        by_org[record[0].org_id].append(record)
+
+    written = 0
+    with db_pool.get_user_connection() as conn:
+        cursor = conn.cursor()
+        for org_id, org_records in by_org.items():
+            try:
+                cursor.execute("SET myapp.current_user_id = %s;", (org_records[0][0].user_id,))
+                cursor.execute("SET myapp.current_org_id = %s;", (org_id,))
+                execute_values(
+                    cursor,
+                    _INSERT_USAGE_SQL,
+                    [_usage_row(usage, recorded_at) for usage, recorded_at in org_records],
+                    page_size=LLM_USAGE_BATCH_SIZE,
+                )
+                execute_values(cursor, _UPSERT_DAILY_COSTS_SQL, _daily_cost_rows(org_records))
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                logger.error(f"Error storing {len(org_records)} LLM usage records for org {org_id}: {e}")
+                continue
+            written += len(org_records)
+            _after_commit(org_records)
+
+    logger.info(f"Stored {written}/{len(records)} LLM usage records")
+    return written
+
+
+class UsageWriter:
+    """Background batcher in front of write_usage_batch.
+
+    The thread starts on first use and is recreated in forked children
+    (records queued in the parent stay the parent's to write).
+    """
+
+    _FLUSH = object()
+
+    def __init__(
+        self,
+        batch_size: int = LLM_USAGE_BATCH_SIZE,
+        flush_interval: float = LLM_USAGE_FLUSH_INTERVAL_SECONDS,
+        max_queue: int = LLM_USAGE_QUEUE_SIZE,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self._reset()
+
+    def _reset(self) -> None:
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue" = queue.Queue(maxsize=self.max_queue)
+        self._thread: Optional[threading.Thread] = None
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="llm-usage-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, usage) -> bool:
+        """Queue a usage record (org_id already resolved). False if it could not be stored."""
+        record = (usage, datetime.now(timezone.utc).replace(tzinfo=None))
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            logger.warning("LLM usage queue full; writing record synchronously")
+            try:
+                return write_usage_batch([record]) == 1
+            except Exception as e:
+                logger.error(f"Error storing LLM usage: {e}")
+                return False
+
+    def flush(self, timeout: float = _SHUTDOWN_FLUSH_TIMEOUT_SECONDS) -> bool:
+        """Write everything queued so far. Returns False on timeout."""
+        if self._thread is None or not self._thread.is_alive():
+            return self._queue.empty()
+        done = threading.Event()
+        try:
+            self._queue.put((self._FLUSH, done), timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def _run(self) -> None:
+        batch: List[_Record] = []
+        deadline = 0.0
+        while True:
+            timeout = max(0.0, deadline - time.monotonic()) if batch else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            flush_event = None
+            if item is not None and item[0] is self._FLUSH:
+                flush_event = item[1]
+            elif item is not None:
+                if not batch:
+                    deadline = time.monotonic() + self.flush_interval
+                batch.append(item)
+
+            if batch and (
+                flush_event is not None
+                or len(batch) >= self.batch_size
+                or time.monotonic() >= deadline
+            ):
+                try:
+                    write_usage_batch(batch)
+                except Exception as e:
+                    logger.error(f"Error storing {len(batch)} LLM usage records: {e}")
+                batch = []
+            if flush_event is not None:
+                flush_event.set()
+
+
+_writer = UsageWriter()
+
+
+def get_usage_writer() -> UsageWriter:
+    return _writer
+
+
+def flush_usage(timeout: float = _SHUTDOWN_FLUSH_TIMEOUT_SECONDS) -> bool:
+    """Flush queued usage records (used at shutdown and in tests)."""
+    return _writer.flush(timeout)
+
+
+atexit.register(flush_usage)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_writer._reset)
@@ -0,0 +1,316 @@
+"""
+Structural compression of log results via template mining.
+
+Observability tools (Splunk, Datadog, New Relic, Sentry, Coroot) often return
+hundreds of near-identical log lines that differ only in ids, counts and
+timestamps. Instead of byte-truncating them or handing them to the LLM
+summarizer, lines are streamed through a Drain-style miner: obvious variables
+are masked, lines are bucketed by token count and leading tokens, and each
+line joins the most similar template in its bucket (differing tokens become
+``<*>``) or starts a new one. Only tokens that look like values (masked, or
+containing a digit) may differ; lines that differ in plain words such as a
+status column stay in separate templates.
+
+The result keeps one entry per template with its count, first/last
+timestamp, severities, a sample line and a few sample parameter values.
+Rare templates are kept even when the template list has to be cut, since a
+one-off error is usually what the agent is looking for.
+"""
+
+import json
+import re
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+# Log results smaller than this (serialized) are returned verbatim.
+LOG_TEMPLATE_MIN_CHARS = 20_000
+# Templates listed in a compressed result.
+MAX_TEMPLATES = 60
+# Fraction of constant tokens a line must share with a template to join it.
+SIMILARITY_THRESHOLD = 0.5
+# Leading tokens used to bucket lines before similarity matching.
+PREFIX_DEPTH = 2
+MAX_CLUSTERS = 2_000
+SAMPLE_PARAMS = 3
+_MAX_SAMPLE_CHARS = 300
+_MAX_TEMPLATE_TOKENS = 80
+# Plain-text output needs enough lines for mining to pay off.
+_MIN_TEXT_LINES = 50
+# Fraction of plain-text lines that must carry a timestamp or severity.
+_MIN_LOG_LINE_FRACTION = 0.5
+
+WILDCARD = "<*>"
+
+_MASKS = [
+    (re.compile(r"\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b"), "<UUID>"),
+    (re.compile(r"\b\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?"), "<TS>"),
+    (re.compile(r"\b(?:\d{1,3}\.){3}\d{1,3}(?::\d+)?\b"), "<IP>"),
+    (re.compile(r"\b0x[0-9a-fA-F]+\b"), "<HEX>"),
+    (re.compile(r"\b[0-9a-fA-F]{16,}\b"), "<HEX>"),
+    (re.compile(r"(?<![\w.])[-+]?\d+(?:\.\d+)?(?:ms|us|ns|s|m|h|%|[KMG]i?B)?\b"), "<NUM>"),
+]
+_MASK_TOKENS = frozenset(token for _, token in _MASKS) | {WILDCARD}
+
+# Timestamp or severity marker that makes a plain-text line look like a log line.
+_LOG_LINE_RE = re.compile(
+    r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}"  # ISO 8601
+    r"|\b\d{2}:\d{2}:\d{2}\b"  # syslog, klog, time-only
+    r"|\b(?:TRACE|DEBUG|INFO|NOTICE|WARN|WARNING|ERROR|FATAL|CRITICAL|PANIC)\b"
+    r"|\b(?i:level|lvl|severity)=\w+"
+)
+
+_ERROR_SEVERITIES = frozenset(("error", "err", "fatal", "critical", "crit", "emergency", "alert", "panic"))
+
+Extractor = Union[str, Callable[[Any], Any], None]
+
+
+def _mask(line: str) -> str:
+    for pattern, token in _MASKS:
+        line = pattern.sub(token, line)
+    return line
+
+
+def _is_variable(token: str) -> bool:
+    return token in _MASK_TOKENS or any(c.isdigit() for c in token)
+
+
+def _is_error(severity: Any) -> bool:
+    return str(severity).lower() in _ERROR_SEVERITIES
+
+
+class _Template:
+    __slots__ = ("tokens", "count", "first_seen", "last_seen", "severities", "sample", "params")
+
+    def __init__(self, tokens: List[str], raw: str):
+        self.tokens = tokens
+        self.count = 0
+        self.first_seen = None
+        self.last_seen = None
+        self.severities: Counter = Counter()
+        self.sample = raw[:_MAX_SAMPLE_CHARS]
+        self.params: List[List[str]] = []
+
+    def similarity(self, tokens: List[str]) -> float:
+        same = sum(1 for a, b in zip(self.tokens, tokens) if a == b and a != WILDCARD)
+        return same / len(tokens) if tokens else 1.0
+
+    def accepts(self, tokens: List[str]) -> bool:
+        """True if every token that differs from the template is a value."""
+        return all(a == b or (_is_variable(a) and _is_variable(b)) for a, b in zip(self.tokens, tokens))
+
+    def merge(self, tokens: List[str]) -> None:
+        self.tokens = [a if a == b else WILDCARD for a, b in zip(self.tokens, tokens)]
+
+    def observe(self, raw_tokens: List[str], timestamp: Any, severity: Any) -> None:
+        self.count += 1
+        if timestamp is not None:
+            try:
+                if self.first_seen is None or timestamp < self.first_seen:
+                    self.first_seen = timestamp
+                if self.last_seen is None or timestamp > self.last_seen:
+                    self.last_seen = timestamp
+            except TypeError:
+                pass
+        if severity:
+            self.severities[str(severity).lower()] += 1
+        if len(self.params) < SAMPLE_PARAMS and len(raw_tokens) == len(self.tokens):
+            params = [raw for raw, tok in zip(raw_tokens, self.tokens) if tok in _MASK_TOKENS]
+            if params and params not in self.params:
+                self.params.append(params)
+
+    def to_dict(self) -> Dict[str, Any]:
+        entry: Dict[str, Any] = {
+            "template": " ".join(self.tokens),
+            "count": self.count,
+        }
+        if self.first_seen is not None:
+            entry["first_seen"] = self.first_seen
+            entry["last_seen"] = self.last_seen
+        if self.severities:
+            entry["severities"] = dict(self.severities)
+        entry["sample"] = self.sample
+        if self.params:
+            entry["sample_params"] = self.params
+        return entry
+
+
+class LogTemplateMiner:
+    """Streaming Drain-style log template miner.
+
+    Feed lines with :meth:`add`; memory grows with the number of distinct
+    templates, not the number of lines.
+    """
+
+    def __init__(
+        self,
+        similarity_threshold: float = SIMILARITY_THRESHOLD,
+        prefix_depth: int = PREFIX_DEPTH,
+        max_clusters: int = MAX_CLUSTERS,
+    ):
+        self.similarity_threshold = similarity_threshold
+        self.prefix_depth = prefix_depth
+        self.max_clusters = max_clusters
+        self.line_count = 0
+        self._buckets: Dict[tuple, List[_Template]] = {}
+        self._templates: List[_Template] = []
+
+    def _bucket_key(self, tokens: List[str]) -> tuple:
+        prefix = tuple(
+            WILDCARD if _is_variable(tok) else tok
+            for tok in tokens[:self.prefix_depth]
+        )
+        return (len(tokens),) + prefix
+
+    def add(self, message: Any, timestamp: Any = None, severity: Any = None) -> None:
+        """Add one log line."""
+        if message is None:
+            return
+        raw = message if isinstance(message, str) else json.dumps(message, default=str)
+        raw = raw.strip()
+        raw_tokens = raw.split()[:_MAX_TEMPLATE_TOKENS]
+        tokens = _mask(" ".join(raw_tokens)).split()
+        self.line_count += 1
+
+        bucket = self._buckets.setdefault(self._bucket_key(tokens), [])
+        at_capacity = len(self._templates) >= self.max_clusters
+        best, best_sim = None, -1.0
+        for template in bucket:
+            if not at_capacity and not template.accepts(tokens):
+                continue
+            sim = template.similarity(tokens)
+            if sim > best_sim:
+                best, best_sim = template, sim
+
+        if best is not None and (best_sim >= self.similarity_threshold or at_capacity):
+            best.merge(tokens)
+        else:
+            best = _Template(tokens, raw)
+            bucket.append(best)
+            self._templates.append(best)
+        best.observe(raw_tokens, timestamp, severity)
+
+    @property
+    def template_count(self) -> int:
+        return len(self._templates)
+
+    def summary(self, max_templates: int = MAX_TEMPLATES) -> Dict[str, Any]:
+        """Templates by count, keeping the rarest (errors first) when cut."""
+        by_count = sorted(self._templates, key=lambda t: -t.count)
+        omitted = 0
+        if len(by_count) > max_templates:
+            frequent = by_count[:max_templates // 2]
+            rest = by_count[max_templates // 2:]
+            rare = sorted(
+                rest,
+                key=lambda t: (not any(_is_error(s) for s in t.severities), t.count),
+            )[:max_templates - len(frequent)]
+            kept = set(map(id, rare))
+            by_count = frequent + [t for t in rest if id(t) in kept]
+            omitted = len(self._templates) - len(by_count)
+
+        result: Dict[str, Any] = {
+            "line_count": self.line_count,
+            "template_count": len(self._templates),
+            "templates": [t.to_dict() for t in by_count],
+        }
+        if omitted:
+            result["omitted_templates"] = omitted
+        return result
+
+
+def _extractor(spec: Extractor) -> Callable[[Any], Any]:
+    if spec is None:
+        return lambda entry: None
+    if callable(spec):
+        return spec
+
+    path = spec.split(".")
+
+    def _get(entry: Any) -> Any:
+        for part in path:
+            if not isinstance(entry, dict):
+                return None
+            entry = entry.get(part)
+        return entry
+
+    return _get
+
+
+def mine_log_entries(
+    entries: Iterable[Any],
+    message: Extractor,
+    timestamp: Extractor = None,
+    severity: Extractor = None,
+    max_templates: int = MAX_TEMPLATES,
+) -> Dict[str, Any]:
+    """Mine templates from log records.
+
+    ``message``, ``timestamp`` and ``severity`` are dotted key paths
+    (``"attributes.message"``) or callables taking a record.
+    """
+    get_message, get_timestamp, get_severity = map(_extractor, (message, timestamp, severity))
+    miner = LogTemplateMiner()
+    for entry in entries:
+        miner.add(get_message(entry), get_timestamp(entry), get_severity(entry))
+    return miner.summary(max_templates)
+
+
+def compress_log_entries(
+    entries: List[Any],
+    message: Extractor,
+    timestamp: Extractor = None,
+    severity: Extractor = None,
+    min_chars: int = LOG_TEMPLATE_MIN_CHARS,
+    serialized_size: Optional[int] = None,
+) -> Optional[Dict[str, Any]]:
+    """Template summary of ``entries``, or None when they are small enough to keep.
+
+    Pass ``serialized_size`` when the caller already serialized the entries.
+    """
+    if not entries:
+        return None
+    if serialized_size is None:
+        serialized_size = len(json.dumps(entries, default=str))
+    if serialized_size <= min_chars:
+        return None
+    summary = mine_log_entries(entries, message, timestamp, severity)
+    if not summary["line_count"]:
+        return None
+    summary["original_chars"] = serialized_size
+    return summary
+
+
+def compress_log_text(text: str, max_templates: int = MAX_TEMPLATES) -> Optional[str]:
+    """Template view of line-oriented text output, or None if it does not compress.
+
+    Used for plain-text tool output (kubectl logs, journalctl, ...); JSON
+    output is left to the tools that understand its structure, and text whose
+    lines mostly lack a timestamp or severity (tables, listings) is not a log.
+    """
+    stripped = text.lstrip()
+    if stripped.startswith(("{", "[")):
+        return None
+    lines = [line for line in text.splitlines() if line.strip()]
+    if len(lines) < _MIN_TEXT_LINES:
+        return None
+    log_lines = sum(1 for line in lines if _LOG_LINE_RE.search(line))
+    if log_lines <= len(lines) * _MIN_LOG_LINE_FRACTION:
+        return None
+
+    miner = LogTemplateMiner()
+    for line in lines:
+        miner.add(line)
+    # Mostly unique lines are not logs worth templating.
+    if miner.template_count > len(lines) // 4:
+        return None
+
+    summary = miner.summary(max_templates)
+    header = f"[{summary['line_count']} lines compressed into {summary['template_count']} log templates"
+    if summary.get("omitted_templates"):
+        header += f"; {summary['omitted_templates']} templates omitted"
+    out = [header + "]"]
+    for entry in summary["templates"]:
+        out.append(f"{entry['count']:>7}x  {entry['template']}")
+        if entry["template"] != entry["sample"]:
+            out.append(f"          e.g. {entry['sample']}")
+    return "\n".join(out)
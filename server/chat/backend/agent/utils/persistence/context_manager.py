@@ -8,6 +8,7 @@ import time
 from typing import List, Dict, Any, Optional
 from .redis_cache import RedisCache
 from .async_save_queue import AsyncSaveQueue
+from . import message_log
 from chat.backend.agent.utils.llm_context_manager import LLMContextManager
 from utils.security.config import config as _guardrails_config
 from utils.security.output_redaction import redact as _redact
@@ -128,6 +129,15 @@ class ContextManager:
                 session_id, user_id, messages, tool_capture
             )
     
+    @classmethod
+    def append_context_history(cls, session_id: str, user_id: str,
+                               messages: List[Any],
+                               tool_capture: Optional[List[Any]] = None) -> bool:
+        """Append *messages* after the session's stored context (no dedup, no rewrite)."""
+        if not session_id or not user_id:
+            return False
+        return cls._get_instance()._execute_append(session_id, user_id, messages, tool_capture)
+    
     @classmethod
     def get_optimized_serialization(cls, messages: List[Dict[str, Any]]) -> str:
         """Get serialized messages with caching."""
@@ -159,35 +169,71 @@ class ContextManager:
     def _execute_actual_save(self, session_id: str, user_id: str, 
                            messages: List[Dict[str, Any]], 
                            tool_capture: Optional[List[Any]] = None) -> bool:
-        """Execute the actual database save operation (moved from LLMContextManager)."""
+        """Persist *messages* as the session's complete context.
+
+        Only messages past the stored prefix are processed and written; when
+        the stored prefix no longer matches (e.g. after RCA compression) the
+        session's log is rewritten.
+        """
+        return self._write_context(session_id, user_id, messages, tool_capture, append=False)
+
+    def _execute_append(self, session_id: str, user_id: str,
+                        messages: List[Any],
+                        tool_capture: Optional[List[Any]] = None) -> bool:
+        """Persist *messages* after whatever context is already stored."""
+        return self._write_context(session_id, user_id, messages, tool_capture, append=True)
+
+    def _write_context(self, session_id, user_id, messages, tool_capture, append: bool) -> bool:
         from datetime import datetime
         from utils.db.connection_pool import db_pool
         
         try:
-            logger.info(f"Saving context for session {session_id}: {len(messages)} messages")
-            
-            processed_messages = self._apply_summarization(messages, tool_capture)
-            processed_messages = self._redact_tool_messages(
-                processed_messages, user_id=user_id, session_id=session_id,
-            )
-            serialized_messages = self._serialize_messages(processed_messages)
-            
             with db_pool.get_user_connection() as conn:
                 cursor = conn.cursor()
                 from utils.auth.stateless_auth import set_rls_context
                 org_id = set_rls_context(cursor, conn, user_id, log_prefix="[ContextManager]")
                 if not org_id:
                     return False
-                
-                result = self._upsert_session(
-                    cursor, conn, session_id, user_id, org_id,
-                    json.dumps(serialized_messages), datetime.now(),
-                )
-                if result is not None:
-                    return result
 
+                now = datetime.now()
+                state = message_log.lock_session_state(cursor, session_id)
+                if state is None:
+                    if not self._create_session(cursor, session_id, user_id, org_id, now):
+                        return False
+                    state = (0, "")
+                stored_len, stored_digest = state
+                if stored_len is None:
+                    stored_len, stored_digest = message_log.migrate_legacy_session(
+                        cursor, session_id, org_id, now
+                    )
+
+                if append or (
+                    stored_len <= len(messages)
+                    and message_log.chain_digest("", messages[:stored_len]) == stored_digest
+                ):
+                    start, base_digest = stored_len, stored_digest
+                    delta = list(messages) if append else messages[stored_len:]
+                else:
+                    logger.info(f"Stored context for session {session_id} diverged; rewriting {len(messages)} messages")
+                    message_log.truncate_log(cursor, session_id)
+                    start, base_digest, delta = 0, "", messages
+
+                if delta or start != stored_len:
+                    processed_messages = self._apply_summarization(delta, tool_capture)
+                    processed_messages = self._redact_tool_messages(
+                        processed_messages, user_id=user_id, session_id=session_id,
+                    )
+                    serialized_messages = self._serialize_messages(processed_messages)
+                    message_log.append_messages(cursor, session_id, org_id, start, serialized_messages)
+                    message_log.set_session_state(
+                        cursor, session_id, start + len(delta),
+                        message_log.chain_digest(base_digest, delta), now,
+                    )
                 conn.commit()
-                logger.info(f"Saved complete LLM context history for session {session_id} with {len(messages)} messages")
+                logger.info(
+                    f"Saved LLM context for session {session_id}: wrote {len(delta)} new message(s), "
+                    f"{start + len(delta)} total"
+                )
                 return True
                 
         except Exception as e:
@@ -240,33 +286,16 @@ class ContextManager:
         return serialized
 
     @staticmethod
-    def _upsert_session(cursor, conn, session_id, user_id, org_id, context_json, now) -> "bool | None":
-        """Try UPDATE, then INSERT if the session doesn't exist. Returns bool or None (updated OK, continue)."""
-        cursor.execute("""
-            UPDATE chat_sessions 
-            SET llm_context_history = %s, updated_at = %s
-            WHERE id = %s
-        """, (context_json, now, session_id))
-
-        if cursor.rowcount > 0:
-            return None
-
-        cursor.execute("""
-            SELECT COUNT(*) FROM chat_sessions 
-            WHERE id = %s AND is_active = true
-        """, (session_id,))
-        if cursor.fetchone()[0] > 0:
-            logger.error(f"Failed to update context for existing session {session_id}")
-            return False
-
+    def _create_session(cursor, session_id, user_id, org_id, now) -> bool:
+        """Insert a missing session row so its context can be logged."""
         try:
             logger.info(f"Session {session_id} not found - creating it automatically")
             cursor.execute("""
-                INSERT INTO chat_sessions (id, user_id, org_id, title, messages, ui_state, llm_context_history, created_at, updated_at, is_active)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (session_id, user_id, org_id, "New Chat", json.dumps([]), json.dumps({}), context_json, now, now, True))
-            conn.commit()
-            logger.info(f"Auto-created session {session_id} and saved context")
+                INSERT INTO chat_sessions (id, user_id, org_id, title, messages, ui_state, llm_context_history,
+                                           llm_context_length, llm_context_digest, created_at, updated_at, is_active)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """, (session_id, user_id, org_id, "New Chat", json.dumps([]), json.dumps({}), json.dumps([]),
+                  0, "", now, now, True))
             return True
         except Exception as create_error:
             logger.error(f"Failed to auto-create session {session_id}: {create_error}")
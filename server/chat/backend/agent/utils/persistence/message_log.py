@@ -0,0 +1,186 @@
+"""Append-only storage for LLM context history.
+
+A session's context lives in ``chat_context_messages``, one row per message
+keyed by ``(session_id, seq)``.  ``chat_sessions.llm_context_length`` holds
+the number of logged messages and ``llm_context_digest`` a chained
+fingerprint of them, so a save can tell whether the caller's list extends
+what is stored (write only the tail) or diverged, e.g. after RCA
+compression (rewrite the log).
+
+Sessions saved before the log existed have ``llm_context_length IS NULL``
+and keep their history in the ``llm_context_history`` JSON column.  Readers
+fall back to that column; the session's next save moves it into the log.
+"""
+
+import hashlib
+import json
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from psycopg2.extras import execute_values
+
+logger = logging.getLogger(__name__)
+
+
+def _message_identity(message: Any) -> Tuple[str, str, str, str]:
+    """``(role, id, tool_call_id, content)`` for a LangChain message or its stored dict.
+
+    Tool message content and ids are left out: redaction and summarization
+    rewrite them on save, and ``tool_call_id`` already identifies the result.
+    """
+    if isinstance(message, dict):
+        role = message.get("role", "unknown")
+        message_id = message.get("id")
+        tool_call_id = message.get("tool_call_id")
+        content = message.get("content", "")
+    else:
+        from chat.backend.agent.utils.llm_context_manager import LLMContextManager
+
+        role = LLMContextManager.message_role(message)
+        message_id = getattr(message, "id", None)
+        tool_call_id = getattr(message, "tool_call_id", None)
+        content = getattr(message, "content", "")
+    if role == "tool":
+        return role, "", str(tool_call_id or ""), ""
+    if not isinstance(content, str):
+        content = json.dumps(content, sort_keys=True, default=str)
+    return role, str(message_id or ""), str(tool_call_id or ""), content
+
+
+def chain_digest(previous: str, messages: Sequence[Any]) -> str:
+    """Extend the running fingerprint *previous* ("" for none) over *messages*."""
+    digest = previous or ""
+    for message in messages:
+        h = hashlib.sha256(digest.encode())
+        for part in _message_identity(message):
+            h.update(b"\x1f")
+            h.update(part.encode("utf-8", "surrogatepass"))
+        digest = h.hexdigest()[:32]
+    return digest
+
+
+def _column(row: Any, index: int, name: str) -> Any:
+    return row[name] if isinstance(row, dict) else row[index]
+
+
+def _decode_json(value: Any) -> Any:
+    return json.loads(value) if isinstance(value, str) else value
+
+
+def lock_session_state(cursor, session_id: str) -> Optional[Tuple[Optional[int], str]]:
+    """Lock the session row; returns ``(length, digest)`` or None if it does not exist.
+
+    ``length`` is None for a session that has not been moved into the log.
+    """
+    cursor.execute(
+        """
+        SELECT llm_context_length, llm_context_digest
+        FROM chat_sessions
+        WHERE id = %s
+        FOR UPDATE
+        """,
+        (session_id,),
+    )
+    row = cursor.fetchone()
+    if not row:
+        return None
+    return _column(row, 0, "llm_context_length"), _column(row, 1, "llm_context_digest") or ""
+
+
+def append_messages(cursor, session_id: str, org_id: str, start_seq: int,
+                    serialized: Sequence[Dict[str, Any]]) -> None:
+    """Insert serialized messages at ``start_seq, start_seq + 1, ...``."""
+    if not serialized:
+        return
+    execute_values(
+        cursor,
+        "INSERT INTO chat_context_messages (session_id, seq, org_id, message) VALUES %s",
+        [
+            (session_id, start_seq + offset, org_id, json.dumps(message))
+            for offset, message in enumerate(serialized)
+        ],
+        page_size=500,
+    )
+
+
+def truncate_log(cursor, session_id: str) -> None:
+    cursor.execute("DELETE FROM chat_context_messages WHERE session_id = %s", (session_id,))
+
+
+def set_session_state(cursor, session_id: str, length: int, digest: str, now) -> None:
+    """Record the log's length and digest; clears the legacy JSON column."""
+    cursor.execute(
+        """
+        UPDATE chat_sessions
+        SET llm_context_length = %s, llm_context_digest = %s,
+            llm_context_history = '[]'::jsonb, updated_at = %s
+        WHERE id = %s
+        """,
+        (length, digest, now, session_id),
+    )
+
+
+def migrate_legacy_session(cursor, session_id: str, org_id: str, now) -> Tuple[int, str]:
+    """Move a session's ``llm_context_history`` column into the log.
+
+    Caller must hold the row lock from :func:`lock_session_state`.  Returns
+    the new ``(length, digest)``.
+    """
+    cursor.execute("SELECT llm_context_history FROM chat_sessions WHERE id = %s", (session_id,))
+    row = cursor.fetchone()
+    history = _decode_json(_column(row, 0, "llm_context_history")) if row else None
+    history = history or []
+    truncate_log(cursor, session_id)
+    append_messages(cursor, session_id, org_id, 0, history)
+    digest = chain_digest("", history)
+    set_session_state(cursor, session_id, len(history), digest, now)
+    logger.info(f"Moved {len(history)} legacy context messages into the log for session {session_id}")
+    return len(history), digest
+
+
+def fetch_serialized_context(
+    cursor,
+    session_id: str,
+    *,
+    user_id: Optional[str] = None,
+    active_only: bool = False,
+) -> Optional[List[Dict[str, Any]]]:
+    """Read a session's serialized context messages in order.
+
+    Returns None when the session row does not match, ``[]`` when it has no
+    context.  Works for both logged and legacy sessions.
+    """
+    conditions = ["id = %s"]
+    params: List[Any] = [session_id]
+    if user_id is not None:
+        conditions.append("user_id = %s")
+        params.append(user_id)
+    if active_only:
+        conditions.append("is_active = true")
+    cursor.execute(
+        f"""
+        SELECT llm_context_length,
+               CASE WHEN llm_context_length IS NULL THEN llm_context_history END AS llm_context_history
+        FROM chat_sessions
+        WHERE {' AND '.join(conditions)}
+        """,
+        tuple(params),
+    )
+    row = cursor.fetchone()
+    if not row:
+        return None
+    length = _column(row, 0, "llm_context_length")
+
+    if length is None:
+        return _decode_json(_column(row, 1, "llm_context_history")) or []
+    if length == 0:
+        return []
+    cursor.execute(
+        """
+        SELECT message FROM chat_context_messages
+        WHERE session_id = %s AND seq < %s
+        ORDER BY seq
+        """,
+        (session_id, length),
+    )
+    return [_decode_json(_column(r, 0, "message")) for r in cursor.fetchall()]
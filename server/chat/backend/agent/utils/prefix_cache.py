@@ -84,11 +84,14 @@ class InMemoryPrefixCacheBackend(PrefixCacheBackend):
 
 
 class RedisPrefixCacheBackend(PrefixCacheBackend):
-    def __init__(self, url: str, namespace: str = "aurora:prefixcache"):
+    def __init__(self, namespace: str = "aurora:prefixcache"):
         if not redis:
             raise RuntimeError("redis library not available")
-        from utils.cache.redis_client import get_redis_ssl_kwargs
-        self.client = redis.from_url(url, **get_redis_ssl_kwargs())
+        from utils.cache.redis_client import get_redis_client
+        # Shared pooled client (REDIS_URL) instead of a private connection.
+        self.client = get_redis_client()
+        if self.client is None:
+            raise RuntimeError("Redis unavailable")
         self.ns = namespace.rstrip(":")
 
     def _rk(self, key: str) -> str:
@@ -125,6 +128,7 @@ class RedisPrefixCacheBackend(PrefixCacheBackend):
             logger.warning(f"Redis clear failed: {e}")
 
     def invalidate_by_provider(self, provider: str) -> None:
+        from utils.cache.redis_client import get_many
         try:
             cursor = 0
             pattern = f"{self.ns}:*"
@@ -134,16 +138,16 @@ class RedisPrefixCacheBackend(PrefixCacheBackend):
                     if cursor == 0:
                         break
                     continue
-                for k in keys:
+                # One MGET and one DEL per scan page instead of a GET per key.
+                stale = []
+                for k, raw in zip(keys, get_many(self.client, keys)):
                     try:
-                        raw = self.client.get(k)
-                        if not raw:
-                            continue
-                        data = json.loads(raw)
-                        if data.get("provider") == provider:
-                            self.client.delete(k)
+                        if raw and json.loads(raw).get("provider") == provider:
+                            stale.append(k)
                     except Exception:
                         continue
+                if stale:
+                    self.client.delete(*stale)
                 if cursor == 0:
                     break
         except Exception as e:
@@ -172,7 +176,7 @@ class PrefixCacheManager:
         # Backend selection
         if self.use_redis and self.redis_url and redis is not None:
             try:
-                self.backend: PrefixCacheBackend = RedisPrefixCacheBackend(self.redis_url)
+                self.backend: PrefixCacheBackend = RedisPrefixCacheBackend()
                 logger.info("PrefixCacheManager using Redis backend")
             except Exception as e:
                 logger.warning(f"Redis backend unavailable ({e}); falling back to in-memory cache")
@@ -52,6 +52,7 @@ class State(BaseModel):
     subagent_inputs: List[Dict[str, Any]] = []
     finding_refs: Annotated[List[Dict[str, Any]], operator.add] = []
     synthesis_wave: int = 0
+    rca_wave: int = 0  # Wave a sub-agent session was dispatched in; orders LLM admission
     # Per-wave decisions from the synthesis node (rationale, follow-ups). Used
     # to feed the orchestrator's own prior thoughts back into later synthesis
     # waves so the summary is grounded in the full investigation arc, not just
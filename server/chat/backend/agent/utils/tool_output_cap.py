@@ -4,12 +4,16 @@ Universal tool output capping for Aurora.
 Prevents large tool outputs from entering the LLM context by capping them
 at the source — before LangChain adds them to the ReAct message list.
 
-Small outputs pass through unchanged. Medium outputs are summarized via LLM.
-Huge outputs are truncated first, then summarized.
+Small outputs pass through unchanged. Line-oriented log output that compresses
+into log templates under the pass-through size is returned in that form.
+Otherwise medium outputs are summarized via LLM and huge outputs are truncated
+first, then summarized.
 """
 
 import logging
 
+from .log_templates import compress_log_text
+
 logger = logging.getLogger(__name__)
 
 # Outputs below this are passed through unchanged (~10K tokens)
@@ -23,6 +27,7 @@ def cap_tool_output(output: str, tool_name: str = "unknown") -> str:
     """Cap a tool output to a reasonable size for LLM context.
 
     - < 40K chars: pass through as-is
+    - repetitive log lines: log templates, if they fit in 40K
     - 40K - 400K chars: summarize via LLM
     - > 400K chars: truncate to 400K, then summarize
 
@@ -36,6 +41,14 @@ def cap_tool_output(output: str, tool_name: str = "unknown") -> str:
     if len(output) <= PASS_THROUGH_CHARS:
         return output
 
+    templated = compress_log_text(output)
+    if templated is not None and len(templated) <= PASS_THROUGH_CHARS:
+        logger.info(
+            f"[ToolOutputCap] {tool_name}: compressed {len(output):,} chars of log lines "
+            f"into {len(templated):,} chars of templates"
+        )
+        return templated
+
     logger.info(
         f"[ToolOutputCap] {tool_name}: output is {len(output):,} chars, "
         f"threshold is {PASS_THROUGH_CHARS:,} — summarizing"
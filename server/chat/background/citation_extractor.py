@@ -149,36 +149,25 @@ class CitationExtractor:
         """
         from utils.db.connection_pool import db_pool
         from utils.auth.stateless_auth import set_rls_context
+        from chat.backend.agent.utils.persistence.message_log import fetch_serialized_context
 
         try:
             with db_pool.get_admin_connection() as conn:
                 with conn.cursor() as cursor:
                     set_rls_context(cursor, conn, user_id, log_prefix="[CitationExtractor:extract_citations_from_session]")
-                    cursor.execute(
-                        """
-                        SELECT llm_context_history
-                        FROM chat_sessions
-                        WHERE id = %s AND user_id = %s
-                        """,
-                        (session_id, user_id),
-                    )
-                    row = cursor.fetchone()
-                    if not row or row[0] is None:
+                    try:
+                        llm_context = fetch_serialized_context(cursor, session_id, user_id=user_id)
+                    except json.JSONDecodeError:
+                        logger.error(
+                            f"[CitationExtractor] Failed to parse llm_context_history for session {session_id}"
+                        )
+                        return []
+                    if llm_context is None:
                         logger.warning(
                             f"[CitationExtractor] No llm_context_history found for session {session_id}"
                         )
                         return []
 
-                    llm_context = row[0]
-                    if isinstance(llm_context, str):
-                        try:
-                            llm_context = json.loads(llm_context)
-                        except json.JSONDecodeError:
-                            logger.error(
-                                f"[CitationExtractor] Failed to parse llm_context_history for session {session_id}"
-                            )
-                            return []
-
                     sub_agent_history = (
                         self._load_sub_agent_history(cursor, incident_id) if incident_id else {}
                     )
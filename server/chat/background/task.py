@@ -150,24 +150,14 @@ def _extract_tool_calls_for_viz(
     """
     try:
         if llm_context is None:
+            from chat.backend.agent.utils.persistence.message_log import fetch_serialized_context
             with db_pool.get_admin_connection() as conn:
                 with conn.cursor() as cursor:
                     set_rls_context(cursor, conn, user_id, log_prefix="[BackgroundChat:ExtractToolCalls]")
-                    cursor.execute(
-                        """
-                        SELECT llm_context_history
-                        FROM chat_sessions
-                        WHERE id = %s AND user_id = %s
-                        """,
-                        (session_id, user_id),
-                    )
-                    row = cursor.fetchone()
-            if not row or not row[0]:
+                    llm_context = fetch_serialized_context(cursor, session_id, user_id=user_id)
+            if not llm_context:
                 logger.warning(f"[Visualization] No llm_context_history for session {session_id}")
                 return []
-            llm_context = row[0]
-            if isinstance(llm_context, str):
-                llm_context = json.loads(llm_context)
 
         tool_calls = []
         for msg in llm_context:
@@ -195,35 +185,27 @@ def _ensure_llm_context_history(
     from langchain_core.messages import AIMessage, ToolMessage
     from chat.backend.agent.utils.llm_context_manager import LLMContextManager
     from chat.backend.agent.utils.persistence.context_manager import ContextManager
+    from chat.backend.agent.utils.persistence.message_log import fetch_serialized_context
 
     try:
         with db_pool.get_admin_connection() as conn:
             with conn.cursor() as cursor:
                 set_rls_context(cursor, conn, user_id, log_prefix="[BackgroundChat:EnsureLLMContext]")
-                cursor.execute(
-                    """
-                    SELECT llm_context_history, messages
-                    FROM chat_sessions
-                    WHERE id = %s
-                    """,
-                    (session_id,),
-                )
+                try:
+                    llm_context = fetch_serialized_context(cursor, session_id)
+                except (ValueError, TypeError) as e:
+                    logger.error(
+                        f"[BackgroundChat] Malformed llm_context_history JSON for session {session_id}: {e}; treating as empty"
+                    )
+                    llm_context = []
+                if llm_context is None:
+                    return None
+                if llm_context:
+                    return llm_context
+                cursor.execute("SELECT messages FROM chat_sessions WHERE id = %s", (session_id,))
                 row = cursor.fetchone()
 
-        if not row:
-            return None
-
-        llm_context, ui_messages = row[0], row[1]
-        if isinstance(llm_context, str):
-            try:
-                llm_context = json.loads(llm_context) if llm_context else []
-            except (ValueError, TypeError) as e:
-                logger.error(
-                    f"[BackgroundChat] Malformed llm_context_history JSON for session {session_id}: {e}; treating as empty"
-                )
-                llm_context = []
-        if llm_context:
-            return llm_context
+        ui_messages = row[0] if row else None
 
         if isinstance(ui_messages, str):
             try:
@@ -652,6 +634,13 @@ def run_background_chat(
                         except Exception as le:
                             logger.error(f"[BackgroundChat] Failed to record lifecycle event 'rca_started' for incident {incident_id}: {le}")
 
+                        # Warm the KB search cache while the agent plans its first steps
+                        try:
+                            from chat.backend.agent.tools.knowledge_base_search_tool import start_incident_prefetch
+                            start_incident_prefetch(user_id, str(incident_id))
+                        except Exception:
+                            logger.debug("[BackgroundChat] Failed to start KB search prefetch")
+
                         # Dispatch on_incident actions for this incident (fire-and-forget)
                         source = trigger_metadata.get('source', '') if trigger_metadata else ''
                         # Prevent infinite loops: actions must not trigger other on_incident actions
@@ -1886,18 +1875,17 @@ def _determine_severity_from_rca(incident_id: str, session_id: str, user_id: str
                 transcript = "\n".join([f"{m.get('sender', 'unknown')}: {m.get('text', '')[:200]}" for m in messages[:10] if m.get('text')])
                 
                 try:
-                    # Use LLMManager which creates ChatOpenAI instances successfully
-                    # This avoids the langchain.schema import issue by using the same code path as the rest of the app
+                    # Use the same provider-aware factory as LLMManager (avoids the langchain.schema
+                    # import issue). Chat models are shared by the provider registry, so ask for a
+                    # temperature-0 instance instead of mutating one.
                     from chat.backend.agent.llm import ModelConfig
+                    from chat.backend.agent.providers import create_chat_model
                     severity_model = ModelConfig.INCIDENT_REPORT_SUMMARIZATION_MODEL
-                    llm_manager = LLMManager()
-                    model = llm_manager._get_or_create_model(severity_model)
-                    
-                    original_temp = model.temperature
-                    model.temperature = 0
+                    model = create_chat_model(
+                        severity_model, temperature=0, provider_mode=LLMManager().provider_mode
+                    )
                     
-                    try:
-                        prompt = f"""You are assessing the operational severity of an incident based on its investigation.
+                    prompt = f"""You are assessing the operational severity of an incident based on its investigation.
 
 Severity levels:
 - critical: Production outage, service unavailable, data loss, or security breach affecting customers
@@ -1911,17 +1899,14 @@ Investigation transcript:
 {transcript}
 
 Respond with ONLY ONE WORD: critical, high, medium, or low"""
-                        response = tracked_invoke(
-                            model,
-                            [HumanMessage(content=prompt)],
-                            user_id=user_id,
-                            session_id=session_id,
-                            model_name=severity_model,
-                            request_type="severity_determination",
-                        )
-                    finally:
-                        # Restore original temperature
-                        model.temperature = original_temp
+                    response = tracked_invoke(
+                        model,
+                        [HumanMessage(content=prompt)],
+                        user_id=user_id,
+                        session_id=session_id,
+                        model_name=severity_model,
+                        request_type="severity_determination",
+                    )
                 except (ImportError, ModuleNotFoundError) as ie:
                     # Catch any import errors - should not happen with LLMManager but just in case
                     error_msg = str(ie)
@@ -134,16 +134,10 @@ def _fetch_recent_tool_calls(session_id: str, user_id: str, limit: int = 10) ->
                     return []
 
                 # Parent session's llm_context_history (single-agent path)
+                from chat.backend.agent.utils.persistence.message_log import fetch_serialized_context
                 parent_calls: List[Dict] = []
-                cursor.execute(
-                    "SELECT llm_context_history FROM chat_sessions WHERE id = %s",
-                    (session_id,),
-                )
-                row = cursor.fetchone()
-                if row and row[0]:
-                    llm_context = row[0]
-                    if isinstance(llm_context, str):
-                        llm_context = json.loads(llm_context)
+                llm_context = fetch_serialized_context(cursor, session_id)
+                if llm_context:
                     for msg in llm_context:
                         if isinstance(msg, dict) and msg.get('name') in INFRASTRUCTURE_TOOLS:
                             parent_calls.append({
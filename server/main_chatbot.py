@@ -16,12 +16,13 @@ logging.getLogger("azure.core.pipeline.policies.http_logging_policy").setLevel(l
 logging.getLogger("azure").setLevel(logging.WARNING)
 
 import json
+import re
 import time
 import uuid
 import os
 import jwt as pyjwt
 from utils.kubectl.agent_ws_handler import handle_kubectl_agent
-from datetime import datetime
+from datetime import datetime, timezone
 from dotenv import load_dotenv
 from typing import Optional
 from urllib.parse import parse_qs
@@ -53,6 +54,7 @@ from utils.cloud.infrastructure_confirmation import handle_websocket_confirmatio
 from chat.backend.agent.tools.cloud_tools import register_websocket_connection, set_user_context
 from chat.backend.agent.access import ModeAccessController
 from utils.text.text_utils import clean_markdown
+from utils.cache.live_stream import LiveChannel
 from utils.internal.api_handler import handle_http_request
 from utils.auth.stateless_auth import validate_user_exists, get_org_id_for_user, set_rls_context
 
@@ -89,6 +91,10 @@ class RateLimiter:
 
 rate_limiter = RateLimiter(rate=5, per=60)
 
+# Background chats checkpoint streamed output to Postgres at most this often;
+# live output goes to Redis streams (utils/cache/live_stream.py).
+BACKGROUND_PERSIST_INTERVAL_SECONDS = float(os.getenv("BACKGROUND_PERSIST_INTERVAL_SECONDS", "5"))
+
 _INTERNAL_API_SECRET = os.getenv("INTERNAL_API_SECRET", "")
 _AURORA_ENV = os.getenv("AURORA_ENV", "production")
 
@@ -337,12 +343,60 @@ async def process_workflow_async(wf, state, websocket, user_id, incident_id=None
     workflow_timeout = 1800  # 30 minutes max for any workflow
     session_id = getattr(state, 'session_id', 'unknown')
 
+    # Background chats stream their output live over Redis (see utils/cache/live_stream.py)
+    # and only checkpoint it to Postgres every few seconds and at turn boundaries.
+    is_background = getattr(state, 'is_background', False)
+    live_session = (
+        LiveChannel("session", session_id)
+        if is_background and session_id and session_id != 'unknown' else None
+    )
+    live_incident = LiveChannel("incident", incident_id) if incident_id else None
+    for live_channel in (live_session, live_incident):
+        if live_channel:
+            live_channel.reset()
+
     # Helper to save incident thoughts for background chats
     accumulated_thought = []
-    last_save_time = [time.time()]  # Use list to allow mutation in nested function
+    pending_thoughts = []  # (timestamp, text) already streamed live, not yet persisted
+    last_cut_time = [time.time()]  # Use list to allow mutation in nested function
+    last_save_time = [time.time()]
+
+    def flush_incident_thoughts():
+        """Persist pending thoughts to incident_thoughts in one transaction."""
+        if not pending_thoughts:
+            return
+        try:
+            from utils.db.connection_pool import db_pool
+            rows = [(incident_id, ts, text, "analysis") for ts, text in pending_thoughts]
+            with db_pool.get_admin_connection() as conn:
+                with conn.cursor() as cursor:
+                    # No RLS needed — incident_thoughts not RLS-protected
+                    cursor.executemany(
+                        "INSERT INTO incident_thoughts (incident_id, timestamp, content, thought_type) "
+                        "VALUES (%s, %s, %s, %s)",
+                        rows,
+                    )
+                    set_rls_context(cursor, conn, user_id, log_prefix="[BackgroundChat]")
+                    cursor.execute(
+                        "UPDATE incidents SET updated_at = %s WHERE id = %s",
+                        (datetime.now(timezone.utc), incident_id),
+                    )
+                    incident_touched = cursor.rowcount == 1
+                conn.commit()
+            if incident_touched:
+                logger.info(f"[BackgroundChat] Saved {len(rows)} thought(s) for incident {incident_id}")
+            else:
+                logger.warning(
+                    "[BackgroundChat] Thought saved, but incidents.updated_at heartbeat touched 0 rows for incident %s — RLS context may be wrong",
+                    incident_id,
+                )
+            pending_thoughts.clear()
+            last_save_time[0] = time.time()
+        except Exception as e:
+            logger.error(f"[BackgroundChat] Failed to save thought: {e}")
     
     def save_incident_thought(content: str, force: bool = False):
-        """Save thought to incident_thoughts if this is a background chat with incident_id."""
+        """Stream thoughts live per sentence and persist them to incident_thoughts in batches."""
         if not incident_id:
             return
         
@@ -351,84 +405,55 @@ async def process_workflow_async(wf, state, websocket, user_id, incident_id=None
         
         accumulated_text = "".join(accumulated_thought)
         current_time = time.time()
-        time_since_last_save = current_time - last_save_time[0]
+        time_since_last_cut = current_time - last_cut_time[0]
         
-        # Check if we should try to save
-        # Save immediately after sentence boundaries OR every 1 second OR when we have 50+ chars, OR when forced
+        # Cut a thought after sentence boundaries OR every 1 second OR when we have 50+ chars, OR when forced
         # This ensures thoughts stream progressively instead of batching
-        should_check = force or time_since_last_save >= 1 or len(accumulated_text) >= 50
+        should_check = force or time_since_last_cut >= 1 or len(accumulated_text) >= 50
         
-        if should_check and len(accumulated_text) > 20:  # Lower threshold for more frequent saves
-            import re
+        if should_check and len(accumulated_text) > 20:
             # Find sentence boundaries (. ! ? followed by space or end)
             sentence_pattern = r'[.!?](?:\s|$)'
             matches = list(re.finditer(sentence_pattern, accumulated_text))
             
-            # Save if: forced, found sentences (save after each sentence)
             if matches or force:
                 if force and not matches:
-                    # Save everything when forced or text is very long
+                    # Take everything when forced
                     text_to_save = accumulated_text
                     remaining = ""
                 else:
-                    # Save up to last complete sentence - this makes it save incrementally
-                    last_match = matches[-1]
-                    split_pos = last_match.end()
+                    # Take up to last complete sentence
+                    split_pos = matches[-1].end()
                     text_to_save = accumulated_text[:split_pos].strip()
                     remaining = accumulated_text[split_pos:].strip()
                 
-                if len(text_to_save) > 20:  # Lower minimum to save smaller chunks
-                    try:
-                        from utils.db.connection_pool import db_pool
-                        from datetime import datetime, timezone
-                        cleaned_text = clean_markdown(text_to_save)
-
-                        # Only save if cleaned text has substantial content
-                        if len(cleaned_text) > 20:  # Lower threshold
-                            now = datetime.now(timezone.utc)
-                            with db_pool.get_admin_connection() as conn:
-                                with conn.cursor() as cursor:
-                                    # No RLS needed — incident_thoughts not RLS-protected
-                                    cursor.execute(
-                                        "INSERT INTO incident_thoughts (incident_id, timestamp, content, thought_type) "
-                                        "VALUES (%s, %s, %s, %s)",
-                                        (incident_id, now, cleaned_text, "analysis")
-                                    )
-                                    set_rls_context(cursor, conn, user_id, log_prefix="[BackgroundChat]")
-                                    cursor.execute(
-                                        "UPDATE incidents SET updated_at = %s WHERE id = %s",
-                                        (now, incident_id),
-                                    )
-                                    incident_touched = cursor.rowcount == 1
-                                conn.commit()
-                                if incident_touched:
-                                    logger.info(f"[BackgroundChat] Saved thought for incident {incident_id}: {len(cleaned_text)} chars (incremental save)")
-                                else:
-                                    logger.warning(
-                                        "[BackgroundChat] Thought saved, but incidents.updated_at heartbeat touched 0 rows for incident %s — RLS context may be wrong",
-                                        incident_id,
-                                    )
-                                accumulated_thought.clear()
-                                if remaining:
-                                    accumulated_thought.append(remaining)
-                                last_save_time[0] = current_time
-                    except Exception as e:
-                        logger.error(f"[BackgroundChat] Failed to save thought: {e}")
+                cleaned_text = clean_markdown(text_to_save) if len(text_to_save) > 20 else ""
+                # Only keep thoughts with substantial content
+                if len(cleaned_text) > 20:
+                    pending_thoughts.append((datetime.now(timezone.utc), cleaned_text))
+                    live_incident.publish("thought", content=cleaned_text)
+                    accumulated_thought.clear()
+                    if remaining:
+                        accumulated_thought.append(remaining)
+                    last_cut_time[0] = current_time
+        
+        if force or current_time - last_save_time[0] >= BACKGROUND_PERSIST_INTERVAL_SECONDS:
+            flush_incident_thoughts()
     
-    # Helper to incrementally save streaming chat messages for background chats.
-    # Same pattern as save_incident_thought but writes to chat_sessions.messages
-    # so the frontend's 2s polling can show partial responses.
-    is_background = getattr(state, 'is_background', False)
+    # Helper to save streaming chat messages for background chats. Deltas go
+    # out live; chat_sessions.messages is checkpointed so clients that still
+    # poll (and reloads after the stream expires) see the partial response.
     accumulated_chat_msg = []
     last_chat_save_time = [time.time()]
 
     def save_streaming_chat_message(content: str, force: bool = False):
-        """Incrementally save the assistant's streaming response to chat_sessions.messages."""
-        if not is_background or not session_id or session_id == 'unknown':
+        """Stream the assistant's response live and checkpoint it to chat_sessions.messages."""
+        if not live_session:
             return
 
         if content:
             accumulated_chat_msg.append(content)
+            live_session.append_delta(content)
 
         accumulated_text = "".join(accumulated_chat_msg)
 
@@ -438,10 +463,11 @@ async def process_workflow_async(wf, state, websocket, user_id, incident_id=None
         current_time = time.time()
         time_since_last = current_time - last_chat_save_time[0]
 
-        should_flush = force or time_since_last >= 1.5 or len(accumulated_text) >= 200
+        should_flush = force or time_since_last >= BACKGROUND_PERSIST_INTERVAL_SECONDS
         if not should_flush or (not force and len(accumulated_text) < 30):
             return
 
+        live_session.flush_delta()
         try:
             from utils.db.connection_pool import db_pool
 
@@ -486,6 +512,12 @@ async def process_workflow_async(wf, state, websocket, user_id, incident_id=None
         except Exception as e:
             logger.error(f"[BackgroundChat] Failed to save streaming chat message: {e}")
 
+    def end_live_streams(reason: str):
+        """Tell live subscribers the workflow has finished."""
+        for live_channel in (live_session, live_incident):
+            if live_channel:
+                live_channel.publish("end", reason=reason)
+
     def finalize_streaming_chat_message(remove: bool = False):
         """Finalize streaming bot messages in chat_sessions.messages.
 
@@ -843,12 +875,15 @@ async def process_workflow_async(wf, state, websocket, user_id, incident_id=None
         # Finalize streaming: remove temporary streaming messages before the
         # authoritative UI messages are written by _append_new_turn_ui_messages
         finalize_streaming_chat_message(remove=True)
+        end_live_streams("completed")
         
         await send_end_status("completed")
         
     except asyncio.TimeoutError:
         logger.error(f"Workflow timeout after {workflow_timeout}s for session {session_id}")
+        save_incident_thought("", force=True)
         finalize_streaming_chat_message(remove=True)
+        end_live_streams("timeout")
         if websocket_connected:
             timeout_msg = {
                 "type": "error",
@@ -861,7 +896,9 @@ async def process_workflow_async(wf, state, websocket, user_id, incident_id=None
         
     except Exception as e:
         logger.error(f"Error in workflow processing for session {session_id}: {e}", exc_info=True)
+        save_incident_thought("", force=True)
         finalize_streaming_chat_message(remove=True)
+        end_live_streams("error")
         if websocket_connected:
             error_msg = {
                 "type": "error",
@@ -14,7 +14,7 @@ import psycopg2.errors
 from flask import Blueprint, jsonify, request
 
 from routes.audit_routes import record_audit_event
-from services.artifacts.store import create_version, upsert_artifact_by_title
+from services.artifacts.store import create_version, get_version_content, upsert_artifact_by_title
 from utils.auth.rbac_decorators import require_permission
 from utils.auth.stateless_auth import get_org_id_from_request, set_rls_context
 from utils.db.connection_pool import db_pool
@@ -285,13 +285,15 @@ def get_artifact_version(user_id, artifact_id, version_id, *, org_id, conn, curs
     row = cursor.fetchone()
     if not row:
         return jsonify({"error": "Version not found"}), 404
+    # Older versions are stored as diffs; rebuild them from the nearest snapshot.
+    content = row[3] if row[3] is not None else get_version_content(cursor, artifact_id, row[1])
 
     return jsonify({
         "version": {
             "id": str(row[0]),
             "versionNumber": row[1],
             "source": row[2],
-            "content": row[3],
+            "content": content,
             "createdAt": iso_utc(row[4]),
         }
     })
@@ -305,7 +307,7 @@ def restore_artifact_version(user_id, artifact_id, version_id, *, org_id, conn,
         return jsonify({"error": "Invalid version ID"}), 400
 
     cursor.execute(
-        """SELECT v.content
+        """SELECT v.content, v.version_number
            FROM artifact_versions v
            JOIN artifacts a ON v.artifact_id = a.id
            WHERE v.id = %s AND a.id = %s AND a.org_id = %s""",
@@ -315,7 +317,9 @@ def restore_artifact_version(user_id, artifact_id, version_id, *, org_id, conn,
     if not row:
         return jsonify({"error": "Version not found"}), 404
 
-    restored_content = row[0]
+    restored_content = row[0] if row[0] is not None else get_version_content(cursor, artifact_id, row[1])
+    if restored_content is None:
+        return jsonify({"error": "Version content unavailable"}), 500
     cursor.execute(
         """UPDATE artifacts
            SET content = %s, current_version_id = %s,
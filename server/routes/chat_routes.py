@@ -1,7 +1,7 @@
 import logging
 import json
 import uuid
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, Response, request, jsonify, session, stream_with_context
 from datetime import datetime
 from utils.db.db_utils import connect_to_db_as_user
 from utils.web.cors_utils import create_cors_response
@@ -9,6 +9,7 @@ from utils.auth.rbac_decorators import require_permission
 from utils.auth.stateless_auth import get_org_id_from_request, set_rls_context
 from utils.web.limiter_ext import limiter
 from utils.db.connection_pool import db_pool
+from utils.cache.live_stream import live_stream_key, tail_live_stream
 
 
 # Configure logging
@@ -325,6 +326,40 @@ def get_chat_session_status(user_id, session_id):
         if 'conn' in locals() and conn:
             conn.close()
 
+@chat_bp.route('/sessions/<session_id>/live', methods=['GET'])
+@limiter.exempt
+@require_permission("chat", "read")
+def stream_chat_session_live(user_id, session_id):
+    """SSE tail of a background session's live output (token deltas and end-of-turn).
+
+    Replays the current turn from the start, or from ``Last-Event-ID`` on reconnect.
+    """
+    org_id = get_org_id_from_request()
+
+    try:
+        with db_pool.get_admin_connection() as conn:
+            with conn.cursor() as cursor:
+                set_rls_context(cursor, conn, user_id, log_prefix=_LOG_PREFIX)
+                cursor.execute(
+                    "SELECT 1 FROM chat_sessions WHERE id = %s AND org_id = %s AND is_active = true",
+                    (session_id, org_id),
+                )
+                if not cursor.fetchone():
+                    return jsonify({'error': 'Chat session not found'}), 404
+    except Exception as e:
+        logging.error(f"{_LOG_PREFIX} Live stream auth check failed: {e}")
+        return jsonify({'error': 'Failed to open live stream'}), 500
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('after')
+    return Response(
+        stream_with_context(tail_live_stream(live_stream_key("session", session_id), last_event_id)),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',
+        }
+    )
+
 @chat_bp.route('/sessions/<session_id>', methods=['PUT'])
 @require_permission("chat", "write")
 def update_chat_session(user_id, session_id):
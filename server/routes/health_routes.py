@@ -44,11 +44,16 @@ def check_redis_health():
     if not redis:
         return {"status": "unhealthy", "error": "redis library not installed"}
     try:
-        from utils.cache.redis_client import get_redis_ssl_kwargs
-        redis_url = os.getenv('REDIS_URL', 'redis://redis:6379/0')
-        r = redis.from_url(redis_url, **get_redis_ssl_kwargs())
+        from utils.cache.redis_client import get_command_latency_stats, get_redis_client
+        r = get_redis_client()
+        if r is None:
+            return {"status": "unhealthy", "error": "Redis connection failed"}
         r.ping()
-        return {"status": "healthy", "message": "Redis connection successful"}
+        return {
+            "status": "healthy",
+            "message": "Redis connection successful",
+            "command_latency": get_command_latency_stats(),
+        }
     except Exception as e:
         logger.warning(f"Redis health check failed: {e}", exc_info=True)
         return {"status": "unhealthy", "error": "Redis connection failed"}
@@ -4,11 +4,13 @@ import logging
 import os
 
 import redis
-from flask import Blueprint, Response
+from flask import Blueprint, Response, request, stream_with_context
 
 from utils.auth.rbac_decorators import require_permission
-from utils.auth.stateless_auth import get_org_id_from_request
+from utils.cache.live_stream import live_stream_key, tail_live_stream
+from utils.auth.stateless_auth import get_org_id_from_request, set_rls_context
 from utils.cache.redis_client import get_redis_client, get_redis_ssl_kwargs
+from utils.db.connection_pool import db_pool
 
 logger = logging.getLogger(__name__)
 
@@ -72,3 +74,33 @@ def incident_stream(user_id):
             'Connection': 'keep-alive'
         }
     )
+
+
+@incidents_sse_bp.route('/api/incidents/<incident_id>/live', methods=['GET'])
+@require_permission("incidents", "read")
+def incident_live_stream(user_id, incident_id: str):
+    """SSE tail of an incident's live RCA thoughts while its background chat runs."""
+    org_id = get_org_id_from_request()
+    try:
+        with db_pool.get_admin_connection() as conn:
+            with conn.cursor() as cursor:
+                set_rls_context(cursor, conn, user_id, log_prefix="[incidents:live_auth]")
+                cursor.execute(
+                    "SELECT 1 FROM incidents WHERE id = %s AND org_id = %s",
+                    (incident_id, org_id),
+                )
+                if not cursor.fetchone():
+                    return Response("Forbidden", status=403)
+    except Exception as e:
+        logger.error("[IncidentsSSE] Live stream auth check failed: %s", e)
+        return Response("Internal error", status=500)
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('after')
+    return Response(
+        stream_with_context(tail_live_stream(live_stream_key("incident", incident_id), last_event_id)),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',
+        }
+    )
@@ -5,9 +5,10 @@ Handles parsing and chunking of documents for RAG retrieval.
 Supports Markdown, Plain Text, and PDF formats.
 """
 
+import hashlib
 import logging
 import re
-from typing import Any
+from typing import Any, Iterator
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +36,17 @@ class DocumentProcessor:
         Returns:
             List of chunk dictionaries with 'content', 'heading_context', 'chunk_index'
         """
+        return list(self.iter_chunks(content, file_type))
+
+    def iter_chunks(self, content: bytes, file_type: str) -> Iterator[dict[str, Any]]:
+        """
+        Yield chunks as they are produced.
+
+        Markdown is chunked one section at a time, so a consumer (the Weaviate
+        batch) can start inserting before the whole document is split.
+        Chunks are the same as ``process`` returns.
+        """
+        count = 0
         try:
             if file_type == "pdf":
                 text = self._extract_pdf_text(content)
@@ -43,17 +55,20 @@ class DocumentProcessor:
 
             if not text.strip():
                 logger.warning(f"[KB Processor] No text extracted from {self.original_filename}")
-                return []
+                return
 
             if file_type == "markdown":
-                chunks = self._chunk_markdown(text)
+                chunks = self._iter_markdown_chunks(text)
             else:
-                chunks = self._chunk_plaintext(text)
+                chunks = iter(self._chunk_plaintext(text))
+
+            for chunk in chunks:
+                count += 1
+                yield chunk
 
             logger.info(
-                f"[KB Processor] Processed {self.original_filename}: {len(chunks)} chunks"
+                f"[KB Processor] Processed {self.original_filename}: {count} chunks"
             )
-            return chunks
 
         except Exception as e:
             logger.exception(f"[KB Processor] Error processing {self.original_filename}: {e}")
@@ -126,7 +141,11 @@ class DocumentProcessor:
         Chunk markdown text with heading-aware splitting.
         Preserves heading hierarchy as context for each chunk.
         """
-        chunks = []
+        return list(self._iter_markdown_chunks(text))
+
+    def _iter_markdown_chunks(self, text: str) -> Iterator[dict[str, Any]]:
+        """Yield heading-aware markdown chunks section by section."""
+        chunk_count = 0
         current_headings: list[tuple[int, str]] = []
 
         # Find fenced code block regions to exclude from header detection
@@ -147,7 +166,8 @@ class DocumentProcessor:
 
         if not headers:
             # No headers, treat as plain text
-            return self._chunk_plaintext(text)
+            yield from self._chunk_plaintext(text)
+            return
 
         # Process sections between headers
         for i, (_, end, level, header_text) in enumerate(headers):
@@ -170,11 +190,10 @@ class DocumentProcessor:
             section_chunks = self._split_text(
                 section_content,
                 heading_context=heading_context,
-                start_index=len(chunks),
+                start_index=chunk_count,
             )
-            chunks.extend(section_chunks)
-
-        return chunks
+            chunk_count += len(section_chunks)
+            yield from section_chunks
 
     def _chunk_plaintext(self, text: str) -> list[dict[str, Any]]:
         """Chunk plain text with paragraph-aware splitting."""
@@ -335,3 +354,12 @@ class DocumentProcessor:
             i = end - CHUNK_OVERLAP if end < len(text) else end
 
         return chunks
+
+
+def chunk_content_hash(chunk: dict[str, Any]) -> str:
+    """Hash of the chunk text that gets vectorized (content plus heading context)."""
+    digest = hashlib.sha256()
+    digest.update(chunk.get("heading_context", "").encode("utf-8"))
+    digest.update(b"\x00")
+    digest.update(chunk.get("content", "").encode("utf-8"))
+    return digest.hexdigest()
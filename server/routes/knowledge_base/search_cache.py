@@ -0,0 +1,120 @@
+"""
+Knowledge Base Search Cache
+
+Caches hybrid search results in Redis, per org, keyed by a normalized query.
+During an RCA the agent and its sub-agents repeat near-identical searches
+(same service name, same error string) within minutes; those are served
+without another Weaviate round trip.
+
+Invalidation is generation based: every insert/delete bumps the org's
+generation counter, which is part of each cache key, so all cached searches
+for that org miss at once and the stale entries simply expire. The key is
+resolved once, before the search runs, so results computed while an
+invalidation lands are stored under the old generation and never served.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+KB_SEARCH_CACHE_TTL_SECONDS = int(os.getenv("KB_SEARCH_CACHE_TTL_SECONDS", "900"))
+_KEY_PREFIX = "kb_search"
+_WHITESPACE = re.compile(r"\s+")
+# Punctuation that does not change what hybrid search matches.
+_EDGE_PUNCTUATION = " \t\n\"'`?!.,;:"
+
+
+def normalize_query(query: str) -> str:
+    """Casefold, collapse whitespace and strip surrounding quotes/punctuation."""
+    return _WHITESPACE.sub(" ", query.casefold()).strip(_EDGE_PUNCTUATION)
+
+
+def cache_scope(user_id: str, org_id: str | None = None) -> str:
+    """Invalidation scope: the org (looked up if not given), else the user."""
+    if not org_id:
+        from utils.auth.stateless_auth import get_org_id_for_user
+
+        org_id = get_org_id_for_user(user_id)
+    return f"org:{org_id}" if org_id else f"user:{user_id}"
+
+
+def _client():
+    from utils.cache.redis_client import get_redis_client
+
+    return get_redis_client()
+
+
+def _generation_key(scope: str) -> str:
+    return f"{_KEY_PREFIX}:gen:{scope}"
+
+
+def _result_key(scope: str, generation: str, user_id: str, org_id: str | None, query: str, params: dict) -> str:
+    canonical = json.dumps(
+        {"user_id": user_id, "org_id": org_id, "query": normalize_query(query), **params},
+        sort_keys=True,
+    )
+    digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    return f"{_KEY_PREFIX}:{scope}:{generation}:{digest}"
+
+
+def search_cache_key(user_id: str, org_id: str | None, query: str, params: dict) -> str | None:
+    """Cache key for this search at the current generation, or None when Redis is unavailable.
+
+    Resolve it before searching and pass it to both the read and the write.
+    """
+    try:
+        client = _client()
+        if client is None:
+            return None
+        scope = cache_scope(user_id, org_id)
+        generation = client.get(_generation_key(scope)) or "0"
+        return _result_key(scope, generation, user_id, org_id, query, params)
+    except Exception as e:
+        logger.debug(f"[KB Cache] Key lookup failed: {e}")
+        return None
+
+
+def get_cached_search(key: str | None) -> list[dict[str, Any]] | None:
+    """Cached results for ``key``, or None on miss or when Redis is unavailable."""
+    if key is None:
+        return None
+    try:
+        client = _client()
+        if client is None:
+            return None
+        payload = client.get(key)
+        return json.loads(payload) if payload else None
+    except Exception as e:
+        logger.debug(f"[KB Cache] Read failed: {e}")
+        return None
+
+
+def put_cached_search(key: str | None, results: list[dict[str, Any]]) -> None:
+    if key is None:
+        return
+    try:
+        client = _client()
+        if client is None:
+            return
+        client.set(key, json.dumps(results, default=str), ex=KB_SEARCH_CACHE_TTL_SECONDS)
+    except Exception as e:
+        logger.debug(f"[KB Cache] Write failed: {e}")
+
+
+def invalidate_search_cache(user_id: str | None = None, org_id: str | None = None) -> None:
+    """Drop every cached search for the org (or user) whose chunks changed."""
+    if not user_id and not org_id:
+        return
+    try:
+        client = _client()
+        if client is None:
+            return
+        scope = f"org:{org_id}" if org_id else cache_scope(user_id)
+        client.incr(_generation_key(scope))
+    except Exception as e:
+        logger.warning(f"[KB Cache] Invalidation failed: {e}")
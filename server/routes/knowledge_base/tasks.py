@@ -9,6 +9,7 @@ Background tasks for document processing:
 """
 
 import logging
+import time
 
 from celery_config import celery_app
 from utils.db.connection_pool import db_pool
@@ -54,35 +55,37 @@ def process_document(
         logger.info(f"[KB Task] Reading {original_filename} from {storage_path}")
 
         # 3. Read file from local filesystem
+        read_started = time.perf_counter()
         content = _download_file(storage_path)
         if not content:
             raise ValueError("Failed to read file from filesystem")
+        read_seconds = time.perf_counter() - read_started
 
         logger.info(f"[KB Task] Downloaded {len(content)} bytes, parsing as {file_type}")
 
-        # 4. Parse and chunk document
+        # 4-5. Chunk incrementally and stream into Weaviate; chunks whose
+        # content is already stored (e.g. from an earlier attempt) are skipped.
         from routes.knowledge_base.document_processor import DocumentProcessor
+        from routes.knowledge_base.weaviate_client import upsert_document_chunks
 
         processor = DocumentProcessor(user_id, document_id, original_filename)
-        chunks = processor.process(content, file_type)
-
-        if not chunks:
-            raise ValueError("No content could be extracted from document")
-
-        logger.info(f"[KB Task] Generated {len(chunks)} chunks")
-
-        # 5. Store chunks in Weaviate
-        from routes.knowledge_base.weaviate_client import insert_chunks
-
-        inserted_count = insert_chunks(
+        result = upsert_document_chunks(
             user_id=user_id,
             document_id=document_id,
             source_filename=original_filename,
-            chunks=chunks,
+            chunks=processor.iter_chunks(content, file_type),
             org_id=get_org_id_for_user(user_id),
         )
 
-        logger.info(f"[KB Task] Stored {inserted_count} chunks in Weaviate")
+        if result["stored"] + result["failed"] == 0:
+            raise ValueError("No content could be extracted from document")
+
+        inserted_count = result["stored"]
+        logger.info(
+            f"[KB Task] Stored {inserted_count} chunks in Weaviate "
+            f"({result['inserted']} embedded, {result['skipped']} unchanged, {result['failed']} failed); "
+            f"{_stage_throughput(len(content), read_seconds, result)}"
+        )
 
         # 6. Update status to 'ready' with chunk count
         _update_document_status(
@@ -111,6 +114,21 @@ def process_document(
             raise self.retry(exc=exc)
 
 
+def _stage_throughput(size_bytes: int, read_seconds: float, result: dict) -> str:
+    """Per-stage timings and rates for the ingestion log line."""
+    chunks = result["stored"] + result["failed"]
+    embedded = result["inserted"] + result["failed"]
+
+    def _rate(count: float, seconds: float) -> str:
+        return f"{count / seconds:,.0f}/s" if seconds > 0 else "n/a"
+
+    return (
+        f"read {read_seconds:.2f}s ({_rate(size_bytes / 1024, read_seconds)} KiB), "
+        f"chunk {result['chunk_seconds']:.2f}s ({_rate(chunks, result['chunk_seconds'])} chunks), "
+        f"embed+insert {result['insert_seconds']:.2f}s ({_rate(embedded, result['insert_seconds'])} chunks)"
+    )
+
+
 def _update_document_status(
     document_id: str,
     user_id: str,
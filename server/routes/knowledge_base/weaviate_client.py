@@ -7,8 +7,9 @@ and retrieving document chunks with vector embeddings.
 
 import logging
 import os
+import time
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Iterable
 
 import weaviate
 from weaviate.classes.config import Configure, DataType, Property
@@ -16,6 +17,12 @@ from weaviate.classes.init import AdditionalConfig, Timeout
 from weaviate.classes.query import Filter, HybridFusion
 from weaviate.util import generate_uuid5
 
+from routes.knowledge_base.search_cache import (
+    get_cached_search,
+    invalidate_search_cache,
+    put_cached_search,
+    search_cache_key,
+)
 from utils.log_sanitizer import sanitize
 
 logger = logging.getLogger(__name__)
@@ -28,6 +35,12 @@ WEAVIATE_PORT = int(os.getenv("WEAVIATE_PORT"))
 WEAVIATE_GRPC_PORT = int(os.getenv("WEAVIATE_GRPC_PORT"))
 WEAVIATE_SECURE = os.getenv("WEAVIATE_SECURE", "false").lower() in ("1", "true", "yes")
 
+# Chunks per batch request; the vectorizer embeds each request as one batch.
+KB_EMBED_BATCH_SIZE = int(os.getenv("KB_EMBED_BATCH_SIZE", "64"))
+# Batch requests in flight per ingestion; adding chunks blocks beyond this.
+KB_INSERT_CONCURRENCY = int(os.getenv("KB_INSERT_CONCURRENCY", "2"))
+_HASH_PAGE_SIZE = 1000
+
 _client: weaviate.WeaviateClient | None = None
 _collection = None
 
@@ -106,7 +119,9 @@ def _ensure_collection(client: weaviate.WeaviateClient):
     try:
         if client.collections.exists(COLLECTION_NAME):
             logger.info(f"[KB Weaviate] Collection {COLLECTION_NAME} already exists")
-            return client.collections.get(COLLECTION_NAME)
+            collection = client.collections.get(COLLECTION_NAME)
+            _ensure_content_hash_property(collection)
+            return collection
 
         logger.info(f"[KB Weaviate] Creating collection {COLLECTION_NAME}")
 
@@ -122,6 +137,7 @@ def _ensure_collection(client: weaviate.WeaviateClient):
                 Property(name="heading_context", data_type=DataType.TEXT),
                 Property(name="source_filename", data_type=DataType.TEXT),
                 Property(name="created_at", data_type=DataType.DATE),
+                Property(name="content_hash", data_type=DataType.TEXT, skip_vectorization=True),
             ],
         )
 
@@ -133,11 +149,145 @@ def _ensure_collection(client: weaviate.WeaviateClient):
         raise
 
 
+def _ensure_content_hash_property(collection) -> None:
+    """Add content_hash to collections created before it existed.
+
+    Declared explicitly so auto-schema does not add it as a vectorized property.
+    """
+    try:
+        existing = {prop.name for prop in collection.config.get().properties}
+        if "content_hash" not in existing:
+            collection.config.add_property(
+                Property(name="content_hash", data_type=DataType.TEXT, skip_vectorization=True)
+            )
+            logger.info(f"[KB Weaviate] Added content_hash property to {COLLECTION_NAME}")
+    except Exception as e:
+        logger.warning(f"[KB Weaviate] Could not add content_hash property: {e}")
+
+
+def get_document_chunk_hashes(user_id: str, document_id: str) -> dict[int, str]:
+    """
+    Map chunk_index -> content_hash for the chunks already stored for a document.
+
+    Chunks written before content hashes existed map to an empty string.
+    """
+    _, collection = _get_weaviate_client()
+    doc_filter = (
+        Filter.by_property("user_id").equal(user_id)
+        & Filter.by_property("document_id").equal(document_id)
+    )
+    hashes: dict[int, str] = {}
+    offset = 0
+    while True:
+        response = collection.query.fetch_objects(
+            filters=doc_filter,
+            limit=_HASH_PAGE_SIZE,
+            offset=offset,
+            return_properties=["chunk_index", "content_hash"],
+        )
+        for obj in response.objects:
+            hashes[obj.properties.get("chunk_index", 0)] = obj.properties.get("content_hash") or ""
+        if len(response.objects) < _HASH_PAGE_SIZE:
+            return hashes
+        offset += _HASH_PAGE_SIZE
+
+
+def upsert_document_chunks(
+    user_id: str,
+    document_id: str,
+    source_filename: str,
+    chunks: Iterable[dict[str, Any]],
+    org_id: str = None,
+    skip_unchanged: bool = True,
+) -> dict[str, Any]:
+    """
+    Stream document chunks into Weaviate, skipping ones that are already stored.
+
+    ``chunks`` may be a generator: chunks are added to a fixed-size batch as
+    they arrive, so chunking overlaps with vectorization. At most
+    KB_INSERT_CONCURRENCY batch requests of KB_EMBED_BATCH_SIZE chunks are in
+    flight; once that limit is reached, adding a chunk blocks until a request
+    completes. A chunk whose content hash matches the stored chunk at the same
+    index is skipped, so retries and re-ingestion do not re-embed it.
+
+    Returns:
+        Dict with ``stored`` (chunks now present for the document),
+        ``inserted``, ``skipped``, ``failed``, and per-stage ``chunk_seconds``
+        (time spent producing chunks) and ``insert_seconds``.
+    """
+    from routes.knowledge_base.document_processor import chunk_content_hash
+
+    _, collection = _get_weaviate_client()
+    existing = get_document_chunk_hashes(user_id, document_id) if skip_unchanged else {}
+    now = datetime.now(timezone.utc).isoformat()
+    inserted = skipped = 0
+    chunk_seconds = 0.0
+    started = time.perf_counter()
+
+    chunk_iter = iter(chunks)
+    with collection.batch.fixed_size(
+        batch_size=KB_EMBED_BATCH_SIZE,
+        concurrent_requests=KB_INSERT_CONCURRENCY,
+    ) as batch:
+        while True:
+            chunk_started = time.perf_counter()
+            chunk = next(chunk_iter, None)
+            chunk_seconds += time.perf_counter() - chunk_started
+            if chunk is None:
+                break
+
+            chunk_index = chunk.get("chunk_index", 0)
+            content_hash = chunk_content_hash(chunk)
+            if existing.get(chunk_index) == content_hash:
+                skipped += 1
+                continue
+
+            try:
+                properties = {
+                    "user_id": user_id,
+                    "document_id": document_id,
+                    "chunk_index": chunk_index,
+                    "content": chunk.get("content", ""),
+                    "heading_context": chunk.get("heading_context", ""),
+                    "source_filename": source_filename,
+                    "created_at": now,
+                    "content_hash": content_hash,
+                }
+                if org_id:
+                    properties["org_id"] = org_id
+
+                # Deterministic UUID: a changed chunk overwrites its predecessor.
+                uuid = generate_uuid5(f"{user_id}:{document_id}:{chunk_index}")
+                batch.add_object(properties=properties, uuid=uuid)
+                inserted += 1
+
+            except Exception as e:
+                logger.error(f"[KB Weaviate] Error adding chunk {chunk_index}: {e}")
+
+    failed_objects = collection.batch.failed_objects
+    if failed_objects:
+        logger.error(f"[KB Weaviate] Batch insertion had {len(failed_objects)} failures")
+        for i, failed in enumerate(failed_objects[:5]):
+            logger.error(f"[KB Weaviate] Failed object {i+1}: {failed}")
+
+    inserted -= len(failed_objects)
+    if inserted or failed_objects:
+        invalidate_search_cache(user_id, org_id)
+    return {
+        "stored": inserted + skipped,
+        "inserted": inserted,
+        "skipped": skipped,
+        "failed": len(failed_objects),
+        "chunk_seconds": chunk_seconds,
+        "insert_seconds": time.perf_counter() - started - chunk_seconds,
+    }
+
+
 def insert_chunks(
     user_id: str,
     document_id: str,
     source_filename: str,
-    chunks: list[dict[str, Any]],
+    chunks: Iterable[dict[str, Any]],
     org_id: str = None,
 ) -> int:
     """
@@ -147,65 +297,31 @@ def insert_chunks(
         user_id: User identifier
         document_id: Document identifier (UUID)
         source_filename: Original filename of the document
-        chunks: List of chunk dictionaries with:
+        chunks: Chunk dictionaries (list or iterator) with:
             - content: str (the chunk text)
             - heading_context: str (optional, parent heading hierarchy)
             - chunk_index: int (position in document)
         org_id: Organization identifier for tenant isolation
 
     Returns:
-        Number of successfully inserted chunks
+        Number of chunks stored for the document (inserted plus unchanged)
     """
-    if not chunks:
+    if isinstance(chunks, list) and not chunks:
         return 0
 
     try:
-        _, collection = _get_weaviate_client()
-        success_count = 0
-        now = datetime.now(timezone.utc).isoformat()
-
-        with collection.batch.dynamic() as batch:
-            for chunk in chunks:
-                try:
-                    chunk_index = chunk.get("chunk_index", 0)
-                    # Generate deterministic UUID
-                    uuid = generate_uuid5(f"{user_id}:{document_id}:{chunk_index}")
-
-                    properties = {
-                        "user_id": user_id,
-                        "document_id": document_id,
-                        "chunk_index": chunk_index,
-                        "content": chunk.get("content", ""),
-                        "heading_context": chunk.get("heading_context", ""),
-                        "source_filename": source_filename,
-                        "created_at": now,
-                    }
-                    if org_id:
-                        properties["org_id"] = org_id
-
-                    batch.add_object(properties=properties, uuid=uuid)
-                    success_count += 1
-
-                except Exception as e:
-                    logger.error(f"[KB Weaviate] Error adding chunk {chunk_index}: {e}")
-
-        # Check for failed objects
-        if collection.batch.failed_objects:
-            logger.error(
-                f"[KB Weaviate] Batch insertion had {len(collection.batch.failed_objects)} failures"
-            )
-            for i, failed in enumerate(collection.batch.failed_objects[:5]):
-                logger.error(f"[KB Weaviate] Failed object {i+1}: {failed}")
-            actual_success = success_count - len(collection.batch.failed_objects)
-            logger.info(
-                f"[KB Weaviate] Inserted {actual_success}/{len(chunks)} chunks for doc {document_id}"
-            )
-            return actual_success
-
+        result = upsert_document_chunks(
+            user_id=user_id,
+            document_id=document_id,
+            source_filename=source_filename,
+            chunks=chunks,
+            org_id=org_id,
+        )
         logger.info(
-            f"[KB Weaviate] Successfully inserted {success_count} chunks for doc {document_id}"
+            f"[KB Weaviate] Stored {result['stored']} chunks for doc {document_id} "
+            f"({result['inserted']} inserted, {result['skipped']} unchanged, {result['failed']} failed)"
         )
-        return success_count
+        return result["stored"]
 
     except Exception as e:
         logger.error(f"[KB Weaviate] Error inserting chunks: {e}")
@@ -237,6 +353,15 @@ def search_knowledge_base(
     if not query.strip():
         return []
 
+    params = {"limit": limit, "alpha": alpha, "min_score": min_score}
+    cache_key = search_cache_key(user_id, org_id, query, params)
+    cached = get_cached_search(cache_key)
+    if cached is not None:
+        logger.info(
+            f"[KB Weaviate] Search for '{sanitize(query)[:50]}...' served {len(cached)} cached results"
+        )
+        return cached
+
     try:
         _, collection = _get_weaviate_client()
 
@@ -278,6 +403,7 @@ def search_knowledge_base(
         logger.info(
             f"[KB Weaviate] Search for '{sanitize(query)[:50]}...' returned {len(results)} results"
         )
+        put_cached_search(cache_key, results)
         return results
 
     except Exception as e:
@@ -309,6 +435,7 @@ def delete_document_chunks(user_id: str, document_id: str) -> int:
         result = collection.data.delete_many(where=doc_filter)
 
         deleted_count = result.successful if hasattr(result, "successful") else 0
+        invalidate_search_cache(user_id)
         logger.info(
             f"[KB Weaviate] Deleted {deleted_count} chunks for doc {sanitize(document_id)}"
         )
@@ -336,6 +463,7 @@ def delete_user_chunks(user_id: str) -> int:
         result = collection.data.delete_many(where=user_filter)
 
         deleted_count = result.successful if hasattr(result, "successful") else 0
+        invalidate_search_cache(user_id)
         logger.info(f"[KB Weaviate] Deleted {deleted_count} chunks for user {sanitize(user_id)}")
         return deleted_count
 
@@ -386,6 +514,7 @@ def delete_discovery_chunks(org_id: str, before: str = None) -> int:
 
         result = collection.data.delete_many(where=discovery_filter)
         deleted = result.successful if hasattr(result, "successful") else 0
+        invalidate_search_cache(org_id=org_id)
         logger.info(f"[KB Weaviate] Deleted {deleted} discovery chunks for org {org_id}")
         return deleted
 
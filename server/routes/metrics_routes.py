@@ -1,11 +1,29 @@
-"""SRE metrics API routes — MTTR, MTTD, Change Failure Rate, Incident Frequency, Agent Execution."""
+"""SRE metrics API routes — MTTR, MTTD, Change Failure Rate, Incident Frequency, Agent Execution.
+
+Incident and deployment aggregates are served from the hourly/daily rollups
+in services/metrics/rollups.py, with raw rows only for partial buckets.
+"""
 
 import logging
+from collections import Counter
 from flask import Blueprint, jsonify, request
+from services.metrics.rollups import (
+    DEPLOYS,
+    MTTD,
+    MTTR,
+    MTTS,
+    STARTED,
+    Aggregate,
+    collect,
+    floor_day,
+    fold,
+    read_clock,
+)
 from utils.db.connection_pool import db_pool
 from utils.auth.rbac_decorators import require_permission
 from utils.auth.stateless_auth import set_rls_context
 from utils.metrics_periods import period_to_interval as _get_period_interval
+from utils.metrics_periods import period_to_timedelta
 
 logger = logging.getLogger(__name__)
 
@@ -29,11 +47,34 @@ def _parse_window_hours(default: int = 4) -> tuple[int | None, tuple | None]:
     return value, None
 
 
+def _seconds(value):
+    return round(value, 1) if value else None
+
+
+def _overall(rows) -> Aggregate:
+    """Merge every row into a single aggregate."""
+    return fold(rows, lambda _ts, _dims: "all").get("all", Aggregate())
+
+
+def _by_day(rows) -> list[tuple]:
+    """(day, aggregate) pairs in date order."""
+    return sorted(fold(rows, lambda ts, _dims: floor_day(ts).date()).items())
+
+
+def _by_count(groups: dict) -> list[tuple]:
+    """(group, aggregate) pairs, largest count first."""
+    return sorted(groups.items(), key=lambda item: item[1].count, reverse=True)
+
+
+def _dim_filters(**values) -> dict:
+    return {dim: value for dim, value in values.items() if value}
+
+
 @metrics_bp.route("/api/metrics/summary", methods=["GET"])
 @require_permission("incidents", "read")
 def get_metrics_summary(user_id):
     """Dashboard overview — key SRE metrics in a single call."""
-    period = _get_period_interval(request.args.get("period", "30d"))
+    period = period_to_timedelta(request.args.get("period", "30d"))
     window_hours, err = _parse_window_hours()
     if err:
         return err
@@ -41,108 +82,53 @@ def get_metrics_summary(user_id):
     try:
         with db_pool.get_user_connection() as conn:
             cursor = conn.cursor()
-            set_rls_context(cursor, conn, user_id, log_prefix=_LOG_PREFIX)
+            org_id = set_rls_context(cursor, conn, user_id, log_prefix=_LOG_PREFIX)
+            now, watermark = read_clock(cursor, org_id)
+            since = now - period
 
-            # Total / active / resolved counts
-            cursor.execute("""
-                SELECT
-                    COUNT(*) FILTER (WHERE started_at >= NOW() - %s::interval) as total,
-                    COUNT(*) FILTER (WHERE status IN ('investigating', 'analyzed') AND aurora_status NOT IN ('complete', 'resolved')) as active,
-                    COUNT(*) FILTER (WHERE
-                        status = 'resolved'
-                        AND resolved_at >= NOW() - %s::interval
-                    ) as resolved,
-                    COUNT(*) FILTER (WHERE
-                        analyzed_at IS NOT NULL
-                        AND analyzed_at >= NOW() - %s::interval
-                    ) as analyzed
-                FROM incidents
-            """, (period, period, period))
-            counts = cursor.fetchone()
-            total_incidents = counts[0] or 0
-            active_incidents = counts[1] or 0
-            resolved_incidents = counts[2] or 0
-            analyzed_incidents = counts[3] or 0
-
-            # Avg MTTR (seconds) — only incidents explicitly resolved by a human.
-            cursor.execute("""
-                SELECT AVG(EXTRACT(EPOCH FROM (
-                    COALESCE(resolved_at, analyzed_at) - started_at
-                )))
-                FROM incidents
-                WHERE resolved_at IS NOT NULL
-                  AND status = 'resolved'
-                  AND resolved_at >= NOW() - %s::interval
-            """, (period,))
-            avg_mttr = cursor.fetchone()[0]
-
-            # Avg MTTS (seconds) — Mean Time to Solution: how fast Aurora
-            # produces an RCA (analyzed_at - started_at).
+            # Active is current state, not a period aggregate.
             cursor.execute("""
-                SELECT AVG(EXTRACT(EPOCH FROM (analyzed_at - started_at)))
+                SELECT COUNT(*)
                 FROM incidents
-                WHERE analyzed_at IS NOT NULL
-                  AND analyzed_at >= NOW() - %s::interval
-            """, (period,))
-            avg_mtts = cursor.fetchone()[0]
+                WHERE status IN ('investigating', 'analyzed') AND aurora_status NOT IN ('complete', 'resolved')
+            """)
+            active_incidents = cursor.fetchone()[0] or 0
+
+            # STARTED dims: (severity, service, source_type, merged)
+            started = fold(collect(cursor, STARTED, since, now, watermark), lambda _ts, dims: dims)
+            total_incidents = sum(agg.count for agg in started.values())
+            service_counts = Counter()
+            for (_severity, service, _source_type, merged), agg in started.items():
+                if service is not None and not merged:
+                    service_counts[service] += agg.count
+            top_services = [
+                {"service": service, "count": count}
+                for service, count in service_counts.most_common(10)
+            ]
 
-            # Avg MTTD (seconds) — fall back to created_at vs started_at for
-            # webhook-ingested alerts where alert_fired_at isn't populated.
-            cursor.execute("""
-                SELECT AVG(EXTRACT(EPOCH FROM (investigation_started_at - started_at)))
-                FROM incidents
-                WHERE investigation_started_at IS NOT NULL
-                  AND started_at >= NOW() - %s::interval
-                  AND investigation_started_at >= started_at
-            """, (period,))
-            avg_mttd = cursor.fetchone()[0]
+            # MTTR — only incidents explicitly resolved by a human.
+            mttr = _overall(collect(cursor, MTTR, since, now, watermark))
+            # MTTS — Mean Time to Solution: how fast Aurora produces an RCA.
+            mtts = _overall(collect(cursor, MTTS, since, now, watermark))
+            # MTTD — pickup latency from webhook arrival to RCA start.
+            mttd = _overall(collect(cursor, MTTD, since, now, watermark))
 
             # Change Failure Rate (window_hours validated above)
-            cursor.execute("""
-                WITH deploys AS (
-                    SELECT id, service, received_at
-                    FROM jenkins_deployment_events
-                    WHERE received_at >= NOW() - %s::interval
-                ),
-                deploy_failures AS (
-                    SELECT DISTINCT d.id
-                    FROM deploys d
-                    JOIN incidents i ON (
-                        i.alert_service = d.service
-                        AND i.started_at BETWEEN d.received_at AND d.received_at + make_interval(hours => %s)
-                        AND i.status != 'merged'
-                    )
-                )
-                SELECT
-                    (SELECT COUNT(*) FROM deploys) as total,
-                    (SELECT COUNT(*) FROM deploy_failures) as failures
-            """, (period, window_hours))
-            cfr_row = cursor.fetchone()
-            total_deploys = cfr_row[0] or 0
-            failed_deploys = cfr_row[1] or 0
+            deploys = _overall(
+                collect(cursor, DEPLOYS, since, now, watermark, lookahead_hours=window_hours)
+            )
+            total_deploys = deploys.count
+            failed_deploys = deploys.failures_within(window_hours)
             cfr = (failed_deploys / total_deploys * 100) if total_deploys > 0 else 0
 
-            # Top affected services
-            cursor.execute("""
-                SELECT alert_service, COUNT(*) as cnt
-                FROM incidents
-                WHERE started_at >= NOW() - %s::interval
-                  AND alert_service IS NOT NULL
-                  AND status != 'merged'
-                GROUP BY alert_service
-                ORDER BY cnt DESC
-                LIMIT 10
-            """, (period,))
-            top_services = [{"service": r[0], "count": r[1]} for r in cursor.fetchall()]
-
         return jsonify({
             "totalIncidents": total_incidents,
             "activeIncidents": active_incidents,
-            "resolvedIncidents": resolved_incidents,
-            "analyzedIncidents": analyzed_incidents,
-            "avgMttrSeconds": round(avg_mttr, 1) if avg_mttr else None,
-            "avgMttsSeconds": round(avg_mtts, 1) if avg_mtts else None,
-            "avgMttdSeconds": round(avg_mttd, 1) if avg_mttd else None,
+            "resolvedIncidents": mttr.count,
+            "analyzedIncidents": mtts.count,
+            "avgMttrSeconds": _seconds(mttr.mean()),
+            "avgMttsSeconds": _seconds(mtts.mean()),
+            "avgMttdSeconds": _seconds(mttd.mean()),
             "changeFailureRate": round(cfr, 2),
             "totalDeployments": total_deploys,
             "topServices": top_services,
@@ -157,84 +143,38 @@ def get_metrics_summary(user_id):
 @require_permission("incidents", "read")
 def get_mttr(user_id):
     """Mean Time to Resolve — only incidents explicitly marked resolved by a human."""
-    period = _get_period_interval(request.args.get("period", "30d"))
-    severity_filter = request.args.get("severity")
-    service_filter = request.args.get("service")
+    period = period_to_timedelta(request.args.get("period", "30d"))
+    filters = _dim_filters(severity=request.args.get("severity"), service=request.args.get("service"))
 
     try:
         with db_pool.get_user_connection() as conn:
             cursor = conn.cursor()
-            set_rls_context(cursor, conn, user_id, log_prefix=_LOG_PREFIX)
-
-            where_clauses = [
-                "resolved_at IS NOT NULL",
-                "status = 'resolved'",
-                "resolved_at >= NOW() - %s::interval",
+            org_id = set_rls_context(cursor, conn, user_id, log_prefix=_LOG_PREFIX)
+            now, watermark = read_clock(cursor, org_id)
+
+            # MTTR rows are bucketed by resolved_at, which is the effective
+            # "investigation end" COALESCE(resolved_at, analyzed_at) for
+            # human-resolved incidents.
+            rows = list(collect(cursor, MTTR, now - period, now, watermark, filters))
+
+            # MTTR dims: (severity, service)
+            by_severity = [
+                {
+                    "severity": severity,
+                    "count": agg.count,
+                    "avgMttrSeconds": _seconds(agg.mean()),
+                    "p50MttrSeconds": _seconds(agg.percentile(0.5)),
+                    "p95MttrSeconds": _seconds(agg.percentile(0.95)),
+                    "avgDetectionToRcaSeconds": _seconds(agg.mean(agg.sum_to_rca_seconds)),
+                    "avgRcaToResolveSeconds": _seconds(agg.mean(agg.sum_rca_to_resolve_seconds)),
+                }
+                for severity, agg in _by_count(fold(rows, lambda _ts, dims: dims[0] or "unknown"))
             ]
-            params = [period]
-
-            if severity_filter:
-                where_clauses.append("severity = %s")
-                params.append(severity_filter)
-            if service_filter:
-                where_clauses.append("alert_service = %s")
-                params.append(service_filter)
-
-            where_sql = " AND ".join(where_clauses)
-
-            # By severity. The "investigation end" used everywhere here is
-            # COALESCE(resolved_at, analyzed_at) so the math is consistent
-            # whether the incident was human-resolved or just RCA-completed.
-            cursor.execute(f"""
-                SELECT
-                    COALESCE(severity, 'unknown') as severity,
-                    COUNT(*) as count,
-                    AVG(EXTRACT(EPOCH FROM (COALESCE(resolved_at, analyzed_at) - started_at))) as avg_mttr,
-                    PERCENTILE_CONT(0.5) WITHIN GROUP (
-                        ORDER BY EXTRACT(EPOCH FROM (COALESCE(resolved_at, analyzed_at) - started_at))
-                    ) as p50_mttr,
-                    PERCENTILE_CONT(0.95) WITHIN GROUP (
-                        ORDER BY EXTRACT(EPOCH FROM (COALESCE(resolved_at, analyzed_at) - started_at))
-                    ) as p95_mttr,
-                    AVG(EXTRACT(EPOCH FROM (
-                        COALESCE(analyzed_at, resolved_at) - started_at
-                    ))) as avg_detection_to_rca,
-                    AVG(EXTRACT(EPOCH FROM (
-                        COALESCE(resolved_at, analyzed_at) - COALESCE(analyzed_at, started_at)
-                    ))) as avg_rca_to_resolve
-                FROM incidents
-                WHERE {where_sql}
-                GROUP BY severity
-                ORDER BY count DESC
-            """, params)
-
-            by_severity = []
-            for row in cursor.fetchall():
-                by_severity.append({
-                    "severity": row[0],
-                    "count": row[1],
-                    "avgMttrSeconds": round(row[2], 1) if row[2] else None,
-                    "p50MttrSeconds": round(row[3], 1) if row[3] else None,
-                    "p95MttrSeconds": round(row[4], 1) if row[4] else None,
-                    "avgDetectionToRcaSeconds": round(row[5], 1) if row[5] else None,
-                    "avgRcaToResolveSeconds": round(row[6], 1) if row[6] else None,
-                })
-
-            # Time series (daily) — bucket by the same effective end timestamp.
-            cursor.execute(f"""
-                SELECT
-                    date_trunc('day', COALESCE(resolved_at, analyzed_at))::date as day,
-                    AVG(EXTRACT(EPOCH FROM (COALESCE(resolved_at, analyzed_at) - started_at))) as avg_mttr,
-                    COUNT(*) as count
-                FROM incidents
-                WHERE {where_sql}
-                GROUP BY day
-                ORDER BY day ASC
-            """, params)
 
+            # Time series (daily)
             trend = [
-                {"date": str(row[0]), "avgMttrSeconds": round(row[1], 1) if row[1] else None, "count": row[2]}
-                for row in cursor.fetchall()
+                {"date": str(day), "avgMttrSeconds": _seconds(agg.mean()), "count": agg.count}
+                for day, agg in _by_day(rows)
             ]
 
         return jsonify({"bySeverity": by_severity, "trend": trend})
@@ -248,69 +188,33 @@ def get_mttr(user_id):
 @require_permission("incidents", "read")
 def get_mtts(user_id):
     """Mean Time to Solution — how fast Aurora produces an RCA (analyzed_at - started_at)."""
-    period = _get_period_interval(request.args.get("period", "30d"))
-    severity_filter = request.args.get("severity")
-    service_filter = request.args.get("service")
+    period = period_to_timedelta(request.args.get("period", "30d"))
+    filters = _dim_filters(severity=request.args.get("severity"), service=request.args.get("service"))
 
     try:
         with db_pool.get_user_connection() as conn:
             cursor = conn.cursor()
-            set_rls_context(cursor, conn, user_id, log_prefix=_LOG_PREFIX)
-
-            where_clauses = [
-                "analyzed_at IS NOT NULL",
-                "analyzed_at >= NOW() - %s::interval",
+            org_id = set_rls_context(cursor, conn, user_id, log_prefix=_LOG_PREFIX)
+            now, watermark = read_clock(cursor, org_id)
+
+            rows = list(collect(cursor, MTTS, now - period, now, watermark, filters))
+
+            # By severity — MTTS dims: (severity, service)
+            by_severity = [
+                {
+                    "severity": severity,
+                    "count": agg.count,
+                    "avgMttsSeconds": _seconds(agg.mean()),
+                    "p50MttsSeconds": _seconds(agg.percentile(0.5)),
+                    "p95MttsSeconds": _seconds(agg.percentile(0.95)),
+                }
+                for severity, agg in _by_count(fold(rows, lambda _ts, dims: dims[0] or "unknown"))
             ]
-            params = [period]
-
-            if severity_filter:
-                where_clauses.append("severity = %s")
-                params.append(severity_filter)
-            if service_filter:
-                where_clauses.append("alert_service = %s")
-                params.append(service_filter)
-
-            where_sql = " AND ".join(where_clauses)
-
-            # By severity
-            cursor.execute(f"""
-                SELECT
-                    COALESCE(severity, 'unknown') as severity,
-                    COUNT(*) as count,
-                    AVG(EXTRACT(EPOCH FROM (analyzed_at - started_at))) as avg_mtts,
-                    PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY EXTRACT(EPOCH FROM (analyzed_at - started_at))) as p50_mtts,
-                    PERCENTILE_CONT(0.95) WITHIN GROUP (ORDER BY EXTRACT(EPOCH FROM (analyzed_at - started_at))) as p95_mtts
-                FROM incidents
-                WHERE {where_sql}
-                GROUP BY severity
-                ORDER BY count DESC
-            """, params)
-
-            by_severity = []
-            for row in cursor.fetchall():
-                by_severity.append({
-                    "severity": row[0],
-                    "count": row[1],
-                    "avgMttsSeconds": round(row[2], 1) if row[2] else None,
-                    "p50MttsSeconds": round(row[3], 1) if row[3] else None,
-                    "p95MttsSeconds": round(row[4], 1) if row[4] else None,
-                })
 
             # Time series (daily)
-            cursor.execute(f"""
-                SELECT
-                    date_trunc('day', analyzed_at)::date as day,
-                    AVG(EXTRACT(EPOCH FROM (analyzed_at - started_at))) as avg_mtts,
-                    COUNT(*) as count
-                FROM incidents
-                WHERE {where_sql}
-                GROUP BY day
-                ORDER BY day ASC
-            """, params)
-
             trend = [
-                {"date": str(row[0]), "avgMttsSeconds": round(row[1], 1) if row[1] else None, "count": row[2]}
-                for row in cursor.fetchall()
+                {"date": str(day), "avgMttsSeconds": _seconds(agg.mean()), "count": agg.count}
+                for day, agg in _by_day(rows)
             ]
 
         return jsonify({"bySeverity": by_severity, "trend": trend})
@@ -326,41 +230,26 @@ def get_mttd(user_id):
     """MTTD = pickup latency — time from webhook arrival (started_at) to the
     moment the RCA worker actually began running (investigation_started_at).
     """
-    period = _get_period_interval(request.args.get("period", "30d"))
+    period = period_to_timedelta(request.args.get("period", "30d"))
 
     try:
         with db_pool.get_user_connection() as conn:
             cursor = conn.cursor()
-            set_rls_context(cursor, conn, user_id, log_prefix=_LOG_PREFIX)
-
-            cursor.execute("""
-                SELECT
-                    source_type,
-                    COUNT(*) as count,
-                    AVG(EXTRACT(EPOCH FROM (investigation_started_at - started_at))) as avg_mttd,
-                    PERCENTILE_CONT(0.5) WITHIN GROUP (
-                        ORDER BY EXTRACT(EPOCH FROM (investigation_started_at - started_at))
-                    ) as p50_mttd,
-                    PERCENTILE_CONT(0.95) WITHIN GROUP (
-                        ORDER BY EXTRACT(EPOCH FROM (investigation_started_at - started_at))
-                    ) as p95_mttd
-                FROM incidents
-                WHERE investigation_started_at IS NOT NULL
-                  AND started_at >= NOW() - %s::interval
-                  AND investigation_started_at >= started_at
-                GROUP BY source_type
-                ORDER BY count DESC
-            """, (period,))
-
-            by_source = []
-            for row in cursor.fetchall():
-                by_source.append({
-                    "sourceType": row[0],
-                    "count": row[1],
-                    "avgMttdSeconds": round(row[2], 1) if row[2] else None,
-                    "p50MttdSeconds": round(row[3], 1) if row[3] else None,
-                    "p95MttdSeconds": round(row[4], 1) if row[4] else None,
-                })
+            org_id = set_rls_context(cursor, conn, user_id, log_prefix=_LOG_PREFIX)
+            now, watermark = read_clock(cursor, org_id)
+
+            # MTTD dims: (source_type,)
+            groups = fold(collect(cursor, MTTD, now - period, now, watermark), lambda _ts, dims: dims[0])
+            by_source = [
+                {
+                    "sourceType": source_type,
+                    "count": agg.count,
+                    "avgMttdSeconds": _seconds(agg.mean()),
+                    "p50MttdSeconds": _seconds(agg.percentile(0.5)),
+                    "p95MttdSeconds": _seconds(agg.percentile(0.95)),
+                }
+                for source_type, agg in _by_count(groups)
+            ]
 
         return jsonify({"bySource": by_source})
 
@@ -373,34 +262,32 @@ def get_mttd(user_id):
 @require_permission("incidents", "read")
 def get_incident_frequency(user_id):
     """Incident count over time, grouped by severity or service."""
-    period = _get_period_interval(request.args.get("period", "30d"))
+    period = period_to_timedelta(request.args.get("period", "30d"))
     group_by = request.args.get("group_by", "severity")
 
     if group_by not in ("severity", "service", "source_type"):
         group_by = "severity"
 
-    group_col = "alert_service" if group_by == "service" else group_by
+    group_index = STARTED.dims.index(group_by)
+    merged_index = STARTED.dims.index("merged")
 
     try:
         with db_pool.get_user_connection() as conn:
             cursor = conn.cursor()
-            set_rls_context(cursor, conn, user_id, log_prefix=_LOG_PREFIX)
+            org_id = set_rls_context(cursor, conn, user_id, log_prefix=_LOG_PREFIX)
+            now, watermark = read_clock(cursor, org_id)
 
-            cursor.execute(f"""
-                SELECT
-                    date_trunc('day', started_at)::date as day,
-                    COALESCE({group_col}, 'unknown') as group_value,
-                    COUNT(*) as count
-                FROM incidents
-                WHERE started_at >= NOW() - %s::interval
-                  AND status != 'merged'
-                GROUP BY day, group_value
-                ORDER BY day ASC, count DESC
-            """, (period,))
+            groups = fold(
+                collect(cursor, STARTED, now - period, now, watermark),
+                lambda ts, dims: None if dims[merged_index] else (
+                    floor_day(ts).date(), dims[group_index] or "unknown",
+                ),
+            )
+            ordered = sorted(groups.items(), key=lambda item: (item[0][0], -item[1].count))
 
             data = [
-                {"date": str(row[0]), "group": row[1], "count": row[2]}
-                for row in cursor.fetchall()
+                {"date": str(day), "group": group_value, "count": agg.count}
+                for (day, group_value), agg in ordered
             ]
 
         return jsonify({"data": data, "groupBy": group_by})
@@ -414,7 +301,7 @@ def get_incident_frequency(user_id):
 @require_permission("incidents", "read")
 def get_change_failure_rate(user_id):
     """Percentage of deployments followed by an incident within a time window."""
-    period = _get_period_interval(request.args.get("period", "30d"))
+    period = period_to_timedelta(request.args.get("period", "30d"))
     window_hours, err = _parse_window_hours()
     if err:
         return err
@@ -422,44 +309,25 @@ def get_change_failure_rate(user_id):
     try:
         with db_pool.get_user_connection() as conn:
             cursor = conn.cursor()
-            set_rls_context(cursor, conn, user_id, log_prefix=_LOG_PREFIX)
+            org_id = set_rls_context(cursor, conn, user_id, log_prefix=_LOG_PREFIX)
+            now, watermark = read_clock(cursor, org_id)
 
-            cursor.execute("""
-                WITH deploys AS (
-                    SELECT id, service, received_at
-                    FROM jenkins_deployment_events
-                    WHERE received_at >= NOW() - %s::interval
-                ),
-                deploy_failures AS (
-                    SELECT DISTINCT d.id as deploy_id, d.service
-                    FROM deploys d
-                    JOIN incidents i ON (
-                        i.alert_service = d.service
-                        AND i.started_at BETWEEN d.received_at AND d.received_at + make_interval(hours => %s)
-                        AND i.status != 'merged'
-                    )
-                )
-                SELECT
-                    d.service,
-                    COUNT(DISTINCT d.id) as total_deployments,
-                    COUNT(DISTINCT df.deploy_id) as failure_linked
-                FROM deploys d
-                LEFT JOIN deploy_failures df ON d.id = df.deploy_id AND d.service = df.service
-                WHERE d.service IS NOT NULL
-                GROUP BY d.service
-                ORDER BY total_deployments DESC
-            """, (period, window_hours))
+            # DEPLOYS dims: (service,); deploys without a service are skipped.
+            groups = fold(
+                collect(cursor, DEPLOYS, now - period, now, watermark, lookahead_hours=window_hours),
+                lambda _ts, dims: dims[0],
+            )
 
             by_service = []
             total_all = 0
             failures_all = 0
-            for row in cursor.fetchall():
-                total = row[1]
-                failures = row[2]
+            for service, agg in _by_count(groups):
+                total = agg.count
+                failures = agg.failures_within(window_hours)
                 total_all += total
                 failures_all += failures
                 by_service.append({
-                    "service": row[0],
+                    "service": service,
                     "totalDeployments": total,
                     "failureLinked": failures,
                     "rate": round(failures / total * 100, 2) if total > 0 else 0,
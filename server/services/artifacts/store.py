@@ -4,9 +4,99 @@ Flask-free so the agent tool (title-based) and the REST routes (id + title)
 share identical upsert + versioning logic, avoiding version-bump drift between
 the two write paths. Every function operates on a caller-supplied cursor — the
 caller owns the connection, RLS context, and commit/rollback.
+
+Versions are stored as reverse deltas: the newest version row always holds the
+full text, and when a new version is written the previous one is rewritten as a
+zlib-compressed line diff against it. Every ARTIFACT_SNAPSHOT_INTERVAL-th
+version stays a full snapshot so reconstructing an old version applies at most
+that many diffs. The artifacts row keeps the current text (``content``) and a
+``version_count`` counter, so reads of the latest version never touch the
+version table and allocating a number never scans it.
 """
 
-from typing import Optional, Tuple
+import difflib
+import json
+import os
+import zlib
+from typing import List, Optional, Tuple, Union
+
+ARTIFACT_SNAPSHOT_INTERVAL = max(1, int(os.getenv("ARTIFACT_SNAPSHOT_INTERVAL", "10")))
+
+
+def encode_delta(base: str, target: str) -> bytes:
+    """Compressed line diff that rebuilds ``target`` from ``base``.
+
+    The payload is a JSON list where ``[i, j]`` copies ``base`` lines i..j and
+    a string inserts literal text.
+    """
+    base_lines = base.splitlines(keepends=True)
+    target_lines = target.splitlines(keepends=True)
+    ops: List[Union[List[int], str]] = []
+    matcher = difflib.SequenceMatcher(None, base_lines, target_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif j2 > j1:
+            ops.append("".join(target_lines[j1:j2]))
+    return zlib.compress(json.dumps(ops, separators=(",", ":")).encode("utf-8"))
+
+
+def apply_delta(base: str, delta: bytes) -> str:
+    """Rebuild the text ``delta`` was encoded for from ``base``."""
+    base_lines = base.splitlines(keepends=True)
+    parts: List[str] = []
+    for op in json.loads(zlib.decompress(bytes(delta))):
+        if isinstance(op, str):
+            parts.append(op)
+        else:
+            parts.extend(base_lines[op[0]:op[1]])
+    return "".join(parts)
+
+
+def _demote_to_delta(cursor, artifact_id: str, version_number: int, newer_content: str) -> None:
+    """Replace a full version row with a diff from the version after it.
+
+    Rows whose diff would not be smaller than the text itself stay full.
+    """
+    cursor.execute(
+        "SELECT id, content FROM artifact_versions WHERE artifact_id = %s AND version_number = %s",
+        (artifact_id, version_number),
+    )
+    row = cursor.fetchone()
+    if not row or row[1] is None:
+        return
+    delta = encode_delta(newer_content, row[1])
+    if len(delta) >= len(row[1].encode("utf-8")):
+        return
+    cursor.execute(
+        "UPDATE artifact_versions SET content = NULL, delta = %s WHERE id = %s",
+        (delta, str(row[0])),
+    )
+
+
+def get_version_content(cursor, artifact_id: str, version_number: int) -> Optional[str]:
+    """Full text of one version, rebuilt from the nearest newer snapshot.
+
+    Returns None when the version does not exist (or is not visible under the
+    caller's RLS context).
+    """
+    cursor.execute(
+        """SELECT version_number, content, delta
+           FROM artifact_versions
+           WHERE artifact_id = %s AND version_number >= %s
+             AND version_number <= (SELECT MIN(version_number) FROM artifact_versions
+                                    WHERE artifact_id = %s AND version_number >= %s
+                                      AND content IS NOT NULL)
+           ORDER BY version_number DESC""",
+        (artifact_id, version_number, artifact_id, version_number),
+    )
+    rows = cursor.fetchall()
+    if not rows or rows[0][1] is None or rows[-1][0] != version_number:
+        return None
+    content = rows[0][1]
+    for _number, _content, delta in rows[1:]:
+        content = apply_delta(content, delta)
+    return content
 
 
 def create_version(
@@ -22,27 +112,35 @@ def create_version(
 ) -> int:
     """Insert a new version row for an artifact and return its number.
 
-    The next version number is computed inline via a subquery (MAX+1) at insert
-    time. The artifact row is locked FOR UPDATE first so concurrent writers to
-    the same artifact serialize here and can't both read the same MAX and
-    collide on version_number. When set_current=True (default), also advances
-    the artifact's current_version_id pointer.
+    The number comes from bumping the artifact's version_count; that UPDATE
+    also row-locks the artifact, so concurrent writers to the same artifact
+    serialize here and can't collide on version_number. The previous newest
+    version is then rewritten as a diff against this one (unless it falls on a
+    snapshot boundary) and this version is stored in full. When
+    set_current=True (default), also advances the artifact's
+    current_version_id pointer.
     """
-    # Serialize concurrent version allocation for this artifact (see docstring).
-    cursor.execute("SELECT id FROM artifacts WHERE id = %s FOR UPDATE", (artifact_id,))
+    cursor.execute(
+        "UPDATE artifacts SET version_count = version_count + 1 WHERE id = %s RETURNING version_count",
+        (artifact_id,),
+    )
+    row = cursor.fetchone()
+    if not row:
+        raise RuntimeError("Artifact not found — cannot create a version.")
+    version_number = row[0]
+
+    previous = version_number - 1
+    if previous >= 1 and previous % ARTIFACT_SNAPSHOT_INTERVAL:
+        _demote_to_delta(cursor, artifact_id, previous, content)
 
     cursor.execute(
         """INSERT INTO artifact_versions
            (artifact_id, org_id, user_id, content, version_number, source, generation_session_id)
-           VALUES (%s, %s, %s, %s,
-                   (SELECT COALESCE(MAX(version_number), 0) + 1
-                    FROM artifact_versions WHERE artifact_id = %s),
-                   %s, %s)
-           RETURNING id, version_number""",
-        (artifact_id, org_id, user_id, content, artifact_id, source, session_id),
+           VALUES (%s, %s, %s, %s, %s, %s, %s)
+           RETURNING id""",
+        (artifact_id, org_id, user_id, content, version_number, source, session_id),
     )
-    row = cursor.fetchone()
-    version_id, version_number = row[0], row[1]
+    version_id = cursor.fetchone()[0]
     if set_current:
         cursor.execute(
             "UPDATE artifacts SET current_version_id = %s WHERE id = %s",
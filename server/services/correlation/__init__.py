@@ -5,6 +5,10 @@ from services.correlation.alert_correlator import (
     CorrelationResult,
     handle_correlated_alert,
 )
+from services.correlation.embedding_cache import (
+    EmbeddingCache,
+    get_embedding_cache_stats,
+)
 from services.correlation.strategies import (
     TimeWindowStrategy,
     TopologyStrategy,
@@ -15,6 +19,8 @@ __all__ = [
     "AlertCorrelator",
     "CorrelationResult",
     "handle_correlated_alert",
+    "EmbeddingCache",
+    "get_embedding_cache_stats",
     "TimeWindowStrategy",
     "TopologyStrategy",
     "SimilarityStrategy",
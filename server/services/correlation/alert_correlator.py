@@ -8,7 +8,8 @@ existing open incident.
 
 import json
 import logging
-from dataclasses import dataclass, field
+import time
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional
 
@@ -143,12 +144,16 @@ class AlertCorrelator:
 
             alert_received_at = self._resolve_received_at(alert_metadata)
 
+            started = time.monotonic()
             candidates = self._get_candidate_incidents(
                 cursor,
                 user_id,
                 alert_received_at,
                 org_id=org_id,
             )
+            latency_ms: Dict[str, float] = {
+                "candidates": _elapsed_ms(started),
+            }
             logger.info(
                 "[CORRELATION] Found %d candidate incidents for user %s (alert_received_at=%s)",
                 len(candidates),
@@ -159,18 +164,31 @@ class AlertCorrelator:
                 logger.info("[CORRELATION] No candidate incidents found")
                 return self._NOT_CORRELATED
 
-            best_result: Optional[CorrelationResult] = None
+            results = self._score_candidates(
+                candidates=candidates,
+                user_id=user_id,
+                alert_title=alert_title,
+                alert_service=alert_service,
+                alert_received_at=alert_received_at,
+                latency_ms=latency_ms,
+            )
+            latency_ms["total"] = _elapsed_ms(started)
+            logger.info(
+                "[CORRELATION] Scored %d candidates in %.1fms (%s)",
+                len(candidates),
+                latency_ms["total"],
+                ", ".join(f"{k}={v:.1f}" for k, v in latency_ms.items()),
+            )
 
-            for candidate in candidates:
-                result = self._score_candidate(
-                    candidate=candidate,
-                    user_id=user_id,
-                    alert_title=alert_title,
-                    alert_service=alert_service,
-                    alert_received_at=alert_received_at,
-                )
+            best_result: Optional[CorrelationResult] = None
+            for result in results:
                 if best_result is None or result.score > best_result.score:
                     best_result = result
+            if best_result is not None:
+                best_result = replace(
+                    best_result,
+                    details={**best_result.details, "latency_ms": latency_ms},
+                )
 
             if best_result is None or best_result.score < self.score_threshold:
                 logger.info(
@@ -284,75 +302,111 @@ class AlertCorrelator:
             for row in rows
         ]
 
-    def _score_candidate(
+    @staticmethod
+    def _incident_services(candidate: Dict[str, Any]) -> List[str]:
+        """Prefer affected_services; fall back to single alert_service."""
+        incident_services = candidate.get("affected_services") or []
+        if not incident_services and candidate.get("alert_service"):
+            incident_services = [candidate["alert_service"]]
+        return incident_services
+
+    def _score_candidates(
         self,
-        candidate: Dict[str, Any],
+        candidates: List[Dict[str, Any]],
         user_id: str,
         alert_title: str,
         alert_service: str,
         alert_received_at: datetime,
-    ) -> CorrelationResult:
-        """Compute weighted score for a single candidate incident."""
-
-        incident_id = candidate["id"]
-        incident_title = candidate["alert_title"]
-        incident_updated_at = candidate["updated_at"]
-
-        # Prefer affected_services; fall back to single alert_service
-        incident_services = candidate.get("affected_services") or []
-        if not incident_services and candidate.get("alert_service"):
-            incident_services = [candidate["alert_service"]]
-
-        scores: Dict[str, float] = {}
+        latency_ms: Optional[Dict[str, float]] = None,
+    ) -> List[CorrelationResult]:
+        """Compute weighted scores for every candidate incident in one batch.
+
+        Each strategy runs once over the whole candidate list.  A failing
+        strategy contributes 0.0 for every candidate rather than aborting
+        the correlation.  Per-strategy wall time (milliseconds) is written
+        into *latency_ms* when provided.
+        """
+        if latency_ms is None:
+            latency_ms = {}
+        count = len(candidates)
+        services_list = [self._incident_services(c) for c in candidates]
 
+        started = time.monotonic()
         try:
-            scores["topology"] = self._topology.score(
+            topology_scores = self._topology.score_batch(
                 alert_service,
-                incident_services,
+                services_list,
                 user_id,
             )
         except Exception:
             logger.warning("[CORRELATION] TopologyStrategy error", exc_info=True)
-            scores["topology"] = 0.0
-
-        try:
-            scores["time_window"] = self._time_window.score(
-                alert_received_at,
-                incident_updated_at,
-            )
-        except Exception:
-            logger.warning("[CORRELATION] TimeWindowStrategy error", exc_info=True)
-            scores["time_window"] = 0.0
+            topology_scores = [0.0] * count
+        latency_ms["topology"] = _elapsed_ms(started)
+
+        started = time.monotonic()
+        time_scores: List[float] = []
+        for candidate in candidates:
+            try:
+                time_scores.append(
+                    self._time_window.score(
+                        alert_received_at,
+                        candidate["updated_at"],
+                    )
+                )
+            except Exception:
+                logger.warning("[CORRELATION] TimeWindowStrategy error", exc_info=True)
+                time_scores.append(0.0)
+        latency_ms["time_window"] = _elapsed_ms(started)
 
+        started = time.monotonic()
         try:
-            scores["similarity"] = self._similarity.score(
+            similarity_scores = self._similarity.score_batch(
                 alert_title,
                 alert_service,
-                incident_title,
-                incident_services,
+                [
+                    (candidate["alert_title"], services)
+                    for candidate, services in zip(candidates, services_list)
+                ],
             )
         except Exception:
             logger.warning("[CORRELATION] SimilarityStrategy error", exc_info=True)
-            scores["similarity"] = 0.0
-
-        weighted = (
-            self.topology_weight * scores["topology"]
-            + self.time_weight * scores["time_window"]
-            + self.similarity_weight * scores["similarity"]
-        )
+            similarity_scores = [0.0] * count
+        latency_ms["similarity"] = _elapsed_ms(started)
+
+        results: List[CorrelationResult] = []
+        for candidate, topology, time_window, similarity in zip(
+            candidates, topology_scores, time_scores, similarity_scores
+        ):
+            scores: Dict[str, float] = {
+                "topology": topology,
+                "time_window": time_window,
+                "similarity": similarity,
+            }
+            weighted = (
+                self.topology_weight * scores["topology"]
+                + self.time_weight * scores["time_window"]
+                + self.similarity_weight * scores["similarity"]
+            )
+            dominant = max(scores, key=scores.get)  # type: ignore[arg-type]
+
+            results.append(
+                CorrelationResult(
+                    is_correlated=True,
+                    incident_id=candidate["id"],
+                    score=weighted,
+                    strategy=dominant,
+                    details={
+                        **scores,
+                        "correlated_alert_count": candidate.get("correlated_alert_count", 0),
+                    },
+                )
+            )
+        return results
 
-        dominant = max(scores, key=scores.get)  # type: ignore[arg-type]
 
-        return CorrelationResult(
-            is_correlated=True,
-            incident_id=incident_id,
-            score=weighted,
-            strategy=dominant,
-            details={
-                **scores,
-                "correlated_alert_count": candidate.get("correlated_alert_count", 0),
-            },
-        )
+def _elapsed_ms(started: float) -> float:
+    """Milliseconds since *started* (a ``time.monotonic()`` reading)."""
+    return round((time.monotonic() - started) * 1000, 2)
 
 
 # ---------------------------------------------------------------------------
@@ -0,0 +1,173 @@
+"""
+Content-addressed cache for t2v-transformers embeddings.
+
+Two tiers: a per-process LRU (with TTL) in front of Redis, so vectors are
+shared across workers and survive restarts.  Keys are the SHA-256 of the
+text, namespaced by embedding model name, so switching models never serves
+stale vectors.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+from cachetools import TTLCache
+
+from utils.cache.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_CACHE_TTL_SECONDS = int(os.getenv("EMBEDDING_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+EMBEDDING_CACHE_LOCAL_MAXSIZE = int(os.getenv("EMBEDDING_CACHE_LOCAL_MAXSIZE", "4096"))
+EMBEDDING_MODEL_NAME = os.getenv(
+    "T2V_MODEL_NAME", "sentence-transformers-all-MiniLM-L6-v2"
+)
+
+_KEY_PREFIX = "embedding"
+
+
+class EmbeddingCache:
+    """Two-tier (local LRU + Redis) embedding cache keyed on content hash.
+
+    Args:
+        model_name: Embedding model identifier, part of every cache key.
+        ttl_seconds: Expiry for both the local and the Redis tier.
+        local_maxsize: Maximum number of vectors held in process.
+    """
+
+    def __init__(
+        self,
+        model_name: str = EMBEDDING_MODEL_NAME,
+        ttl_seconds: int = EMBEDDING_CACHE_TTL_SECONDS,
+        local_maxsize: int = EMBEDDING_CACHE_LOCAL_MAXSIZE,
+    ):
+        self.model_name = model_name
+        self.ttl_seconds = ttl_seconds
+        self._local: TTLCache = TTLCache(maxsize=local_maxsize, ttl=ttl_seconds)
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {
+            "local_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "redis_errors": 0,
+        }
+
+    def key_for(self, text: str) -> str:
+        """Return the cache key for *text* under the current model."""
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{_KEY_PREFIX}:{self.model_name}:{digest}"
+
+    def get_many(self, texts: Iterable[str]) -> Dict[str, List[float]]:
+        """Look up vectors for *texts*; returns only the texts that hit."""
+        found: Dict[str, List[float]] = {}
+        pending: Dict[str, str] = {}
+
+        with self._lock:
+            for text in dict.fromkeys(texts):
+                key = self.key_for(text)
+                vec = self._local.get(key)
+                if vec is not None:
+                    found[text] = vec
+                    self._stats["local_hits"] += 1
+                else:
+                    pending[key] = text
+
+        if not pending:
+            return found
+
+        keys = list(pending)
+        raw_values = self._redis_mget(keys)
+
+        with self._lock:
+            for key, raw in zip(keys, raw_values):
+                vec = _decode(raw)
+                if vec is None:
+                    self._stats["misses"] += 1
+                    continue
+                found[pending[key]] = vec
+                self._local[key] = vec
+                self._stats["redis_hits"] += 1
+        return found
+
+    def set_many(self, vectors: Dict[str, List[float]]) -> None:
+        """Store freshly fetched vectors in both tiers."""
+        if not vectors:
+            return
+
+        entries = {self.key_for(text): vec for text, vec in vectors.items()}
+        with self._lock:
+            for key, vec in entries.items():
+                self._local[key] = vec
+            self._stats["stores"] += len(entries)
+
+        redis_client = get_redis_client()
+        if not redis_client:
+            return
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for key, vec in entries.items():
+                pipe.setex(key, self.ttl_seconds, json.dumps(vec))
+            pipe.execute()
+        except Exception as e:
+            self._count_redis_error()
+            logger.warning("[EmbeddingCache] Redis set failed: %s", e)
+
+    def clear_local(self) -> None:
+        """Drop the in-process tier (Redis entries expire via TTL)."""
+        with self._lock:
+            self._local.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Snapshot of hit/miss counters plus local occupancy and hit ratio."""
+        with self._lock:
+            snapshot: Dict[str, float] = dict(self._stats)
+            snapshot["local_size"] = len(self._local)
+            snapshot["local_maxsize"] = self._local.maxsize
+        lookups = snapshot["local_hits"] + snapshot["redis_hits"] + snapshot["misses"]
+        snapshot["hit_ratio"] = (
+            round((snapshot["local_hits"] + snapshot["redis_hits"]) / lookups, 4)
+            if lookups
+            else 0.0
+        )
+        return snapshot
+
+    def _redis_mget(self, keys: List[str]) -> List[Optional[str]]:
+        redis_client = get_redis_client()
+        if not redis_client:
+            return [None] * len(keys)
+        try:
+            return redis_client.mget(keys)
+        except Exception as e:
+            self._count_redis_error()
+            logger.warning("[EmbeddingCache] Redis get failed: %s", e)
+            return [None] * len(keys)
+
+    def _count_redis_error(self) -> None:
+        with self._lock:
+            self._stats["redis_errors"] += 1
+
+
+def _decode(raw: Optional[str]) -> Optional[List[float]]:
+    if not raw:
+        return None
+    try:
+        vec = json.loads(raw)
+    except (TypeError, ValueError):
+        return None
+    return vec if isinstance(vec, list) and vec else None
+
+
+@lru_cache(maxsize=1)
+def get_embedding_cache() -> EmbeddingCache:
+    """Get or create the singleton embedding cache."""
+    return EmbeddingCache()
+
+
+def get_embedding_cache_stats() -> Dict[str, float]:
+    """Export the singleton cache's counters (for logs and health endpoints)."""
+    return get_embedding_cache().stats()
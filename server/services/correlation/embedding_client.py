@@ -2,33 +2,56 @@
 Embedding client for the t2v-transformers container.
 
 Calls the Weaviate text2vec-transformers inference service to get
-dense vector embeddings for text.
+dense vector embeddings for text.  Results are served from
+``EmbeddingCache`` when possible; cache misses in a batch are fetched
+concurrently since the service only accepts one text per request.
 """
 
 import logging
-from functools import lru_cache
-from typing import List, Optional
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from typing import Dict, List, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+
+from services.correlation.embedding_cache import EmbeddingCache, get_embedding_cache
 
 logger = logging.getLogger(__name__)
 
 T2V_URL = "http://t2v-transformers:8080"
 T2V_TIMEOUT = 5.0
+T2V_MAX_CONCURRENCY = int(os.getenv("T2V_MAX_CONCURRENCY", "8"))
 
 
 class EmbeddingClient:
     """Client for the t2v-transformers embedding service."""
 
-    def __init__(self, base_url: str = T2V_URL, timeout: float = T2V_TIMEOUT):
+    def __init__(
+        self,
+        base_url: str = T2V_URL,
+        timeout: float = T2V_TIMEOUT,
+        cache: Optional[EmbeddingCache] = None,
+        max_concurrency: int = T2V_MAX_CONCURRENCY,
+    ):
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
+        self.cache = cache if cache is not None else get_embedding_cache()
+        self.max_concurrency = max(1, max_concurrency)
         self._session: Optional[requests.Session] = None
 
     @property
     def session(self) -> requests.Session:
         if self._session is None:
-            self._session = requests.Session()
+            session = requests.Session()
+            # One pooled connection per concurrent worker in embed_batch
+            adapter = HTTPAdapter(
+                pool_connections=1, pool_maxsize=self.max_concurrency
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._session = session
         return self._session
 
     def close(self) -> None:
@@ -47,9 +70,60 @@ class EmbeddingClient:
         """
         if not text or not text.strip():
             return None
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Get embeddings for multiple texts.
+
+        Cached vectors are returned without any HTTP call.  The t2v-transformers
+        container doesn't support batch requests, so distinct misses are
+        fetched in parallel (up to ``max_concurrency`` at a time) and written
+        back to the cache.
+
+        Returns:
+            One vector (or None on failure / blank text) per input, in order.
+        """
+        wanted = [text for text in texts if text and text.strip()]
+        if not wanted:
+            return [None] * len(texts)
 
+        vectors: Dict[str, List[float]] = {}
+        try:
+            vectors.update(self.cache.get_many(wanted))
+        except Exception as e:
+            logger.warning("[EmbeddingClient] Cache lookup failed: %s", e)
+
+        misses = [text for text in dict.fromkeys(wanted) if text not in vectors]
+        if misses:
+            fetched = self._fetch_many(misses)
+            if fetched:
+                try:
+                    self.cache.set_many(fetched)
+                except Exception as e:
+                    logger.warning("[EmbeddingClient] Cache store failed: %s", e)
+                vectors.update(fetched)
+
+        return [vectors.get(text) if text else None for text in texts]
+
+    def _fetch_many(self, texts: List[str]) -> Dict[str, List[float]]:
+        """Fetch uncached texts from the service, in parallel when >1."""
+        # Resolve the shared session before fanning out so workers don't race
+        # to create it.
+        fetch = partial(self._fetch, session=self.session)
+        if len(texts) == 1:
+            results = [fetch(texts[0])]
+        else:
+            workers = min(self.max_concurrency, len(texts))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(fetch, texts))
+        return {text: vec for text, vec in zip(texts, results) if vec}
+
+    def _fetch(
+        self, text: str, session: Optional[requests.Session] = None
+    ) -> Optional[List[float]]:
+        """POST a single text to ``/vectors`` (no caching)."""
         try:
-            response = self.session.post(
+            response = (session or self.session).post(
                 f"{self.base_url}/vectors",
                 json={"text": text},
                 timeout=self.timeout,
@@ -69,14 +143,6 @@ class EmbeddingClient:
             logger.warning("[EmbeddingClient] Unexpected error: %s", e)
             return None
 
-    def embed_batch(self, texts: List[str]) -> List[Optional[List[float]]]:
-        """Get embeddings for multiple texts.
-
-        Note: The t2v-transformers container doesn't support batch requests,
-        so this calls embed() for each text sequentially.
-        """
-        return [self.embed(text) for text in texts]
-
 
 @lru_cache(maxsize=1)
 def get_embedding_client() -> EmbeddingClient:
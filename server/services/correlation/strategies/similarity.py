@@ -9,7 +9,12 @@ Jaccard fallback when embeddings are unavailable.
 import logging
 import math
 import re
-from typing import List, Optional, Set
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pure-Python cosine fallback in _vector_similarity_batch
+    np = None
 
 from services.correlation.embedding_client import get_embedding_client
 from services.correlation.strategies.base import CorrelationStrategy
@@ -63,6 +68,49 @@ class SimilarityStrategy(CorrelationStrategy):
 
         return self.TITLE_WEIGHT * title_sim + self.SERVICE_WEIGHT * service_sim
 
+    def score_batch(
+        self,
+        alert_title: str,
+        alert_service: str,
+        incidents: Sequence[Tuple[str, List[str]]],
+    ) -> List[float]:
+        """Score one alert against many incidents with one embedding round.
+
+        The alert title is embedded once, distinct incident titles are
+        embedded together through ``embed_batch`` and all title similarities
+        are computed as a single matrix-vector product.  Incidents whose
+        title could not be embedded fall back to Jaccard individually.
+
+        Args:
+            alert_title: Title / summary of the alert.
+            alert_service: Service name from the alert.
+            incidents: ``(incident_title, incident_services)`` per candidate.
+
+        Returns:
+            List[float]: One score per incident, in input order.
+        """
+        if not incidents:
+            return []
+        if not alert_title:
+            return [0.0] * len(incidents)
+
+        titles = [title for title, _ in incidents if title]
+        title_sims = self._vector_similarity_batch(alert_title, titles)
+
+        scores: List[float] = []
+        for incident_title, incident_services in incidents:
+            if not incident_title:
+                scores.append(0.0)
+                continue
+            title_sim = title_sims.get(incident_title)
+            if title_sim is None:
+                title_sim = self._jaccard_similarity(alert_title, incident_title)
+            service_sim = self._service_similarity(alert_service, incident_services)
+            scores.append(
+                self.TITLE_WEIGHT * title_sim + self.SERVICE_WEIGHT * service_sim
+            )
+        return scores
+
     def _vector_similarity(self, text_a: str, text_b: str) -> Optional[float]:
         """Compute cosine similarity using embeddings.
 
@@ -81,6 +129,51 @@ class SimilarityStrategy(CorrelationStrategy):
             logger.debug("[SimilarityStrategy] Vector similarity failed: %s", e)
             return None
 
+    def _vector_similarity_batch(
+        self, query: str, texts: List[str]
+    ) -> Dict[str, float]:
+        """Cosine similarity of *query* against each distinct text.
+
+        Returns a ``{text: similarity}`` map containing only the texts that
+        were embedded successfully; empty if the query itself failed.
+        """
+        unique_texts = list(dict.fromkeys(texts))
+        if not unique_texts:
+            return {}
+
+        try:
+            client = get_embedding_client()
+            query_vec = client.embed(query)
+            if query_vec is None:
+                return {}
+            vectors = client.embed_batch(unique_texts)
+        except Exception as e:
+            logger.debug("[SimilarityStrategy] Batch vector similarity failed: %s", e)
+            return {}
+
+        embedded = [
+            (text, vec)
+            for text, vec in zip(unique_texts, vectors)
+            if vec is not None and len(vec) == len(query_vec) and len(vec) > 0
+        ]
+        if not embedded:
+            return {}
+
+        if np is None:
+            return {
+                text: self._cosine_similarity(query_vec, vec) for text, vec in embedded
+            }
+
+        matrix = np.asarray([vec for _, vec in embedded], dtype=np.float64)
+        query_arr = np.asarray(query_vec, dtype=np.float64)
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query_arr)
+        dots = matrix @ query_arr
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sims = np.where(norms > 0, dots / norms, 0.0)
+        sims = np.clip(sims, 0.0, 1.0)
+
+        return {text: float(sim) for (text, _), sim in zip(embedded, sims)}
+
     @staticmethod
     def _cosine_similarity(vec_a: List[float], vec_b: List[float]) -> float:
         """Compute cosine similarity between two vectors."""
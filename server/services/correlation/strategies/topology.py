@@ -6,9 +6,10 @@ distance between the alert's service and the incident's services.
 """
 
 import logging
-from typing import List
+from typing import Dict, List, Tuple
 
 from services.correlation.strategies.base import CorrelationStrategy
+from services.graph.topology_snapshot import get_topology_snapshot
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +25,8 @@ _UPSTREAM_SCORES = {1: 1.0, 2: 0.7, 3: 0.4}
 #   3-hop: distant dependent -> very low correlation (0.2)
 _DOWNSTREAM_SCORES = {1: 0.8, 2: 0.5, 3: 0.2}
 
+_MAX_DEPTH = 3
+
 
 class TopologyStrategy(CorrelationStrategy):
     """Graph-distance scoring using the Memgraph dependency topology."""
@@ -56,51 +59,126 @@ class TopologyStrategy(CorrelationStrategy):
             )
             return 0.0
 
-        try:
-            from services.graph.memgraph_client import get_memgraph_client
+        return self.score_batch(alert_service, [incident_services], user_id)[0]
+
+    def score_batch(
+        self,
+        alert_service: str,
+        incident_services_list: List[List[str]],
+        user_id: str,
+    ) -> List[float]:
+        """Score one alert against many incidents with a single neighborhood fetch.
 
-            client = get_memgraph_client()
+        The alert service's upstream/downstream neighborhood is resolved once
+        and every candidate is scored against the same depth maps.
 
-            # Fetch upstream/downstream neighbours of the alert service once
-            upstream_list = client.get_all_upstream(user_id, alert_service, max_depth=3)
-            downstream_list = client.get_all_downstream(
-                user_id, alert_service, max_depth=3
-            )
+        Args:
+            alert_service: Name of the service that fired the alert.
+            incident_services_list: One list of service names per incident.
+            user_id: Owner of the topology graph.
 
-            # Build {service_name: depth} maps
-            upstream_map = {
-                entry["name"]: entry["depth"]
-                for entry in upstream_list
-                if "name" in entry and "depth" in entry
-            }
-            downstream_map = {
-                entry["name"]: entry["depth"]
-                for entry in downstream_list
-                if "name" in entry and "depth" in entry
-            }
-
-            best_score = 0.0
-            for svc in incident_services:
-                # Exact match: same service -> perfect correlation
-                if svc == alert_service:
-                    return 1.0
-                
-                # Upstream check (alert depends on incident service)
-                if svc in upstream_map:
-                    depth = upstream_map[svc]
-                    best_score = max(best_score, _UPSTREAM_SCORES.get(depth, 0.0))
-
-                # Downstream check (incident service depends on alert service)
-                if svc in downstream_map:
-                    depth = downstream_map[svc]
-                    best_score = max(best_score, _DOWNSTREAM_SCORES.get(depth, 0.0))
-
-            return best_score
+        Returns:
+            List[float]: One score per incident, in input order. All 0.0 on
+            any error.
+        """
+        if not alert_service or not incident_services_list:
+            return [0.0] * len(incident_services_list)
+
+        # Exact matches need no graph lookup; skip Memgraph if nothing else
+        # could score.
+        if all(
+            not services or alert_service in services
+            for services in incident_services_list
+        ):
+            return [
+                1.0 if services and alert_service in services else 0.0
+                for services in incident_services_list
+            ]
 
+        try:
+            upstream_map, downstream_map = self.fetch_neighborhood(
+                alert_service, user_id
+            )
         except Exception:
             logger.warning(
                 "TopologyStrategy: failed to score alert_service=%s, returning 0.0",
                 alert_service,
                 exc_info=True,
             )
+            return [0.0] * len(incident_services_list)
+
+        return [
+            self.score_from_neighborhood(
+                alert_service, services, upstream_map, downstream_map
+            )
+            for services in incident_services_list
+        ]
+
+    @staticmethod
+    def fetch_neighborhood(
+        alert_service: str,
+        user_id: str,
+    ) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """Return ``(upstream, downstream)`` ``{service_name: depth}`` maps.
+
+        Served from the worker's in-process topology snapshot; Memgraph is
+        traversed directly only when no snapshot can be built.
+        """
+        snapshot = get_topology_snapshot(user_id)
+        if snapshot is not None:
+            return (
+                snapshot.upstream(alert_service, max_depth=_MAX_DEPTH),
+                snapshot.downstream(alert_service, max_depth=_MAX_DEPTH),
+            )
+
+        from services.graph.memgraph_client import get_memgraph_client
+
+        client = get_memgraph_client()
+
+        upstream_list = client.get_all_upstream(
+            user_id, alert_service, max_depth=_MAX_DEPTH
+        )
+        downstream_list = client.get_all_downstream(
+            user_id, alert_service, max_depth=_MAX_DEPTH
+        )
+
+        upstream_map = {
+            entry["name"]: entry["depth"]
+            for entry in upstream_list
+            if "name" in entry and "depth" in entry
+        }
+        downstream_map = {
+            entry["name"]: entry["depth"]
+            for entry in downstream_list
+            if "name" in entry and "depth" in entry
+        }
+        return upstream_map, downstream_map
+
+    @staticmethod
+    def score_from_neighborhood(
+        alert_service: str,
+        incident_services: List[str],
+        upstream_map: Dict[str, int],
+        downstream_map: Dict[str, int],
+    ) -> float:
+        """Score one incident against pre-fetched neighborhood depth maps."""
+        if not alert_service or not incident_services:
             return 0.0
+
+        best_score = 0.0
+        for svc in incident_services:
+            # Exact match: same service -> perfect correlation
+            if svc == alert_service:
+                return 1.0
+
+            # Upstream check (alert depends on incident service)
+            if svc in upstream_map:
+                depth = upstream_map[svc]
+                best_score = max(best_score, _UPSTREAM_SCORES.get(depth, 0.0))
+
+            # Downstream check (incident service depends on alert service)
+            if svc in downstream_map:
+                depth = downstream_map[svc]
+                best_score = max(best_score, _DOWNSTREAM_SCORES.get(depth, 0.0))
+
+        return best_score
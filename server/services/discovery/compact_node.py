@@ -0,0 +1,88 @@
+"""
+Compact Node - Slotted, read-mostly node records for the discovery inventory.
+
+Phase 1 nodes are written to Memgraph as each provider page arrives; the
+orchestrator only keeps a CompactNode per resource for Phase 2 enrichment
+and Phase 3 inference. It behaves like the original node dict for reads
+(``node.get("name")``, ``node["metadata"]``) but keeps the common fields in
+slots, interns low-cardinality strings and drops raw provider payloads
+(e.g. AWS Resource Explorer properties) that were already persisted with
+the node's metadata and that no enricher or inference engine reads.
+"""
+
+import sys
+from collections.abc import Mapping
+
+_FIELDS = (
+    "name",
+    "display_name",
+    "resource_type",
+    "sub_type",
+    "provider",
+    "region",
+    "zone",
+    "cloud_resource_id",
+    "endpoint",
+    "vpc_id",
+    "metadata",
+)
+_FIELD_SET = frozenset(_FIELDS)
+_INTERNED = frozenset({"resource_type", "sub_type", "provider", "region", "zone"})
+# Raw payload keys in node metadata that are only needed for the graph write.
+_DROPPED_METADATA = frozenset({"properties"})
+_MISSING = object()
+
+
+class CompactNode(Mapping):
+    """Dict-like view of a discovered node with a small memory footprint.
+
+    Only keys present on the source node are present here. Fields outside
+    ``_FIELDS`` (e.g. ``namespace``, ``network_interfaces``) are kept in a
+    per-node dict that is only allocated when needed.
+    """
+
+    __slots__ = _FIELDS + ("_extra",)
+
+    def __init__(self, node):
+        self._extra = None
+        for key, value in node.items():
+            self[key] = value
+
+    def __getitem__(self, key):
+        if key in _FIELD_SET:
+            value = getattr(self, key, _MISSING)
+            if value is not _MISSING:
+                return value
+        elif self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in _FIELD_SET:
+            if key in _INTERNED and isinstance(value, str):
+                value = sys.intern(value)
+            elif key == "metadata" and isinstance(value, dict) and not _DROPPED_METADATA.isdisjoint(value):
+                value = {k: v for k, v in value.items() if k not in _DROPPED_METADATA}
+            object.__setattr__(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __iter__(self):
+        for field in _FIELDS:
+            if getattr(self, field, _MISSING) is not _MISSING:
+                yield field
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"CompactNode({dict(self)!r})"
+
+
+def compact_node(node):
+    """Return a CompactNode for ``node`` (CompactNodes are returned as-is)."""
+    return node if isinstance(node, CompactNode) else CompactNode(node)
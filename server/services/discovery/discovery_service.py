@@ -1,17 +1,28 @@
 """
 Discovery Service - Orchestrates the 3-phase discovery pipeline.
 Phase 1: Bulk Asset Discovery (parallel per provider)
-Phase 2: Detail Enrichment (sequential per resource type)
-Phase 3: Connection Inference (all 11 methods)
+Phase 2: Detail Enrichment (parallel per enricher)
+Phase 3: Connection Inference (all 11 methods, parallel)
+
+Providers stream Phase 1 results as pages; each page is written to Memgraph
+in bounded batches as it arrives and only compact node records are kept in
+memory for Phases 2 and 3. Graph writes go through a GraphDiffWriter, so
+only nodes/edges that changed since the previous run are upserted.
 """
 
 import logging
+import os
+import queue
 import shutil
+import sys
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 
 from utils.log_sanitizer import safe_provider, hash_for_log
-from services.discovery.graph_writer import write_services, write_dependencies
+from services.discovery.compact_node import compact_node
+from services.discovery.graph_writer import GraphDiffWriter
+from services.discovery.providers.pages import iter_provider_pages
 from services.discovery.providers import (
     gcp_asset_discovery,
     aws_asset_discovery,
@@ -27,10 +38,18 @@ from services.discovery.enrichment import (
     azure_enrichment,
     serverless_enrichment,
 )
-from services.discovery.inference.connection_inference import run_all_inference
+from services.discovery.inference.connection_inference import infer_connections
 
 logger = logging.getLogger(__name__)
 
+DISCOVERY_ENRICHMENT_WORKERS = int(os.getenv("DISCOVERY_ENRICHMENT_WORKERS", "4"))
+# Phase 1 producer threads (providers plus individual AWS accounts).
+DISCOVERY_PHASE1_WORKERS = int(os.getenv("DISCOVERY_PHASE1_WORKERS", "10"))
+# Pages buffered between provider threads and the writer; producers block
+# when it is full, which bounds how much raw inventory is held at once.
+DISCOVERY_PAGE_QUEUE_SIZE = int(os.getenv("DISCOVERY_PAGE_QUEUE_SIZE", "4"))
+DISCOVERY_WRITE_BATCH_SIZE = int(os.getenv("DISCOVERY_WRITE_BATCH_SIZE", "500"))
+
 # Map provider names to discovery modules
 PROVIDER_MODULES = {
     "gcp": gcp_asset_discovery,
@@ -175,6 +194,54 @@ def _setup_provider_env(provider_name, user_id, credentials):
     return None, credentials
 
 
+class _ProducerDone:
+    """Queue marker: a Phase 1 producer finished (with ``error`` if it raised)."""
+
+    __slots__ = ("provider_name", "error")
+
+    def __init__(self, provider_name, error=None):
+        self.provider_name = provider_name
+        self.error = error
+
+
+def _put_page(page_queue, item, stop):
+    """Blocking put that gives up once ``stop`` is set. Returns False if it gave up."""
+    while not stop.is_set():
+        try:
+            page_queue.put(item, timeout=1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _produce_pages(provider_name, pages, page_queue, stop):
+    """Feed a provider's pages into the queue, then a _ProducerDone marker."""
+    error = None
+    try:
+        for page in pages:
+            if not _put_page(page_queue, (provider_name, page), stop):
+                return
+    except Exception as e:
+        error = e
+    _put_page(page_queue, _ProducerDone(provider_name, error), stop)
+
+
+def _peak_rss_mb():
+    """Peak resident set size of this process in MB, or None if unavailable.
+
+    ``ru_maxrss`` covers the whole process lifetime, so in a reused worker
+    it can reflect an earlier, larger task.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
 def run_discovery_for_user(user_id, connected_providers):
     """Run the full 3-phase discovery pipeline for a single user.
 
@@ -197,9 +264,12 @@ def run_discovery_for_user(user_id, connected_providers):
         "phase2_nodes": 0,
         "phase2_relationships": 0,
         "phase3_edges": 0,
+        "phase2_enrichment": {},
+        "phase3_engines": {},
         "errors": [],
         "provider_errors": {},
     }
+    graph = GraphDiffWriter(user_id)
 
     # =====================================================================
     # Phase 1: Bulk Asset Discovery (parallel per provider)
@@ -217,80 +287,159 @@ def run_discovery_for_user(user_id, connected_providers):
         provider_envs[provider_name] = (env, updated_creds)
         connected_providers[provider_name] = updated_creds
 
-    with ThreadPoolExecutor(max_workers=len(connected_providers)) as executor:
-        futures = {}
-        for provider_name, credentials in connected_providers.items():
-            module = PROVIDER_MODULES.get(provider_name)
-            if not module:
-                logger.warning(f"[Discovery] Unknown provider: {provider_name}")
-                continue
-            env, creds = provider_envs.get(provider_name, (None, credentials))
-
-            # Multi-account AWS: fan out via discover_all_accounts
-            if provider_name == "aws" and isinstance(creds, dict) and creds.get("_multi_account"):
-                from services.discovery.providers.aws_asset_discovery import discover_all_accounts
-                account_envs = creds["_account_envs"]
-                futures[executor.submit(discover_all_accounts, user_id, account_envs)] = provider_name
-            else:
-                futures[executor.submit(module.discover, user_id, creds, env)] = provider_name
-
-        for future in as_completed(futures):
-            provider_name = futures[future]
+    producers = []
+    for provider_name, credentials in connected_providers.items():
+        module = PROVIDER_MODULES.get(provider_name)
+        if not module:
+            logger.warning(f"[Discovery] Unknown provider: {provider_name}")
+            continue
+        env, creds = provider_envs.get(provider_name, (None, credentials))
+
+        # Multi-account AWS: one producer per account
+        if provider_name == "aws" and isinstance(creds, dict) and creds.get("_multi_account"):
+            for acct in creds["_account_envs"]:
+                producers.append((provider_name, aws_asset_discovery.discover_account_pages(user_id, acct)))
+        else:
+            producers.append((provider_name, iter_provider_pages(module, user_id, creds, env)))
+
+    phase1_providers = {}
+    page_queue = queue.Queue(maxsize=DISCOVERY_PAGE_QUEUE_SIZE)
+    stop = threading.Event()
+    if producers:
+        with ThreadPoolExecutor(
+            max_workers=min(len(producers), DISCOVERY_PHASE1_WORKERS),
+            thread_name_prefix="discovery-phase1",
+        ) as executor:
+            for provider_name, pages in producers:
+                executor.submit(_produce_pages, provider_name, pages, page_queue, stop)
+
+            remaining = len(producers)
             try:
-                result = future.result()
-                nodes = result.get("nodes", [])
-                relationships = result.get("relationships", [])
-                errors = result.get("errors", [])
-
-                all_nodes.extend(nodes)
-                all_phase1_relationships.extend(relationships)
-
-                # Store raw GCP relationships for Phase 3 inference
-                if provider_name == "gcp" and result.get("raw_relationships"):
-                    gcp_relationships_raw = result["raw_relationships"]
-
-                if errors:
-                    summary["errors"].extend(errors)
-                    summary["provider_errors"].setdefault(provider_name, []).extend(errors)
-
-                logger.info(f"[Discovery] Phase 1 {provider_name}: {len(nodes)} nodes, {len(relationships)} relationships")
-            except Exception as e:
-                error_msg = f"Phase 1 {provider_name} failed: {str(e)}"
-                logger.error(f"[Discovery] {error_msg}")
-                summary["errors"].append(error_msg)
-                summary["provider_errors"].setdefault(provider_name, []).append(error_msg)
-
-    # Write Phase 1 nodes to Memgraph
-    summary["phase1_nodes"] = write_services(user_id, all_nodes)
+                while remaining:
+                    item = page_queue.get()
+                    if isinstance(item, _ProducerDone):
+                        remaining -= 1
+                        if item.error is not None:
+                            error_msg = f"Phase 1 {item.provider_name} failed: {str(item.error)}"
+                            logger.error(f"[Discovery] {error_msg}")
+                            summary["errors"].append(error_msg)
+                            summary["provider_errors"].setdefault(item.provider_name, []).append(error_msg)
+                        continue
+
+                    provider_name, page = item
+                    stats = phase1_providers.setdefault(provider_name, {"pages": 0, "nodes": 0, "relationships": 0})
+                    nodes = page.get("nodes", [])
+                    relationships = page.get("relationships", [])
+                    errors = page.get("errors", [])
+
+                    # Write this page's nodes now; keep only compact records
+                    for i in range(0, len(nodes), DISCOVERY_WRITE_BATCH_SIZE):
+                        summary["phase1_nodes"] += graph.write_services(nodes[i:i + DISCOVERY_WRITE_BATCH_SIZE])
+                    all_nodes.extend(compact_node(node) for node in nodes)
+                    # Edges are written after every node exists (they may span pages)
+                    all_phase1_relationships.extend(relationships)
+
+                    # Store raw GCP relationships for Phase 3 inference
+                    if provider_name == "gcp" and page.get("raw_relationships"):
+                        gcp_relationships_raw.extend(page["raw_relationships"])
+
+                    if errors:
+                        summary["errors"].extend(errors)
+                        summary["provider_errors"].setdefault(provider_name, []).extend(errors)
+
+                    stats["pages"] += 1
+                    stats["nodes"] += len(nodes)
+                    stats["relationships"] += len(relationships)
+                    # Don't pin the last raw page while waiting for the next
+                    del item, page, nodes
+            finally:
+                stop.set()
+
+    for provider_name, stats in phase1_providers.items():
+        logger.info(
+            f"[Discovery] Phase 1 {provider_name}: {stats['nodes']} nodes, "
+            f"{stats['relationships']} relationships in {stats['pages']} pages"
+        )
+    summary["phase1_providers"] = phase1_providers
 
     # Write Phase 1 relationships to Memgraph
-    if all_phase1_relationships:
-        summary["phase1_relationships"] = write_dependencies(user_id, all_phase1_relationships)
+    for i in range(0, len(all_phase1_relationships), DISCOVERY_WRITE_BATCH_SIZE):
+        summary["phase1_relationships"] += graph.write_dependencies(
+            all_phase1_relationships[i:i + DISCOVERY_WRITE_BATCH_SIZE]
+        )
+    summary["phase1_peak_rss_mb"] = _peak_rss_mb()
 
     logger.info(f"[Discovery] Phase 1 complete: {summary['phase1_nodes']} nodes, {summary['phase1_relationships']} relationships")
 
     # =====================================================================
-    # Phase 2: Detail Enrichment (sequential)
+    # Phase 2: Detail Enrichment (parallel)
     # =====================================================================
     logger.info(f"[Discovery] Phase 2 starting for user {user_id}")
     enrichment_data = {}
+    isolated_envs = {p: env for p, (env, _) in provider_envs.items() if env is not None}
 
-    # Kubernetes enrichment (for cloud-managed clusters only — kubectl clusters
-    # already have their internals discovered in Phase 1)
+    # Every enricher selects its input from the Phase 1 nodes only, so they
+    # run concurrently; results are merged below in a fixed order.
+    # Kubernetes enrichment is for cloud-managed clusters only — kubectl
+    # clusters already have their internals discovered in Phase 1.
     k8s_clusters = [n for n in all_nodes if n.get("resource_type") == "kubernetes_cluster" and n.get("provider") != "kubectl"]
+    serverless_nodes = [n for n in all_nodes if n.get("resource_type") == "serverless_function"]
+    provider_enrichments = {
+        "aws": aws_enrichment,
+        "azure": azure_enrichment,
+    }
+
+    enrichers = []
     if k8s_clusters:
+        enrichers.append(("kubernetes", lambda: kubernetes_enrichment.enrich(
+            user_id, k8s_clusters, connected_providers, provider_envs=isolated_envs,
+        )))
+    for provider_name, enrichment_module in provider_enrichments.items():
+        if provider_name in connected_providers:
+            provider_nodes = [n for n in all_nodes if n.get("provider") == provider_name]
+            enrichers.append((provider_name, lambda m=enrichment_module, p=provider_name, nodes=provider_nodes: m.enrich(
+                user_id, nodes, connected_providers[p],
+            )))
+    if serverless_nodes:
+        # Pass provider_envs so GCP gcloud calls get the isolated auth env
+        enrichers.append(("serverless", lambda: serverless_enrichment.enrich(
+            user_id, serverless_nodes, connected_providers, provider_envs=isolated_envs,
+        )))
+
+    def _timed(enrich):
+        started = time.perf_counter()
         try:
-            k8s_result = kubernetes_enrichment.enrich(
-                user_id, k8s_clusters, connected_providers,
-                provider_envs={p: env for p, (env, _) in provider_envs.items() if env is not None},
-            )
+            return enrich(), None, time.perf_counter() - started
+        except Exception as e:
+            return None, e, time.perf_counter() - started
+
+    phase2_results = {}
+    if enrichers:
+        with ThreadPoolExecutor(
+            max_workers=min(len(enrichers), DISCOVERY_ENRICHMENT_WORKERS),
+            thread_name_prefix="discovery-enrich",
+        ) as executor:
+            futures = {name: executor.submit(_timed, enrich) for name, enrich in enrichers}
+            phase2_results = {name: future.result() for name, future in futures.items()}
+
+    for name, (_, error, seconds) in phase2_results.items():
+        summary["phase2_enrichment"][name] = {"seconds": round(seconds, 2)}
+        if error is not None:
+            summary["phase2_enrichment"][name]["error"] = str(error)
+
+    if "kubernetes" in phase2_results:
+        k8s_result, error, _ = phase2_results["kubernetes"]
+        try:
+            if error is not None:
+                raise error
             k8s_nodes = k8s_result.get("nodes", [])
             k8s_rels = k8s_result.get("relationships", [])
             if k8s_nodes:
-                summary["phase2_nodes"] += write_services(user_id, k8s_nodes)
-                all_nodes.extend(k8s_nodes)
+                summary["phase2_nodes"] += graph.write_services(k8s_nodes)
+                all_nodes.extend(compact_node(node) for node in k8s_nodes)
             if k8s_rels:
-                summary["phase2_relationships"] += write_dependencies(user_id, k8s_rels)
+                summary["phase2_relationships"] += graph.write_dependencies(k8s_rels)
+            summary["phase2_enrichment"]["kubernetes"].update(nodes=len(k8s_nodes), relationships=len(k8s_rels))
             if k8s_result.get("errors"):
                 summary["errors"].extend(k8s_result["errors"])
                 # Attribute each error to its provider via substring matching.
@@ -318,38 +467,28 @@ def run_discovery_for_user(user_id, connected_providers):
             logger.error(f"[Discovery] Phase 2 K8s enrichment failed: {e}")
             summary["errors"].append(f"K8s enrichment failed: {str(e)}")
 
-    # AWS / Azure enrichment (identical pattern: filter nodes, enrich, collect data)
-    provider_enrichments = {
-        "aws": aws_enrichment,
-        "azure": azure_enrichment,
-    }
-    for provider_name, enrichment_module in provider_enrichments.items():
-        if provider_name not in connected_providers:
+    # AWS / Azure enrichment (identical pattern: collect data)
+    for provider_name in provider_enrichments:
+        if provider_name not in phase2_results:
             continue
-        provider_nodes = [n for n in all_nodes if n.get("provider") == provider_name]
-        try:
-            result = enrichment_module.enrich(user_id, provider_nodes, connected_providers[provider_name])
+        result, error, _ = phase2_results[provider_name]
+        if error is None:
             enrichment_data.update(result.get("enrichment_data", {}))
             if result.get("errors"):
                 summary["errors"].extend(result["errors"])
                 summary["provider_errors"].setdefault(provider_name, []).extend(result["errors"])
             logger.info(f"[Discovery] Phase 2 {provider_name.upper()} enrichment complete")
-        except Exception as e:
+        else:
             label = provider_name.upper()
-            logger.error(f"[Discovery] Phase 2 {label} enrichment failed: {e}")
-            error_msg = f"{label} enrichment failed: {str(e)}"
+            logger.error(f"[Discovery] Phase 2 {label} enrichment failed: {error}")
+            error_msg = f"{label} enrichment failed: {str(error)}"
             summary["errors"].append(error_msg)
             summary["provider_errors"].setdefault(provider_name, []).append(error_msg)
 
     # Serverless enrichment
-    serverless_nodes = [n for n in all_nodes if n.get("resource_type") == "serverless_function"]
-    if serverless_nodes:
-        try:
-            # Pass provider_envs so GCP gcloud calls get the isolated auth env
-            serverless_result = serverless_enrichment.enrich(
-                user_id, serverless_nodes, connected_providers,
-                provider_envs={p: env for p, (env, _) in provider_envs.items() if env is not None},
-            )
+    if "serverless" in phase2_results:
+        serverless_result, error, _ = phase2_results["serverless"]
+        if error is None:
             enrichment_data["env_vars"] = serverless_result.get("env_vars", {})
             if serverless_result.get("errors"):
                 summary["errors"].extend(serverless_result["errors"])
@@ -362,9 +501,9 @@ def run_discovery_for_user(user_id, connected_providers):
                             summary["provider_errors"].setdefault(pname, []).append(err_str)
                             break
             logger.info("[Discovery] Phase 2 Serverless enrichment complete")
-        except Exception as e:
-            logger.error(f"[Discovery] Phase 2 Serverless enrichment failed: {e}")
-            error_msg = f"Serverless enrichment failed: {str(e)}"
+        else:
+            logger.error(f"[Discovery] Phase 2 Serverless enrichment failed: {error}")
+            error_msg = f"Serverless enrichment failed: {str(error)}"
             summary["errors"].append(error_msg)
             # Attribute only to providers actually present in this serverless run.
             affected_providers = {
@@ -387,18 +526,22 @@ def run_discovery_for_user(user_id, connected_providers):
     logger.info(f"[Discovery] Phase 3 starting for user {user_id}")
 
     try:
-        inferred_edges = run_all_inference(user_id, all_nodes, enrichment_data)
-        summary["phase3_edges"] = write_dependencies(user_id, inferred_edges)
+        inferred_edges, summary["phase3_engines"] = infer_connections(user_id, all_nodes, enrichment_data)
+        summary["phase3_edges"] = graph.write_dependencies(inferred_edges)
         logger.info(f"[Discovery] Phase 3 complete: {summary['phase3_edges']} inferred edges")
     except Exception as e:
         logger.error(f"[Discovery] Phase 3 inference failed: {e}")
         summary["errors"].append(f"Connection inference failed: {str(e)}")
 
+    graph.commit()
+    summary["graph_diff"] = graph.stats
+
     # =====================================================================
     # Summary
     # =====================================================================
     elapsed = time.time() - start_time
     summary["elapsed_seconds"] = round(elapsed, 1)
+    summary["peak_rss_mb"] = _peak_rss_mb()
     total_nodes = summary["phase1_nodes"] + summary["phase2_nodes"]
     total_edges = summary["phase1_relationships"] + summary["phase2_relationships"] + summary["phase3_edges"]
     logger.info(
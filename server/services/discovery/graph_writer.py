@@ -1,14 +1,29 @@
 """
 Graph Writer - Batch writes discovered nodes and edges to Memgraph.
 Used by the discovery orchestrator after each phase completes.
+
+``GraphDiffWriter`` compares each run's inventory against the previous run's
+snapshot (per-node / per-edge fingerprints kept in Redis) and only upserts
+what changed. Unchanged nodes and edges just get their timestamps refreshed
+so stale-service pruning keeps working. Anything the snapshot claims exists
+but Memgraph no longer has is upserted in full.
 """
 
+import hashlib
+import json
 import logging
+import os
 
-from services.graph.memgraph_client import get_memgraph_client
+from services.graph.memgraph_client import get_memgraph_client, service_node_id
 
 logger = logging.getLogger(__name__)
 
+# The snapshot expires so every node is fully rewritten at least this often.
+DISCOVERY_SNAPSHOT_TTL_SECONDS = int(os.getenv("DISCOVERY_SNAPSHOT_TTL_SECONDS", str(24 * 3600)))
+_SNAPSHOT_KEY = "discovery:graph_snapshot:{user_id}:{kind}"
+_SNAPSHOT_WRITE_CHUNK = 1000
+_EDGE_SEPARATOR = "\x1f"
+
 
 def write_services(user_id, services):
     """Batch upsert service nodes into Memgraph.
@@ -45,3 +60,147 @@ def write_dependencies(user_id, dependencies):
     count = client.batch_upsert_dependencies(user_id, dependencies)
     logger.info(f"Graph Writer: upserted {count}/{len(dependencies)} dependencies for user {user_id}")
     return count
+
+
+def _fingerprint(item):
+    return hashlib.sha1(json.dumps(item, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _redis():
+    from utils.cache.redis_client import get_redis_client
+
+    return get_redis_client()
+
+
+class GraphDiffWriter:
+    """Writes one discovery run's nodes and edges, upserting only what changed.
+
+    Call ``write_services`` / ``write_dependencies`` as each phase completes,
+    then ``commit()`` to store this run's inventory as the next snapshot.
+    Without Redis every write is a full upsert, as with the module functions.
+    """
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self._previous = {"services": {}, "dependencies": {}}
+        self._current = {"services": {}, "dependencies": {}}
+        self.stats = {
+            "snapshot_loaded": False,
+            "services_changed": 0,
+            "services_unchanged": 0,
+            "dependencies_changed": 0,
+            "dependencies_unchanged": 0,
+        }
+        self._load_snapshot()
+
+    def _key(self, kind):
+        return _SNAPSHOT_KEY.format(user_id=self.user_id, kind=kind)
+
+    def _load_snapshot(self):
+        try:
+            client = _redis()
+            if client is None:
+                return
+            for kind in self._previous:
+                self._previous[kind] = client.hgetall(self._key(kind)) or {}
+            self.stats["snapshot_loaded"] = bool(self._previous["services"])
+        except Exception as e:
+            logger.warning(f"Graph Writer: could not load snapshot for user {self.user_id}: {e}")
+            self._previous = {"services": {}, "dependencies": {}}
+
+    def _split(self, kind, keyed_items):
+        """Partition (key, item) pairs into changed items and unchanged keys."""
+        previous = self._previous[kind]
+        current = self._current[kind]
+        changed, unchanged = [], {}
+        for key, item in keyed_items:
+            fingerprint = _fingerprint(item)
+            if previous.get(key) == fingerprint:
+                unchanged[key] = (item, fingerprint)
+            else:
+                changed.append((key, item, fingerprint))
+        return changed, unchanged, current
+
+    def write_services(self, services):
+        """Upsert changed services and touch unchanged ones. Returns services written."""
+        if not services:
+            return 0
+        keyed = [
+            (service_node_id(self.user_id, svc.get("provider"), svc.get("name")), svc)
+            for svc in services
+        ]
+        changed, unchanged, current = self._split("services", keyed)
+        client = get_memgraph_client()
+
+        if unchanged:
+            present = client.touch_services(self.user_id, list(unchanged))
+            for key in set(unchanged) - present:
+                item, fingerprint = unchanged.pop(key)
+                changed.append((key, item, fingerprint))
+            for key, (_, fingerprint) in unchanged.items():
+                current[key] = fingerprint
+
+        count = len(unchanged)
+        if changed:
+            count += client.batch_upsert_services(self.user_id, [item for _, item, _ in changed])
+            for key, _, fingerprint in changed:
+                current[key] = fingerprint
+
+        self.stats["services_changed"] += len(changed)
+        self.stats["services_unchanged"] += len(unchanged)
+        logger.info(
+            f"Graph Writer: {len(changed)} changed / {len(unchanged)} unchanged services for user {self.user_id}"
+        )
+        return count
+
+    def write_dependencies(self, dependencies):
+        """Upsert changed edges and touch unchanged ones. Returns edges written."""
+        if not dependencies:
+            return 0
+        keyed = [
+            (f"{dep.get('from_service')}{_EDGE_SEPARATOR}{dep.get('to_service')}", dep)
+            for dep in dependencies
+        ]
+        changed, unchanged, current = self._split("dependencies", keyed)
+        client = get_memgraph_client()
+
+        if unchanged:
+            pairs = [tuple(key.split(_EDGE_SEPARATOR, 1)) for key in unchanged]
+            present = {_EDGE_SEPARATOR.join(pair) for pair in client.touch_dependencies(self.user_id, pairs)}
+            for key in set(unchanged) - present:
+                item, fingerprint = unchanged.pop(key)
+                changed.append((key, item, fingerprint))
+            for key, (_, fingerprint) in unchanged.items():
+                current[key] = fingerprint
+
+        count = len(unchanged)
+        if changed:
+            count += client.batch_upsert_dependencies(self.user_id, [item for _, item, _ in changed])
+            for key, _, fingerprint in changed:
+                current[key] = fingerprint
+
+        self.stats["dependencies_changed"] += len(changed)
+        self.stats["dependencies_unchanged"] += len(unchanged)
+        logger.info(
+            f"Graph Writer: {len(changed)} changed / {len(unchanged)} unchanged dependencies for user {self.user_id}"
+        )
+        return count
+
+    def commit(self):
+        """Replace the stored snapshot with everything written in this run."""
+        try:
+            client = _redis()
+            if client is None:
+                return
+            pipe = client.pipeline(transaction=True)
+            for kind, fingerprints in self._current.items():
+                key = self._key(kind)
+                pipe.delete(key)
+                items = list(fingerprints.items())
+                for start in range(0, len(items), _SNAPSHOT_WRITE_CHUNK):
+                    pipe.hset(key, mapping=dict(items[start:start + _SNAPSHOT_WRITE_CHUNK]))
+                if items:
+                    pipe.expire(key, DISCOVERY_SNAPSHOT_TTL_SECONDS)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Graph Writer: could not store snapshot for user {self.user_id}: {e}")
@@ -8,6 +8,8 @@ one of the highest-confidence inference methods.
 
 import logging
 
+from services.discovery.inference.node_lookup import find_node_by_identifier
+
 logger = logging.getLogger(__name__)
 
 
@@ -62,16 +64,7 @@ def _find_node_by_resource_id(graph_nodes, resource_id):
     CloudMap instances often have AWS_INSTANCE_ID or similar attributes
     that map to EC2 instance IDs, ECS task IDs, or EKS pod IPs.
     """
-    if not resource_id:
-        return None
-    resource_id_lower = resource_id.lower()
-    for node in graph_nodes:
-        node_id = (node.get("resource_id") or "").lower()
-        node_arn = (node.get("arn") or "").lower()
-        node_name = (node.get("name") or "").lower()
-        if resource_id_lower in (node_id, node_arn, node_name):
-            return node
-    return None
+    return find_node_by_identifier(graph_nodes, resource_id)
 
 
 def _resolve_instance_to_node(instance, graph_nodes, ip_index):
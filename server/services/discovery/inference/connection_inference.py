@@ -7,6 +7,9 @@ discovered_from lists.
 """
 
 import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 from services.discovery.inference import (
     gcp_relationship_inference,
@@ -21,9 +24,12 @@ from services.discovery.inference import (
     cloudmap_inference,
     network_proximity_inference,
 )
+from services.discovery.inference.node_lookup import build_node_index
 
 logger = logging.getLogger(__name__)
 
+DISCOVERY_INFERENCE_WORKERS = int(os.getenv("DISCOVERY_INFERENCE_WORKERS", "4"))
+
 # Ordered list of (name, module) for all inference methods.
 _INFERENCE_MODULES = [
     ("gcp_relationship", gcp_relationship_inference),
@@ -87,35 +93,47 @@ def _deduplicate_edges(edges):
     return list(edge_map.values())
 
 
-def run_all_inference(user_id, graph_nodes, enrichment_data):
-    """Run all 11 inference methods and deduplicate edges.
+def _run_engine(name, module, user_id, node_index, enrichment_data):
+    started = time.perf_counter()
+    try:
+        edges = module.infer(user_id, node_index, enrichment_data) or []
+        stats = {"edges": len(edges), "seconds": round(time.perf_counter() - started, 3)}
+        logger.info("Inference [%s]: produced %d edges in %.2fs", name, len(edges), stats["seconds"])
+        return edges, stats
+    except Exception as e:
+        logger.exception("Inference [%s] failed", name)
+        return [], {"edges": 0, "seconds": round(time.perf_counter() - started, 3), "error": str(e)}
 
-    Each inference module's infer() function is called independently.
-    If one module fails, the others still run. Results are collected,
-    deduplicated by (from_service, to_service) pair, and returned.
 
-    Args:
-        user_id: The Aurora user ID.
-        graph_nodes: List of discovered graph node dicts from Phase 1.
-        enrichment_data: Dict of enrichment data from Phase 2.
+def infer_connections(user_id, graph_nodes, enrichment_data, max_workers=None):
+    """Run all 11 inference methods on a worker pool and deduplicate edges.
+
+    Engines only read the shared node index and enrichment data. Their edges
+    are combined in ``_INFERENCE_MODULES`` order regardless of completion
+    order, so deduplication is deterministic.
 
     Returns:
-        List of deduplicated dependency edge dicts with highest confidence
-        per edge pair.
+        (deduplicated edges, {engine name: {"edges", "seconds"[, "error"]}})
     """
+    # Built once and shared so every engine resolves references via hash
+    # lookups instead of rescanning the full node list.
+    node_index = build_node_index(graph_nodes)
+
+    with ThreadPoolExecutor(
+        max_workers=max_workers or DISCOVERY_INFERENCE_WORKERS,
+        thread_name_prefix="discovery-inference",
+    ) as executor:
+        futures = [
+            (name, executor.submit(_run_engine, name, module, user_id, node_index, enrichment_data))
+            for name, module in _INFERENCE_MODULES
+        ]
+        results = [(name, future.result()) for name, future in futures]
+
     all_edges = []
-    summary = []
-
-    for name, module in _INFERENCE_MODULES:
-        try:
-            edges = module.infer(user_id, graph_nodes, enrichment_data)
-            edge_count = len(edges) if edges else 0
-            all_edges.extend(edges or [])
-            summary.append(f"{name}={edge_count}")
-            logger.info("Inference [%s]: produced %d edges", name, edge_count)
-        except Exception:
-            logger.exception("Inference [%s] failed", name)
-            summary.append(f"{name}=ERROR")
+    engine_stats = {}
+    for name, (edges, stats) in results:
+        all_edges.extend(edges)
+        engine_stats[name] = stats
 
     # Deduplicate
     deduplicated = _deduplicate_edges(all_edges)
@@ -126,7 +144,29 @@ def run_all_inference(user_id, graph_nodes, enrichment_data):
         user_id,
         len(all_edges),
         len(deduplicated),
-        ", ".join(summary),
+        ", ".join(
+            f"{name}=ERROR" if "error" in stats else f"{name}={stats['edges']} ({stats['seconds']:.2f}s)"
+            for name, stats in engine_stats.items()
+        ),
     )
 
-    return deduplicated
+    return deduplicated, engine_stats
+
+
+def run_all_inference(user_id, graph_nodes, enrichment_data):
+    """Run all 11 inference methods and deduplicate edges.
+
+    Each inference module's infer() function is called independently.
+    If one module fails, the others still run. Results are collected,
+    deduplicated by (from_service, to_service) pair, and returned.
+
+    Args:
+        user_id: The Aurora user ID.
+        graph_nodes: List of discovered graph node dicts from Phase 1.
+        enrichment_data: Dict of enrichment data from Phase 2.
+
+    Returns:
+        List of deduplicated dependency edge dicts with highest confidence
+        per edge pair.
+    """
+    return infer_connections(user_id, graph_nodes, enrichment_data)[0]
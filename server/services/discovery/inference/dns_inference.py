@@ -9,6 +9,8 @@ or hostname, a dependency edge is created from the DNS zone to the target.
 import logging
 from ipaddress import ip_address
 
+from services.discovery.inference.node_lookup import nodes_of_type
+
 logger = logging.getLogger(__name__)
 
 
@@ -85,10 +87,9 @@ def _match_cname_to_node(cname_value, hostname_index):
 def _find_dns_zone_node(zone_name, graph_nodes):
     """Find the graph node corresponding to a DNS hosted zone by name."""
     normalized_zone = _normalize_hostname(zone_name)
-    for node in graph_nodes:
-        if node.get("resource_type") == "dns_zone":
-            if _normalize_hostname(node.get("name")) == normalized_zone:
-                return node["name"]
+    for node in nodes_of_type(graph_nodes, "dns_zone"):
+        if _normalize_hostname(node.get("name")) == normalized_zone:
+            return node["name"]
     return None
 
 
@@ -13,7 +13,11 @@ because IAM permissions are often over-provisioned.
 import json
 import logging
 
-from services.discovery.inference.node_lookup import find_node_by_arn, find_node_by_name
+from services.discovery.inference.node_lookup import (
+    find_node_by_arn,
+    find_node_by_name,
+    nodes_of_type,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -78,11 +82,7 @@ def _extract_arns_from_resource(resource_field):
 
 def _find_compute_nodes(graph_nodes):
     """Return graph nodes that represent compute resources (Lambda, EC2, ECS, etc.)."""
-    compute_types = {"vm", "serverless_function", "kubernetes_cluster"}
-    return [
-        node for node in graph_nodes
-        if node.get("resource_type") in compute_types
-    ]
+    return nodes_of_type(graph_nodes, "vm", "serverless_function", "kubernetes_cluster")
 
 
 def _infer_from_aws_policies(iam_policies, graph_nodes):
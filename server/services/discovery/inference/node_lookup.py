@@ -3,8 +3,138 @@ Shared node lookup utilities for Phase 3 inference modules.
 
 Provides common functions for resolving AWS ARNs, node names, and endpoints
 to graph node names. Used by multiple inference engines to avoid duplication.
+
+The orchestrator wraps the Phase 1 node list in a ``NodeIndex`` once per
+discovery run and hands it to every engine in place of the raw list.  The
+``find_*`` helpers detect the index and answer from its hash maps instead
+of scanning every node; plain lists still work (linear scan) for callers
+that don't build an index.
 """
 
+import threading
+from collections.abc import Sequence
+
+# Endpoint substring lookups use a trigram inverted index; queries shorter
+# than this fall back to a scan.
+_NGRAM = 3
+
+
+class NodeIndex(Sequence):
+    """Read-only view over ``graph_nodes`` with precomputed lookup maps.
+
+    Iterating, indexing and ``len()`` behave exactly like the wrapped list,
+    so engines that walk ``graph_nodes`` directly are unaffected.  Every map
+    keeps the *first* node in list order for a key, matching the result of
+    the linear scans it replaces.
+    """
+
+    def __init__(self, graph_nodes):
+        self._nodes = list(graph_nodes)
+        self.by_name = {}
+        self.by_name_lower = {}
+        self.by_cloud_id_lower = {}
+        self.by_identifier_lower = {}
+        self.by_type = {}
+        self._endpoints = []
+        self._endpoint_grams = None
+        self._endpoint_grams_lock = threading.Lock()
+        self._endpoint_memo = {}
+
+        for node in self._nodes:
+            name = node.get("name")
+            if name:
+                self.by_name.setdefault(name, node)
+                self.by_name_lower.setdefault(name.lower(), node)
+            cloud_id = (node.get("cloud_resource_id") or "").lower()
+            if cloud_id:
+                self.by_cloud_id_lower.setdefault(cloud_id, node)
+            for key in ("resource_id", "arn", "name"):
+                value = (node.get(key) or "").lower()
+                if value:
+                    self.by_identifier_lower.setdefault(value, node)
+            self.by_type.setdefault(node.get("resource_type"), []).append(node)
+            endpoint = (node.get("endpoint") or "").lower()
+            if endpoint:
+                self._endpoints.append((endpoint, node))
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __getitem__(self, item):
+        return self._nodes[item]
+
+    def __iter__(self):
+        return iter(self._nodes)
+
+    def nodes_of_type(self, *resource_types):
+        """Nodes whose resource_type is one of *resource_types*, in list order."""
+        if len(resource_types) == 1:
+            return self.by_type.get(resource_types[0], [])
+        wanted = set(resource_types)
+        return [node for node in self._nodes if node.get("resource_type") in wanted]
+
+    def find_by_endpoint_substring(self, endpoint_lower):
+        """First node (list order) whose lowered endpoint contains the query."""
+        if endpoint_lower in self._endpoint_memo:
+            return self._endpoint_memo[endpoint_lower]
+
+        if len(endpoint_lower) < _NGRAM:
+            candidates = self._endpoints
+        else:
+            candidates = self._endpoint_candidates(endpoint_lower)
+
+        match = None
+        for node_endpoint, node in candidates:
+            if endpoint_lower in node_endpoint:
+                match = node
+                break
+
+        self._endpoint_memo[endpoint_lower] = match
+        return match
+
+    def _endpoint_candidates(self, endpoint_lower):
+        """Endpoint entries sharing every trigram of the query, in list order."""
+        if self._endpoint_grams is None:
+            with self._endpoint_grams_lock:
+                if self._endpoint_grams is None:
+                    self._endpoint_grams = self._build_endpoint_grams()
+
+        postings = []
+        for gram in {endpoint_lower[j:j + _NGRAM] for j in range(len(endpoint_lower) - _NGRAM + 1)}:
+            entries = self._endpoint_grams.get(gram)
+            if not entries:
+                return []
+            postings.append(entries)
+        postings.sort(key=len)
+        candidate_ids = set(postings[0])
+        for entries in postings[1:]:
+            candidate_ids.intersection_update(entries)
+            if not candidate_ids:
+                return []
+        return [self._endpoints[i] for i in sorted(candidate_ids)]
+
+    def _build_endpoint_grams(self):
+        grams = {}
+        for i, (node_endpoint, _) in enumerate(self._endpoints):
+            for gram in {node_endpoint[j:j + _NGRAM] for j in range(len(node_endpoint) - _NGRAM + 1)}:
+                grams.setdefault(gram, []).append(i)
+        return grams
+
+
+def build_node_index(graph_nodes):
+    """Return *graph_nodes* as a ``NodeIndex`` (no-op if it already is one)."""
+    if isinstance(graph_nodes, NodeIndex):
+        return graph_nodes
+    return NodeIndex(graph_nodes)
+
+
+def nodes_of_type(graph_nodes, *resource_types):
+    """Filter *graph_nodes* by resource_type, using the index when available."""
+    if isinstance(graph_nodes, NodeIndex):
+        return graph_nodes.nodes_of_type(*resource_types)
+    wanted = set(resource_types)
+    return [node for node in graph_nodes if node.get("resource_type") in wanted]
+
 
 def extract_name_from_arn(arn):
     """Extract the resource name from an AWS ARN.
@@ -38,6 +168,9 @@ def find_node_by_name(name, graph_nodes):
     if not name:
         return None
     name_lower = name.lower()
+    if isinstance(graph_nodes, NodeIndex):
+        node = graph_nodes.by_name_lower.get(name_lower)
+        return node["name"] if node else None
     for node in graph_nodes:
         if (node.get("name") or "").lower() == name_lower:
             return node["name"]
@@ -60,6 +193,11 @@ def find_node_by_arn(arn, graph_nodes):
     if not arn:
         return None
     arn_lower = arn.lower()
+    if isinstance(graph_nodes, NodeIndex):
+        node = graph_nodes.by_cloud_id_lower.get(arn_lower)
+        if node:
+            return node["name"]
+        return find_node_by_name(extract_name_from_arn(arn), graph_nodes)
     for node in graph_nodes:
         cloud_id = (node.get("cloud_resource_id") or "").lower()
         if cloud_id and cloud_id == arn_lower:
@@ -77,6 +215,8 @@ def find_compute_node(graph_nodes, service_name):
     Returns:
         The matching node dict, or None if not found.
     """
+    if isinstance(graph_nodes, NodeIndex):
+        return graph_nodes.by_name.get(service_name)
     for node in graph_nodes:
         if node.get("name") == service_name:
             return node
@@ -96,8 +236,37 @@ def find_node_by_endpoint(endpoint, graph_nodes):
     if not endpoint:
         return None
     endpoint_lower = endpoint.lower()
+    if isinstance(graph_nodes, NodeIndex):
+        node = graph_nodes.find_by_endpoint_substring(endpoint_lower)
+        return node["name"] if node else None
     for node in graph_nodes:
         node_endpoint = (node.get("endpoint") or "").lower()
         if node_endpoint and (node_endpoint == endpoint_lower or endpoint_lower in node_endpoint):
             return node["name"]
     return None
+
+
+def find_node_by_identifier(graph_nodes, identifier):
+    """Find the first node whose resource_id, arn or name equals *identifier*.
+
+    Case-insensitive.
+
+    Args:
+        graph_nodes: List of graph node dicts (or a ``NodeIndex``).
+        identifier: Instance ID, task ARN, or node name.
+
+    Returns:
+        The matching node dict, or None if not found.
+    """
+    if not identifier:
+        return None
+    identifier_lower = identifier.lower()
+    if isinstance(graph_nodes, NodeIndex):
+        return graph_nodes.by_identifier_lower.get(identifier_lower)
+    for node in graph_nodes:
+        node_id = (node.get("resource_id") or "").lower()
+        node_arn = (node.get("arn") or "").lower()
+        node_name = (node.get("name") or "").lower()
+        if identifier_lower in (node_id, node_arn, node_name):
+            return node
+    return None
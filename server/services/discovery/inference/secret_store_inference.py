@@ -9,7 +9,7 @@ IAM policies, environment variables, and app settings.
 import logging
 import re
 
-from services.discovery.inference.node_lookup import find_compute_node
+from services.discovery.inference.node_lookup import find_compute_node, nodes_of_type
 
 logger = logging.getLogger(__name__)
 
@@ -67,9 +67,8 @@ def _find_secret_store_node(graph_nodes, name_hint, sub_type_hint=None):
         Matching node dict, or None.
     """
     name_lower = name_hint.lower() if name_hint else ""
-    for node in graph_nodes:
-        if node.get("resource_type") != "secret_store":
-            continue
+    secret_stores = nodes_of_type(graph_nodes, "secret_store")
+    for node in secret_stores:
         if sub_type_hint and node.get("sub_type") != sub_type_hint:
             continue
         node_name = (node.get("name") or "").lower()
@@ -78,8 +77,8 @@ def _find_secret_store_node(graph_nodes, name_hint, sub_type_hint=None):
             return node
     # If no specific match, return any secret store of the right sub_type
     if sub_type_hint:
-        for node in graph_nodes:
-            if node.get("resource_type") == "secret_store" and node.get("sub_type") == sub_type_hint:
+        for node in secret_stores:
+            if node.get("sub_type") == sub_type_hint:
                 return node
     return None
 
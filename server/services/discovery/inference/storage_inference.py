@@ -8,7 +8,7 @@ by analyzing environment variables, IAM policies, and event source mappings.
 import logging
 import re
 
-from services.discovery.inference.node_lookup import find_compute_node
+from services.discovery.inference.node_lookup import find_compute_node, nodes_of_type
 
 logger = logging.getLogger(__name__)
 
@@ -58,9 +58,7 @@ def _find_bucket_node(graph_nodes, bucket_name):
     Checks both the node name and any ARN/URI properties for a match.
     """
     bucket_name_lower = bucket_name.lower()
-    for node in graph_nodes:
-        if node.get("resource_type") != "storage_bucket":
-            continue
+    for node in nodes_of_type(graph_nodes, "storage_bucket"):
         node_name = (node.get("name") or "").lower()
         node_arn = (node.get("arn") or "").lower()
         if bucket_name_lower == node_name or bucket_name_lower in node_arn:
@@ -10,6 +10,7 @@ import logging
 import os
 import subprocess
 
+from services.discovery.providers.pages import collect_pages
 from services.discovery.resource_mapper import map_aws_resource
 
 logger = logging.getLogger(__name__)
@@ -211,16 +212,23 @@ def discover(user_id, credentials, env=None):
             - relationships: Empty list (Phase 1 - no relationship inference)
             - errors: List of error message strings
     """
-    nodes = []
-    errors = []
+    return collect_pages(discover_pages(user_id, credentials, env))
+
 
+def discover_pages(user_id, credentials, env=None):
+    """Yield one page dict per Resource Explorer search page.
+
+    Same arguments as discover(). Each page has ``nodes`` and ``errors``;
+    errors that end the search are yielded as a final page.
+    """
     # Validate required credentials
     if not credentials.get("access_key_id") or not credentials.get("secret_access_key"):
-        return {
+        yield {
             "nodes": [],
             "relationships": [],
             "errors": ["AWS credentials missing: access_key_id and secret_access_key are required."],
         }
+        return
 
     env = _build_env(credentials)
 
@@ -233,6 +241,9 @@ def discover(user_id, credentials, env=None):
 
     next_token = None
     page_count = 0
+    node_count = 0
+    error_count = 0
+    errors = []
 
     try:
         while True:
@@ -241,11 +252,15 @@ def discover(user_id, credentials, env=None):
 
             response = _run_resource_explorer_search(env, next_token=next_token)
             resources = response.get("Resources", [])
+            next_token = response.get("NextToken")
+            del response
 
             # Log resource types for debugging
             resource_types = set(r.get("ResourceType", "") for r in resources)
             logger.info("AWS Resource Explorer page %d: %d resources, types: %s", page_count, len(resources), resource_types)
 
+            nodes = []
+            page_errors = []
             for resource in resources:
                 try:
                     node = _resource_to_node(resource)
@@ -254,9 +269,12 @@ def discover(user_id, credentials, env=None):
                 except Exception as e:
                     arn = resource.get("Arn", "unknown")
                     logger.warning("Failed to process AWS resource %s: %s", arn, e)
-                    errors.append(f"Failed to process resource {arn}: {e}")
+                    page_errors.append(f"Failed to process resource {arn}: {e}")
+
+            node_count += len(nodes)
+            error_count += len(page_errors)
+            yield {"nodes": nodes, "relationships": [], "errors": page_errors}
 
-            next_token = response.get("NextToken")
             if not next_token:
                 break
 
@@ -276,16 +294,37 @@ def discover(user_id, credentials, env=None):
             "Install it from https://docs.aws.amazon.com/cli/latest/userguide/install-cliv2.html"
         )
 
+    if errors:
+        yield {"nodes": [], "relationships": [], "errors": errors}
+
     logger.info(
         "AWS discovery complete for user %s: %d nodes, %d errors",
-        user_id, len(nodes), len(errors),
+        user_id, node_count, error_count + len(errors),
     )
 
-    return {
-        "nodes": nodes,
-        "relationships": [],  # Phase 1: no relationship inference from Resource Explorer
-        "errors": errors,
-    }
+
+def discover_account_pages(user_id, acct):
+    """Yield discover_pages() pages for one account from setup_aws_environments_all_accounts().
+
+    Nodes are tagged with ``aws_account_id`` and errors are prefixed with the
+    account ID. A failure is yielded as an error page instead of raised.
+    """
+    account_id = acct["account_id"]
+    try:
+        creds = {
+            "access_key_id": acct["credentials"]["accessKeyId"],
+            "secret_access_key": acct["credentials"]["secretAccessKey"],
+            "session_token": acct["credentials"]["sessionToken"],
+            "region": acct["region"],
+        }
+        for page in discover_pages(user_id, creds):
+            for node in page.get("nodes", []):
+                node["aws_account_id"] = account_id
+            page["errors"] = [f"[{account_id}] {err}" for err in page.get("errors", [])]
+            yield page
+    except Exception as e:
+        logger.error("Discovery failed for account %s: %s", account_id, e)
+        yield {"nodes": [], "relationships": [], "errors": [f"[{account_id}] Discovery failed: {e}"]}
 
 
 def discover_all_accounts(user_id, account_envs):
@@ -304,35 +343,19 @@ def discover_all_accounts(user_id, account_envs):
     merged_nodes = []
     merged_errors = []
 
-    def _discover_one(acct):
-        creds = {
-            "access_key_id": acct["credentials"]["accessKeyId"],
-            "secret_access_key": acct["credentials"]["secretAccessKey"],
-            "session_token": acct["credentials"]["sessionToken"],
-            "region": acct["region"],
-        }
-        result = discover(user_id, creds)
-        account_id = acct["account_id"]
-        for node in result.get("nodes", []):
-            node["aws_account_id"] = account_id
-        result["errors"] = [f"[{account_id}] {err}" for err in result.get("errors", [])]
-        return result
-
     if not account_envs:
         return {"nodes": [], "relationships": [], "errors": []}
 
     max_workers = min(len(account_envs), 10)
     with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as pool:
-        futures = {pool.submit(_discover_one, acct): acct["account_id"] for acct in account_envs}
+        futures = [
+            pool.submit(collect_pages, discover_account_pages(user_id, acct))
+            for acct in account_envs
+        ]
         for future in concurrent.futures.as_completed(futures):
-            account_id = futures[future]
-            try:
-                result = future.result()
-                merged_nodes.extend(result.get("nodes", []))
-                merged_errors.extend(result.get("errors", []))
-            except Exception as e:
-                logger.error("Discovery failed for account %s: %s", account_id, e)
-                merged_errors.append(f"[{account_id}] Discovery failed: {e}")
+            result = future.result()
+            merged_nodes.extend(result.get("nodes", []))
+            merged_errors.extend(result.get("errors", []))
 
     logger.info(
         "Multi-account AWS discovery complete for user %s: %d nodes across %d accounts, %d errors",
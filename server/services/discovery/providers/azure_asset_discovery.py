@@ -10,6 +10,7 @@ import json
 import logging
 import subprocess
 
+from services.discovery.providers.pages import collect_pages
 from services.discovery.resource_mapper import map_azure_resource
 
 logger = logging.getLogger(__name__)
@@ -20,6 +21,8 @@ RESOURCE_GRAPH_QUERY = (
     "| project name, type, location, resourceGroup, subscriptionId, "
     "properties, tags, identity, sku, kind"
 )
+# Rows per Resource Graph page (the API maximum).
+RESOURCE_GRAPH_PAGE_SIZE = 1000
 
 
 def discover(user_id, credentials, env=None):
@@ -38,60 +41,60 @@ def discover(user_id, credentials, env=None):
             relationships: Empty list (Phase 1 does not infer relationships).
             errors: List of error message strings encountered during discovery.
     """
-    nodes = []
-    errors = []
+    return collect_pages(discover_pages(user_id, credentials, env))
+
+
+def discover_pages(user_id, credentials, env=None):
+    """Yield one page dict (nodes, errors) per Resource Graph result page.
+
+    Same arguments as discover(). A query failure is yielded as a final
+    error page; pages already yielded are kept.
+    """
+    resource_count = 0
+    node_count = 0
+    error_count = 0
 
     try:
-        resources = _query_resource_graph(credentials)
+        for resources in _query_resource_graph(credentials):
+            nodes = []
+            errors = []
+            for resource in resources:
+                try:
+                    node = _resource_to_node(resource)
+                    if node is not None:
+                        nodes.append(node)
+                except Exception as exc:
+                    resource_name = resource.get("name", "<unknown>")
+                    resource_type = resource.get("type", "<unknown>")
+                    msg = f"Failed to process Azure resource {resource_name} ({resource_type}): {exc}"
+                    logger.warning(msg)
+                    errors.append(msg)
+            resource_count += len(resources)
+            node_count += len(nodes)
+            error_count += len(errors)
+            yield {"nodes": nodes, "relationships": [], "errors": errors}
     except ResourceGraphExtensionError as exc:
         logger.error("Azure Resource Graph extension not installed: %s", exc)
-        return {
-            "nodes": [],
-            "relationships": [],
-            "errors": [str(exc)],
-        }
+        yield {"nodes": [], "relationships": [], "errors": [str(exc)]}
+        return
     except subprocess.CalledProcessError as exc:
         stderr = exc.stderr or ""
         logger.error("Azure CLI failed (exit %d): %s", exc.returncode, stderr)
-        return {
-            "nodes": [],
-            "relationships": [],
-            "errors": [f"Azure CLI query failed: {stderr}"],
-        }
+        yield {"nodes": [], "relationships": [], "errors": [f"Azure CLI query failed: {stderr}"]}
+        return
     except Exception as exc:
         logger.error("Unexpected error during Azure discovery: %s", exc, exc_info=True)
-        return {
-            "nodes": [],
-            "relationships": [],
-            "errors": [f"Azure discovery error: {exc}"],
-        }
-
-    for resource in resources:
-        try:
-            node = _resource_to_node(resource)
-            if node is not None:
-                nodes.append(node)
-        except Exception as exc:
-            resource_name = resource.get("name", "<unknown>")
-            resource_type = resource.get("type", "<unknown>")
-            msg = f"Failed to process Azure resource {resource_name} ({resource_type}): {exc}"
-            logger.warning(msg)
-            errors.append(msg)
+        yield {"nodes": [], "relationships": [], "errors": [f"Azure discovery error: {exc}"]}
+        return
 
     logger.info(
         "Azure discovery for user %s: found %d resources, mapped %d nodes, %d errors",
         user_id,
-        len(resources),
-        len(nodes),
-        len(errors),
+        resource_count,
+        node_count,
+        error_count,
     )
 
-    return {
-        "nodes": nodes,
-        "relationships": [],
-        "errors": errors,
-    }
-
 
 class ResourceGraphExtensionError(Exception):
     """Raised when the Azure Resource Graph CLI extension is not installed."""
@@ -99,14 +102,15 @@ class ResourceGraphExtensionError(Exception):
 
 
 def _query_resource_graph(credentials):
-    """Execute an Azure Resource Graph query via the Azure CLI.
+    """Execute an Azure Resource Graph query via the Azure CLI, page by page.
 
     Args:
         credentials: Dict with optional subscription_id, tenant_id,
                      client_id, client_secret.
 
-    Returns:
-        List of resource dicts from Resource Graph.
+    Yields:
+        Lists of resource dicts from Resource Graph, one per result page of
+        up to RESOURCE_GRAPH_PAGE_SIZE rows.
 
     Raises:
         ResourceGraphExtensionError: If the resource-graph extension is missing.
@@ -115,49 +119,60 @@ def _query_resource_graph(credentials):
     # Azure CLI requires an explicit login — env vars alone are not enough.
     _az_login(credentials)
 
-    cmd = [
+    base_cmd = [
         "az", "graph", "query",
         "-q", RESOURCE_GRAPH_QUERY,
+        "--first", str(RESOURCE_GRAPH_PAGE_SIZE),
         "--output", "json",
     ]
 
     subscription_id = credentials.get("subscription_id")
     if subscription_id:
-        cmd.extend(["--subscriptions", subscription_id])
+        base_cmd.extend(["--subscriptions", subscription_id])
 
-    try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=120,
-            check=True,
-        )
-    except FileNotFoundError:
-        raise ResourceGraphExtensionError(
-            "Azure CLI (az) is not installed or not found on PATH. "
-            "Install it from https://learn.microsoft.com/en-us/cli/azure/install-azure-cli"
-        )
-    except subprocess.CalledProcessError as exc:
-        stderr = (exc.stderr or "").lower()
-        if "resource-graph" in stderr or "'graph' is not" in stderr:
+    skip_token = None
+    while True:
+        cmd = base_cmd + (["--skip-token", skip_token] if skip_token else [])
+        try:
+            result = subprocess.run(
+                cmd,
+                capture_output=True,
+                text=True,
+                timeout=120,
+                check=True,
+            )
+        except FileNotFoundError:
             raise ResourceGraphExtensionError(
-                "Azure Resource Graph CLI extension is not installed. "
-                "Run: az extension add --name resource-graph"
+                "Azure CLI (az) is not installed or not found on PATH. "
+                "Install it from https://learn.microsoft.com/en-us/cli/azure/install-azure-cli"
             )
-        raise
+        except subprocess.CalledProcessError as exc:
+            stderr = (exc.stderr or "").lower()
+            if "resource-graph" in stderr or "'graph' is not" in stderr:
+                raise ResourceGraphExtensionError(
+                    "Azure Resource Graph CLI extension is not installed. "
+                    "Run: az extension add --name resource-graph"
+                )
+            raise
 
-    try:
-        output = json.loads(result.stdout)
-    except json.JSONDecodeError as exc:
-        raise ValueError(f"Failed to parse Azure CLI JSON output: {exc}")
-
-    # Resource Graph returns results under a "data" key
-    if isinstance(output, dict):
-        return output.get("data", output.get("Data", []))
-    if isinstance(output, list):
-        return output
-    return []
+        try:
+            output = json.loads(result.stdout)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"Failed to parse Azure CLI JSON output: {exc}")
+        del result
+
+        # Resource Graph returns results under a "data" key, with a
+        # skip token when more pages remain
+        if isinstance(output, dict):
+            yield output.get("data", output.get("Data", []))
+            skip_token = output.get("skip_token") or output.get("$skipToken")
+            if not skip_token:
+                return
+        elif isinstance(output, list):
+            yield output
+            return
+        else:
+            return
 
 
 def _az_login(credentials):
@@ -10,6 +10,7 @@ import json
 import logging
 import subprocess
 
+from services.discovery.providers.pages import collect_pages
 from services.discovery.resource_mapper import map_gcp_resource, GCP_RELATIONSHIP_TYPE_MAP
 
 logger = logging.getLogger(__name__)
@@ -486,6 +487,14 @@ def discover(user_id, credentials, env=None):
             - relationships: List of dependency edge dicts.
             - errors: List of error message strings.
     """
+    return collect_pages(discover_pages(user_id, credentials, env))
+
+
+def discover_pages(user_id, credentials, env=None):
+    """Yield one page dict (nodes, relationships, errors) per GCP project.
+
+    Same arguments as discover().
+    """
     # Support both single project_id and multi-project project_ids
     project_ids = credentials.get("project_ids") or []
     if not project_ids:
@@ -494,40 +503,36 @@ def discover(user_id, credentials, env=None):
             project_ids = [single]
 
     if not project_ids:
-        return {
+        yield {
             "nodes": [],
             "relationships": [],
             "errors": ["Missing required credential: project_id or project_ids"],
         }
+        return
 
     logger.info(
         f"Starting GCP Asset Inventory discovery for {len(project_ids)} project(s) "
         f"(user: {user_id}): {project_ids}"
     )
 
-    all_nodes = []
-    all_relationships = []
-    all_errors = []
+    node_count = 0
+    relationship_count = 0
+    error_count = 0
     auth_args = _build_gcloud_env(credentials)
 
     for project_id in project_ids:
         logger.info(f"Discovering project '{project_id}'...")
         nodes, relationships, errors = _discover_project(project_id, auth_args, env=env)
-        all_nodes.extend(nodes)
-        all_relationships.extend(relationships)
-        all_errors.extend(errors)
+        node_count += len(nodes)
+        relationship_count += len(relationships)
+        error_count += len(errors)
         logger.info(
             f"Project '{project_id}': {len(nodes)} nodes, "
             f"{len(relationships)} relationships, {len(errors)} errors"
         )
+        yield {"nodes": nodes, "relationships": relationships, "errors": errors}
 
     logger.info(
         f"GCP Asset discovery complete for {len(project_ids)} project(s): "
-        f"{len(all_nodes)} nodes, {len(all_relationships)} relationships, {len(all_errors)} errors"
+        f"{node_count} nodes, {relationship_count} relationships, {error_count} errors"
     )
-
-    return {
-        "nodes": all_nodes,
-        "relationships": all_relationships,
-        "errors": all_errors,
-    }
@@ -19,6 +19,7 @@ from services.discovery.enrichment.kubernetes_enrichment import (
     _extract_ingress_node,
     _build_relationships,
 )
+from services.discovery.providers.pages import collect_pages
 
 logger = logging.getLogger(__name__)
 
@@ -188,47 +189,54 @@ def discover(user_id, credentials, env=None):
     Returns:
         Dict with keys: nodes (list), relationships (list), errors (list).
     """
-    all_nodes = []
-    all_relationships = []
-    all_errors = []
+    return collect_pages(discover_pages(user_id, credentials, env))
 
+
+def discover_pages(user_id, credentials, env=None):
+    """Yield one page dict (nodes, relationships, errors) per cluster.
+
+    Same arguments as discover().
+    """
     clusters = credentials.get("clusters", [])
     if not clusters:
         logger.info("kubectl discovery: no connected clusters")
-        return {"nodes": [], "relationships": [], "errors": []}
+        return
 
     logger.info(
         f"kubectl discovery: discovering {len(clusters)} clusters for user {user_id}"
     )
 
+    node_count = 0
+    relationship_count = 0
+    error_count = 0
+
     for cluster_info in clusters:
         cluster_id = cluster_info.get("cluster_id")
         cluster_name = cluster_info.get("cluster_name", cluster_id)
 
         if not cluster_id:
-            all_errors.append("kubectl discovery: cluster entry missing cluster_id")
+            error_count += 1
+            yield {"errors": ["kubectl discovery: cluster entry missing cluster_id"]}
             continue
 
         try:
             nodes, relationships, errors = _discover_cluster(
                 user_id, cluster_id, cluster_name
             )
-            all_nodes.extend(nodes)
-            all_relationships.extend(relationships)
-            all_errors.extend(errors)
         except Exception as e:
             error_msg = f"kubectl discovery failed for cluster {cluster_name}: {e}"
             logger.exception(error_msg)
-            all_errors.append(error_msg)
+            error_count += 1
+            yield {"errors": [error_msg]}
+            continue
+
+        node_count += len(nodes)
+        relationship_count += len(relationships)
+        error_count += len(errors)
+        yield {"nodes": nodes, "relationships": relationships, "errors": errors}
 
     logger.info(
         f"kubectl discovery complete for user {user_id}: "
-        f"{len(all_nodes)} nodes, {len(all_relationships)} relationships, "
-        f"{len(all_errors)} errors"
+        f"{node_count} nodes, {relationship_count} relationships, "
+        f"{error_count} errors"
     )
-
-    return {
-        "nodes": all_nodes,
-        "relationships": all_relationships,
-        "errors": all_errors,
-    }
@@ -0,0 +1,39 @@
+"""
+Discovery Pages - Helpers for the paged Phase 1 provider interface.
+
+Providers that can stream expose ``discover_pages(user_id, credentials, env)``,
+a generator of page dicts with keys ``nodes``, ``relationships`` and
+``errors`` (any may be missing). Their ``discover()`` keeps returning one
+merged dict by collecting the pages.
+"""
+
+
+def collect_pages(pages):
+    """Merge an iterable of page dicts into a single discovery result dict."""
+    nodes = []
+    relationships = []
+    errors = []
+    for page in pages:
+        nodes.extend(page.get("nodes", []))
+        relationships.extend(page.get("relationships", []))
+        errors.extend(page.get("errors", []))
+    return {
+        "nodes": nodes,
+        "relationships": relationships,
+        "errors": errors,
+    }
+
+
+def iter_provider_pages(module, user_id, credentials, env=None):
+    """Page iterator for any provider module, paged or not.
+
+    Providers without ``discover_pages`` produce a single page holding their
+    whole ``discover()`` result. Nothing runs until the iterator is first
+    advanced, so the provider's work (and any exception it raises) happens
+    in whichever thread consumes the pages.
+    """
+    discover_pages = getattr(module, "discover_pages", None)
+    if discover_pages is not None:
+        yield from discover_pages(user_id, credentials, env)
+    else:
+        yield module.discover(user_id, credentials, env)
@@ -35,6 +35,11 @@ def get_memgraph_client():
     return _client_instance
 
 
+def service_node_id(user_id, provider, name):
+    """Primary key of a Service node."""
+    return f"{user_id}:{provider}:{name}"
+
+
 class MemgraphClient:
     """Encapsulates all Memgraph Cypher queries for the Aurora dependency graph."""
 
@@ -170,6 +175,8 @@ class MemgraphClient:
         params = self._build_service_row(user_id, name, provider, svc_data)
         params["user_id"] = user_id
         results = self._execute(query, params)
+        if results:
+            self._notify_topology("note_services_upserted", user_id, [(params["id"], name)])
         return self._node_to_dict(results[0]["s"]) if results else None
 
     def batch_upsert_services(self, user_id, services):
@@ -230,10 +237,10 @@ class MemgraphClient:
         """
         try:
             results = self._execute(query, {"user_id": user_id, "services": rows})
-            return results[0]["total"] if results else 0
+            total = results[0]["total"] if results else 0
         except Exception as e:
             logger.error(f"Batch upsert services failed: {e}, falling back to individual inserts")
-            count = 0
+            total = 0
             for svc in services:
                 try:
                     self.upsert_service(
@@ -243,10 +250,43 @@ class MemgraphClient:
                         provider=svc["provider"],
                         **{k: v for k, v in svc.items() if k not in ("name", "resource_type", "provider")},
                     )
-                    count += 1
+                    total += 1
                 except Exception as e2:
                     logger.warning(f"Failed to upsert service {svc.get('name')}: {e2}")
-            return count
+        self._notify_topology(
+            "note_services_upserted", user_id, [(row["id"], row["name"]) for row in rows]
+        )
+        return total
+
+    def touch_services(self, user_id, service_ids):
+        """Refresh updated_at on existing services without rewriting them.
+
+        Used for nodes whose discovered properties did not change, so stale
+        pruning still sees them. Returns the set of ids that exist.
+        """
+        if not service_ids:
+            return set()
+        query = """
+        UNWIND $ids AS id
+        MATCH (s:Service {id: id, user_id: $user_id})
+        SET s.updated_at = localDateTime()
+        RETURN collect(s.id) AS ids;
+        """
+        results = self._execute(query, {"user_id": user_id, "ids": list(service_ids)})
+        return set(results[0]["ids"]) if results else set()
+
+    def touch_dependencies(self, user_id, pairs):
+        """Refresh last_seen on existing DEPENDS_ON edges; returns the (from, to) pairs that exist."""
+        if not pairs:
+            return set()
+        query = """
+        UNWIND $pairs AS pair
+        MATCH (a:Service {user_id: $user_id, name: pair[0]})-[r:DEPENDS_ON]->(b:Service {user_id: $user_id, name: pair[1]})
+        SET r.last_seen = localDateTime()
+        RETURN collect(DISTINCT [a.name, b.name]) AS pairs;
+        """
+        results = self._execute(query, {"user_id": user_id, "pairs": [list(p) for p in pairs]})
+        return {tuple(p) for p in results[0]["pairs"]} if results else set()
 
     def get_service(self, user_id, name):
         """Get a single service by name with its direct dependencies."""
@@ -290,7 +330,10 @@ class MemgraphClient:
         RETURN count(s) AS deleted;
         """
         results = self._execute(query, {"user_id": user_id, "name": name})
-        return results[0]["deleted"] > 0 if results else False
+        deleted = results[0]["deleted"] > 0 if results else False
+        if deleted:
+            self._notify_topology("invalidate_topology", user_id)
+        return deleted
 
     def find_service_by_endpoint(self, user_id, endpoint):
         """Look up a service by its connection endpoint."""
@@ -350,6 +393,8 @@ class MemgraphClient:
             "discovered_from": discovered_list,
         }
         results = self._execute(query, params)
+        if results:
+            self._notify_topology("invalidate_topology", user_id)
         return results[0] if results else None
 
     def batch_upsert_dependencies(self, user_id, deps):
@@ -398,7 +443,13 @@ class MemgraphClient:
         """
         try:
             results = self._execute(query, {"user_id": user_id, "deps": rows})
-            return results[0]["total"] if results else 0
+            total = results[0]["total"] if results else 0
+            self._notify_topology(
+                "note_dependencies_upserted",
+                user_id,
+                [(row["from_service"], row["to_service"]) for row in rows],
+            )
+            return total
         except Exception as e:
             logger.error(f"Batch upsert dependencies failed: {e}, falling back to individual inserts")
             count = 0
@@ -416,6 +467,7 @@ class MemgraphClient:
                         count += 1
                 except Exception as e2:
                     logger.warning(f"Failed to upsert dependency {dep}: {e2}")
+            self._notify_topology("invalidate_topology", user_id)
             return count
 
     def get_dependencies(self, user_id, service_name, direction="both"):
@@ -447,7 +499,10 @@ class MemgraphClient:
         RETURN count(r) AS deleted;
         """
         results = self._execute(query, {"from_id": from_id, "to_id": to_id})
-        return results[0]["deleted"] > 0 if results else False
+        removed = results[0]["deleted"] > 0 if results else False
+        if removed:
+            self._notify_topology("invalidate_topology", user_id)
+        return removed
 
     # =========================================================================
     # Graph Traversal
@@ -747,6 +802,25 @@ class MemgraphClient:
         edges = self._execute(edges_query, {"user_id": user_id})
         return {"nodes": nodes, "edges": edges}
 
+    def get_topology(self, user_id):
+        """Returns the bare DEPENDS_ON structure used by topology snapshots.
+
+        ``(nodes, edges)`` where nodes are ``(id, name)`` and edges are
+        ``(from_id, to_id)`` tuples.
+        """
+        nodes_query = """
+        MATCH (s:Service {user_id: $user_id})
+        RETURN s.id AS id, s.name AS name;
+        """
+        edges_query = """
+        MATCH (a:Service {user_id: $user_id})-[:DEPENDS_ON]->(b:Service {user_id: $user_id})
+        RETURN a.id AS source, b.id AS target;
+        """
+        params = {"user_id": user_id}
+        nodes = [(r["id"], r["name"]) for r in self._execute(nodes_query, params)]
+        edges = [(r["source"], r["target"]) for r in self._execute(edges_query, params)]
+        return nodes, edges
+
     def get_graph_stats(self, user_id):
         """Returns graph statistics."""
         query = """
@@ -790,6 +864,8 @@ class MemgraphClient:
             "[MemgraphClient] Deleted %d Service nodes for user=%s provider=%s",
             deleted, sanitize(user_id), sanitize(provider),
         )
+        if deleted:
+            self._notify_topology("invalidate_topology", user_id)
         return deleted
 
     def delete_services_for_cluster(self, user_id, cluster_name):
@@ -809,6 +885,8 @@ class MemgraphClient:
             "[MemgraphClient] Deleted %d Service nodes for user=%s cluster=%s",
             deleted, sanitize(user_id), sanitize(cluster_name),
         )
+        if deleted:
+            self._notify_topology("invalidate_topology", user_id)
         return deleted
 
     def delete_services_for_aws_account(self, user_id, aws_account_id):
@@ -828,6 +906,8 @@ class MemgraphClient:
             "[MemgraphClient] Deleted %d Service nodes for user=%s aws_account=%s",
             deleted, sanitize(user_id), sanitize(aws_account_id),
         )
+        if deleted:
+            self._notify_topology("invalidate_topology", user_id)
         return deleted
 
     def mark_stale_services(self, user_id, stale_days=7):
@@ -860,6 +940,8 @@ class MemgraphClient:
             "[MemgraphClient] Deleted %d stale Service nodes (>%dd) for user=%s",
             deleted, stale_days, sanitize(user_id),
         )
+        if deleted:
+            self._notify_topology("invalidate_topology", user_id)
         return deleted
 
     # =========================================================================
@@ -877,6 +959,16 @@ class MemgraphClient:
         results = self._execute(query, {"user_id": user_id, "name": service_name_or_id})
         return results[0]["id"] if results else None
 
+    @staticmethod
+    def _notify_topology(hook, user_id, *args):
+        """Propagate a write to topology snapshots; never fails the write."""
+        try:
+            from services.graph import topology_snapshot
+
+            getattr(topology_snapshot, hook)(user_id, *args)
+        except Exception as e:
+            logger.debug(f"Topology snapshot hook {hook} failed: {e}")
+
     @staticmethod
     def _node_to_dict(node):
         """Convert a Memgraph node to a plain dict with JSON-safe values."""
@@ -908,7 +1000,7 @@ class MemgraphClient:
         """Build the property dict shared by upsert_service and batch_upsert_services."""
         metadata = svc.get("metadata", {})
         return {
-            "id": f"{user_id}:{provider}:{name}",
+            "id": service_node_id(user_id, provider, name),
             "name": name,
             "display_name": svc.get("display_name", name),
             "resource_type": svc.get("resource_type", ""),
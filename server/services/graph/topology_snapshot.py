@@ -0,0 +1,353 @@
+"""
+In-process topology snapshots for bounded-depth dependency lookups.
+
+Each worker keeps a compiled, integer-indexed copy of a user's DEPENDS_ON
+graph in CSR form (forward = upstream, reverse = downstream) so that hot
+paths such as alert correlation answer "what is within N hops of X" with a
+local BFS instead of a Memgraph traversal.
+
+Freshness follows the same scheme as the Casbin enforcer: every graph
+write bumps a per-user Redis version counter.  A reader compares the
+counter with its snapshot's version and rebuilds from Memgraph only on a
+mismatch.  The worker that performs a write patches its own snapshot in
+place so it never has to refetch its own changes.
+"""
+
+import logging
+import os
+import threading
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from cachetools import LRUCache
+
+from utils.cache.redis_client import get_redis_client
+from utils.log_sanitizer import sanitize
+
+logger = logging.getLogger(__name__)
+
+TOPOLOGY_VERSION_KEY_PREFIX = "topology_version"
+# Used only when Redis is unreachable: snapshots older than this are rebuilt.
+TOPOLOGY_SNAPSHOT_MAX_AGE_SECONDS = int(os.getenv("TOPOLOGY_SNAPSHOT_MAX_AGE_SECONDS", "60"))
+TOPOLOGY_SNAPSHOT_MAX_USERS = int(os.getenv("TOPOLOGY_SNAPSHOT_MAX_USERS", "256"))
+# Patched edges live in a side overlay; fold them into the CSR arrays once
+# the overlay grows past this many edges.
+_OVERLAY_COMPACT_THRESHOLD = 4096
+
+
+def _version_key(user_id: str) -> str:
+    return f"{TOPOLOGY_VERSION_KEY_PREFIX}:{user_id}"
+
+
+def _build_csr(node_count: int, edges: Sequence[Tuple[int, int]]) -> Tuple[array, array]:
+    """Return ``(offsets, targets)`` for a directed edge list."""
+    offsets = array("i", [0]) * (node_count + 1)
+    for src, _ in edges:
+        offsets[src + 1] += 1
+    for i in range(node_count):
+        offsets[i + 1] += offsets[i]
+    targets = array("i", [0]) * len(edges)
+    cursor = array("i", offsets[:-1]) if node_count else array("i")
+    for src, dst in edges:
+        targets[cursor[src]] = dst
+        cursor[src] += 1
+    return offsets, targets
+
+
+class TopologySnapshot:
+    """Immutable-core CSR adjacency for one user's dependency graph.
+
+    Nodes are addressed by dense integer index; several nodes may share a
+    name (the same name under different providers), in which case lookups
+    by name start from all of them.
+    """
+
+    __slots__ = (
+        "version",
+        "built_at",
+        "_names",
+        "_ids",
+        "_by_name",
+        "_by_id",
+        "_fwd_offsets",
+        "_fwd_targets",
+        "_rev_offsets",
+        "_rev_targets",
+        "_fwd_extra",
+        "_rev_extra",
+        "_edges",
+        "_overlay_edges",
+        "_lock",
+    )
+
+    def __init__(
+        self,
+        nodes: Iterable[Tuple[str, str]],
+        edges: Iterable[Tuple[str, str]],
+        version: Optional[str] = None,
+    ):
+        """Build from ``(id, name)`` node pairs and ``(from_id, to_id)`` edges."""
+        self.version = version
+        self.built_at = time.monotonic()
+        self._names: List[str] = []
+        self._ids: List[str] = []
+        self._by_name: Dict[str, List[int]] = {}
+        self._by_id: Dict[str, int] = {}
+        for node_id, name in nodes:
+            self._add_node(node_id, name)
+
+        edge_set = set()
+        for src_id, dst_id in edges:
+            src = self._by_id.get(src_id)
+            dst = self._by_id.get(dst_id)
+            if src is not None and dst is not None:
+                edge_set.add((src, dst))
+        self._edges: List[Tuple[int, int]] = sorted(edge_set)
+        self._overlay_edges = 0
+        self._fwd_extra: Dict[int, List[int]] = {}
+        self._rev_extra: Dict[int, List[int]] = {}
+        self._lock = threading.Lock()
+        self._compile()
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    @property
+    def node_count(self) -> int:
+        return len(self._names)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self._edges)
+
+    def upstream(self, service_name: str, max_depth: int = 3) -> Dict[str, int]:
+        """Services *service_name* depends on, as ``{name: min_depth}``."""
+        with self._lock:
+            return self._bfs(
+                service_name, max_depth, self._fwd_offsets, self._fwd_targets, self._fwd_extra
+            )
+
+    def downstream(self, service_name: str, max_depth: int = 3) -> Dict[str, int]:
+        """Services that depend on *service_name*, as ``{name: min_depth}``."""
+        with self._lock:
+            return self._bfs(
+                service_name, max_depth, self._rev_offsets, self._rev_targets, self._rev_extra
+            )
+
+    # ------------------------------------------------------------------
+    # In-place patching (used by the writing worker)
+    # ------------------------------------------------------------------
+
+    def add_services(self, services: Iterable[Tuple[str, str]]) -> None:
+        """Register ``(id, name)`` nodes that may later gain edges."""
+        with self._lock:
+            added = False
+            for node_id, name in services:
+                if node_id not in self._by_id:
+                    self._add_node(node_id, name)
+                    added = True
+            if added:
+                # CSR offsets are sized by node count; new nodes start with
+                # no CSR edges and live in the overlay until compaction.
+                pad = self.node_count + 1 - len(self._fwd_offsets)
+                tail_fwd = self._fwd_offsets[-1]
+                tail_rev = self._rev_offsets[-1]
+                self._fwd_offsets.extend([tail_fwd] * pad)
+                self._rev_offsets.extend([tail_rev] * pad)
+
+    def add_dependencies(self, deps: Iterable[Tuple[str, str]]) -> int:
+        """Add ``(from_name, to_name)`` edges; returns how many were new.
+
+        Mirrors ``batch_upsert_dependencies``, which matches endpoints by
+        name, so one name pair may connect several node pairs.
+        """
+        with self._lock:
+            existing = set(self._edges)
+            new_edges = []
+            for from_name, to_name in deps:
+                for src in self._by_name.get(from_name, ()):
+                    for dst in self._by_name.get(to_name, ()):
+                        if (src, dst) not in existing:
+                            existing.add((src, dst))
+                            new_edges.append((src, dst))
+            for src, dst in new_edges:
+                self._fwd_extra.setdefault(src, []).append(dst)
+                self._rev_extra.setdefault(dst, []).append(src)
+                self._edges.append((src, dst))
+            self._overlay_edges += len(new_edges)
+            if self._overlay_edges > _OVERLAY_COMPACT_THRESHOLD:
+                self._compile()
+            return len(new_edges)
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _add_node(self, node_id: str, name: str) -> None:
+        idx = len(self._names)
+        self._names.append(name)
+        self._ids.append(node_id)
+        self._by_id[node_id] = idx
+        self._by_name.setdefault(name, []).append(idx)
+
+    def _compile(self) -> None:
+        n = self.node_count
+        self._fwd_offsets, self._fwd_targets = _build_csr(n, self._edges)
+        self._rev_offsets, self._rev_targets = _build_csr(
+            n, [(dst, src) for src, dst in self._edges]
+        )
+        self._fwd_extra = {}
+        self._rev_extra = {}
+        self._overlay_edges = 0
+
+    def _bfs(
+        self,
+        service_name: str,
+        max_depth: int,
+        offsets: array,
+        targets: array,
+        extra: Dict[int, List[int]],
+    ) -> Dict[str, int]:
+        seeds = self._by_name.get(service_name)
+        if not seeds:
+            return {}
+        seen = set(seeds)
+        frontier = list(seeds)
+        found: Dict[str, int] = {}
+        names = self._names
+        for depth in range(1, max_depth + 1):
+            next_frontier = []
+            for node in frontier:
+                for i in range(offsets[node], offsets[node + 1]):
+                    nbr = targets[i]
+                    if nbr not in seen:
+                        seen.add(nbr)
+                        next_frontier.append(nbr)
+                for nbr in extra.get(node, ()):
+                    if nbr not in seen:
+                        seen.add(nbr)
+                        next_frontier.append(nbr)
+            for node in next_frontier:
+                found.setdefault(names[node], depth)
+            if not next_frontier:
+                break
+            frontier = next_frontier
+        found.pop(service_name, None)
+        return found
+
+
+# ---------------------------------------------------------------------------
+# Per-worker snapshot registry
+# ---------------------------------------------------------------------------
+
+_snapshots: "LRUCache[str, TopologySnapshot]" = LRUCache(maxsize=TOPOLOGY_SNAPSHOT_MAX_USERS)
+_snapshots_lock = threading.Lock()
+
+
+def _read_version(user_id: str) -> Optional[str]:
+    """Current Redis version for *user_id*; None when Redis is unavailable."""
+    try:
+        redis_client = get_redis_client()
+        if not redis_client:
+            return None
+        return str(redis_client.get(_version_key(user_id)) or "0")
+    except Exception as e:
+        logger.debug("Topology version lookup failed: %s", e)
+        return None
+
+
+def _is_fresh(snapshot: TopologySnapshot, version: Optional[str]) -> bool:
+    if version is None:
+        age = time.monotonic() - snapshot.built_at
+        return age < TOPOLOGY_SNAPSHOT_MAX_AGE_SECONDS
+    return snapshot.version == version
+
+
+def get_topology_snapshot(user_id: str) -> Optional[TopologySnapshot]:
+    """Return a current snapshot for *user_id*, rebuilding it if stale.
+
+    Returns None when the graph cannot be loaded, so callers can fall back
+    to querying Memgraph directly.
+    """
+    version = _read_version(user_id)
+    with _snapshots_lock:
+        snapshot = _snapshots.get(user_id)
+    if snapshot is not None and _is_fresh(snapshot, version):
+        return snapshot
+
+    try:
+        from services.graph.memgraph_client import get_memgraph_client
+
+        nodes, edges = get_memgraph_client().get_topology(user_id)
+        snapshot = TopologySnapshot(nodes, edges, version=version)
+    except Exception:
+        logger.warning(
+            "Failed to build topology snapshot for user=%s", sanitize(user_id), exc_info=True
+        )
+        return None
+
+    with _snapshots_lock:
+        _snapshots[user_id] = snapshot
+    logger.info(
+        "Built topology snapshot for user=%s (version=%s, nodes=%d, edges=%d)",
+        sanitize(user_id), version, snapshot.node_count, snapshot.edge_count,
+    )
+    return snapshot
+
+
+def _bump_version(user_id: str) -> Tuple[Optional[str], Optional[str]]:
+    """Increment the Redis version; returns ``(previous, new)`` or ``(None, None)``."""
+    try:
+        redis_client = get_redis_client()
+        if not redis_client:
+            return None, None
+        new_version = int(redis_client.incr(_version_key(user_id)))
+        return str(new_version - 1), str(new_version)
+    except Exception as e:
+        logger.debug("Topology version bump failed: %s", e)
+        return None, None
+
+
+def _patch_or_drop(user_id: str, patch) -> None:
+    """Bump the version and patch the local snapshot if it was current.
+
+    If the local snapshot was behind (another worker wrote meanwhile) it is
+    dropped instead, and the next read rebuilds it from Memgraph.
+    """
+    previous, new = _bump_version(user_id)
+    with _snapshots_lock:
+        snapshot = _snapshots.get(user_id)
+        if snapshot is None:
+            return
+        if new is None or snapshot.version != previous:
+            _snapshots.pop(user_id, None)
+            return
+        patch(snapshot)
+        snapshot.version = new
+
+
+def note_services_upserted(user_id: str, services: Iterable[Tuple[str, str]]) -> None:
+    """Record that ``(id, name)`` services were written for *user_id*."""
+    services = list(services)
+    _patch_or_drop(user_id, lambda snapshot: snapshot.add_services(services))
+
+
+def note_dependencies_upserted(user_id: str, deps: Iterable[Tuple[str, str]]) -> None:
+    """Record that ``(from_name, to_name)`` DEPENDS_ON edges were written."""
+    deps = list(deps)
+    _patch_or_drop(user_id, lambda snapshot: snapshot.add_dependencies(deps))
+
+
+def invalidate_topology(user_id: str) -> None:
+    """Record a destructive change (deletes); every worker rebuilds on next read."""
+    _bump_version(user_id)
+    with _snapshots_lock:
+        _snapshots.pop(user_id, None)
+
+
+def clear_topology_snapshots() -> None:
+    """Drop all local snapshots (tests and fork hooks)."""
+    with _snapshots_lock:
+        _snapshots.clear()
@@ -0,0 +1,418 @@
+"""Hourly and daily rollups behind the SRE metrics dashboard.
+
+The dashboard routes used to aggregate the full requested period of
+``incidents`` / ``jenkins_deployment_events`` on every load. Instead, the
+``refresh_incident_metric_rollups`` beat task (services/metrics/tasks.py)
+maintains per-org rollup rows in ``incident_metric_rollups``. Routes then
+answer a query from three kinds of segment:
+
+- ``day`` rollups for whole days below the org's watermark,
+- ``hour`` rollups for whole hours at either end of those days,
+- raw rows for the partial hour at the start of the period and for
+  everything at or above the watermark (the current, still-open hour plus
+  whatever the task has not reached yet).
+
+Counts and means are exact. Percentiles come from log-spaced histogram
+buckets (see ``_HIST_GAMMA``) and are within about 1% of PERCENTILE_CONT.
+
+Change failure rate stores, per deploy bucket, how many deploys had their
+first non-merged incident on the same service within N hours (N rounded up).
+Any window up to ``CFR_MAX_WINDOW_HOURS`` can therefore be answered from
+rollups. Larger windows fall back to raw rows.
+
+Rollups lag edits to older rows until the next task run. A DB trigger
+records the affected hour buckets in ``incident_metric_dirty_buckets`` and
+the task rebuilds those days.
+"""
+
+import math
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+HOUR = timedelta(hours=1)
+DAY = timedelta(days=1)
+
+# Largest change-failure window (hours) answerable from rollups.
+CFR_MAX_WINDOW_HOURS = 168
+
+# Ratio between consecutive histogram bucket bounds. A value is reported as the
+# bucket's geometric midpoint, so the relative error is at most (g - 1) / (g + 1).
+_HIST_GAMMA = 1.02
+_LOG_GAMMA = math.log(_HIST_GAMMA)
+
+ROLLUPS_TABLE = "incident_metric_rollups"
+STATE_TABLE = "incident_metric_rollup_state"
+DIRTY_TABLE = "incident_metric_dirty_buckets"
+
+# Dirty-bucket sources written by the DB triggers.
+SOURCE_INCIDENTS = "incidents"
+SOURCE_DEPLOYS = "deploys"
+
+# Row shape shared by raw reads and rollup reads: (timestamp, dims, aggregate).
+Row = Tuple[datetime, tuple, "Aggregate"]
+
+
+def floor_hour(ts: datetime) -> datetime:
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def ceil_hour(ts: datetime) -> datetime:
+    floored = floor_hour(ts)
+    return floored if floored == ts else floored + HOUR
+
+
+def floor_day(ts: datetime) -> datetime:
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def ceil_day(ts: datetime) -> datetime:
+    floored = floor_day(ts)
+    return floored if floored == ts else floored + DAY
+
+
+def _hist_key(seconds: float) -> int:
+    """Histogram bucket for a duration. Sub-second and negative values share bucket 0."""
+    return int(math.floor(math.log(max(seconds, 1.0)) / _LOG_GAMMA))
+
+
+def _hist_value(key: int) -> float:
+    """Representative value of a histogram bucket [g^k, g^(k+1))."""
+    return 2 * _HIST_GAMMA ** (key + 1) / (1 + _HIST_GAMMA)
+
+
+@dataclass
+class Aggregate:
+    """Mergeable aggregate for one rollup bucket.
+
+    For duration metrics ``histogram`` maps log-bucket -> count. For deploys it
+    maps "hours until the first incident, rounded up" -> count.
+    """
+
+    count: int = 0
+    sum_seconds: float = 0.0
+    sum_to_rca_seconds: float = 0.0
+    sum_rca_to_resolve_seconds: float = 0.0
+    histogram: Dict[int, int] = field(default_factory=dict)
+
+    def add_duration(self, seconds, to_rca=None, rca_to_resolve=None) -> None:
+        seconds = float(seconds)
+        self.count += 1
+        self.sum_seconds += seconds
+        if to_rca is not None:
+            self.sum_to_rca_seconds += float(to_rca)
+        if rca_to_resolve is not None:
+            self.sum_rca_to_resolve_seconds += float(rca_to_resolve)
+        key = _hist_key(seconds)
+        self.histogram[key] = self.histogram.get(key, 0) + 1
+
+    def add_deploy(self, first_incident_delay) -> None:
+        self.count += 1
+        if first_incident_delay is not None:
+            key = max(0, math.ceil(float(first_incident_delay) / 3600))
+            self.histogram[key] = self.histogram.get(key, 0) + 1
+
+    def merge(self, other: "Aggregate") -> None:
+        self.count += other.count
+        self.sum_seconds += other.sum_seconds
+        self.sum_to_rca_seconds += other.sum_to_rca_seconds
+        self.sum_rca_to_resolve_seconds += other.sum_rca_to_resolve_seconds
+        for key, n in other.histogram.items():
+            self.histogram[key] = self.histogram.get(key, 0) + n
+
+    def mean(self, total: Optional[float] = None) -> Optional[float]:
+        if not self.count:
+            return None
+        return (self.sum_seconds if total is None else total) / self.count
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Estimate PERCENTILE_CONT(q), interpolating between neighbouring ranks."""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        lo = int(math.floor(rank))
+        v_lo = self._value_at(lo)
+        frac = rank - lo
+        if not frac:
+            return v_lo
+        return v_lo + (self._value_at(lo + 1) - v_lo) * frac
+
+    def _value_at(self, rank: int) -> float:
+        seen = 0
+        key = 0
+        for key in sorted(self.histogram):
+            seen += self.histogram[key]
+            if seen > rank:
+                break
+        return _hist_value(key)
+
+    def failures_within(self, hours: int) -> int:
+        """Deploys whose first incident started within ``hours`` of the deploy."""
+        return sum(n for key, n in self.histogram.items() if key <= hours)
+
+
+@dataclass(frozen=True)
+class RollupMetric:
+    name: str
+    source: str
+    kind: str                   # "count" | "duration" | "deploy"
+    ts_column: str
+    dim_columns: Dict[str, str]  # rollup dim column -> raw SQL expression
+    raw_query: str              # selects ts, dims..., measures...; takes {where}
+
+    @property
+    def dims(self) -> Tuple[str, ...]:
+        return tuple(self.dim_columns)
+
+
+STARTED = RollupMetric(
+    name="started",
+    source=SOURCE_INCIDENTS,
+    kind="count",
+    ts_column="started_at",
+    dim_columns={
+        "severity": "severity",
+        "service": "alert_service",
+        "source_type": "source_type",
+        "merged": "(status = 'merged')",
+    },
+    raw_query="""
+        SELECT started_at, severity, alert_service, source_type, (status = 'merged')
+        FROM incidents
+        WHERE {where}
+    """,
+)
+
+MTTR = RollupMetric(
+    name="mttr",
+    source=SOURCE_INCIDENTS,
+    kind="duration",
+    ts_column="resolved_at",
+    dim_columns={"severity": "severity", "service": "alert_service"},
+    raw_query="""
+        SELECT
+            resolved_at, severity, alert_service,
+            EXTRACT(EPOCH FROM (resolved_at - started_at)),
+            EXTRACT(EPOCH FROM (COALESCE(analyzed_at, resolved_at) - started_at)),
+            EXTRACT(EPOCH FROM (resolved_at - COALESCE(analyzed_at, started_at)))
+        FROM incidents
+        WHERE resolved_at IS NOT NULL
+          AND status = 'resolved'
+          AND {where}
+    """,
+)
+
+MTTS = RollupMetric(
+    name="mtts",
+    source=SOURCE_INCIDENTS,
+    kind="duration",
+    ts_column="analyzed_at",
+    dim_columns={"severity": "severity", "service": "alert_service"},
+    raw_query="""
+        SELECT analyzed_at, severity, alert_service, EXTRACT(EPOCH FROM (analyzed_at - started_at))
+        FROM incidents
+        WHERE analyzed_at IS NOT NULL
+          AND {where}
+    """,
+)
+
+MTTD = RollupMetric(
+    name="mttd",
+    source=SOURCE_INCIDENTS,
+    kind="duration",
+    ts_column="started_at",
+    dim_columns={"source_type": "source_type"},
+    raw_query="""
+        SELECT started_at, source_type, EXTRACT(EPOCH FROM (investigation_started_at - started_at))
+        FROM incidents
+        WHERE investigation_started_at IS NOT NULL
+          AND investigation_started_at >= started_at
+          AND {where}
+    """,
+)
+
+# Delay from each deploy to the first non-merged incident on the same service,
+# looking ahead at most %(lookahead)s hours (NULL when there is none).
+DEPLOYS = RollupMetric(
+    name="deploys",
+    source=SOURCE_DEPLOYS,
+    kind="deploy",
+    ts_column="d.received_at",
+    dim_columns={"service": "d.service"},
+    raw_query="""
+        SELECT
+            d.received_at, d.service,
+            (
+                SELECT MIN(EXTRACT(EPOCH FROM (i.started_at - d.received_at)))
+                FROM incidents i
+                WHERE i.alert_service = d.service
+                  AND i.started_at BETWEEN d.received_at
+                      AND d.received_at + make_interval(hours => %(lookahead)s)
+                  AND i.status != 'merged'
+            )
+        FROM jenkins_deployment_events d
+        WHERE {where}
+    """,
+)
+
+INCIDENT_METRICS = (STARTED, MTTR, MTTS, MTTD)
+ALL_METRICS = INCIDENT_METRICS + (DEPLOYS,)
+
+
+def plan_segments(
+    start: datetime, now: datetime, watermark: Optional[datetime]
+) -> List[Tuple[str, datetime, Optional[datetime]]]:
+    """Split ``[start, ∞)`` into raw, hour-rollup and day-rollup segments.
+
+    Rollups are complete for buckets below ``watermark``. The last segment is
+    always raw and open-ended so rows stamped after ``now`` are still counted,
+    matching the ``>= NOW() - interval`` queries this replaces.
+    """
+    if watermark is None:
+        return [("raw", start, None)]
+    hi = min(floor_hour(watermark), floor_hour(now))
+    lo = ceil_hour(start)
+    if hi <= lo:
+        return [("raw", start, None)]
+
+    segments: List[Tuple[str, datetime, Optional[datetime]]] = []
+    if start < lo:
+        segments.append(("raw", start, lo))
+    day_lo, day_hi = ceil_day(lo), floor_day(hi)
+    if day_lo < day_hi:
+        if lo < day_lo:
+            segments.append(("hour", lo, day_lo))
+        segments.append(("day", day_lo, day_hi))
+        if day_hi < hi:
+            segments.append(("hour", day_hi, hi))
+    else:
+        segments.append(("hour", lo, hi))
+    segments.append(("raw", hi, None))
+    return segments
+
+
+def _filter_sql(metric: RollupMetric, filters: Dict[str, str], *, raw: bool) -> Tuple[str, dict]:
+    clauses, params = [], {}
+    for dim, value in filters.items():
+        column = metric.dim_columns[dim] if raw else dim
+        clauses.append(f"{column} = %(f_{dim})s")
+        params[f"f_{dim}"] = value
+    return "".join(f" AND {c}" for c in clauses), params
+
+
+def fetch_raw(
+    cursor,
+    metric: RollupMetric,
+    start: datetime,
+    end: Optional[datetime],
+    filters: Optional[Dict[str, str]] = None,
+    lookahead_hours: int = CFR_MAX_WINDOW_HOURS,
+) -> Iterator[Row]:
+    """Yield one single-row aggregate per raw row with ``start <= ts < end``."""
+    where = f"{metric.ts_column} >= %(start)s"
+    params = {"start": start, "lookahead": lookahead_hours}
+    if end is not None:
+        where += f" AND {metric.ts_column} < %(end)s"
+        params["end"] = end
+    filter_sql, filter_params = _filter_sql(metric, filters or {}, raw=True)
+    params.update(filter_params)
+    cursor.execute(metric.raw_query.format(where=where + filter_sql), params)
+
+    n_dims = len(metric.dim_columns)
+    for row in cursor.fetchall():
+        agg = Aggregate()
+        measures = row[1 + n_dims:]
+        if metric.kind == "duration":
+            agg.add_duration(*measures)
+        elif metric.kind == "deploy":
+            agg.add_deploy(measures[0])
+        else:
+            agg.count = 1
+        yield row[0], tuple(row[1:1 + n_dims]), agg
+
+
+def fetch_rollups(
+    cursor,
+    metric: RollupMetric,
+    grain: str,
+    start: datetime,
+    end: datetime,
+    filters: Optional[Dict[str, str]] = None,
+) -> Iterator[Row]:
+    """Yield stored rollup rows of one grain with ``start <= bucket_start < end``."""
+    filter_sql, params = _filter_sql(metric, filters or {}, raw=False)
+    params.update({"metric": metric.name, "grain": grain, "start": start, "end": end})
+    cursor.execute(
+        f"""
+        SELECT bucket_start, {", ".join(metric.dims)}, count, sum_seconds,
+               sum_to_rca_seconds, sum_rca_to_resolve_seconds, histogram
+        FROM {ROLLUPS_TABLE}
+        WHERE metric = %(metric)s AND grain = %(grain)s
+          AND bucket_start >= %(start)s AND bucket_start < %(end)s{filter_sql}
+        """,
+        params,
+    )
+    n_dims = len(metric.dims)
+    for row in cursor.fetchall():
+        count, sum_s, sum_rca, sum_res, histogram = row[1 + n_dims:]
+        agg = Aggregate(
+            count=count,
+            sum_seconds=sum_s or 0.0,
+            sum_to_rca_seconds=sum_rca or 0.0,
+            sum_rca_to_resolve_seconds=sum_res or 0.0,
+            histogram={int(k): n for k, n in (histogram or {}).items()},
+        )
+        yield row[0], tuple(row[1:1 + n_dims]), agg
+
+
+def read_clock(cursor, org_id: str) -> Tuple[datetime, Optional[datetime]]:
+    """Return the DB's current local timestamp and the org's rollup watermark."""
+    cursor.execute(
+        f"SELECT LOCALTIMESTAMP, (SELECT rolled_up_to FROM {STATE_TABLE} WHERE org_id = %s)",
+        (org_id,),
+    )
+    now, watermark = cursor.fetchone()
+    return now, watermark
+
+
+def collect(
+    cursor,
+    metric: RollupMetric,
+    start: datetime,
+    now: datetime,
+    watermark: Optional[datetime],
+    filters: Optional[Dict[str, str]] = None,
+    lookahead_hours: int = CFR_MAX_WINDOW_HOURS,
+) -> Iterator[Row]:
+    """Yield rows covering ``[start, ∞)`` from rollups where possible, raw otherwise."""
+    if lookahead_hours > CFR_MAX_WINDOW_HOURS:
+        watermark = None
+    for source, seg_start, seg_end in plan_segments(start, now, watermark):
+        if source == "raw":
+            yield from fetch_raw(cursor, metric, seg_start, seg_end, filters, lookahead_hours)
+        else:
+            yield from fetch_rollups(cursor, metric, source, seg_start, seg_end, filters)
+
+
+def fold(rows: Iterable[Row], key: Callable[[datetime, tuple], object]) -> Dict[object, Aggregate]:
+    """Merge rows by ``key(ts, dims)``. Rows whose key is None are dropped."""
+    out: Dict[object, Aggregate] = {}
+    for ts, dims, agg in rows:
+        k = key(ts, dims)
+        if k is None:
+            continue
+        if k not in out:
+            out[k] = Aggregate()
+        out[k].merge(agg)
+    return out
+
+
+def build_buckets(rows: Iterable[Row]) -> Dict[Tuple[str, datetime, tuple], Aggregate]:
+    """Fold raw rows into ``(grain, bucket_start, dims)`` hour and day buckets."""
+    out: Dict[Tuple[str, datetime, tuple], Aggregate] = {}
+    for ts, dims, agg in rows:
+        for key in (("hour", floor_hour(ts), dims), ("day", floor_day(ts), dims)):
+            if key not in out:
+                out[key] = Aggregate()
+            out[key].merge(agg)
+    return out
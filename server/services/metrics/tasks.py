@@ -0,0 +1,205 @@
+"""Celery beat task that maintains the SRE metrics rollups (see rollups.py)."""
+
+import json
+import logging
+from datetime import datetime
+from typing import Iterable, List, Optional, Set, Tuple
+
+from psycopg2.extras import execute_values
+
+from celery_config import celery_app
+from services.metrics.rollups import (
+    CFR_MAX_WINDOW_HOURS,
+    DAY,
+    DEPLOYS,
+    DIRTY_TABLE,
+    HOUR,
+    INCIDENT_METRICS,
+    ROLLUPS_TABLE,
+    SOURCE_DEPLOYS,
+    SOURCE_INCIDENTS,
+    STATE_TABLE,
+    RollupMetric,
+    build_buckets,
+    fetch_raw,
+    floor_day,
+    floor_hour,
+)
+from utils.auth.stateless_auth import set_rls_context
+from utils.db.connection_pool import db_pool
+
+logger = logging.getLogger(__name__)
+
+_LOG_PREFIX = "[MetricRollups]"
+
+_ALL_DIMS = ("severity", "service", "source_type", "merged")
+
+
+def _days_between(start: datetime, end: datetime) -> Set[datetime]:
+    """Day buckets overlapping ``[start, end)``."""
+    days = set()
+    day = floor_day(start)
+    while day < end:
+        days.add(day)
+        day += DAY
+    return days
+
+
+def _day_runs(days: Iterable[datetime]) -> List[Tuple[datetime, datetime]]:
+    """Merge day buckets into contiguous ``[start, end)`` ranges."""
+    runs: List[Tuple[datetime, datetime]] = []
+    for day in sorted(days):
+        if runs and runs[-1][1] == day:
+            runs[-1] = (runs[-1][0], day + DAY)
+        else:
+            runs.append((day, day + DAY))
+    return runs
+
+
+def _earliest_activity(cursor) -> Optional[datetime]:
+    cursor.execute("""
+        SELECT LEAST(
+            (SELECT MIN(started_at) FROM incidents),
+            (SELECT MIN(analyzed_at) FROM incidents),
+            (SELECT MIN(resolved_at) FROM incidents),
+            (SELECT MIN(received_at) FROM jenkins_deployment_events)
+        )
+    """)
+    return cursor.fetchone()[0]
+
+
+def _rebuild(cursor, org_id: str, metric: RollupMetric, start: datetime, end: datetime, limit: datetime) -> None:
+    """Replace the metric's hour and day rollups for ``[start, end)``.
+
+    Only raw rows below ``limit`` (the new watermark) are folded in, so a day
+    that is still in progress gets a partial row that routes ignore until the
+    watermark passes it.
+    """
+    buckets = build_buckets(fetch_raw(cursor, metric, start, min(end, limit)))
+    cursor.execute(
+        f"DELETE FROM {ROLLUPS_TABLE} "
+        "WHERE org_id = %s AND metric = %s AND bucket_start >= %s AND bucket_start < %s",
+        (org_id, metric.name, start, end),
+    )
+    if not buckets:
+        return
+    dims = metric.dims
+    rows = []
+    for (grain, bucket_start, key), agg in buckets.items():
+        values = dict(zip(dims, key))
+        rows.append((
+            org_id, metric.name, grain, bucket_start,
+            *(values.get(d) for d in _ALL_DIMS),
+            agg.count, agg.sum_seconds, agg.sum_to_rca_seconds, agg.sum_rca_to_resolve_seconds,
+            json.dumps(agg.histogram),
+        ))
+    execute_values(
+        cursor,
+        f"""
+        INSERT INTO {ROLLUPS_TABLE} (
+            org_id, metric, grain, bucket_start, severity, service, source_type, merged,
+            count, sum_seconds, sum_to_rca_seconds, sum_rca_to_resolve_seconds, histogram
+        ) VALUES %s
+        """,
+        rows,
+    )
+
+
+def refresh_org_rollups(cursor, org_id: str) -> int:
+    """Advance one org's rollups to the current hour and rebuild dirty days.
+
+    Runs inside the caller's transaction with RLS already set for ``org_id``.
+    Returns the number of day buckets rebuilt, or -1 when another worker holds
+    the org's refresh lock.
+    """
+    cursor.execute(
+        "SELECT pg_try_advisory_xact_lock(hashtext(%s))", (f"{ROLLUPS_TABLE}:{org_id}",)
+    )
+    if not cursor.fetchone()[0]:
+        return -1
+
+    cursor.execute("SELECT LOCALTIMESTAMP")
+    new_watermark = floor_hour(cursor.fetchone()[0])
+
+    cursor.execute(f"SELECT rolled_up_to FROM {STATE_TABLE} WHERE org_id = %s", (org_id,))
+    state = cursor.fetchone()
+    old_watermark = state[0] if state else None
+    if old_watermark is None:
+        earliest = _earliest_activity(cursor)
+        old_watermark = floor_hour(earliest) if earliest else new_watermark
+
+    # Markers are deleted by id rather than wholesale: an edit committed while
+    # this rebuild runs inserts a new marker that must survive for the next run.
+    cursor.execute(
+        f"SELECT id, source, bucket_start FROM {DIRTY_TABLE} WHERE org_id = %s", (org_id,)
+    )
+    markers = cursor.fetchall()
+
+    advanced = _days_between(old_watermark, new_watermark)
+    incident_days = set(advanced)
+    deploy_days = set(advanced)
+    lookback = CFR_MAX_WINDOW_HOURS * HOUR
+    for _id, source, bucket_start in markers:
+        if bucket_start >= new_watermark:
+            continue
+        if source == SOURCE_INCIDENTS:
+            incident_days.add(floor_day(bucket_start))
+            # An incident can flip the failure status of any deploy it follows
+            # within the largest supported CFR window.
+            deploy_days |= _days_between(bucket_start - lookback, bucket_start + HOUR)
+        elif source == SOURCE_DEPLOYS:
+            deploy_days.add(floor_day(bucket_start))
+    deploy_days = {d for d in deploy_days if d < new_watermark}
+
+    for start, end in _day_runs(incident_days):
+        for metric in INCIDENT_METRICS:
+            _rebuild(cursor, org_id, metric, start, end, new_watermark)
+    for start, end in _day_runs(deploy_days):
+        _rebuild(cursor, org_id, DEPLOYS, start, end, new_watermark)
+
+    cursor.execute(
+        f"""
+        INSERT INTO {STATE_TABLE} (org_id, rolled_up_to, updated_at)
+        VALUES (%s, %s, CURRENT_TIMESTAMP)
+        ON CONFLICT (org_id) DO UPDATE
+        SET rolled_up_to = EXCLUDED.rolled_up_to, updated_at = EXCLUDED.updated_at
+        """,
+        (org_id, new_watermark),
+    )
+    if markers:
+        cursor.execute(
+            f"DELETE FROM {DIRTY_TABLE} WHERE id = ANY(%s)", ([m[0] for m in markers],)
+        )
+    return len(incident_days | deploy_days)
+
+
+@celery_app.task(name="services.metrics.tasks.refresh_incident_metric_rollups")
+def refresh_incident_metric_rollups():
+    """Refresh metric rollups for every org.
+
+    The rollup and incident tables are RLS-protected, so we iterate per-org
+    (one transaction each) to satisfy row-level security policies.
+    """
+    try:
+        with db_pool.get_admin_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "SELECT DISTINCT ON (org_id) id, org_id "
+                    "FROM users WHERE org_id IS NOT NULL "
+                    "ORDER BY org_id, id"
+                )
+                org_reps = cur.fetchall()
+                for user_id, org_id in org_reps:
+                    if not set_rls_context(cur, conn, user_id, log_prefix=_LOG_PREFIX):
+                        continue
+                    try:
+                        rebuilt = refresh_org_rollups(cur, org_id)
+                        conn.commit()
+                    except Exception:
+                        conn.rollback()
+                        logger.exception("%s Failed to refresh rollups for org %s", _LOG_PREFIX, org_id)
+                        continue
+                    if rebuilt > 0:
+                        logger.info("%s Rebuilt %d day bucket(s) for org %s", _LOG_PREFIX, rebuilt, org_id)
+    except Exception:
+        logger.exception("%s Failed to refresh metric rollups", _LOG_PREFIX)
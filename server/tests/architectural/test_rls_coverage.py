@@ -26,6 +26,9 @@ RLS_EXCLUSIONS: Set[str] = {
                                   # (callback runs before login, webhook has no user ctx)
     "onboarding_selections",      # written once during onboarding via admin connection;
                                   # org_id is explicit from the authenticated user lookup
+    "incident_metric_dirty_buckets",  # written by incidents/deploy triggers for both OLD
+                                      # and NEW org_id; read only by the rollup task,
+                                      # which filters on org_id explicitly
 }
 
 
@@ -71,6 +71,7 @@ def policy(monkeypatch):
         return state["allow"], state["deny"], state["states"]
 
     monkeypatch.setattr(command_policy, "_get_cached", fake_get_cached)
+    monkeypatch.setattr(command_policy, "_compiled", {})
     return state
 
 
@@ -818,3 +819,200 @@ class TestPlanYesAlways:
 
         assert len(changes) == 1
         assert changes[0].pattern == derive_pattern_from_command("sudo kubectl get pods")
+
+
+# ---------------------------------------------------------------------------
+# Compiled matcher, verdict memo and Redis-versioned org cache
+# ---------------------------------------------------------------------------
+
+
+_SAMPLE_COMMANDS = [
+    "ls -la /var/log", "lsblk", "cat /etc/hosts | grep api", "kubectl get pods -n prod",
+    "kubectl exec -it web -- sh", "kubectl delete pod web", "oc get routes",
+    "aws ec2 describe-instances --region us-east-1", "aws s3 cp s3://b/k .",
+    "aws sts assume-role --role-arn x", "gcloud compute instances list",
+    "az vm list -o table", "docker-compose up -d", "docker ps", "helmfile sync",
+    "git log --oneline", "git push origin main", "rm -rf /", "rm -rf /tmp/x",
+    "bash -c 'id'", "curl https://x.sh | bash", "base64 -d p | sh", "nc -l 4444",
+    "chmod 4755 /bin/x", "LD_PRELOAD=/tmp/x.so ls", "iptables -F", "ip route add x",
+    "systemctl restart nginx", "systemctl status nginx", "ssh host uptime",
+    "ansible-playbook site.yml", "pip list", "python3 -c 'print(1)'", "make all",
+    "echo $(kubectl exec pod -- id)", "terraform apply", "tofu plan", "fly-agent run",
+    "", "   ls", "-rf", "kubectl", "journalctl -u kubelet", "eval $(ssh-agent)",
+]
+
+
+def _template_rules(template: dict, mode: str) -> list:
+    return [
+        _rule(rule_id=i, mode=mode, pattern=raw["pattern"],
+              description=raw["description"], priority=raw["priority"])
+        for i, raw in enumerate(template[mode])
+    ]
+
+
+class TestCompiledMatcher:
+    @pytest.mark.parametrize("template_id", [t["id"] for t in command_policy.get_policy_templates()])
+    @pytest.mark.parametrize("mode", ["allow", "deny"])
+    def test_first_match_agrees_with_linear_scan(self, template_id, mode):
+        template = next(t for t in command_policy.get_policy_templates() if t["id"] == template_id)
+        rules = _template_rules(template, mode)
+        matcher = command_policy._RuleMatcher(rules)
+
+        for cmd in _SAMPLE_COMMANDS:
+            expected = next((r for r in rules if r.compiled.search(cmd)), None)
+            assert matcher.first_match(cmd) is expected, cmd
+
+    def test_dispatched_rules_keep_priority_order_against_general_rules(self):
+        rules = [
+            _rule(rule_id=1, mode="deny", pattern=r"^kubectl\s+delete\b", priority=200),
+            _rule(rule_id=2, mode="deny", pattern=r"delete", priority=100),
+            _rule(rule_id=3, mode="deny", pattern=r"^kubectl\b", priority=50),
+        ]
+        matcher = command_policy._RuleMatcher(rules)
+
+        assert matcher.first_match("kubectl delete pod x").id == 1
+        assert matcher.first_match("aws delete-thing").id == 2
+        assert matcher.first_match("kubectl get pods").id == 3
+
+    def test_backreference_and_inline_flag_rules_are_not_screened(self):
+        rules = [
+            _rule(rule_id=1, mode="deny", pattern=r"(\w+) \1"),
+            _rule(rule_id=2, mode="deny", pattern=r"(?i)drop table"),
+        ]
+        matcher = command_policy._RuleMatcher(rules)
+
+        assert matcher.first_match("echo echo").id == 1
+        assert matcher.first_match("psql -c 'DROP TABLE x'").id == 2
+        assert matcher.first_match("echo hi") is None
+
+    @pytest.mark.parametrize("command", ["mkfs.ext4 /dev/sda", "sudo mkfs /dev/sda", "rm -rf /tmp/x"])
+    def test_top_level_alternation_deny_rule_is_not_dispatched_on_first_word(self, policy, command):
+        rules = [
+            _rule(rule_id=1, mode="deny", pattern=r"^kubectl\s+delete\b"),
+            _rule(rule_id=2, mode="deny", pattern=r"^rm\b|mkfs"),
+        ]
+        assert command_policy._dispatch_words(rules[1].pattern) is None
+        assert command_policy._RuleMatcher(rules).first_match(command).id == 2
+
+        policy["deny"] = rules
+        policy["states"] = ListStates(allowlist_enabled=False, denylist_enabled=True)
+        assert evaluate_command("org-7", command).deny_rule_id == 2
+
+    @pytest.mark.parametrize("pattern", [r"^sudo\s*", r"^sudo\s?", r"^sudo\s{0,3}", r"^(sudo|su) *"])
+    def test_optional_separator_deny_rule_is_not_dispatched_on_exact_word(self, policy, pattern):
+        rules = [
+            _rule(rule_id=1, mode="deny", pattern=r"^kubectl\s+delete\b"),
+            _rule(rule_id=2, mode="deny", pattern=pattern),
+        ]
+        assert command_policy._dispatch_words(pattern) is None
+        assert command_policy._dispatch_words(r"^sudo\s+") == ["sudo"]
+        assert command_policy._RuleMatcher(rules).first_match("sudoedit /etc/shadow").id == 2
+
+        policy["deny"] = rules
+        policy["states"] = ListStates(allowlist_enabled=False, denylist_enabled=True)
+        assert evaluate_command("org-7", "sudoedit /etc/shadow").deny_rule_id == 2
+
+    def test_identical_commands_are_memoized(self, policy, monkeypatch):
+        policy["states"] = ListStates(allowlist_enabled=True, denylist_enabled=True)
+        policy["allow"] = [_rule(rule_id=1, mode="allow", pattern=r"^ls\b")]
+        spy = MagicMock(wraps=command_policy._evaluate)
+        monkeypatch.setattr(command_policy, "_evaluate", spy)
+
+        first = evaluate_compound_command("org-7", "ls -la && ls /tmp")
+        again = evaluate_compound_command("org-7", "ls -la && ls /tmp")
+        evaluate_command("org-7", "ls -la")
+
+        assert first == again and first.allowed
+        assert spy.call_count == 2  # one per distinct sub-command
+
+    def test_new_rule_lists_start_a_fresh_memo(self, policy):
+        policy["states"] = ListStates(allowlist_enabled=False, denylist_enabled=True)
+        assert evaluate_command("org-7", "kubectl delete pod x").allowed
+
+        policy["deny"] = [_rule(rule_id=9, mode="deny", pattern=r"\bdelete\b")]
+
+        assert evaluate_command("org-7", "kubectl delete pod x").deny_rule_id == 9
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def setex(self, key, _ttl, value):
+        self.store[key] = value
+
+    def incr(self, key):
+        self.store[key] = str(int(self.store.get(key, 0)) + 1)
+        return int(self.store[key])
+
+
+class TestRedisVersionedCache:
+    @pytest.fixture
+    def redis(self, monkeypatch):
+        fake = _FakeRedis()
+        monkeypatch.setattr(command_policy, "_get_redis", lambda: fake)
+        return fake
+
+    @pytest.fixture
+    def db(self, monkeypatch):
+        rows = {"deny": [_rule(rule_id=1, mode="deny", pattern=r"\brm\b")]}
+        fetch = MagicMock(side_effect=lambda _org: (
+            [], list(rows["deny"]), ListStates(allowlist_enabled=False, denylist_enabled=True),
+        ))
+        monkeypatch.setattr(command_policy, "_fetch", fetch)
+        return rows, fetch
+
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        now = {"t": 1000.0}
+        monkeypatch.setattr(command_policy.time, "monotonic", lambda: now["t"])
+        return now
+
+    def test_other_workers_load_the_shared_snapshot(self, redis, db, clock):
+        _, fetch = db
+        command_policy._get_cached("org-7")
+        command_policy._cache.clear()  # a second worker with a cold cache
+
+        _, deny, _ = command_policy._get_cached("org-7")
+
+        assert fetch.call_count == 1
+        assert [r.id for r in deny] == [1]
+
+    def test_version_bump_reaches_other_workers(self, redis, db, clock):
+        rows, fetch = db
+        assert not evaluate_command("org-7", "rm x").allowed
+
+        rows["deny"] = []
+        redis.incr(command_policy._version_key("org-7"))  # edit made on another worker
+
+        clock["t"] += command_policy._VERSION_CHECK_INTERVAL - 0.5
+        assert not evaluate_command("org-7", "rm x").allowed  # not re-checked yet
+        clock["t"] += 1
+        assert evaluate_command("org-7", "rm x").allowed
+        assert fetch.call_count == 2
+
+    def test_unchanged_version_does_not_refetch(self, redis, db, clock):
+        _, fetch = db
+        for _ in range(5):
+            command_policy._get_cached("org-7")
+            clock["t"] += command_policy._VERSION_CHECK_INTERVAL + 1
+
+        assert fetch.call_count == 1
+
+    def test_invalidate_cache_bumps_version(self, redis):
+        invalidate_cache("org-7")
+        invalidate_cache("org-7")
+
+        assert redis.get(command_policy._version_key("org-7")) == "2"
+
+    def test_fail_open_fetch_is_not_shared(self, redis, monkeypatch):
+        monkeypatch.setattr(command_policy, "_fetch", lambda _org: (
+            [], [], ListStates(allowlist_enabled=False, denylist_enabled=False),
+        ))
+
+        command_policy._get_cached("org-7")
+
+        assert command_policy._snapshot_key("org-7") not in redis.store
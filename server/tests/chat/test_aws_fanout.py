@@ -0,0 +1,82 @@
+"""Tests for the bounded multi-account AWS fan-out in cloud_exec."""
+
+import json
+import subprocess
+import threading
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from chat.backend.agent.tools import cloud_exec_tool
+
+
+def _connections(count):
+    return [{"account_id": f"{i:012d}", "role_arn": f"arn:aws:iam::{i:012d}:role/r", "region": "us-east-1"} for i in range(count)]
+
+
+@pytest.fixture()
+def fanout(monkeypatch):
+    stored = {}
+    done = threading.Event()
+
+    def _store(user_id, command, stdout, output_ref=None):
+        stored[output_ref] = json.loads(stdout)
+        done.set()
+        return output_ref
+
+    monkeypatch.setattr(cloud_exec_tool, "get_mode_from_context", lambda: "agent")
+    monkeypatch.setattr(cloud_exec_tool, "_assume_aws_account_env", lambda user_id, conn, ws, ro: {"AURORA_AWS_ACCOUNT_ID": conn["account_id"]})
+    with patch("utils.workspace.workspace_utils.get_or_create_workspace", return_value={"id": "ws1", "aws_external_id": "ext"}), \
+            patch("chat.backend.agent.tools.cloud_output_tool.store_cloud_output", side_effect=_store):
+        yield SimpleNamespace(stored=stored, done=done)
+
+
+def _ok(args, env=None, **kwargs):
+    return SimpleNamespace(returncode=0, stdout=json.dumps({"Account": env["AURORA_AWS_ACCOUNT_ID"]}), stderr="")
+
+
+def test_results_are_keyed_by_account(fanout, monkeypatch):
+    monkeypatch.setattr(cloud_exec_tool, "terminal_run", _ok)
+    result = json.loads(cloud_exec_tool._cloud_exec_aws_multi_account("u1", _connections(5), "sts get-caller-identity"))
+
+    assert result["success"] and result["accounts_queried"] == 5
+    assert "pending_accounts" not in result
+    assert json.loads(result["results_by_account"]["000000000003"]["output"]) == {"Account": "000000000003"}
+    assert fanout.stored == {}
+
+
+def test_per_account_timeout_does_not_fail_the_rest(fanout, monkeypatch):
+    def _run(args, env=None, timeout=None, **kwargs):
+        if env["AURORA_AWS_ACCOUNT_ID"] == "000000000001":
+            raise subprocess.TimeoutExpired(args, timeout)
+        return _ok(args, env=env)
+
+    monkeypatch.setattr(cloud_exec_tool, "terminal_run", _run)
+    result = json.loads(cloud_exec_tool._cloud_exec_aws_multi_account("u1", _connections(3), "s3 ls"))
+
+    assert not result["success"]
+    assert result["results_by_account"]["000000000001"]["timed_out"]
+    assert result["results_by_account"]["000000000002"]["success"]
+
+
+def test_stragglers_are_stored_for_read_cloud_output(fanout, monkeypatch):
+    release = threading.Event()
+
+    def _run(args, env=None, **kwargs):
+        if env["AURORA_AWS_ACCOUNT_ID"] == "000000000002":
+            release.wait(5)
+        return _ok(args, env=env)
+
+    monkeypatch.setattr(cloud_exec_tool, "terminal_run", _run)
+    monkeypatch.setattr(cloud_exec_tool, "AWS_FANOUT_RETURN_AFTER_SECONDS", 0.2)
+    result = json.loads(cloud_exec_tool._cloud_exec_aws_multi_account("u1", _connections(3), "ec2 describe-instances"))
+
+    assert result["pending_accounts"] == ["000000000002"]
+    assert result["accounts_queried"] == 2
+    assert result["output_ref"] in result["partial_note"]
+
+    release.set()
+    assert fanout.done.wait(5)
+    merged = fanout.stored[result["output_ref"]]
+    assert merged["success"] and merged["accounts_queried"] == 3
@@ -0,0 +1,98 @@
+"""Tests for storing and paging oversized cloud_exec output."""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from chat.backend.agent.tools import cloud_output_tool
+from chat.backend.agent.tools.cloud_output_tool import read_cloud_output, store_cloud_output
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.values = {}
+        self.ttls = {}
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+        self.ttls[key] = ex
+
+    def get(self, key):
+        return self.values.get(key)
+
+
+@pytest.fixture()
+def redis_client():
+    fake = _FakeRedis()
+    with patch("utils.cache.redis_client.get_redis_client", return_value=fake), \
+            patch.object(cloud_output_tool, "_parsed_cache", {}):
+        yield fake
+
+
+def _az_vms(count):
+    return json.dumps([
+        {"name": f"vm{i}", "location": "eastus" if i % 3 else "westeurope", "tags": {"team": f"t{i % 2}"}}
+        for i in range(count)
+    ])
+
+
+def test_records_round_trip_with_paging_fields_and_match(redis_client):
+    output_ref = store_cloud_output("u1", "az vm list", _az_vms(250))
+    key = f"cloud_output:u1:{output_ref}"
+    assert redis_client.ttls[key] == cloud_output_tool.CLOUD_OUTPUT_TTL_SECONDS
+    assert len(redis_client.values[key]) < len(_az_vms(250))  # compressed
+
+    first = json.loads(read_cloud_output(output_ref, offset=0, limit=100, user_id="u1"))
+    assert first["total_count"] == 250
+    assert len(first["records"]) == 100
+    assert first["next_offset"] == 100
+
+    last = json.loads(read_cloud_output(output_ref, offset=240, limit=500, fields=["name", "tags.team"], user_id="u1"))
+    assert last["records"][-1] == {"name": "vm249", "tags.team": "t1"}
+    assert last["next_offset"] is None
+
+    matched = json.loads(read_cloud_output(output_ref, match="location=westeurope", limit=5, user_id="u1"))
+    assert matched["total_count"] == 84
+    assert all(r["location"] == "westeurope" for r in matched["records"])
+
+
+def test_outputs_are_scoped_per_user(redis_client):
+    output_ref = store_cloud_output("u1", "az vm list", _az_vms(3))
+    assert json.loads(read_cloud_output(output_ref, user_id="u2"))["status"] == "not_found"
+
+
+def test_text_output_is_paged_by_line(redis_client):
+    stdout = "\n".join(f"pod-{i}  Running" for i in range(500))
+    output_ref = store_cloud_output("u1", "kubectl get pods", stdout)
+
+    page = json.loads(read_cloud_output(output_ref, offset=10, limit=1000, user_id="u1"))
+    assert page["total_lines"] == 500
+    assert page["lines"][0] == "pod-10  Running"
+    assert len(page["lines"]) == cloud_output_tool._MAX_TEXT_LINES
+
+
+def test_redis_unavailable_stores_nothing():
+    with patch("utils.cache.redis_client.get_redis_client", return_value=None):
+        assert store_cloud_output("u1", "az vm list", _az_vms(3)) is None
+
+
+def test_sub_agents_with_cloud_exec_also_get_read_cloud_output():
+    from types import SimpleNamespace
+
+    from chat.backend.agent.orchestrator import select_skills
+
+    tools = [SimpleNamespace(name=n, description="d") for n in ("cloud_exec", "read_cloud_output")]
+    role = SimpleNamespace(name="infra", tools=["runtime_state"])
+    meta = select_skills._get_tool_meta(tools[1])
+    assert meta["mutates"] is False and meta["cacheable"] is False
+    assert set(meta["capability_tags"]) == set(select_skills._get_tool_meta(tools[0])["capability_tags"])
+
+    def _select(has_cloud_provider):
+        with patch.object(select_skills, "_resolve_connected_tool_filter", return_value=(set(), set())), \
+             patch.object(select_skills, "_has_cloud_provider", return_value=has_cloud_provider), \
+             patch.object(select_skills, "wrap_tool_with_cache", side_effect=lambda tool, tool_metadata: tool):
+            return [t.name for t in select_skills.select_tools_for_role("user-1", role, tools)]
+
+    assert _select(True) == ["cloud_exec", "read_cloud_output"]
+    assert _select(False) == []  # nothing to page without cloud_exec
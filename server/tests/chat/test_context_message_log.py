@@ -0,0 +1,169 @@
+"""Tests for the append-only LLM context log (chat_context_messages)."""
+
+import json
+from contextlib import contextmanager
+from unittest.mock import MagicMock, patch
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from chat.backend.agent.utils.persistence import context_manager as cm_mod
+from chat.backend.agent.utils.persistence import message_log
+
+
+class _FakeDB:
+    """Just enough of chat_sessions + chat_context_messages for the log queries."""
+
+    def __init__(self):
+        self.sessions = {}
+        self.log = {}
+        self.inserted_rows = 0
+
+    def cursor(self, *args, **kwargs):
+        return _FakeCursor(self)
+
+    def commit(self):
+        pass
+
+
+class _FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self._result = []
+
+    def execute(self, sql, params=()):
+        sql = " ".join(sql.split())
+        db = self.db
+        if sql.startswith("SELECT llm_context_length, llm_context_digest"):
+            row = db.sessions.get(params[0])
+            self._result = [(row["length"], row["digest"])] if row else []
+        elif sql.startswith("SELECT llm_context_history FROM"):
+            row = db.sessions.get(params[0])
+            self._result = [(row["legacy"],)] if row else []
+        elif sql.startswith("SELECT llm_context_length, CASE"):
+            row = db.sessions.get(params[0])
+            legacy = row["legacy"] if row and row["length"] is None else None
+            self._result = [(row["length"], legacy)] if row else []
+        elif sql.startswith("SELECT message FROM chat_context_messages"):
+            session_id, end = params
+            entries = db.log.get(session_id, {})
+            self._result = [(entries[s],) for s in sorted(entries) if s < end]
+        elif sql.startswith("INSERT INTO chat_sessions"):
+            db.sessions[params[0]] = {"length": 0, "digest": "", "legacy": []}
+        elif sql.startswith("DELETE FROM chat_context_messages"):
+            db.log.pop(params[0], None)
+        elif sql.startswith("UPDATE chat_sessions SET llm_context_length"):
+            length, digest, _now, session_id = params
+            db.sessions[session_id].update(length=length, digest=digest, legacy=[])
+        else:
+            raise AssertionError(f"unexpected SQL: {sql}")
+
+    def fetchone(self):
+        return self._result[0] if self._result else None
+
+    def fetchall(self):
+        return list(self._result)
+
+
+def _fake_execute_values(cursor, sql, rows, page_size=None):
+    for session_id, seq, _org_id, message in rows:
+        entries = cursor.db.log.setdefault(session_id, {})
+        assert seq not in entries, "log rows are never overwritten in place"
+        entries[seq] = json.loads(message)
+        cursor.db.inserted_rows += 1
+
+
+@pytest.fixture
+def db():
+    fake = _FakeDB()
+
+    @contextmanager
+    def connection():
+        yield fake
+
+    pool = MagicMock()
+    pool.get_user_connection.side_effect = connection
+    with patch("utils.db.connection_pool.db_pool", pool), \
+            patch("utils.auth.stateless_auth.set_rls_context", return_value="org-1"), \
+            patch.object(message_log, "execute_values", _fake_execute_values), \
+            patch.object(cm_mod, "_guardrails_config", MagicMock(enabled=False)):
+        yield fake
+
+
+@pytest.fixture
+def manager():
+    instance = cm_mod.ContextManager.__new__(cm_mod.ContextManager)
+    instance.cache = MagicMock()
+    instance.cache.get_serialized.return_value = None
+    return instance
+
+
+def _conversation(turns):
+    messages = []
+    for i in range(turns):
+        messages.append(HumanMessage(content=f"question {i}", id=f"h{i}"))
+        messages.append(AIMessage(
+            content="", id=f"a{i}",
+            tool_calls=[{"id": f"call-{i}", "name": "cloud_exec", "args": {}, "type": "tool_call"}],
+        ))
+        messages.append(ToolMessage(content=f"output {i}", tool_call_id=f"call-{i}"))
+    return messages
+
+
+def _load(db, session_id):
+    return message_log.fetch_serialized_context(db.cursor(), session_id)
+
+
+class TestIncrementalSave:
+    def test_extending_save_writes_only_new_messages(self, db, manager):
+        history = _conversation(2)
+        assert manager._execute_actual_save("s1", "u1", history)
+        assert db.inserted_rows == 6
+
+        assert manager._execute_actual_save("s1", "u1", history + _conversation(3)[6:])
+        assert db.inserted_rows == 9
+        assert db.sessions["s1"]["length"] == 9
+        assert [m["content"] for m in _load(db, "s1")][-1] == "output 2"
+
+    def test_reloaded_history_still_matches_prefix(self, db, manager):
+        manager._execute_actual_save("s1", "u1", _conversation(2))
+        reloaded = [
+            cm_mod.LLMContextManager.deserialize_message(m) for m in _load(db, "s1")
+        ]
+        manager._execute_actual_save("s1", "u1", reloaded + [HumanMessage(content="next")])
+        assert db.inserted_rows == 7
+
+    def test_diverged_history_rewrites_log(self, db, manager):
+        manager._execute_actual_save("s1", "u1", _conversation(3))
+        compressed = [HumanMessage(content="question 0", id="h0"), AIMessage(content="summary")]
+        assert manager._execute_actual_save("s1", "u1", compressed)
+        assert [m["content"] for m in _load(db, "s1")] == ["question 0", "summary"]
+        assert db.sessions["s1"]["length"] == 2
+
+    def test_append_skips_prefix_check(self, db, manager):
+        manager._execute_actual_save("s1", "u1", _conversation(1))
+        assert manager._execute_append("s1", "u1", [AIMessage(content="more", id="x")])
+        assert db.inserted_rows == 4
+        # A later full save of the same list is recognised as a pure extension
+        full = _conversation(1) + [AIMessage(content="more", id="x"), HumanMessage(content="q")]
+        manager._execute_actual_save("s1", "u1", full)
+        assert db.inserted_rows == 5
+
+    def test_legacy_session_is_moved_into_log(self, db, manager):
+        legacy = [cm_mod.LLMContextManager.serialize_message(m) for m in _conversation(1)]
+        db.sessions["s1"] = {"length": None, "digest": None, "legacy": legacy}
+        assert _load(db, "s1")[-1]["content"] == "output 0"
+
+        reloaded = [cm_mod.LLMContextManager.deserialize_message(m) for m in legacy]
+        manager._execute_actual_save("s1", "u1", reloaded + [HumanMessage(content="new")])
+        assert db.sessions["s1"]["legacy"] == []
+        assert db.sessions["s1"]["length"] == 4
+        assert db.inserted_rows == 4  # 3 migrated + 1 appended
+
+
+
+class TestFetch:
+    def test_reads_the_logged_messages_in_order(self, db, manager):
+        manager._execute_actual_save("s1", "u1", _conversation(2))
+        assert [m["role"] for m in _load(db, "s1")] == ["human", "ai", "tool"] * 2
+        assert _load(db, "missing") is None
@@ -0,0 +1,110 @@
+"""Tests for local projection of oversized cloud CLI JSON output."""
+
+import json
+
+import pytest
+
+from chat.backend.agent.utils.json_projection import (
+    build_preview,
+    find_records,
+    format_preview_summary,
+    iter_json_documents,
+    parse_json_output,
+)
+
+
+def _aws_describe_instances(reservations=40):
+    return {
+        "Reservations": [
+            {
+                "ReservationId": f"r-{i}",
+                "OwnerId": "123456789012",
+                "Instances": [
+                    {
+                        "InstanceId": f"i-{i:03d}{j}",
+                        "InstanceType": "m5.large" if j else "t3.micro",
+                        "State": {"Code": 16, "Name": "stopped" if i % 4 == 0 else "running"},
+                        "Placement": {"AvailabilityZone": f"us-east-1{'ab'[i % 2]}"},
+                        "LaunchTime": "2026-09-01T10:00:00+00:00",
+                        "BlockDeviceMappings": [{"DeviceName": "/dev/xvda"}],
+                        "Tags": [{"Key": "Name", "Value": f"api-{i}"}],
+                    }
+                    for j in range(2)
+                ],
+            }
+            for i in range(reservations)
+        ]
+    }
+
+
+def _gcp_instances(count=120):
+    return [
+        {
+            "name": f"web-{i}",
+            "id": str(1000 + i),
+            "status": "TERMINATED" if i % 10 == 0 else "RUNNING",
+            "zone": "https://www.googleapis.com/compute/v1/projects/p/zones/us-central1-a",
+            "machineType": "https://www.googleapis.com/compute/v1/projects/p/machineTypes/e2-small",
+            "networkInterfaces": [{"networkIP": f"10.0.0.{i}"}],
+            "metadata": {"fingerprint": "abc", "items": []},
+        }
+        for i in range(count)
+    ]
+
+
+class TestRecordDiscovery:
+    def test_aws_wrapper_is_flattened(self):
+        path, records = find_records(_aws_describe_instances())
+        assert path == "Reservations[].Instances"
+        assert len(records) == 80
+
+    def test_azure_value_wrapper(self):
+        path, records = find_records({"value": [{"name": "vm1"}, {"name": "vm2"}], "nextLink": None})
+        assert path == "value"
+        assert len(records) == 2
+
+    def test_no_record_array(self):
+        assert find_records({"Account": "123", "Arn": "arn:aws:iam::123:user/x"}) == (None, [])
+
+    def test_concatenated_and_ndjson_documents(self):
+        text = '{"a": 1}\n{"a": 2}  {"a": 3}\n'
+        assert list(iter_json_documents(text)) == [{"a": 1}, {"a": 2}, {"a": 3}]
+        assert parse_json_output(' \n[{"a": 1}]\n') == [{"a": 1}]
+        with pytest.raises(ValueError):
+            parse_json_output("NAME   STATUS\nweb-1  RUNNING")
+
+
+class TestBuildPreview:
+    def test_aws_preview_selects_identity_fields_and_counts(self):
+        preview = build_preview(_aws_describe_instances())
+
+        assert preview["total_count"] == 80
+        assert preview["fields"][:2] == ["InstanceId", "State.Name"]
+        assert "Placement.AvailabilityZone" in preview["fields"]
+        assert preview["value_counts"]["State.Name"] == {"running": 60, "stopped": 20}
+        assert "InstanceId" not in preview["value_counts"]  # unique per record
+        assert preview["schema"]["BlockDeviceMappings"]["types"] == ["array"]
+        assert len(preview["sample"]) == 20
+        assert preview["sample"][0]["InstanceId"] == "i-0000"
+        assert preview["sample"][-1]["InstanceId"] == "i-0391"
+
+    def test_gcp_preview_is_much_smaller_than_the_output(self):
+        data = _gcp_instances(2000)
+        preview = build_preview(data)
+
+        assert preview["records_path"] == ""
+        assert preview["value_counts"]["status"] == {"RUNNING": 1800, "TERMINATED": 200}
+        assert len(json.dumps(preview)) < len(json.dumps(data)) / 20
+
+    def test_long_values_and_nested_collections_are_compacted(self):
+        records = [{"name": f"n{i}", "policy": "x" * 5000, "rules": [1, 2, 3]} for i in range(3)]
+        preview = build_preview(records)
+        sample = preview["sample"][0]
+        assert len(sample["policy"]) < 250
+        assert "rules" not in sample or sample["rules"] == "<3 items>"
+
+    def test_summary_text(self):
+        summary = format_preview_summary(build_preview(_gcp_instances(30)))
+        assert summary.startswith("30 records (top level)")
+        assert "status: RUNNING=27, TERMINATED=3" in summary
+        assert format_preview_summary(build_preview({"k": "v"})).startswith("Large object output")
@@ -0,0 +1,301 @@
+"""Tests for the cross-worker LLM admission scheduler and its agent middleware.
+
+Redis is faked at the script boundary, so most of these tests pin the Python
+side -- queueing, priorities, bypass rules, token reconciliation, 429
+cooldowns and metrics. The Lua admission script itself is exercised by the
+tests marked for a live Redis (REDIS_URL), which skip when none is reachable.
+"""
+
+import asyncio
+import importlib.util
+import json
+import os
+import sys
+import types
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+_SERVER_DIR = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir)
+if os.path.abspath(_SERVER_DIR) not in sys.path:
+    sys.path.insert(0, os.path.abspath(_SERVER_DIR))
+
+from chat.backend.agent.utils import llm_admission  # noqa: E402
+
+_MIDDLEWARE_PATH = os.path.join(
+    _SERVER_DIR, "chat", "backend", "agent", "middleware", "llm_admission.py"
+)
+
+
+class _FakeRedis:
+    """Records scheduler traffic; ``verdicts`` scripts the admission results."""
+
+    def __init__(self, verdicts=None):
+        self.verdicts = list(verdicts or [])
+        self.evals = []
+        self.ops = []
+
+    def register_script(self, script):
+        def run(keys=(), args=(), client=None):
+            self.evals.append((tuple(keys), tuple(args)))
+            return self.verdicts.pop(0) if self.verdicts else [1, 0, 0]
+        return run
+
+    def zcard(self, key):
+        return 3
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def zrem(self, key, member):
+        self.ops.append(("zrem", key, member))
+
+    def hdel(self, key, member):
+        self.ops.append(("hdel", key, member))
+
+    def incrby(self, key, amount):
+        self.ops.append(("incrby", key, amount))
+
+    def pexpire(self, key, ms):
+        self.ops.append(("pexpire", key, ms))
+
+    def set(self, key, value, px=None):
+        self.ops.append(("set", key, px))
+
+    def execute(self):
+        pass
+
+
+@pytest.fixture()
+def redis(monkeypatch):
+    fake = _FakeRedis()
+    monkeypatch.setattr(llm_admission, "_client", lambda: fake)
+    monkeypatch.setattr(llm_admission, "_POLL_INITIAL", 0.001)
+    monkeypatch.setattr(llm_admission, "_POLL_MAX", 0.002)
+    monkeypatch.setattr(llm_admission, "_registered_script", None)
+    llm_admission._stats.clear()
+    yield fake
+    llm_admission._stats.clear()
+
+
+def test_priorities_order_chat_before_rca_waves():
+    assert llm_admission.request_priority(False, wave=3) == llm_admission.PRIORITY_INTERACTIVE
+    first, second = (llm_admission.request_priority(True, wave=w) for w in (1, 2))
+    assert llm_admission.PRIORITY_INTERACTIVE < first < second
+    assert llm_admission.request_priority(True, wave=10_000) < 1000
+
+
+def test_limits_resolve_model_then_provider_then_default(monkeypatch):
+    monkeypatch.setattr(llm_admission, "_limit_overrides", {
+        "anthropic": {"rpm": 50, "tpm": 400_000},
+        "anthropic/claude-opus": {"rpm": 5, "concurrency": 2},
+    })
+    assert llm_admission.get_limits("anthropic/claude-opus") == llm_admission._Limits(5, llm_admission.LLM_DEFAULT_TPM, 2)
+    assert llm_admission.get_limits("anthropic/claude-haiku") == llm_admission._Limits(
+        50, 400_000, llm_admission.LLM_DEFAULT_CONCURRENCY)
+    assert llm_admission.get_limits("openai/gpt-4.1").rpm == llm_admission.LLM_DEFAULT_RPM
+
+
+def test_waiter_queues_until_admitted(redis):
+    redis.verdicts = [[0, 0, 4], [0, 0, 3], [1, 0, 2]]
+    ticket = llm_admission.acquire("openai/gpt-4.1", estimated_tokens=1200,
+                                   priority=llm_admission.request_priority(True, 2))
+
+    assert ticket.leased and ticket.estimated_tokens == 1200
+    # Same ticket and score on every attempt, so the caller keeps its place in line.
+    assert len({argv[0] for _, argv in redis.evals}) == 1
+    assert len({argv[1] for _, argv in redis.evals}) == 1
+    assert float(redis.evals[0][1][1]) >= 102 * 1e13
+    stats = llm_admission.get_admission_stats()["openai/gpt-4.1"]
+    assert stats["admitted"] == 1 and stats["queued"] == 1 and stats["waiting"] == 0
+    assert stats["last_queue_depth"] == 2
+    assert stats["queue_depth"] == 3  # live depth across workers
+
+
+def test_metrics_route_reports_admission_stats(redis, monkeypatch):
+    from utils.internal import api_handler
+
+    monkeypatch.setenv("INTERNAL_API_SECRET", "s3cr3t")
+    llm_admission.acquire("openai/gpt-4.1")
+
+    def _request(headers):
+        writer = MagicMock()
+        writer.drain = AsyncMock()
+        asyncio.run(api_handler._handle_llm_admission_metrics(headers, writer))
+        raw = b"".join(call.args[0] for call in writer.write.call_args_list)
+        return json.loads(raw[raw.find(b"\r\n\r\n") + 4:])
+
+    assert _request({}) == {"error": "Unauthorized"}
+    stats = _request({"x-internal-secret": "s3cr3t"})["llm_admission"]["openai/gpt-4.1"]
+    assert stats["admitted"] == 1 and stats["queue_depth"] == 3
+
+
+def test_redis_down_or_max_wait_lets_calls_through(redis, monkeypatch):
+    monkeypatch.setattr(llm_admission, "_client", lambda: None)
+    assert not llm_admission.acquire("openai/gpt-4.1").leased
+
+    monkeypatch.setattr(llm_admission, "_client", lambda: redis)
+    monkeypatch.setattr(llm_admission, "LLM_ADMISSION_MAX_WAIT_SECONDS", 0)
+    redis.verdicts = [[0, 0, 9]]
+    ticket = llm_admission.acquire("openai/gpt-4.1")
+    assert not ticket.leased
+    assert ("zrem", "llm_admit:openai/gpt-4.1:waiting", ticket.ticket_id) in redis.ops
+    assert llm_admission.get_admission_stats()["openai/gpt-4.1"]["bypassed"] == 2
+
+
+def test_cancelled_waiter_leaves_the_queue(redis):
+    redis.verdicts = [[0, 0, 1]] * 1000
+
+    async def _cancel():
+        task = asyncio.create_task(llm_admission.acquire_async("openai/gpt-4.1"))
+        await asyncio.sleep(0.02)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(_cancel())
+    ticket_id = redis.evals[0][1][0]
+    assert ("zrem", "llm_admit:openai/gpt-4.1:waiting", ticket_id) in redis.ops
+    assert llm_admission.get_admission_stats()["openai/gpt-4.1"]["waiting"] == 0
+
+
+def test_release_ends_lease_and_charges_extra_tokens(redis):
+    ticket = llm_admission.acquire("openai/gpt-4.1", estimated_tokens=1000)
+    llm_admission.release(ticket, actual_tokens=1500)
+    tpm_key = f"llm_admit:openai/gpt-4.1:tpm:{ticket.window}"
+    assert ("zrem", "llm_admit:openai/gpt-4.1:leases", ticket.ticket_id) in redis.ops
+    assert ("incrby", tpm_key, 500) in redis.ops
+
+    redis.ops.clear()
+    llm_admission.release(llm_admission.acquire("openai/gpt-4.1", estimated_tokens=1000), actual_tokens=200)
+    assert not any(op[0] == "incrby" for op in redis.ops)
+
+
+@pytest.fixture()
+def middleware_module(monkeypatch):
+    """Load the middleware with minimal LangChain stubs for focused tests."""
+    middleware = types.ModuleType("langchain.agents.middleware")
+    middleware_types = types.ModuleType("langchain.agents.middleware.types")
+    messages_utils = types.ModuleType("langchain_core.messages.utils")
+
+    class AgentMiddleware:
+        pass
+
+    middleware.AgentMiddleware = AgentMiddleware
+    middleware_types.ModelRequest = middleware_types.ModelResponse = object
+    messages_utils.count_tokens_approximately = lambda messages: 100 * len(messages)
+
+    monkeypatch.setitem(sys.modules, "langchain.agents.middleware", middleware)
+    monkeypatch.setitem(sys.modules, "langchain.agents.middleware.types", middleware_types)
+    monkeypatch.setitem(sys.modules, "langchain_core.messages.utils", messages_utils)
+
+    spec = importlib.util.spec_from_file_location(
+        "chat.backend.agent.middleware._llm_admission_under_test", _MIDDLEWARE_PATH
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class _RateLimitError(Exception):
+    def __init__(self):
+        super().__init__("429 Too Many Requests")
+        self.status_code = 429
+        self.response = SimpleNamespace(status_code=429, headers={"retry-after": "7"})
+
+
+def test_middleware_reconciles_tokens_and_reports_429s(redis, middleware_module):
+    mw = middleware_module.LLMAdmissionMiddleware("openai/gpt-4.1", priority=llm_admission.PRIORITY_INTERACTIVE)
+    request = SimpleNamespace(messages=["a", "b"], system_prompt="x" * 400)
+    response = SimpleNamespace(result=[SimpleNamespace(usage_metadata={"total_tokens": 900})])
+
+    async def _ok(req):
+        return response
+
+    assert asyncio.run(mw.awrap_model_call(request, _ok)) is response
+    assert redis.evals[0][1][3] == 300  # 2 messages + 400-char system prompt
+    assert any(op[0] == "incrby" and op[2] == 600 for op in redis.ops)
+
+    def _limited(req):
+        raise _RateLimitError()
+
+    with pytest.raises(_RateLimitError):
+        mw.wrap_model_call(request, _limited)
+    assert ("set", "llm_admit:openai/gpt-4.1:cooldown", 7000) in redis.ops
+    leases = [op for op in redis.ops if op[:2] == ("zrem", "llm_admit:openai/gpt-4.1:leases")]
+    assert len(leases) == 2  # both calls released their lease
+    assert llm_admission.get_admission_stats()["openai/gpt-4.1"]["rate_limited"] == 1
+
+
+# ---------------------------------------------------------------------------
+# Admission script against a live Redis
+# ---------------------------------------------------------------------------
+
+
+def _live_redis():
+    try:
+        import redis as redis_lib
+    except ImportError:
+        return None
+    if not isinstance(getattr(redis_lib, "Redis", None), type):
+        return None  # conftest stub
+    try:
+        client = redis_lib.from_url(
+            os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+            decode_responses=True, socket_connect_timeout=0.5, socket_timeout=2,
+        )
+        client.ping()
+        return client
+    except Exception:
+        return None
+
+
+@pytest.fixture()
+def live_redis(monkeypatch):
+    client = _live_redis()
+    if client is None:
+        pytest.skip("no Redis reachable at REDIS_URL")
+    model_key = f"test/{uuid.uuid4().hex}"
+    monkeypatch.setattr(llm_admission, "_client", lambda: client)
+    monkeypatch.setattr(llm_admission, "_registered_script", None)
+    yield client, model_key
+    keys = list(client.scan_iter(match=f"llm_admit:{model_key}:*"))
+    if keys:
+        client.delete(*keys)
+
+
+def test_script_admits_by_priority_within_concurrency(live_redis):
+    client, model_key = live_redis
+    limits = llm_admission._Limits(rpm=0, tpm=0, concurrency=1)
+
+    def admit(ticket, score):
+        return llm_admission._try_admit(client, model_key, ticket, score, 10, limits)
+
+    first = admit("first", 200.0)
+    assert first[0] and first[3] == 0
+    # The only slot is leased: a background and then an interactive caller queue.
+    assert admit("background", 100.0)[:2] == (False, 0.0)
+    assert admit("chat", 1.0)[0] is False
+    assert llm_admission.get_queue_depth(model_key) == 2
+
+    llm_admission.release(llm_admission.AdmissionTicket(model_key, "first", 10, first[2], 0.0, True))
+    # The freed slot goes to the caller at the head of the queue, not the first to poll.
+    assert admit("background", 100.0)[0] is False
+    assert admit("chat", 1.0)[:2] == (True, 0.0)
+    assert llm_admission.get_queue_depth(model_key) == 1
+
+
+def test_script_holds_callers_over_the_rpm_budget(live_redis):
+    client, model_key = live_redis
+    limits = llm_admission._Limits(rpm=1, tpm=0, concurrency=0)
+
+    assert llm_admission._try_admit(client, model_key, "a", 1.0, 10, limits)[0]
+    admitted, hint, _, depth = llm_admission._try_admit(client, model_key, "b", 1.0, 10, limits)
+    assert not admitted and depth == 1
+    assert 0 < hint <= 60  # until the one-minute window rolls over
+
+    llm_admission.report_rate_limited(model_key, retry_after_seconds=5)
+    admitted, hint, _, _ = llm_admission._try_admit(client, model_key, "b", 1.0, 10, limits)
+    assert not admitted and 4 < hint <= 5
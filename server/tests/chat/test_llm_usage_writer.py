@@ -0,0 +1,167 @@
+"""Tests for the buffered LLM usage writer and running cost counters."""
+
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from chat.backend.agent.utils import llm_usage_writer
+from chat.backend.agent.utils.llm_usage_tracker import LLMUsage, LLMUsageTracker
+from utils.billing import cost_counters
+
+
+def _usage(user_id="user-1", model="openai/gpt-4.1", cost=0.01, org_id="org-1"):
+    return LLMUsage(
+        user_id=user_id,
+        session_id="s1",
+        model_name=model,
+        api_provider="openai",
+        request_type="chat",
+        input_tokens=100,
+        output_tokens=20,
+        estimated_cost=cost,
+        response_time_ms=5,
+        org_id=org_id,
+    )
+
+
+class _FakeConn:
+    def __init__(self, db):
+        self.db = db
+
+    def cursor(self):
+        return self.db
+
+    def commit(self):
+        self.db.committed.extend(self.db.pending)
+        self.db.pending = []
+
+    def rollback(self):
+        self.db.pending = []
+
+
+class _FakeDB:
+    def __init__(self):
+        self.settings = {}
+        self.pending = []
+        self.committed = []
+        self.fail_org = None
+
+    def execute(self, sql, params=None):
+        name = sql.split()[1]
+        self.settings[name] = params[0]
+
+    @contextmanager
+    def connection(self):
+        yield _FakeConn(self)
+
+    def execute_values(self, cursor, sql, rows, page_size=100):
+        if self.settings["myapp.current_org_id"] == self.fail_org:
+            raise RuntimeError("insert failed")
+        table = "daily" if "llm_usage_daily_costs (" in sql.split("VALUES")[0] else "usage"
+        self.pending.extend((table, self.settings["myapp.current_org_id"], row) for row in rows)
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    def pipeline(self, transaction=False):
+        return self
+
+    def eval(self, script, numkeys, key, amount):
+        if key in self.values:
+            self.values[key] = repr(float(self.values[key]) + float(amount))
+
+    def execute(self):
+        pass
+
+
+@pytest.fixture()
+def db(monkeypatch):
+    fake = _FakeDB()
+    redis = _FakeRedis()
+    monkeypatch.setattr(llm_usage_writer, "execute_values", fake.execute_values)
+    monkeypatch.setattr(llm_usage_writer.db_pool, "get_user_connection", fake.connection)
+    monkeypatch.setattr(cost_counters, "_client", lambda: redis)
+    fake.redis = redis
+    return fake
+
+
+def _records(*usages):
+    return [(usage, datetime(2026, 10, 16, 12, 0)) for usage in usages]
+
+
+def test_batch_is_one_insert_per_org_with_daily_aggregates(db):
+    cost_counters.seed_total("user", "user-1", 1.0)
+    written = llm_usage_writer.write_usage_batch(_records(
+        _usage(), _usage(cost=0.02), _usage(model="openai/o3"), _usage(user_id="user-2", org_id="org-2"),
+    ))
+
+    assert written == 4
+    daily = {(org, row[1], row[2]): row[4:] for table, org, row in db.committed if table == "daily"}
+    assert daily[("org-1", "user-1", "openai/gpt-4.1")] == (2, 200, 40, pytest.approx(0.03))
+    assert daily[("org-1", "user-1", "openai/o3")] == (1, 100, 20, 0.01)
+    assert sum(1 for table, _, _ in db.committed if table == "usage") == 4
+    # Existing counters are incremented; missing ones are left for the next seed.
+    assert float(cost_counters.get_cached_total("user", "user-1")) == pytest.approx(1.04)
+    assert cost_counters.get_cached_total("user", "user-2") is None
+
+
+def test_failed_org_does_not_block_others(db):
+    db.fail_org = "org-2"
+    written = llm_usage_writer.write_usage_batch(_records(_usage(), _usage(user_id="user-2", org_id="org-2")))
+    assert written == 1
+    assert {org for _, org, _ in db.committed} == {"org-1"}
+
+
+def test_writer_flushes_on_size_and_on_demand(db):
+    batches = []
+    flushed = threading.Event()
+
+    def _write(records):
+        batches.append(len(records))
+        flushed.set()
+        return len(records)
+
+    writer = llm_usage_writer.UsageWriter(batch_size=3, flush_interval=60, max_queue=10)
+    with patch.object(llm_usage_writer, "write_usage_batch", side_effect=_write):
+        for _ in range(3):
+            assert writer.submit(_usage())
+        assert flushed.wait(5)
+        assert batches == [3]
+
+        writer.submit(_usage())
+        assert writer.flush(5)
+        assert batches == [3, 1]
+
+
+def test_full_queue_writes_synchronously(db):
+    writer = llm_usage_writer.UsageWriter(batch_size=10, flush_interval=60, max_queue=1)
+    release = threading.Event()
+    with patch.object(llm_usage_writer, "write_usage_batch", side_effect=lambda records: release.wait(5) and len(records)) as write:
+        writer._ensure_started = lambda: None  # no consumer: the queue stays full
+        assert writer.submit(_usage())
+        release.set()
+        assert writer.submit(_usage())
+        write.assert_called_once()
+
+
+def test_store_usage_rejects_users_without_org(db, monkeypatch):
+    submitted = []
+    monkeypatch.setattr(llm_usage_writer._writer, "submit", lambda usage: submitted.append(usage) or True)
+    with patch("utils.auth.stateless_auth.get_org_id_for_user", side_effect=lambda user_id: "org-9" if user_id == "user-1" else None):
+        assert LLMUsageTracker.store_usage(_usage(org_id=None))
+        assert not LLMUsageTracker.store_usage(_usage(user_id="ghost", org_id=None))
+    assert [usage.org_id for usage in submitted] == ["org-9"]
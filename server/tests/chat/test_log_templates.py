@@ -0,0 +1,158 @@
+"""Tests the Drain-style log template miner shared by the observability tools,
+and its use in place of byte truncation / LLM summarization of large log
+results.
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+_server_dir = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir)
+if os.path.abspath(_server_dir) not in sys.path:
+    sys.path.insert(0, os.path.abspath(_server_dir))
+
+from chat.backend.agent.utils.log_templates import (  # noqa: E402
+    LogTemplateMiner,
+    compress_log_entries,
+    compress_log_text,
+)
+from chat.backend.agent.utils.tool_output_cap import PASS_THROUGH_CHARS, cap_tool_output  # noqa: E402
+
+
+def _request_line(i):
+    return f"2026-10-16T12:{i % 60:02d}:00Z GET /api/orders/{i} served to 10.0.{i % 9}.{i % 250} in {i * 3}ms"
+
+
+def test_similar_lines_share_one_template():
+    miner = LogTemplateMiner()
+    for i in range(500):
+        miner.add(_request_line(i), timestamp=f"2026-10-16T12:{i % 60:02d}:00Z", severity="INFO")
+    for user in ("u1001", "u1002", "u2417"):
+        miner.add(f"session opened for user {user} via sso")
+
+    summary = miner.summary()
+    assert summary["line_count"] == 503
+    assert summary["template_count"] == 2
+    requests, sessions = summary["templates"]
+    assert requests["template"] == "<TS> GET /api/orders/<NUM> served to <IP> in <NUM>"
+    assert requests["count"] == 500
+    assert requests["first_seen"] == "2026-10-16T12:00:00Z"
+    assert requests["last_seen"] == "2026-10-16T12:59:00Z"
+    assert requests["severities"] == {"info": 500}
+    assert requests["sample_params"][1] == ["2026-10-16T12:01:00Z", "10.0.1.1", "3ms"]
+    assert sessions["template"] == "session opened for user <*> via sso"
+    assert sessions["count"] == 3
+
+
+def test_lines_differing_in_plain_words_are_not_merged():
+    miner = LogTemplateMiner()
+    for status in ("Running", "Running", "CrashLoopBackOff"):
+        miner.add(f"orders-7d9f8c 1/1 {status} 0 5d")
+    templates = {t["template"].split()[2]: t["count"] for t in miner.summary()["templates"]}
+    assert templates == {"Running": 2, "CrashLoopBackOff": 1}
+
+
+def test_rare_templates_survive_the_template_cap():
+    miner = LogTemplateMiner()
+    for n in range(40):
+        for _ in range(n + 2):
+            miner.add("job " + "step " * n + "done")  # token count makes each its own template
+    miner.add("disk quota exceeded on volume data", severity="error")
+
+    summary = miner.summary(max_templates=10)
+    templates = [t["template"] for t in summary["templates"]]
+    assert len(templates) == 10
+    assert summary["omitted_templates"] == summary["template_count"] - 10
+    assert "disk quota exceeded on volume data" in templates
+    # The most frequent templates are kept too.
+    assert summary["templates"][0]["count"] == 41
+
+
+def test_small_results_are_left_alone():
+    entries = [{"message": _request_line(i)} for i in range(10)]
+    assert compress_log_entries(entries, message="message") is None
+    summary = compress_log_entries(entries, message="message", min_chars=100)
+    assert summary["template_count"] == 1 and summary["original_chars"] > 100
+
+
+def test_compress_log_text_only_handles_repetitive_text():
+    text = "\n".join(_request_line(i) for i in range(2000))
+    compressed = compress_log_text(text)
+    assert compressed.startswith("[2000 lines compressed into 1 log templates]")
+    assert "2000x" in compressed
+
+    assert compress_log_text(json.dumps([{"line": _request_line(i)} for i in range(2000)])) is None
+    unique = "\n".join(f"{chr(65 + i % 26)}{chr(97 + i // 26 % 26)}word{chr(97 + i // 676)} other" for i in range(2000))
+    assert compress_log_text(unique) is None
+
+
+def test_compress_log_text_leaves_tables_alone():
+    rows = ["NAMESPACE   NAME   READY   STATUS   RESTARTS   AGE"] + [
+        f"team-{i % 12}   api-{i:04d}-5f7c9   1/1   {'CrashLoopBackOff' if i == 431 else 'Running'}   {i % 3}   {i % 40}d"
+        for i in range(700)
+    ]
+    assert compress_log_text("\n".join(rows)) is None
+
+
+def test_cap_tool_output_prefers_templates_over_summarization(monkeypatch):
+    # An import failure here would fall back to truncation, which the asserts catch.
+    monkeypatch.setitem(sys.modules, "chat.backend.agent.llm", None)
+    text = "\n".join(_request_line(i) for i in range(2000))
+    assert len(text) > PASS_THROUGH_CHARS
+    result = cap_tool_output(text, "kubectl_logs")
+    assert len(result) <= PASS_THROUGH_CHARS
+    assert "lines compressed into" in result
+
+
+def test_datadog_logs_are_returned_as_templates(monkeypatch):
+    pytest.importorskip("pydantic")
+    from chat.backend.agent.tools import datadog_tool
+
+    logs = [
+        {"id": str(i), "attributes": {
+            "message": _request_line(i), "timestamp": f"2026-10-16T12:{i % 60:02d}:00Z",
+            "status": "error" if i == 7 else "info", "service": "orders",
+        }}
+        for i in range(400)
+    ]
+
+    class _Client:
+        def search_logs(self, query, start, end, limit):
+            return {"data": logs}
+
+    monkeypatch.setattr(datadog_tool, "_get_stored_datadog_credentials", lambda user_id: {"api_key": "k"})
+    monkeypatch.setattr(datadog_tool, "_build_client_from_creds", lambda creds: _Client())
+
+    result = json.loads(datadog_tool.query_datadog("logs", user_id="user-1", limit=1000))
+    assert result["success"] and "results" not in result
+    assert result["count"] == 400
+    (template,) = result["log_templates"]["templates"]
+    assert template["count"] == 400 and template["severities"] == {"info": 399, "error": 1}
+
+
+def test_coroot_app_logs_are_returned_as_templates():
+    pytest.importorskip("pydantic")
+    from chat.backend.agent.tools import coroot_tool
+
+    class _Client:
+        def get_app_logs(self, pid, app_id, from_ts, to_ts, query):
+            return {"entries": [
+                {"timestamp": i, "severity": "Info", "message": _request_line(i)} for i in range(200)
+            ] + [{"timestamp": 500, "severity": "Error", "message": "upstream connect error: reset"}]}
+
+    # Undecorated: skips credential and project resolution.
+    result = json.loads(coroot_tool.coroot_get_app_logs.__wrapped__(
+        client=_Client(), pid="p", from_ts=0, to_ts=1, app_id="default:Deployment:orders", limit=200,
+    ))
+    assert result["total_entries"] == 201
+    templates = {t["template"]: t for t in result["log_templates"]["templates"]}
+    assert templates["upstream connect error: reset"]["count"] == 1
+    assert sum(t["count"] for t in templates.values()) == 201
+    assert "entries" not in result and "_truncated" not in result
+
+
+def test_records_without_messages_are_not_templated():
+    rows = [{"count": 5, "host": f"h{i}"} for i in range(2000)]
+    assert compress_log_entries(rows, message="message") is None
@@ -0,0 +1,183 @@
+"""Tests for the multiplexed MCP stdio transport and per-user server pool."""
+
+import asyncio
+import os
+import sys
+import textwrap
+
+from chat.backend.agent.tools.mcp_transport import MCPConnection, MCPServerPool, run_on_mcp_loop
+
+# Echoes each request back after ``params.delay`` seconds, answering out of order.
+_ECHO_SERVER = textwrap.dedent(
+    """
+    import asyncio, json, sys
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+
+        async def answer(msg):
+            await asyncio.sleep(msg.get("params", {}).get("delay", 0))
+            sys.stdout.write(json.dumps({"jsonrpc": "2.0", "id": msg["id"], "result": msg.get("params")}) + "\\n")
+            sys.stdout.flush()
+
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            msg = json.loads(line)
+            if "id" in msg:
+                asyncio.ensure_future(answer(msg))
+            else:
+                sys.stdout.write(json.dumps({"jsonrpc": "2.0", "method": "log"}) + "\\n")
+                sys.stdout.flush()
+
+    asyncio.run(main())
+    """
+)
+
+
+async def _spawn(server_type="echo"):
+    return await MCPConnection.spawn(server_type, [sys.executable, "-c", _ECHO_SERVER], dict(os.environ))
+
+
+def _request(message_id, delay=0.0):
+    return {"jsonrpc": "2.0", "id": message_id, "method": "echo", "params": {"delay": delay, "n": message_id}}
+
+
+class TestMCPConnection:
+    def test_concurrent_requests_are_matched_by_id(self):
+        async def scenario():
+            conn = await _spawn()
+            try:
+                await conn.notify({"jsonrpc": "2.0", "method": "ping"})
+                started = asyncio.get_running_loop().time()
+                responses = await asyncio.gather(
+                    conn.request(_request(1, delay=0.3), timeout=5),
+                    conn.request(_request(2, delay=0.1), timeout=5),
+                    conn.request(_request(3, delay=0.2), timeout=5),
+                )
+                return responses, asyncio.get_running_loop().time() - started
+            finally:
+                await conn.close()
+
+        responses, elapsed = asyncio.run(scenario())
+        assert [r["result"]["n"] for r in responses] == [1, 2, 3]
+        # Serialized requests would take 0.6s.
+        assert elapsed < 0.55
+
+    def test_timeout_and_exit_return_none(self):
+        async def scenario():
+            conn = await _spawn()
+            timed_out = await conn.request(_request(1, delay=1), timeout=0.1)
+            pending = asyncio.ensure_future(conn.request(_request(2, delay=5), timeout=10))
+            await asyncio.sleep(0.1)
+            conn.process.kill()
+            try:
+                return timed_out, await pending, conn.alive
+            finally:
+                await conn.close()
+
+        timed_out, after_exit, alive = asyncio.run(scenario())
+        assert timed_out is None
+        assert after_exit is None
+        assert alive is False
+
+
+class TestMCPServerPool:
+    def test_pool_is_bounded_per_key_and_reuses_connections(self):
+        pool = MCPServerPool(max_per_key=2, max_in_flight=1)
+        spawned = []
+
+        async def factory():
+            conn = await _spawn()
+            spawned.append(conn)
+            return conn
+
+        async def call(user, n):
+            async with pool.lease((user, "echo"), factory) as conn:
+                response = await conn.request(_request(n, delay=0.05), timeout=5)
+                pool.record_request("echo", 0.05, response is not None)
+                return response
+
+        async def scenario():
+            try:
+                results = await asyncio.gather(*(call("u1", n) for n in range(6)))
+                await call("u2", 99)
+                return results, pool.stats()
+            finally:
+                await pool.close_user()
+
+        results, stats = asyncio.run(scenario())
+        assert [r["result"]["n"] for r in results] == list(range(6))
+        assert len(spawned) == 3  # two for u1, one for u2
+        assert stats["echo"]["spawns"] == 3
+        assert stats["echo"]["requests"] == 7
+        assert stats["echo"]["no_response"] == 0
+        assert stats["echo"]["open"] == 3
+        assert all(not c.alive for c in spawned)
+
+    def test_prestart_coalesces_concurrent_starts(self):
+        pool = MCPServerPool()
+        calls = []
+
+        async def factory():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return await _spawn()
+
+        async def scenario():
+            try:
+                return await asyncio.gather(*(pool.prestart(("u1", "echo"), factory) for _ in range(4)))
+            finally:
+                await pool.close_user("u1")
+
+        assert asyncio.run(scenario()) == [True] * 4
+        assert len(calls) == 1
+
+    def test_failed_start_yields_none_and_counts(self):
+        pool = MCPServerPool()
+
+        async def factory():
+            return None
+
+        async def scenario():
+            async with pool.lease(("u1", "echo"), factory) as conn:
+                return conn, pool.stats()
+
+        conn, stats = asyncio.run(scenario())
+        assert conn is None
+        assert stats["echo"]["spawn_failures"] == 1
+
+    def test_sweep_retires_idle_and_over_age_connections(self):
+        pool = MCPServerPool(idle_seconds=0, max_age_seconds=3600)
+
+        async def scenario():
+            key = ("u1", "echo")
+            assert await pool.prestart(key, _spawn)
+            await asyncio.sleep(0.01)
+            closed = await pool.sweep()
+
+            pool.idle_seconds, pool.max_age_seconds = 3600, 0
+            assert await pool.prestart(key, _spawn)
+            closed += await pool.sweep()
+            return closed, pool.stats()
+
+        closed, stats = asyncio.run(scenario())
+        assert closed == 2
+        assert stats["echo"]["evictions"] == 2
+        assert stats["echo"]["open"] == 0
+
+
+def test_run_on_mcp_loop_bridges_caller_loops():
+    async def on_mcp_loop():
+        return asyncio.get_running_loop()
+
+    async def caller():
+        return await run_on_mcp_loop(on_mcp_loop()), asyncio.get_running_loop()
+
+    first_mcp, first_caller = asyncio.run(caller())
+    second_mcp, second_caller = asyncio.run(caller())
+    assert first_mcp is second_mcp
+    assert first_caller is not first_mcp and second_caller is not second_mcp
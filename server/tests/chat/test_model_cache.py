@@ -0,0 +1,81 @@
+"""Tests for chat model reuse in the provider registry."""
+
+import pytest
+from cachetools import LRUCache
+
+from chat.backend.agent import providers
+from chat.backend.agent.providers import ProviderRegistry
+
+
+class _FakeProvider:
+    provider_name = "fake"
+
+    def __init__(self):
+        self.built = []
+
+    def get_chat_model(self, model, temperature=0.4, **kwargs):
+        instance = object()
+        self.built.append((model, temperature, kwargs))
+        return instance
+
+
+@pytest.fixture()
+def registry(monkeypatch):
+    if not isinstance(LRUCache, type):  # conftest stubs cachetools when it is not installed
+        pytest.skip("cachetools is not installed")
+    reg = ProviderRegistry(model_cache_size=2)
+    fake = _FakeProvider()
+    monkeypatch.setattr(reg, "get_provider_for_model", lambda model, mode=None: fake)
+    return reg, fake
+
+
+def test_identical_requests_share_an_instance(registry):
+    reg, fake = registry
+    first = reg.get_chat_model("openai/gpt-5", temperature=0.0, streaming=False, model_kwargs={"a": [1, 2]})
+    second = reg.get_chat_model("openai/gpt-5", temperature=0.0, streaming=False, model_kwargs={"a": [1, 2]})
+
+    assert first is second
+    assert len(fake.built) == 1
+    assert reg.get_model_cache_stats()["hits"] == 1
+
+
+def test_different_temperature_or_kwargs_get_their_own_instance(registry):
+    reg, fake = registry
+    base = reg.get_chat_model("openai/gpt-5", temperature=0.0)
+
+    assert reg.get_chat_model("openai/gpt-5", temperature=0.4) is not base
+    assert reg.get_chat_model("openai/gpt-5", temperature=0.0, streaming=True) is not base
+    assert len(fake.built) == 3
+
+
+def test_callbacks_are_never_shared(registry):
+    reg, fake = registry
+    callback = object()
+    first = reg.get_chat_model("openai/gpt-5", callbacks=[callback])
+    second = reg.get_chat_model("openai/gpt-5", callbacks=[callback])
+
+    assert first is not second
+    assert reg.get_model_cache_stats()["uncacheable"] == 2
+    # callbacks=None is plain data and is cached
+    assert reg.get_chat_model("openai/gpt-5", callbacks=None) is reg.get_chat_model("openai/gpt-5", callbacks=None)
+
+
+def test_cache_is_lru_bounded(registry):
+    reg, fake = registry
+    a = reg.get_chat_model("m-a")
+    reg.get_chat_model("m-b")
+    assert reg.get_chat_model("m-a") is a  # refresh m-a
+    reg.get_chat_model("m-c")  # evicts m-b
+
+    stats = reg.get_model_cache_stats()
+    assert stats["size"] == 2
+    assert stats["evictions"] == 1
+    assert reg.get_chat_model("m-a") is a
+    reg.get_chat_model("m-b")
+    assert len(fake.built) == 4
+
+
+def test_fork_reset_drops_the_registry(monkeypatch):
+    monkeypatch.setattr(providers, "_registry", ProviderRegistry(model_cache_size=1))
+    providers._reset_after_fork()
+    assert providers._registry is None
@@ -42,6 +42,9 @@ def openai_provider_module(monkeypatch):
 
     base_provider.BaseLLMProvider = BaseLLMProvider
 
+    http_pool = types.ModuleType("chat.backend.agent.providers.http_pool")
+    http_pool.shared_http_client_kwargs = lambda provider_name: {}
+
     model_mapper = types.ModuleType("chat.backend.agent.model_mapper")
 
     class ModelMapper:
@@ -69,6 +72,7 @@ def openai_provider_module(monkeypatch):
     monkeypatch.setitem(
         sys.modules, "chat.backend.agent.providers.base_provider", base_provider
     )
+    monkeypatch.setitem(sys.modules, "chat.backend.agent.providers.http_pool", http_pool)
     monkeypatch.setitem(sys.modules, "chat.backend.agent.model_mapper", model_mapper)
 
     spec = importlib.util.spec_from_file_location(
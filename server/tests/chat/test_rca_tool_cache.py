@@ -0,0 +1,157 @@
+"""Tests for single-flight coalescing in the RCA tool result cache."""
+
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from chat.backend.agent.orchestrator import tool_cache
+from chat.backend.agent.orchestrator.tool_cache import cache_decorator, get_cache_stats
+from utils.cloud.cloud_utils import _state_var
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.store = {}
+        self.ttls = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def mget(self, keys):
+        return [self.store.get(key) for key in keys]
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+        self.ttls[key] = ttl
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        return True
+
+    def exists(self, key):
+        return int(key in self.store)
+
+    def eval(self, script, numkeys, key, token):
+        if self.store.get(key) == token:
+            del self.store[key]
+            return 1
+        return 0
+
+
+@pytest.fixture
+def redis():
+    fake = _FakeRedis()
+    with patch.object(tool_cache, "_get_redis", return_value=fake), \
+            patch.object(tool_cache, "_stats", {}), \
+            patch.object(tool_cache, "_POLL_INITIAL", 0.001), \
+            patch.object(tool_cache, "_POLL_MAX", 0.005):
+        yield fake
+
+
+def _run(coro, incident_id="inc-1"):
+    async def with_state():
+        _state_var.set(SimpleNamespace(incident_id=incident_id))
+        return await coro()
+    return asyncio.run(with_state())
+
+
+def _slow_tool(calls, delay=0.02, fail=False):
+    async def query(q):
+        calls.append(q)
+        await asyncio.sleep(delay)
+        if fail:
+            raise RuntimeError("upstream down")
+        return {"rows": [q]}
+    return query
+
+
+def test_concurrent_identical_calls_execute_once(redis):
+    calls = []
+    cached = cache_decorator(_slow_tool(calls), tool_name="query_datadog", ttl_seconds=120)
+
+    async def scenario():
+        return await asyncio.gather(*(cached("cpu") for _ in range(5)))
+
+    results = _run(scenario)
+    assert calls == ["cpu"]
+    assert results == [{"rows": ["cpu"]}] * 5
+    assert get_cache_stats("inc-1") == {"hits": 0, "misses": 1, "coalesced": 4}
+    assert list(redis.ttls.values()) == [120]
+
+
+def test_later_call_is_a_hit(redis):
+    calls = []
+    cached = cache_decorator(_slow_tool(calls, delay=0), tool_name="t")
+
+    async def scenario():
+        await cached("cpu")
+        return await cached("cpu")
+
+    assert _run(scenario) == {"rows": ["cpu"]}
+    assert calls == ["cpu"]
+    assert get_cache_stats("inc-1")["hits"] == 1
+
+
+def test_waits_for_another_workers_pending_call(redis):
+    calls = []
+    cached = cache_decorator(_slow_tool(calls), tool_name="t")
+    key = tool_cache._cache_key("inc-1", "t", ("cpu",), {})
+    redis.store[key + tool_cache._PENDING_SUFFIX] = "other-worker"
+
+    async def other_worker_finishes():
+        await asyncio.sleep(0.01)
+        redis.setex(key, 600, json.dumps({"rows": ["remote"]}))
+        del redis.store[key + tool_cache._PENDING_SUFFIX]
+
+    async def scenario():
+        result, _ = await asyncio.gather(cached("cpu"), other_worker_finishes())
+        return result
+
+    assert _run(scenario) == {"rows": ["remote"]}
+    assert calls == []
+    assert get_cache_stats("inc-1")["coalesced"] == 1
+
+
+def test_waiters_retry_when_leader_fails(redis):
+    calls = []
+    attempts = {"n": 0}
+
+    async def flaky(q):
+        attempts["n"] += 1
+        calls.append(q)
+        await asyncio.sleep(0.01)
+        if attempts["n"] == 1:
+            raise RuntimeError("transient")
+        return "ok"
+
+    cached = cache_decorator(flaky, tool_name="t")
+
+    async def scenario():
+        return await asyncio.gather(cached("cpu"), cached("cpu"), return_exceptions=True)
+
+    first, second = _run(scenario)
+    assert isinstance(first, RuntimeError)
+    assert second == "ok"
+    assert len(calls) == 2
+    assert tool_cache._inflight == {}
+
+
+def test_different_incidents_do_not_share(redis):
+    calls = []
+    cached = cache_decorator(_slow_tool(calls, delay=0), tool_name="t")
+    _run(lambda: cached("cpu"), incident_id="inc-1")
+    _run(lambda: cached("cpu"), incident_id="inc-2")
+    assert calls == ["cpu", "cpu"]
+
+
+def test_wrap_tool_uses_metadata_ttl():
+    tool = SimpleNamespace(name="t", coroutine=_slow_tool([]))
+    tool.model_copy = lambda update: SimpleNamespace(name="t", **update)
+    with patch.object(tool_cache, "cache_decorator", wraps=cache_decorator) as spy:
+        tool_cache.wrap_tool_with_cache(tool, tool_metadata={"cacheable": True, "cache_ttl": 42})
+    assert spy.call_args.kwargs["ttl_seconds"] == 42
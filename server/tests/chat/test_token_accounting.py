@@ -0,0 +1,96 @@
+"""Tests for memoized token counting in LLMUsageTracker."""
+
+from types import SimpleNamespace
+
+import pytest
+from cachetools import LRUCache
+
+if not isinstance(LRUCache, type):  # conftest stubs cachetools when it is not installed
+    pytest.skip("cachetools is not installed", allow_module_level=True)
+
+from chat.backend.agent.utils import llm_usage_tracker  # noqa: E402
+from chat.backend.agent.utils.llm_usage_tracker import LLMUsageTracker  # noqa: E402
+
+
+class _WordEncoding:
+    """One token per whitespace-separated word; records every encode call."""
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, text, disallowed_special=()):
+        self.encoded.append(text)
+        return text.split()
+
+
+@pytest.fixture()
+def encoding(monkeypatch):
+    fake = _WordEncoding()
+    monkeypatch.setattr(llm_usage_tracker, "_get_encoding", lambda name: fake)
+    monkeypatch.setattr(llm_usage_tracker, "_token_cache", llm_usage_tracker._TokenCountCache(1000))
+    return fake
+
+
+def _message(content):
+    return SimpleNamespace(content=content)
+
+
+def test_growing_history_only_tokenizes_new_messages(encoding):
+    history = [_message(f"step {i} kubectl get pods") for i in range(50)]
+    assert LLMUsageTracker.count_tokens_from_messages(history) == 250
+    assert len(encoding.encoded) == 50
+
+    history.append(_message("new tool output line"))
+    assert LLMUsageTracker.count_tokens_from_messages(history) == 254
+    assert len(encoding.encoded) == 51
+    assert LLMUsageTracker.get_token_cache_stats()["hits"] == 50
+
+
+def test_multimodal_parts_and_non_list_input(encoding):
+    message = _message([
+        {"type": "text", "text": "describe this graph"},
+        {"type": "image_url", "image_url": {"url": "data:..."}},
+        "trailing note",
+    ])
+    assert LLMUsageTracker.count_tokens_from_messages([message, SimpleNamespace(text="a b")]) == 3 + 85 + 2 + 2
+    assert LLMUsageTracker.count_tokens_from_messages("plain prompt text") == 3
+
+
+def test_encodings_are_cached_separately(monkeypatch):
+    encodings = {"cl100k_base": _WordEncoding(), "o200k_base": _WordEncoding()}
+    monkeypatch.setattr(llm_usage_tracker, "_get_encoding", encodings.__getitem__)
+    monkeypatch.setattr(llm_usage_tracker, "_token_cache", llm_usage_tracker._TokenCountCache(1000))
+
+    LLMUsageTracker.count_tokens("same text", "gpt-4")
+    LLMUsageTracker.count_tokens("same text", "gpt-4o")
+    LLMUsageTracker.count_tokens("same text", "gpt-4o-mini")
+    assert len(encodings["cl100k_base"].encoded) == 1
+    assert len(encodings["o200k_base"].encoded) == 1
+
+
+def test_large_text_is_estimated_from_samples(encoding, monkeypatch):
+    monkeypatch.setattr(llm_usage_tracker, "TOKEN_ESTIMATE_MIN_CHARS", 10_000)
+    text = "pod-abc Running 10.0.0.1 " * 20_000  # 3 tokens per 25 chars
+
+    estimate = LLMUsageTracker.count_tokens(text)
+    assert abs(estimate - 60_000) / 60_000 < 0.01
+    assert sum(len(chunk) for chunk in encoding.encoded) < len(text) // 4
+    assert LLMUsageTracker.get_token_cache_stats()["estimated"] == 1
+
+
+def test_cache_is_lru_bounded(encoding, monkeypatch):
+    monkeypatch.setattr(llm_usage_tracker, "_token_cache", llm_usage_tracker._TokenCountCache(2))
+    for text in ("a", "b", "a", "c", "b"):
+        LLMUsageTracker.count_tokens(text)
+    # "b" was evicted by "c" and had to be re-encoded.
+    assert encoding.encoded == ["a", "b", "c", "b"]
+    assert LLMUsageTracker.get_token_cache_stats()["size"] == 2
+
+
+def test_encoding_failure_falls_back_to_length(monkeypatch):
+    def broken(name):
+        raise RuntimeError("no encoding files")
+
+    monkeypatch.setattr(llm_usage_tracker, "_get_encoding", broken)
+    monkeypatch.setattr(llm_usage_tracker, "_token_cache", llm_usage_tracker._TokenCountCache(10))
+    assert LLMUsageTracker.count_tokens("x" * 40) == 10
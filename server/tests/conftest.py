@@ -49,7 +49,7 @@ _OPTIONAL_PACKAGES = (
     "neo4j", "casbin", "casbin_sqlalchemy_adapter", "sqlalchemy",
     "hvac", "redis", "celery", "weaviate", "flask_socketio",
     "flask_cors", "langchain", "langgraph", "requests", "tiktoken",
-    "dotenv", "flask",
+    "dotenv", "flask", "websockets", "cachetools",
     "langchain_core", "langchain_core.tools", "langchain_core.language_models",
     "langchain_core.language_models.chat_models",
     "langchain_anthropic", "langchain_openai", "langchain_google_genai",
@@ -67,6 +67,8 @@ _OPTIONAL_PACKAGES = (
     "langgraph.checkpoint", "langgraph.checkpoint.memory",
     "langgraph.graph", "langgraph.graph.state", "langgraph.types",
     "celery.exceptions", "celery.signals",
+    "weaviate.classes", "weaviate.classes.config", "weaviate.classes.init",
+    "weaviate.classes.query", "weaviate.util",
 )
 
 # Namespace packages that must be stubbed *prefix-wise*, not module-by-module.
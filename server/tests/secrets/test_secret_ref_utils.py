@@ -342,3 +342,45 @@ class TestProviderCanonicalizedInSQL:
                 f"Raw provider {raw_provider!r} found in SQL params {params}; "
                 f"only lowercase provider_base should reach the query"
             )
+
+
+# ---------------------------------------------------------------------------
+# AWS rows: both secrets go through the cache together
+# ---------------------------------------------------------------------------
+
+
+class TestAwsSecretsCachedTogether:
+    """An AWS row's token and external ID are read in one MGET and refilled in one write."""
+
+    _ROW = ("vault:kv/data/aurora/users/aws-token", "arn:aws:iam::1:role/r", "vault:kv/data/aurora/users/aws-ext")
+
+    def _manager(self, manager_with_mocked_db, monkeypatch, cached):
+        manager, _, cursor = manager_with_mocked_db
+        cursor.fetchone.return_value = self._ROW
+        backend = MagicMock()
+        backend.get_secret.side_effect = {
+            self._ROW[0]: '{"aws_access_key_id": "AKIA"}',
+            self._ROW[2]: "ext-123",
+        }.get
+        manager._backend = backend
+        writes = MagicMock()
+        monkeypatch.setattr(sru, "get_cached_secrets", MagicMock(return_value=cached))
+        monkeypatch.setattr(sru, "update_secret_cache_many", writes)
+        monkeypatch.setattr(sru, "update_secret_cache", MagicMock(side_effect=AssertionError("per-key write")))
+        return manager, backend, writes
+
+    def test_misses_are_written_back_in_one_call(self, manager_with_mocked_db, monkeypatch):
+        manager, backend, writes = self._manager(manager_with_mocked_db, monkeypatch, {})
+
+        token = manager.get_user_token_data(_UID, "aws")
+
+        assert token == {"aws_access_key_id": "AKIA", "role_arn": self._ROW[1], "external_id": "ext-123"}
+        writes.assert_called_once_with({self._ROW[0]: '{"aws_access_key_id": "AKIA"}', self._ROW[2]: "ext-123"})
+
+    def test_cache_hits_skip_vault_and_the_write(self, manager_with_mocked_db, monkeypatch):
+        cached = {self._ROW[0]: '{"aws_access_key_id": "AKIA"}', self._ROW[2]: "ext-123"}
+        manager, backend, writes = self._manager(manager_with_mocked_db, monkeypatch, cached)
+
+        assert manager.get_user_token_data(_UID, "aws")["external_id"] == "ext-123"
+        backend.get_secret.assert_not_called()
+        writes.assert_not_called()
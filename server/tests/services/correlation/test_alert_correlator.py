@@ -102,9 +102,9 @@ class TestAlertCorrelatorAboveThreshold:
     def test_above_threshold_returns_correlated(
         self, MockSimilarity, MockTimeWindow, MockTopology
     ):
-        MockTopology.return_value.score.return_value = 0.9
+        MockTopology.return_value.score_batch.return_value = [0.9]
         MockTimeWindow.return_value.score.return_value = 0.8
-        MockSimilarity.return_value.score.return_value = 0.7
+        MockSimilarity.return_value.score_batch.return_value = [0.7]
 
         correlator = AlertCorrelator()
         cursor = _make_cursor(candidate_rows=[_CANDIDATE_ROW])
@@ -115,6 +115,8 @@ class TestAlertCorrelatorAboveThreshold:
         assert result.is_correlated is True
         assert result.incident_id == "inc-uuid-001"
         assert result.score == pytest.approx(0.83)
+        latency = result.details["latency_ms"]
+        assert {"candidates", "topology", "time_window", "similarity", "total"} <= set(latency)
 
 
 class TestAlertCorrelatorBelowThreshold:
@@ -124,9 +126,9 @@ class TestAlertCorrelatorBelowThreshold:
     def test_below_threshold_returns_not_correlated(
         self, MockSimilarity, MockTimeWindow, MockTopology
     ):
-        MockTopology.return_value.score.return_value = 0.1
+        MockTopology.return_value.score_batch.return_value = [0.1]
         MockTimeWindow.return_value.score.return_value = 0.2
-        MockSimilarity.return_value.score.return_value = 0.1
+        MockSimilarity.return_value.score_batch.return_value = [0.1]
 
         correlator = AlertCorrelator()
         cursor = _make_cursor(candidate_rows=[_CANDIDATE_ROW])
@@ -150,9 +152,9 @@ class TestAlertCorrelatorShadowMode:
     def test_shadow_mode_returns_not_correlated(
         self, MockSimilarity, MockTimeWindow, MockTopology
     ):
-        MockTopology.return_value.score.return_value = 0.9
+        MockTopology.return_value.score_batch.return_value = [0.9]
         MockTimeWindow.return_value.score.return_value = 0.9
-        MockSimilarity.return_value.score.return_value = 0.9
+        MockSimilarity.return_value.score_batch.return_value = [0.9]
 
         correlator = AlertCorrelator(shadow_mode=True)
         cursor = _make_cursor(candidate_rows=[_CANDIDATE_ROW])
@@ -169,9 +171,9 @@ class TestAlertCorrelatorStrategyException:
     def test_strategy_exception_degrades_gracefully(
         self, MockSimilarity, MockTimeWindow, MockTopology
     ):
-        MockTopology.return_value.score.side_effect = RuntimeError("memgraph down")
+        MockTopology.return_value.score_batch.side_effect = RuntimeError("memgraph down")
         MockTimeWindow.return_value.score.return_value = 0.9
-        MockSimilarity.return_value.score.return_value = 0.9
+        MockSimilarity.return_value.score_batch.return_value = [0.9]
 
         correlator = AlertCorrelator()
         cursor = _make_cursor(candidate_rows=[_CANDIDATE_ROW])
@@ -188,9 +190,9 @@ class TestAlertCorrelatorStrategyException:
     def test_strategy_exception_with_high_remaining_scores(
         self, MockSimilarity, MockTimeWindow, MockTopology
     ):
-        MockTopology.return_value.score.side_effect = RuntimeError("boom")
+        MockTopology.return_value.score_batch.side_effect = RuntimeError("boom")
         MockTimeWindow.return_value.score.return_value = 1.0
-        MockSimilarity.return_value.score.return_value = 1.0
+        MockSimilarity.return_value.score_batch.return_value = [1.0]
 
         correlator = AlertCorrelator()
         cursor = _make_cursor(candidate_rows=[_CANDIDATE_ROW])
@@ -209,9 +211,9 @@ class TestAlertCorrelatorMaxGroupSize:
     def test_max_group_size_returns_not_correlated(
         self, MockSimilarity, MockTimeWindow, MockTopology
     ):
-        MockTopology.return_value.score.return_value = 0.9
+        MockTopology.return_value.score_batch.return_value = [0.9]
         MockTimeWindow.return_value.score.return_value = 0.9
-        MockSimilarity.return_value.score.return_value = 0.9
+        MockSimilarity.return_value.score_batch.return_value = [0.9]
 
         correlator = AlertCorrelator(max_group_size=5)
         row = _make_candidate_row(count=5)
@@ -317,9 +319,9 @@ class TestScoreCandidate:
     def test_weighted_score_calculation(
         self, MockSimilarity, MockTimeWindow, MockTopology
     ):
-        MockTopology.return_value.score.return_value = 1.0
+        MockTopology.return_value.score_batch.return_value = [1.0]
         MockTimeWindow.return_value.score.return_value = 1.0
-        MockSimilarity.return_value.score.return_value = 1.0
+        MockSimilarity.return_value.score_batch.return_value = [1.0]
 
         correlator = AlertCorrelator()
         candidate = {
@@ -331,8 +333,8 @@ class TestScoreCandidate:
             "updated_at": _NOW - timedelta(seconds=30),
         }
 
-        result = correlator._score_candidate(
-            candidate=candidate,
+        [result] = correlator._score_candidates(
+            candidates=[candidate],
             user_id="user-1",
             alert_title="CPU alert",
             alert_service="api",
@@ -351,9 +353,9 @@ class TestScoreCandidate:
     def test_falls_back_to_alert_service_when_no_affected(
         self, MockSimilarity, MockTimeWindow, MockTopology
     ):
-        MockTopology.return_value.score.return_value = 0.5
+        MockTopology.return_value.score_batch.return_value = [0.5]
         MockTimeWindow.return_value.score.return_value = 0.5
-        MockSimilarity.return_value.score.return_value = 0.5
+        MockSimilarity.return_value.score_batch.return_value = [0.5]
 
         correlator = AlertCorrelator()
         candidate = {
@@ -365,16 +367,53 @@ class TestScoreCandidate:
             "updated_at": _NOW - timedelta(seconds=30),
         }
 
-        correlator._score_candidate(
-            candidate=candidate,
+        correlator._score_candidates(
+            candidates=[candidate],
             user_id="user-1",
             alert_title="Disk alert",
             alert_service="storage",
             alert_received_at=_NOW,
         )
 
-        MockTopology.return_value.score.assert_called_once_with(
+        MockTopology.return_value.score_batch.assert_called_once_with(
             "storage",
-            ["storage"],
+            [["storage"]],
             "user-1",
         )
+
+
+class TestScoreCandidatesBatch:
+    @patch("services.correlation.alert_correlator.TopologyStrategy")
+    @patch("services.correlation.alert_correlator.TimeWindowStrategy")
+    @patch("services.correlation.alert_correlator.SimilarityStrategy")
+    def test_each_strategy_called_once_for_all_candidates(
+        self, MockSimilarity, MockTimeWindow, MockTopology
+    ):
+        MockTopology.return_value.score_batch.return_value = [0.2, 1.0, 0.0]
+        MockTimeWindow.return_value.score.return_value = 0.5
+        MockSimilarity.return_value.score_batch.return_value = [0.1, 0.9, 0.3]
+
+        correlator = AlertCorrelator()
+        rows = [
+            _make_candidate_row(id="inc-a", title="A", service="svc-a"),
+            _make_candidate_row(id="inc-b", title="B", service="api-server"),
+            _make_candidate_row(id="inc-c", title="C", service="svc-c"),
+        ]
+        cursor = _make_cursor(candidate_rows=rows)
+
+        result = _call_correlate(correlator, cursor)
+
+        MockTopology.return_value.score_batch.assert_called_once_with(
+            "api-server",
+            [["svc-a"], ["api-server"], ["svc-c"]],
+            "user-1",
+        )
+        MockSimilarity.return_value.score_batch.assert_called_once_with(
+            "High CPU on api",
+            "api-server",
+            [("A", ["svc-a"]), ("B", ["api-server"]), ("C", ["svc-c"])],
+        )
+        assert result.is_correlated is True
+        assert result.incident_id == "inc-b"
+        # weighted = 0.5*1.0 + 0.3*0.5 + 0.2*0.9 = 0.5+0.15+0.18 = 0.83
+        assert result.score == pytest.approx(0.83)
@@ -0,0 +1,133 @@
+"""Tests for EmbeddingClient and its two-tier EmbeddingCache."""
+
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from cachetools import TTLCache
+
+if not isinstance(TTLCache, type):  # conftest stubs cachetools when it is not installed
+    pytest.skip("cachetools is not installed", allow_module_level=True)
+
+from services.correlation.embedding_cache import EmbeddingCache  # noqa: E402
+from services.correlation.embedding_client import EmbeddingClient  # noqa: E402
+
+
+class _FakeRedis:
+    """Minimal dict-backed stand-in for the redis-py calls the cache makes."""
+
+    def __init__(self):
+        self.store = {}
+
+    def mget(self, keys):
+        return [self.store.get(k) for k in keys]
+
+    def pipeline(self, transaction=False):
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.ops = []
+
+    def setex(self, key, ttl, value):
+        self.ops.append((key, value))
+
+    def execute(self):
+        for key, value in self.ops:
+            self.redis.store[key] = value
+
+
+def _response(vector):
+    resp = MagicMock()
+    resp.json.return_value = {"vector": vector}
+    resp.raise_for_status.return_value = None
+    return resp
+
+
+@pytest.fixture
+def fake_redis():
+    redis = _FakeRedis()
+    with patch(
+        "services.correlation.embedding_cache.get_redis_client", return_value=redis
+    ):
+        yield redis
+
+
+class TestEmbeddingCache:
+    def test_key_is_namespaced_by_model(self):
+        a = EmbeddingCache(model_name="model-a")
+        b = EmbeddingCache(model_name="model-b")
+        assert a.key_for("text") != b.key_for("text")
+        assert a.key_for("text").startswith("embedding:model-a:")
+
+    def test_local_then_redis_then_miss(self, fake_redis):
+        cache = EmbeddingCache(model_name="m")
+        cache.set_many({"alpha": [1.0, 2.0]})
+        fake_redis.store[cache.key_for("beta")] = json.dumps([3.0])
+
+        found = cache.get_many(["alpha", "beta", "gamma"])
+
+        assert found == {"alpha": [1.0, 2.0], "beta": [3.0]}
+        stats = cache.stats()
+        assert stats["local_hits"] == 1
+        assert stats["redis_hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_ratio"] == pytest.approx(2 / 3, abs=1e-4)
+
+    def test_redis_hit_is_promoted_to_local(self, fake_redis):
+        cache = EmbeddingCache(model_name="m")
+        fake_redis.store[cache.key_for("beta")] = json.dumps([3.0])
+
+        cache.get_many(["beta"])
+        fake_redis.store.clear()
+        assert cache.get_many(["beta"]) == {"beta": [3.0]}
+        assert cache.stats()["local_hits"] == 1
+
+    def test_redis_unavailable_uses_local_tier_only(self):
+        cache = EmbeddingCache(model_name="m")
+        with patch(
+            "services.correlation.embedding_cache.get_redis_client", return_value=None
+        ):
+            cache.set_many({"alpha": [1.0]})
+            assert cache.get_many(["alpha", "beta"]) == {"alpha": [1.0]}
+
+
+class TestEmbeddingClient:
+    def _client(self):
+        return EmbeddingClient(cache=EmbeddingCache(model_name="m"), max_concurrency=4)
+
+    def test_repeated_text_costs_one_http_call(self, fake_redis):
+        client = self._client()
+        session = MagicMock()
+        session.post.return_value = _response([0.1, 0.2])
+        client._session = session
+
+        assert client.embed("High CPU") == [0.1, 0.2]
+        assert client.embed("High CPU") == [0.1, 0.2]
+
+        assert session.post.call_count == 1
+
+    def test_embed_batch_fetches_only_distinct_misses(self, fake_redis):
+        client = self._client()
+        client.cache.set_many({"cached": [9.0]})
+        session = MagicMock()
+        session.post.side_effect = lambda url, json, timeout: _response([len(json["text"])])
+        client._session = session
+
+        vectors = client.embed_batch(["cached", "ab", "", "abc", "ab"])
+
+        assert vectors == [[9.0], [2], None, [3], [2]]
+        posted = sorted(call.kwargs["json"]["text"] for call in session.post.call_args_list)
+        assert posted == ["ab", "abc"]
+
+    def test_failed_fetch_is_not_cached(self, fake_redis):
+        client = self._client()
+        session = MagicMock()
+        session.post.side_effect = [_response(None), _response([1.0])]
+        client._session = session
+
+        assert client.embed("flaky") is None
+        assert client.embed("flaky") == [1.0]
+        assert session.post.call_count == 2
@@ -65,6 +65,48 @@ class TestSimilarityStrategyWithVectors:
         assert score <= 0.3
 
 
+    @patch("services.correlation.strategies.similarity.get_embedding_client")
+    def test_score_batch_embeds_alert_once_and_titles_together(self, mock_get_client):
+        """Batch scoring uses one alert embed and one embed_batch call."""
+        mock_client = MagicMock()
+        mock_client.embed.return_value = [1.0, 0.0]
+        mock_client.embed_batch.return_value = [[1.0, 0.0], [0.0, 1.0]]
+        mock_get_client.return_value = mock_client
+
+        scores = self.strategy.score_batch(
+            "High CPU on api",
+            "api",
+            [
+                ("High CPU on api", ["api"]),
+                ("Disk full", ["db"]),
+                ("High CPU on api", ["db"]),
+            ],
+        )
+
+        mock_client.embed.assert_called_once_with("High CPU on api")
+        mock_client.embed_batch.assert_called_once_with(["High CPU on api", "Disk full"])
+        assert scores == pytest.approx([1.0, 0.0, 0.7])
+
+    @patch("services.correlation.strategies.similarity.get_embedding_client")
+    def test_score_batch_falls_back_to_jaccard_per_title(self, mock_get_client):
+        """Titles that fail to embed use Jaccard; others keep cosine."""
+        mock_client = MagicMock()
+        mock_client.embed.return_value = [1.0, 0.0]
+        mock_client.embed_batch.return_value = [None, [1.0, 0.0]]
+        mock_get_client.return_value = mock_client
+
+        scores = self.strategy.score_batch(
+            "database connection timeout",
+            "",
+            [
+                ("database connection timeout", []),
+                ("something else", []),
+            ],
+        )
+
+        assert scores == pytest.approx([0.7, 0.7])
+
+
 class TestSimilarityStrategyFallback:
     """Tests for Jaccard fallback when embeddings unavailable."""
 
@@ -5,8 +5,20 @@ from unittest.mock import patch, MagicMock
 import pytest
 
 from services.correlation.strategies.topology import TopologyStrategy
+from services.graph.topology_snapshot import TopologySnapshot
 
 
+@pytest.fixture
+def no_snapshot():
+    """Force the direct-Memgraph fallback path."""
+    with patch(
+        "services.correlation.strategies.topology.get_topology_snapshot",
+        return_value=None,
+    ):
+        yield
+
+
+@pytest.mark.usefixtures("no_snapshot")
 class TestTopologyStrategy:
     """Suite for graph-based topology scoring."""
 
@@ -153,3 +165,84 @@ class TestTopologyStrategy:
     def test_empty_incident_services_returns_zero(self):
         """Empty incident_services list → 0.0."""
         assert self.strategy.score("api-server", [], "user-1") == 0.0
+
+    # ------------------------------------------------------------------
+    # Batch scoring
+    # ------------------------------------------------------------------
+
+    def test_score_batch_fetches_neighborhood_once(self):
+        """Many candidates share a single upstream/downstream traversal."""
+        client = self._mock_client(
+            upstream=[{"name": "db-primary", "depth": 1}],
+            downstream=[{"name": "web-frontend", "depth": 2}],
+        )
+        with patch(
+            "services.graph.memgraph_client.get_memgraph_client",
+            return_value=client,
+        ):
+            scores = self.strategy.score_batch(
+                "api-server",
+                [["db-primary"], ["web-frontend"], ["api-server"], ["unknown"], []],
+                "user-1",
+            )
+        assert scores == pytest.approx([1.0, 0.5, 1.0, 0.0, 0.0])
+        client.get_all_upstream.assert_called_once()
+        client.get_all_downstream.assert_called_once()
+
+    def test_score_batch_exact_matches_skip_memgraph(self):
+        """Only exact matches → no graph traversal needed."""
+        with patch(
+            "services.graph.memgraph_client.get_memgraph_client",
+        ) as get_client:
+            scores = self.strategy.score_batch(
+                "api-server", [["api-server"], ["db", "api-server"]], "user-1"
+            )
+        assert scores == [1.0, 1.0]
+        get_client.assert_not_called()
+
+    def test_score_batch_memgraph_exception_returns_zeros(self):
+        with patch(
+            "services.graph.memgraph_client.get_memgraph_client",
+            side_effect=RuntimeError("connection refused"),
+        ):
+            scores = self.strategy.score_batch(
+                "api-server", [["db-primary"], ["cache"]], "user-1"
+            )
+        assert scores == [0.0, 0.0]
+
+
+class TestTopologyStrategySnapshot:
+    """Scoring served from the in-process topology snapshot."""
+
+    def setup_method(self):
+        self.strategy = TopologyStrategy()
+        # api-server -> db-primary -> storage; web-frontend -> api-server
+        self.snapshot = TopologySnapshot(
+            nodes=[
+                ("u:aws:api-server", "api-server"),
+                ("u:aws:db-primary", "db-primary"),
+                ("u:aws:storage", "storage"),
+                ("u:aws:web-frontend", "web-frontend"),
+            ],
+            edges=[
+                ("u:aws:api-server", "u:aws:db-primary"),
+                ("u:aws:db-primary", "u:aws:storage"),
+                ("u:aws:web-frontend", "u:aws:api-server"),
+            ],
+            version="1",
+        )
+
+    def test_snapshot_scores_without_memgraph(self):
+        with patch(
+            "services.correlation.strategies.topology.get_topology_snapshot",
+            return_value=self.snapshot,
+        ), patch(
+            "services.graph.memgraph_client.get_memgraph_client",
+        ) as get_client:
+            scores = self.strategy.score_batch(
+                "api-server",
+                [["db-primary"], ["storage"], ["web-frontend"], ["unknown"]],
+                "user-1",
+            )
+        assert scores == pytest.approx([1.0, 0.7, 0.8, 0.0])
+        get_client.assert_not_called()
@@ -0,0 +1,160 @@
+"""Tests for incremental graph writes and parallel connection inference."""
+
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from services.discovery import graph_writer
+from services.discovery.graph_writer import GraphDiffWriter
+from services.discovery.inference import connection_inference
+
+
+class _FakePipeline:
+    def __init__(self, redis):
+        self._redis = redis
+        self._ops = []
+
+    def delete(self, key):
+        self._ops.append(lambda: self._redis.hashes.pop(key, None))
+
+    def hset(self, key, mapping):
+        self._ops.append(lambda: self._redis.hashes.setdefault(key, {}).update(mapping))
+
+    def expire(self, key, seconds):
+        pass
+
+    def execute(self):
+        for op in self._ops:
+            op()
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.hashes = {}
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+
+class _FakeMemgraph:
+    def __init__(self):
+        self.services = set()
+        self.edges = set()
+        self.upserted_services = []
+        self.upserted_edges = []
+        self.touched = 0
+
+    def batch_upsert_services(self, user_id, services):
+        self.upserted_services.extend(s["name"] for s in services)
+        self.services.update(graph_writer.service_node_id(user_id, s["provider"], s["name"]) for s in services)
+        return len(services)
+
+    def batch_upsert_dependencies(self, user_id, deps):
+        self.upserted_edges.extend((d["from_service"], d["to_service"]) for d in deps)
+        self.edges.update((d["from_service"], d["to_service"]) for d in deps)
+        return len(deps)
+
+    def touch_services(self, user_id, service_ids):
+        self.touched += len(service_ids)
+        return self.services & set(service_ids)
+
+    def touch_dependencies(self, user_id, pairs):
+        self.touched += len(pairs)
+        return self.edges & set(pairs)
+
+
+_SERVICES = [
+    {"name": "orders-api", "resource_type": "vm", "provider": "aws"},
+    {"name": "orders-db", "resource_type": "database", "provider": "aws"},
+]
+_EDGES = [{"from_service": "orders-api", "to_service": "orders-db", "dependency_type": "database", "confidence": 0.9}]
+
+
+@pytest.fixture()
+def graph():
+    redis, memgraph = _FakeRedis(), _FakeMemgraph()
+    with patch.object(graph_writer, "_redis", return_value=redis), \
+            patch.object(graph_writer, "get_memgraph_client", return_value=memgraph):
+        yield memgraph
+
+
+def _run(services, edges):
+    writer = GraphDiffWriter("user-1")
+    counts = (writer.write_services(services), writer.write_dependencies(edges))
+    writer.commit()
+    return writer, counts
+
+
+def test_unchanged_items_are_touched_not_upserted(graph):
+    first, counts = _run(_SERVICES, _EDGES)
+    assert counts == (2, 1) and not first.stats["snapshot_loaded"]
+
+    graph.upserted_services.clear()
+    graph.upserted_edges.clear()
+    changed = [dict(_SERVICES[0], region="us-east-1"), _SERVICES[1]]
+    second, counts = _run(changed, _EDGES)
+
+    assert counts == (2, 1)
+    assert graph.upserted_services == ["orders-api"]
+    assert graph.upserted_edges == []
+    assert second.stats == {
+        "snapshot_loaded": True,
+        "services_changed": 1,
+        "services_unchanged": 1,
+        "dependencies_changed": 0,
+        "dependencies_unchanged": 1,
+    }
+
+
+def test_items_missing_from_memgraph_are_rewritten(graph):
+    _run(_SERVICES, _EDGES)
+    graph.services.clear()
+    graph.edges.clear()
+    graph.upserted_services.clear()
+
+    writer, _ = _run(_SERVICES, _EDGES)
+    assert sorted(graph.upserted_services) == ["orders-api", "orders-db"]
+    assert writer.stats["services_unchanged"] == writer.stats["dependencies_unchanged"] == 0
+
+
+def _engine(edges, delay=0.0, error=None):
+    def infer(user_id, node_index, enrichment_data):
+        time.sleep(delay)
+        if error:
+            raise error
+        return edges
+    return SimpleNamespace(infer=infer)
+
+
+def test_infer_connections_merges_in_engine_order(monkeypatch):
+    seen_threads = set()
+    slow_edge = {"from_service": "a", "to_service": "b", "confidence": 0.6, "discovered_from": ["slow"]}
+    fast_edge = {"from_service": "a", "to_service": "b", "confidence": 0.6, "discovered_from": ["fast"]}
+
+    def tracked(module):
+        def infer(*args):
+            seen_threads.add(threading.current_thread().name)
+            return module.infer(*args)
+        return SimpleNamespace(infer=infer)
+
+    monkeypatch.setattr(connection_inference, "_INFERENCE_MODULES", [
+        ("slow", tracked(_engine([slow_edge], delay=0.1))),
+        ("fast", tracked(_engine([fast_edge]))),
+        ("broken", tracked(_engine([], error=RuntimeError("boom")))),
+    ])
+    edges, stats = connection_inference.infer_connections("user-1", [], {}, max_workers=3)
+
+    assert edges == [{
+        "from_service": "a", "to_service": "b", "dependency_type": "unknown",
+        "confidence": 0.6, "discovered_from": ["slow", "fast"],
+    }]
+    assert stats["slow"]["edges"] == stats["fast"]["edges"] == 1
+    assert stats["broken"] == {"edges": 0, "seconds": stats["broken"]["seconds"], "error": "boom"}
+    assert all(name.startswith("discovery-inference") for name in seen_threads)
+    assert connection_inference.run_all_inference("user-1", [], {}) == edges
@@ -0,0 +1,103 @@
+"""Tests for NodeIndex: indexed lookups must match the linear scans."""
+
+import pytest
+
+from services.discovery.inference.node_lookup import (
+    NodeIndex,
+    build_node_index,
+    find_compute_node,
+    find_node_by_arn,
+    find_node_by_endpoint,
+    find_node_by_identifier,
+    find_node_by_name,
+    nodes_of_type,
+)
+
+_NODES = [
+    {
+        "name": "Orders-API",
+        "resource_type": "vm",
+        "cloud_resource_id": "arn:aws:ec2:us-east-1:1:instance/i-1",
+        "endpoint": "https://orders.us-east-1.internal:8443",
+        "resource_id": "i-1",
+    },
+    {
+        "name": "orders-api",
+        "resource_type": "serverless_function",
+        "cloud_resource_id": "arn:aws:lambda:us-east-1:1:function:orders-api",
+        "endpoint": "orders.us-east-1.internal",
+    },
+    {
+        "name": "payments-queue",
+        "resource_type": "message_queue",
+        "cloud_resource_id": "arn:aws:sqs:us-east-1:1:payments-queue",
+        "arn": "arn:aws:sqs:us-east-1:1:payments-queue",
+    },
+    {"name": "db", "resource_type": "database", "endpoint": "db.internal"},
+    {"name": "", "resource_type": "vm"},
+]
+
+_NAME_QUERIES = ["orders-api", "ORDERS-API", "payments-queue", "db", "missing", "", None]
+_ARN_QUERIES = [
+    "arn:aws:lambda:us-east-1:1:function:orders-api",
+    "ARN:AWS:SQS:US-EAST-1:1:PAYMENTS-QUEUE",
+    "arn:aws:sqs:eu-west-1:2:db",  # falls back to the name in the ARN
+    "arn:aws:sqs:eu-west-1:2:nothing",
+    "not-an-arn",
+    "",
+]
+_ENDPOINT_QUERIES = [
+    "orders.us-east-1.internal",
+    "us-east-1",
+    "ORDERS",
+    "db",
+    "b.",
+    "missing.example",
+    "",
+]
+
+
+@pytest.fixture
+def index():
+    return NodeIndex(_NODES)
+
+
+class TestNodeIndexParity:
+    @pytest.mark.parametrize("name", _NAME_QUERIES)
+    def test_find_node_by_name(self, index, name):
+        assert find_node_by_name(name, index) == find_node_by_name(name, _NODES)
+
+    @pytest.mark.parametrize("arn", _ARN_QUERIES)
+    def test_find_node_by_arn(self, index, arn):
+        assert find_node_by_arn(arn, index) == find_node_by_arn(arn, _NODES)
+
+    @pytest.mark.parametrize("endpoint", _ENDPOINT_QUERIES)
+    def test_find_node_by_endpoint(self, index, endpoint):
+        assert find_node_by_endpoint(endpoint, index) == find_node_by_endpoint(endpoint, _NODES)
+
+    @pytest.mark.parametrize("name", ["orders-api", "Orders-API", "ORDERS-API", "db"])
+    def test_find_compute_node(self, index, name):
+        assert find_compute_node(index, name) is find_compute_node(_NODES, name)
+
+    @pytest.mark.parametrize("identifier", ["I-1", "orders-api", "arn:aws:sqs:us-east-1:1:payments-queue", "x"])
+    def test_find_node_by_identifier(self, index, identifier):
+        assert find_node_by_identifier(index, identifier) is find_node_by_identifier(_NODES, identifier)
+
+    def test_nodes_of_type_preserves_order(self, index):
+        assert nodes_of_type(index, "vm") == nodes_of_type(_NODES, "vm")
+        assert nodes_of_type(index, "vm", "database") == nodes_of_type(_NODES, "vm", "database")
+
+
+class TestNodeIndexSequence:
+    def test_behaves_like_the_wrapped_list(self, index):
+        assert len(index) == len(_NODES)
+        assert list(index) == _NODES
+        assert index[2] is _NODES[2]
+
+    def test_build_node_index_is_idempotent(self, index):
+        assert build_node_index(index) is index
+        assert isinstance(build_node_index(_NODES), NodeIndex)
+
+    def test_endpoint_lookup_is_memoized(self, index):
+        first = find_node_by_endpoint("us-east-1", index)
+        assert index._endpoint_memo["us-east-1"]["name"] == first
@@ -0,0 +1,155 @@
+"""Tests for paged Phase 1 discovery and compact in-memory node records."""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from services.discovery import discovery_service
+from services.discovery.compact_node import CompactNode, compact_node
+from services.discovery.providers import aws_asset_discovery, azure_asset_discovery
+
+
+def _aws_node(i):
+    return {
+        "name": f"i-{i}",
+        "resource_type": "vm",
+        "provider": "aws",
+        "region": "us-east-1",
+        "cloud_resource_id": f"arn:aws:ec2:us-east-1:1:instance/i-{i}",
+        "metadata": {"aws_resource_type": "ec2:instance", "properties": {"blob": "x" * 100}},
+    }
+
+
+def test_compact_node_reads_like_the_original_dict():
+    node = dict(_aws_node(1), namespace="prod", network_interfaces=[{"private_ip": "10.0.0.1"}])
+    compact = compact_node(node)
+
+    assert isinstance(compact, CompactNode) and compact_node(compact) is compact
+    assert compact["name"] == "i-1" and compact.get("namespace") == "prod"
+    assert compact.get("vpc_id") is None and "vpc_id" not in compact
+    assert compact.get("network_interfaces")[0]["private_ip"] == "10.0.0.1"
+    assert compact["metadata"] == {"aws_resource_type": "ec2:instance"}
+    assert dict(compact) == {**node, "metadata": {"aws_resource_type": "ec2:instance"}}
+    with pytest.raises(KeyError):
+        compact["zone"]
+
+    compact["endpoint"] = "10.0.0.1:443"
+    assert compact["endpoint"] == "10.0.0.1:443"
+    assert not hasattr(compact, "__dict__")
+
+
+def test_aws_yields_one_page_per_search_page(monkeypatch):
+    responses = iter([
+        {"Resources": [{"Arn": "arn:aws:ec2:us-east-1:1:instance/i-1", "ResourceType": "ec2:instance"}], "NextToken": "t"},
+        {"Resources": [{"Arn": "arn:aws:ec2:us-east-1:1:instance/i-2", "ResourceType": "ec2:instance"}]},
+    ])
+    monkeypatch.setattr(aws_asset_discovery, "_find_aggregator_region", lambda env: None)
+    monkeypatch.setattr(aws_asset_discovery, "_run_resource_explorer_search", lambda env, next_token=None: next(responses))
+    creds = {"access_key_id": "a", "secret_access_key": "s"}
+
+    pages = list(aws_asset_discovery.discover_pages("user-1", creds))
+    assert [[n["name"] for n in page["nodes"]] for page in pages] == [["i-1"], ["i-2"]]
+
+    acct = {"account_id": "111", "region": "us-east-1",
+            "credentials": {"accessKeyId": "a", "secretAccessKey": "s", "sessionToken": "t"}}
+    monkeypatch.setattr(aws_asset_discovery, "_run_resource_explorer_search",
+                        lambda env, next_token=None: (_ for _ in ()).throw(RuntimeError("no index")))
+    (page,) = aws_asset_discovery.discover_account_pages("user-1", acct)
+    assert page["errors"] == ["[111] no index"]
+
+
+def test_azure_follows_skip_tokens(monkeypatch):
+    commands = []
+    outputs = iter([
+        {"data": [{"name": "a"}], "skip_token": "next"},
+        {"data": [{"name": "b"}]},
+    ])
+
+    def _run(cmd, **kwargs):
+        commands.append(cmd)
+        return SimpleNamespace(stdout=json.dumps(next(outputs)))
+
+    monkeypatch.setattr(azure_asset_discovery, "_az_login", lambda credentials: None)
+    monkeypatch.setattr(azure_asset_discovery.subprocess, "run", _run)
+
+    pages = list(azure_asset_discovery._query_resource_graph({}))
+    assert pages == [[{"name": "a"}], [{"name": "b"}]]
+    assert "--skip-token" not in commands[0]
+    assert commands[1][-2:] == ["--skip-token", "next"]
+
+
+class _RecordingGraph:
+    def __init__(self, user_id):
+        self.service_batches = []
+        self.stats = {}
+
+    def write_services(self, services):
+        self.service_batches.append(len(services))
+        return len(services)
+
+    def write_dependencies(self, dependencies):
+        return len(dependencies)
+
+    def commit(self):
+        pass
+
+
+def test_pages_are_written_in_bounded_batches(monkeypatch):
+    graphs = []
+    seen = {}
+
+    def _pages(user_id, credentials, env=None):
+        yield {"nodes": [_aws_node(i) for i in range(3)]}
+        yield {"nodes": [_aws_node(3)], "errors": ["page 2 partial"]}
+
+    def _broken_pages(user_id, credentials, env=None):
+        yield {"nodes": [_aws_node(9)]}
+        raise RuntimeError("api down")
+
+    def _infer(user_id, nodes, enrichment_data):
+        seen["nodes"] = nodes
+        return [], {}
+
+    monkeypatch.setattr(discovery_service, "DISCOVERY_WRITE_BATCH_SIZE", 2)
+    monkeypatch.setitem(discovery_service.PROVIDER_MODULES, "ovh", SimpleNamespace(discover_pages=_pages))
+    monkeypatch.setitem(discovery_service.PROVIDER_MODULES, "scaleway", SimpleNamespace(discover_pages=_broken_pages))
+    monkeypatch.setattr(discovery_service, "_setup_provider_env", lambda name, user_id, creds: (None, creds))
+    monkeypatch.setattr(discovery_service, "GraphDiffWriter", lambda user_id: graphs.append(_RecordingGraph(user_id)) or graphs[-1])
+    monkeypatch.setattr(discovery_service, "infer_connections", _infer)
+
+    summary = discovery_service.run_discovery_for_user("user-1", {"ovh": {}, "scaleway": {}})
+
+    assert summary["phase1_nodes"] == 5
+    assert max(graphs[0].service_batches) <= 2
+    assert summary["phase1_providers"]["ovh"] == {"pages": 2, "nodes": 4, "relationships": 0}
+    assert summary["provider_errors"] == {
+        "ovh": ["page 2 partial"],
+        "scaleway": ["Phase 1 scaleway failed: api down"],
+    }
+    assert len(seen["nodes"]) == 5
+    assert all(isinstance(node, CompactNode) and "properties" not in node["metadata"] for node in seen["nodes"])
+    assert summary["peak_rss_mb"] > 0
+
+
+def test_failing_non_paged_provider_runs_in_the_pool_and_is_recorded(monkeypatch):
+    import threading
+
+    discover_threads = []
+
+    def _discover(user_id, credentials, env=None):
+        discover_threads.append(threading.current_thread().name)
+        raise RuntimeError("tailscale api down")
+
+    monkeypatch.setitem(discovery_service.PROVIDER_MODULES, "tailscale", SimpleNamespace(discover=_discover))
+    monkeypatch.setitem(discovery_service.PROVIDER_MODULES, "ovh",
+                        SimpleNamespace(discover=lambda user_id, credentials, env=None: {"nodes": [_aws_node(1)]}))
+    monkeypatch.setattr(discovery_service, "_setup_provider_env", lambda name, user_id, creds: (None, creds))
+    monkeypatch.setattr(discovery_service, "GraphDiffWriter", _RecordingGraph)
+    monkeypatch.setattr(discovery_service, "infer_connections", lambda user_id, nodes, enrichment_data: ([], {}))
+
+    summary = discovery_service.run_discovery_for_user("user-1", {"tailscale": {}, "ovh": {}})
+
+    assert summary["provider_errors"] == {"tailscale": ["Phase 1 tailscale failed: tailscale api down"]}
+    assert summary["phase1_providers"]["ovh"]["nodes"] == 1
+    assert discover_threads and discover_threads[0].startswith("discovery-phase1")
@@ -0,0 +1,152 @@
+"""Tests for in-process topology snapshots and their Redis versioning."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from cachetools import LRUCache
+
+from services.graph import topology_snapshot
+from services.graph.topology_snapshot import (
+    TopologySnapshot,
+    clear_topology_snapshots,
+    get_topology_snapshot,
+    invalidate_topology,
+    note_dependencies_upserted,
+    note_services_upserted,
+)
+
+
+_NODES = [
+    ("u:aws:a", "a"),
+    ("u:aws:b", "b"),
+    ("u:aws:c", "c"),
+    ("u:aws:d", "d"),
+    ("u:aws:e", "e"),
+]
+# a -> b -> c -> d -> e  (a depends on b, ...)
+_EDGES = [
+    ("u:aws:a", "u:aws:b"),
+    ("u:aws:b", "u:aws:c"),
+    ("u:aws:c", "u:aws:d"),
+    ("u:aws:d", "u:aws:e"),
+]
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def incr(self, key):
+        self.store[key] = str(int(self.store.get(key, 0)) + 1)
+        return int(self.store[key])
+
+
+@pytest.fixture
+def fake_redis():
+    redis = _FakeRedis()
+    clear_topology_snapshots()
+    with patch.object(topology_snapshot, "get_redis_client", return_value=redis):
+        yield redis
+    clear_topology_snapshots()
+
+
+@pytest.fixture
+def memgraph():
+    client = MagicMock(name="MemgraphClient")
+    client.get_topology.return_value = (list(_NODES), list(_EDGES))
+    with patch(
+        "services.graph.memgraph_client.get_memgraph_client", return_value=client
+    ):
+        yield client
+
+
+class TestTopologySnapshot:
+    def test_upstream_depths_bounded(self):
+        snap = TopologySnapshot(_NODES, _EDGES)
+        assert snap.upstream("a", max_depth=3) == {"b": 1, "c": 2, "d": 3}
+
+    def test_downstream_depths(self):
+        snap = TopologySnapshot(_NODES, _EDGES)
+        assert snap.downstream("d", max_depth=3) == {"c": 1, "b": 2, "a": 3}
+
+    def test_min_depth_wins_and_source_excluded_on_cycle(self):
+        edges = _EDGES + [("u:aws:a", "u:aws:c"), ("u:aws:c", "u:aws:a")]
+        snap = TopologySnapshot(_NODES, edges)
+        assert snap.upstream("a", max_depth=3) == {"b": 1, "c": 1, "d": 2, "e": 3}
+
+    def test_unknown_service_returns_empty(self):
+        snap = TopologySnapshot(_NODES, _EDGES)
+        assert snap.upstream("missing") == {}
+
+    def test_shared_name_seeds_from_every_node(self):
+        nodes = _NODES + [("u:gcp:a", "a"), ("u:gcp:z", "z")]
+        edges = _EDGES + [("u:gcp:a", "u:gcp:z")]
+        snap = TopologySnapshot(nodes, edges)
+        assert snap.upstream("a", max_depth=1) == {"b": 1, "z": 1}
+
+    def test_patched_services_and_edges_are_traversed(self):
+        snap = TopologySnapshot(_NODES, _EDGES)
+        snap.add_services([("u:aws:f", "f")])
+        assert snap.add_dependencies([("e", "f"), ("e", "f"), ("a", "missing")]) == 1
+        assert snap.downstream("f", max_depth=2) == {"e": 1, "d": 2}
+        assert snap.edge_count == len(_EDGES) + 1
+
+    def test_compaction_keeps_results(self):
+        snap = TopologySnapshot(_NODES, _EDGES)
+        with patch.object(topology_snapshot, "_OVERLAY_COMPACT_THRESHOLD", 0):
+            snap.add_dependencies([("e", "a")])
+        assert snap.upstream("d", max_depth=3) == {"e": 1, "a": 2, "b": 3}
+
+
+# conftest stubs cachetools when it is not installed; the registry needs a real LRU.
+@pytest.mark.skipif(not isinstance(LRUCache, type), reason="cachetools is not installed")
+class TestSnapshotRegistry:
+    def test_built_once_while_version_unchanged(self, fake_redis, memgraph):
+        first = get_topology_snapshot("u")
+        second = get_topology_snapshot("u")
+        assert first is second
+        memgraph.get_topology.assert_called_once_with("u")
+
+    def test_foreign_write_triggers_rebuild(self, fake_redis, memgraph):
+        first = get_topology_snapshot("u")
+        fake_redis.incr("topology_version:u")  # another worker wrote
+        second = get_topology_snapshot("u")
+        assert second is not first
+        assert memgraph.get_topology.call_count == 2
+
+    def test_local_write_patches_without_refetch(self, fake_redis, memgraph):
+        snap = get_topology_snapshot("u")
+        note_services_upserted("u", [("u:aws:f", "f")])
+        note_dependencies_upserted("u", [("e", "f")])
+
+        assert get_topology_snapshot("u") is snap
+        assert snap.upstream("d", max_depth=2) == {"e": 1, "f": 2}
+        memgraph.get_topology.assert_called_once()
+
+    def test_invalidate_drops_snapshot(self, fake_redis, memgraph):
+        first = get_topology_snapshot("u")
+        invalidate_topology("u")
+        assert get_topology_snapshot("u") is not first
+        assert fake_redis.store["topology_version:u"] == "1"
+
+    def test_memgraph_failure_returns_none(self, fake_redis):
+        with patch(
+            "services.graph.memgraph_client.get_memgraph_client",
+            side_effect=RuntimeError("down"),
+        ):
+            assert get_topology_snapshot("u") is None
+
+    def test_least_recently_used_snapshot_is_evicted(self, fake_redis, memgraph):
+        with patch.object(topology_snapshot, "_snapshots", LRUCache(maxsize=2)):
+            first = get_topology_snapshot("u1")
+            get_topology_snapshot("u2")
+            assert get_topology_snapshot("u1") is first  # u1 now most recent
+            get_topology_snapshot("u3")
+
+            assert get_topology_snapshot("u1") is first
+            assert memgraph.get_topology.call_count == 3  # u2 was evicted, not u1
+            get_topology_snapshot("u2")
+            assert memgraph.get_topology.call_count == 4
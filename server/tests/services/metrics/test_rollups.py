@@ -0,0 +1,171 @@
+"""Tests for the SRE metrics rollups (segment planning and mergeable aggregates)."""
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.metrics.rollups import (
+    DEPLOYS,
+    MTTR,
+    Aggregate,
+    build_buckets,
+    collect,
+    fold,
+    plan_segments,
+)
+
+
+def _percentile_cont(values, q):
+    ordered = sorted(values)
+    rank = q * (len(ordered) - 1)
+    lo = int(rank)
+    if lo + 1 >= len(ordered):
+        return ordered[lo]
+    return ordered[lo] + (ordered[lo + 1] - ordered[lo]) * (rank - lo)
+
+
+class TestPlanSegments:
+    def test_no_watermark_is_all_raw(self):
+        start = datetime(2026, 1, 1, 10, 30)
+        assert plan_segments(start, datetime(2026, 2, 1), None) == [("raw", start, None)]
+
+    def test_segments_are_contiguous_and_aligned(self):
+        start = datetime(2026, 1, 1, 10, 30)
+        now = datetime(2026, 1, 31, 15, 45)
+        watermark = datetime(2026, 1, 31, 14)
+        segments = plan_segments(start, now, watermark)
+
+        assert segments == [
+            ("raw", start, datetime(2026, 1, 1, 11)),
+            ("hour", datetime(2026, 1, 1, 11), datetime(2026, 1, 2)),
+            ("day", datetime(2026, 1, 2), datetime(2026, 1, 31)),
+            ("hour", datetime(2026, 1, 31), watermark),
+            ("raw", watermark, None),
+        ]
+
+    def test_range_within_one_day_uses_hours_only(self):
+        start = datetime(2026, 1, 1, 1, 15)
+        segments = plan_segments(start, datetime(2026, 1, 1, 9, 5), datetime(2026, 1, 1, 9))
+        assert [s[0] for s in segments] == ["raw", "hour", "raw"]
+
+    def test_stale_watermark_falls_back_to_raw(self):
+        start = datetime(2026, 1, 10, 0, 30)
+        assert plan_segments(start, datetime(2026, 1, 20), datetime(2026, 1, 5)) == [
+            ("raw", start, None)
+        ]
+
+
+class TestAggregate:
+    def test_percentiles_track_percentile_cont(self):
+        rng = random.Random(7)
+        values = [rng.lognormvariate(7, 1.5) for _ in range(2000)]
+        agg = Aggregate()
+        for v in values:
+            agg.add_duration(v)
+
+        for q in (0.5, 0.95):
+            exact = _percentile_cont(values, q)
+            assert abs(agg.percentile(q) - exact) / exact < 0.011
+        assert agg.mean() == pytest.approx(sum(values) / len(values))
+
+    def test_merge_matches_single_pass(self):
+        values = [30.0, 95.0, 400.0, 1200.0, 3600.0, 86400.0]
+        whole, left, right = Aggregate(), Aggregate(), Aggregate()
+        for i, v in enumerate(values):
+            whole.add_duration(v, to_rca=v / 2)
+            (left if i % 2 else right).add_duration(v, to_rca=v / 2)
+        left.merge(right)
+
+        assert left == whole
+
+    def test_failures_within_is_inclusive_of_window_end(self):
+        agg = Aggregate()
+        agg.add_deploy(None)
+        agg.add_deploy(0)
+        agg.add_deploy(4 * 3600)
+        agg.add_deploy(4 * 3600 + 0.001)
+
+        assert agg.count == 4
+        assert agg.failures_within(4) == 2
+        assert agg.failures_within(5) == 3
+
+    def test_empty_aggregate(self):
+        agg = Aggregate()
+        assert agg.mean() is None
+        assert agg.percentile(0.5) is None
+
+
+class _FakeCursor:
+    """Serves raw rows or rollup rows depending on the table queried.
+
+    Rollup rows carry their grain as a trailing element, stripped on read.
+    """
+
+    def __init__(self, raw_rows, rollup_rows):
+        self.raw_rows = raw_rows
+        self.rollup_rows = rollup_rows
+        self.queries = []
+        self._result = []
+
+    def execute(self, sql, params=None):
+        self.queries.append((sql, params))
+        if "incident_metric_rollups" in sql:
+            self._result = [
+                r[:-1] for r in self.rollup_rows
+                if r[-1] == params["grain"] and params["start"] <= r[0] < params["end"]
+            ]
+        else:
+            self._result = [
+                r for r in self.raw_rows
+                if r[0] >= params["start"] and ("end" not in params or r[0] < params["end"])
+            ]
+
+    def fetchall(self):
+        return self._result
+
+
+class TestCollect:
+    def test_rollups_plus_raw_edges_equal_all_raw(self):
+        base = datetime(2026, 3, 1)
+        raw = [
+            (base + timedelta(hours=h, minutes=17), "sev1" if h % 3 else None, "api", 60.0 * h + 5, 10.0, 20.0)
+            for h in range(0, 24 * 5)
+        ]
+        watermark = base + timedelta(days=4, hours=6)
+        rollups = []
+        for (grain, bucket, dims), agg in build_buckets(
+            (r[0], r[1:3], _duration(r[3:])) for r in raw if r[0] < watermark
+        ).items():
+            rollups.append((bucket, *dims, agg.count, agg.sum_seconds, agg.sum_to_rca_seconds,
+                            agg.sum_rca_to_resolve_seconds, {str(k): v for k, v in agg.histogram.items()},
+                            grain))
+
+        start = base + timedelta(hours=3, minutes=40)
+        now = base + timedelta(days=4, hours=8)
+        mixed = _FakeCursor(raw, rollups)
+        from_rollups = fold(collect(mixed, MTTR, start, now, watermark), lambda _ts, dims: dims[0])
+        from_raw = fold(collect(_FakeCursor(raw, []), MTTR, start, now, None), lambda _ts, dims: dims[0])
+
+        assert from_rollups.keys() == from_raw.keys()
+        for key, agg in from_raw.items():
+            assert from_rollups[key].count == agg.count
+            assert from_rollups[key].sum_seconds == pytest.approx(agg.sum_seconds)
+            assert from_rollups[key].histogram == agg.histogram
+        assert any("incident_metric_rollups" in sql for sql, _ in mixed.queries)
+
+    def test_wide_cfr_window_bypasses_rollups(self):
+        cursor = _FakeCursor([], [])
+        list(collect(cursor, DEPLOYS, datetime(2026, 1, 1), datetime(2026, 2, 1),
+                     datetime(2026, 2, 1), lookahead_hours=500))
+
+        assert len(cursor.queries) == 1
+        sql, params = cursor.queries[0]
+        assert "jenkins_deployment_events" in sql
+        assert params["lookahead"] == 500
+
+
+def _duration(measures):
+    agg = Aggregate()
+    agg.add_duration(*measures)
+    return agg
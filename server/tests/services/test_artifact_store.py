@@ -0,0 +1,96 @@
+"""Tests for services.artifacts.store delta-compressed versioning."""
+
+import pytest
+
+from services.artifacts import store
+
+
+class _FakeCursor:
+    """Just enough of a psycopg2 cursor for the statements the store issues."""
+
+    def __init__(self):
+        self.artifacts = {"a1": {"version_count": 0, "current_version_id": None}}
+        self.versions = {}  # version_number -> {"id", "content", "delta"}
+        self._result = []
+        self.statements = []
+
+    def execute(self, sql, params):
+        sql = " ".join(sql.split())
+        self.statements.append(sql)
+        if sql.startswith("UPDATE artifacts SET version_count"):
+            artifact = self.artifacts.get(params[0])
+            if artifact is None:
+                self._result = []
+                return
+            artifact["version_count"] += 1
+            self._result = [(artifact["version_count"],)]
+        elif sql.startswith("SELECT id, content FROM artifact_versions"):
+            row = self.versions.get(params[1])
+            self._result = [(row["id"], row["content"])] if row else []
+        elif sql.startswith("UPDATE artifact_versions SET content = NULL"):
+            row = next(r for r in self.versions.values() if r["id"] == params[1])
+            row["content"], row["delta"] = None, params[0]
+        elif sql.startswith("INSERT INTO artifact_versions"):
+            number = params[4]
+            assert number not in self.versions
+            self.versions[number] = {"id": f"v{number}", "content": params[3], "delta": None}
+            self._result = [(f"v{number}",)]
+        elif sql.startswith("UPDATE artifacts SET current_version_id"):
+            self.artifacts[params[1]]["current_version_id"] = params[0]
+        elif sql.startswith("SELECT version_number, content, delta"):
+            start = params[1]
+            snapshots = [n for n, r in self.versions.items() if n >= start and r["content"] is not None]
+            end = min(snapshots) if snapshots else -1
+            self._result = [
+                (n, self.versions[n]["content"], self.versions[n]["delta"])
+                for n in sorted(self.versions, reverse=True) if start <= n <= end
+            ]
+        else:
+            raise AssertionError(f"unexpected SQL: {sql}")
+
+    def fetchone(self):
+        return self._result[0] if self._result else None
+
+    def fetchall(self):
+        return list(self._result)
+
+
+def _revision(n):
+    body = "".join(f"## Section {i}\nSteady text for section {i}.\n" for i in range(40))
+    return f"# Postmortem rev {n}\n{body}Action items: {n}\n"
+
+
+@pytest.mark.parametrize("base,target", [
+    ("a\nb\nc\n", "a\nB\nc\nd"),
+    ("", "new\n"),
+    ("old\n", ""),
+    ("x\r\ny\n", "x\r\nz\r\ny\n"),
+])
+def test_delta_round_trip(base, target):
+    assert store.apply_delta(base, store.encode_delta(base, target)) == target
+
+
+def test_versions_are_reverse_deltas_with_periodic_snapshots(monkeypatch):
+    monkeypatch.setattr(store, "ARTIFACT_SNAPSHOT_INTERVAL", 4)
+    cursor = _FakeCursor()
+    for n in range(1, 11):
+        assert store.create_version(cursor, "a1", "org", "user", _revision(n), source="agent") == n
+
+    assert cursor.artifacts["a1"] == {"version_count": 10, "current_version_id": "v10"}
+    full = sorted(n for n, row in cursor.versions.items() if row["content"] is not None)
+    assert full == [4, 8, 10]
+    assert all(len(cursor.versions[n]["delta"]) < len(_revision(n)) // 10 for n in (1, 5, 9))
+    for n in range(1, 11):
+        assert store.get_version_content(cursor, "a1", n) == _revision(n)
+    assert store.get_version_content(cursor, "a1", 11) is None
+    assert not any("MAX(" in sql or "FOR UPDATE" in sql for sql in cursor.statements)
+
+
+def test_unrelated_rewrite_keeps_full_text_and_missing_artifact_raises():
+    cursor = _FakeCursor()
+    store.create_version(cursor, "a1", "org", "user", "short", source="agent")
+    store.create_version(cursor, "a1", "org", "user", "completely different", source="agent")
+    assert cursor.versions[1]["content"] == "short"
+
+    with pytest.raises(RuntimeError):
+        store.create_version(cursor, "missing", "org", "user", "x", source="agent")
@@ -0,0 +1,110 @@
+"""Tests for streaming knowledge-base ingestion into Weaviate.
+
+Pins ``upsert_document_chunks`` (routes/knowledge_base/weaviate_client.py):
+chunks are consumed lazily from ``DocumentProcessor.iter_chunks``, chunks
+whose content hash is already stored at the same index are skipped, and the
+stored count covers both inserted and unchanged chunks. Weaviate is faked.
+"""
+
+from __future__ import annotations
+
+import os
+from types import SimpleNamespace
+from unittest.mock import patch
+
+os.environ.setdefault("WEAVIATE_PORT", "8080")
+os.environ.setdefault("WEAVIATE_GRPC_PORT", "50051")
+
+from routes.knowledge_base import weaviate_client  # noqa: E402
+from routes.knowledge_base.document_processor import DocumentProcessor, chunk_content_hash  # noqa: E402
+
+
+class _FakeBatch:
+    def __init__(self, collection):
+        self._collection = collection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def add_object(self, properties, uuid):
+        self._collection.objects[properties["chunk_index"]] = properties
+
+
+class _FakeCollection:
+    def __init__(self):
+        self.objects: dict[int, dict] = {}
+        self.batch_kwargs = None
+        self.batch = SimpleNamespace(fixed_size=self._fixed_size, failed_objects=[])
+        self.query = SimpleNamespace(fetch_objects=self._fetch_objects)
+
+    def _fixed_size(self, **kwargs):
+        self.batch_kwargs = kwargs
+        return _FakeBatch(self)
+
+    def _fetch_objects(self, filters=None, limit=None, offset=0, return_properties=None):
+        rows = list(self.objects.values())[offset:offset + limit]
+        return SimpleNamespace(objects=[SimpleNamespace(properties=row) for row in rows])
+
+
+def _markdown(sections: int, body: str = "Restart the pod and check the logs. ") -> bytes:
+    return "".join(f"# Step {i}\n{body * 60}\n" for i in range(sections)).encode()
+
+
+def _upsert(collection, content: bytes):
+    processor = DocumentProcessor("user-1", "doc-1", "runbook.md")
+    with patch.object(weaviate_client, "_get_weaviate_client", return_value=(None, collection)):
+        return weaviate_client.upsert_document_chunks(
+            user_id="user-1",
+            document_id="doc-1",
+            source_filename="runbook.md",
+            chunks=processor.iter_chunks(content, "markdown"),
+            org_id="org-1",
+        )
+
+
+def test_iter_chunks_matches_process():
+    processor = DocumentProcessor("user-1", "doc-1", "runbook.md")
+    content = _markdown(5)
+    assert list(processor.iter_chunks(content, "markdown")) == processor.process(content, "markdown")
+
+
+def test_first_ingest_inserts_every_chunk_in_fixed_batches():
+    collection = _FakeCollection()
+    result = _upsert(collection, _markdown(4))
+
+    assert result["inserted"] == result["stored"] == len(collection.objects) > 4
+    assert result["skipped"] == 0
+    assert collection.batch_kwargs == {
+        "batch_size": weaviate_client.KB_EMBED_BATCH_SIZE,
+        "concurrent_requests": weaviate_client.KB_INSERT_CONCURRENCY,
+    }
+    stored = collection.objects[0]
+    assert stored["org_id"] == "org-1"
+    assert stored["content_hash"] == chunk_content_hash(stored)
+
+
+def test_reingest_skips_unchanged_chunks():
+    collection = _FakeCollection()
+    first = _upsert(collection, _markdown(4))
+
+    again = _upsert(collection, _markdown(4))
+    assert again == {**again, "inserted": 0, "skipped": first["stored"], "stored": first["stored"]}
+
+    changed = _markdown(4).replace(b"# Step 3", b"# Step three")
+    partial = _upsert(collection, changed)
+    assert 0 < partial["inserted"] < first["stored"]
+    assert partial["stored"] == first["stored"]
+
+
+def test_chunks_without_hash_are_reembedded():
+    collection = _FakeCollection()
+    _upsert(collection, _markdown(2))
+    for row in collection.objects.values():
+        row["content_hash"] = None  # written before content hashes existed
+
+    result = _upsert(collection, _markdown(2))
+    assert result["skipped"] == 0
+    assert result["inserted"] == len(collection.objects)
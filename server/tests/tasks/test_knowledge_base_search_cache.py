@@ -0,0 +1,129 @@
+"""Tests for the knowledge-base search cache and incident prefetch.
+
+Pins ``search_knowledge_base`` (routes/knowledge_base/weaviate_client.py):
+near-identical queries are served from the per-org Redis cache, inserts and
+deletes invalidate it, and failed searches are never cached. Redis, Weaviate
+and the org lookup are faked.
+"""
+
+from __future__ import annotations
+
+import os
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+os.environ.setdefault("WEAVIATE_PORT", "8080")
+os.environ.setdefault("WEAVIATE_GRPC_PORT", "50051")
+
+from routes.knowledge_base import search_cache, weaviate_client  # noqa: E402
+from routes.knowledge_base.search_cache import normalize_query  # noqa: E402
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    def incr(self, key):
+        self.values[key] = str(int(self.values.get(key, "0")) + 1)
+
+
+class _FakeCollection:
+    def __init__(self):
+        self.hybrid_calls = 0
+        self.fail = False
+        self.query = SimpleNamespace(hybrid=self._hybrid)
+        self.data = SimpleNamespace(delete_many=lambda where: SimpleNamespace(successful=1))
+
+    def _hybrid(self, **kwargs):
+        self.hybrid_calls += 1
+        if self.fail:
+            raise RuntimeError("weaviate down")
+        obj = SimpleNamespace(
+            properties={"content": "Restart payment-api", "source_filename": "runbook.md", "chunk_index": 0},
+            metadata=SimpleNamespace(score=0.8),
+        )
+        return SimpleNamespace(objects=[obj])
+
+
+@pytest.fixture()
+def collection():
+    fake_redis = _FakeRedis()
+    fake = _FakeCollection()
+    with patch.object(search_cache, "_client", return_value=fake_redis), \
+            patch("utils.auth.stateless_auth.get_org_id_for_user", return_value="org-1"), \
+            patch.object(weaviate_client, "_get_weaviate_client", return_value=(None, fake)), \
+            patch.object(weaviate_client, "Filter", MagicMock()):
+        yield fake
+
+
+def test_normalize_query():
+    assert normalize_query('  "Payment-API   Timeout?" ') == "payment-api timeout"
+
+
+def test_near_identical_queries_hit_the_cache(collection):
+    first = weaviate_client.search_knowledge_base("user-1", "payment-api timeout", limit=5)
+    again = weaviate_client.search_knowledge_base("user-1", "Payment-API  timeout?", limit=5)
+
+    assert again == first and first[0]["content"] == "Restart payment-api"
+    assert collection.hybrid_calls == 1
+
+    weaviate_client.search_knowledge_base("user-1", "payment-api timeout", limit=10)
+    weaviate_client.search_knowledge_base("user-2", "payment-api timeout", limit=5)
+    assert collection.hybrid_calls == 3  # different limit / user are separate entries
+
+
+def test_deletes_invalidate_the_org(collection):
+    weaviate_client.search_knowledge_base("user-1", "payment-api timeout")
+    weaviate_client.delete_document_chunks("user-2", "doc-1")  # same org
+    weaviate_client.search_knowledge_base("user-1", "payment-api timeout")
+    assert collection.hybrid_calls == 2
+
+    weaviate_client.delete_discovery_chunks("org-1")
+    weaviate_client.search_knowledge_base("user-1", "payment-api timeout")
+    assert collection.hybrid_calls == 3
+
+
+def test_failed_searches_are_not_cached(collection):
+    collection.fail = True
+    assert weaviate_client.search_knowledge_base("user-1", "payment-api timeout") == []
+    collection.fail = False
+    assert weaviate_client.search_knowledge_base("user-1", "payment-api timeout")
+    assert collection.hybrid_calls == 2
+
+
+def test_invalidation_during_a_search_is_not_cached_under_the_new_generation(collection):
+    hybrid = collection._hybrid
+
+    def _hybrid_racing_an_insert(**kwargs):
+        weaviate_client.invalidate_search_cache(org_id="org-1")
+        return hybrid(**kwargs)
+
+    collection.query.hybrid = _hybrid_racing_an_insert
+    weaviate_client.search_knowledge_base("user-1", "payment-api timeout")
+    collection.query.hybrid = hybrid
+    weaviate_client.search_knowledge_base("user-1", "payment-api timeout")
+    assert collection.hybrid_calls == 2
+
+
+def test_incident_prefetch_queries():
+    from chat.backend.agent.tools.knowledge_base_search_tool import incident_search_queries
+
+    queries = incident_search_queries(
+        "payment-api: High 503 rate and ConnectionTimeoutError", "payment-api"
+    )
+    assert queries == [
+        "payment-api: High 503 rate and ConnectionTimeoutError",
+        "payment-api",
+        "payment-api 503 ConnectionTimeoutError",
+        "payment-api runbook",
+    ]
+    assert incident_search_queries("payment-api", "payment-api") == ["payment-api", "payment-api runbook"]
+    assert incident_search_queries(None, None) == []
@@ -0,0 +1,217 @@
+"""Tests for command execution in the kubectl agent (kubectl-agent/src/agent.py).
+
+kubectl is faked at ``asyncio.create_subprocess_exec``; each fake process
+writes its output once the test releases it, so concurrency, cancellation
+and truncation can be observed while commands are still running.
+"""
+
+import asyncio
+import base64
+import importlib.util
+import os
+import sys
+import types
+import zlib
+
+import pytest
+
+_AGENT_PATH = os.path.join(
+    os.path.dirname(__file__), os.pardir, os.pardir, os.pardir, "kubectl-agent", "src", "agent.py"
+)
+
+
+@pytest.fixture
+def agent_module(monkeypatch):
+    """Load the agent with minimal websockets/aiohttp stubs; it never connects here."""
+    websockets = types.ModuleType("websockets")
+    exceptions = types.ModuleType("websockets.exceptions")
+    exceptions.ConnectionClosed = type("ConnectionClosed", (Exception,), {})
+    websockets.exceptions = exceptions
+    websockets.WebSocketClientProtocol = object
+    aiohttp = types.ModuleType("aiohttp")
+    aiohttp.web = types.ModuleType("aiohttp.web")
+
+    monkeypatch.setitem(sys.modules, "websockets", websockets)
+    monkeypatch.setitem(sys.modules, "websockets.exceptions", exceptions)
+    monkeypatch.setitem(sys.modules, "aiohttp", aiohttp)
+    monkeypatch.setitem(sys.modules, "aiohttp.web", aiohttp.web)
+    monkeypatch.setenv("NEXT_PUBLIC_WEBSOCKET_URL", "wss://aurora.example/kubectl-agent")
+    monkeypatch.setenv("AURORA_AGENT_TOKEN", "test-token")
+
+    spec = importlib.util.spec_from_file_location("_kubectl_agent_under_test", _AGENT_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class _FakeProcess:
+    """A kubectl process that writes ``output`` and exits once ``release`` is set."""
+
+    def __init__(self, output: bytes, release: asyncio.Event, kubectl):
+        self.stdout = asyncio.StreamReader()
+        self.stderr = asyncio.StreamReader()
+        self.returncode = None
+        self.killed = False
+        self._kubectl = kubectl
+        self._exited = asyncio.Event()
+        self._runner = asyncio.get_running_loop().create_task(self._run(output, release))
+
+    async def _run(self, output: bytes, release: asyncio.Event):
+        await release.wait()
+        self.stdout.feed_data(output)
+        self._exit(0)
+
+    def _exit(self, returncode: int):
+        if self.returncode is not None:
+            return
+        self.returncode = returncode
+        self.stdout.feed_eof()
+        self.stderr.feed_eof()
+        self._kubectl.running -= 1
+        self._exited.set()
+
+    async def wait(self):
+        await self._exited.wait()
+        return self.returncode
+
+    def kill(self):
+        self.killed = True
+        self._runner.cancel()
+        self._exit(-9)
+
+
+class _FakeKubectl:
+    """Stands in for create_subprocess_exec and tracks how many commands run at once."""
+
+    def __init__(self, output: bytes = b"pod-0 Running\n"):
+        self.output = output
+        self.release = asyncio.Event()
+        self.processes = []
+        self.running = 0
+        self.max_running = 0
+
+    async def __call__(self, *args, **kwargs):
+        assert args[0] == "kubectl"
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        process = _FakeProcess(self.output, self.release, self)
+        self.processes.append(process)
+        return process
+
+
+@pytest.fixture
+def agent(agent_module):
+    instance = agent_module.KubectlAgent()
+    instance.sent = []
+
+    async def _send(message):
+        instance.sent.append(message)
+
+    instance.send_message = _send
+    return instance
+
+
+def _responses(agent):
+    return {m["command_id"]: m for m in agent.sent if m["type"] == "command_response"}
+
+
+async def _settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+def _start(agent, command_id, command="get pods"):
+    # Same bookkeeping as message_loop does for a 'kubectl_command' frame.
+    agent.command_tasks[command_id] = asyncio.create_task(agent.run_command(command_id, command, 60))
+    return agent.command_tasks[command_id]
+
+
+class TestConcurrentExecution:
+    def test_commands_run_concurrently_up_to_the_cap(self, agent, monkeypatch):
+        async def scenario():
+            kubectl = _FakeKubectl()
+            monkeypatch.setattr(asyncio, "create_subprocess_exec", kubectl)
+            agent.command_semaphore = asyncio.Semaphore(2)
+
+            tasks = [_start(agent, f"cmd-{i}") for i in range(5)]
+            await _settle()
+            assert kubectl.running == 2  # the rest wait for a slot
+
+            kubectl.release.set()
+            await asyncio.gather(*tasks)
+            return kubectl
+
+        kubectl = asyncio.run(scenario())
+        assert kubectl.max_running == 2
+        assert len(kubectl.processes) == 5
+        responses = _responses(agent)
+        assert sorted(responses) == [f"cmd-{i}" for i in range(5)]
+        assert all(r["success"] and r["output"] == "pod-0 Running\n" for r in responses.values())
+        assert agent.command_tasks == {}
+
+
+class TestCancellation:
+    def test_cancel_kills_running_command_and_skips_queued_one(self, agent, monkeypatch):
+        async def scenario():
+            kubectl = _FakeKubectl()
+            monkeypatch.setattr(asyncio, "create_subprocess_exec", kubectl)
+            agent.command_semaphore = asyncio.Semaphore(1)
+
+            running, queued = _start(agent, "running"), _start(agent, "queued")
+            await _settle()
+            assert agent.cancel_command("queued")
+            assert agent.cancel_command("running")
+            await asyncio.gather(running, queued)
+            assert not agent.cancel_command("running")  # already finished
+            return kubectl
+
+        kubectl = asyncio.run(scenario())
+        assert len(kubectl.processes) == 1  # the queued command never started kubectl
+        assert kubectl.processes[0].killed
+        for response in _responses(agent).values():
+            assert response["return_code"] == 130 and response["error"] == "Command cancelled"
+        assert agent.command_tasks == {}
+
+    def test_timeout_kills_the_command(self, agent, monkeypatch):
+        async def scenario():
+            kubectl = _FakeKubectl()
+            monkeypatch.setattr(asyncio, "create_subprocess_exec", kubectl)
+            result = await agent.execute_kubectl_command("get pods", timeout=0.01)
+            return kubectl, result
+
+        kubectl, result = asyncio.run(scenario())
+        assert result["return_code"] == 124 and not result["success"]
+        assert kubectl.processes[0].killed
+
+
+class TestOutputTruncation:
+    def test_inline_output_is_capped(self, agent, agent_module, monkeypatch):
+        monkeypatch.setattr(agent_module, "OUTPUT_MAX_BYTES", 100)
+
+        async def scenario():
+            kubectl = _FakeKubectl(output=b"x" * 1000)
+            kubectl.release.set()
+            monkeypatch.setattr(asyncio, "create_subprocess_exec", kubectl)
+            return await agent.execute_kubectl_command("logs big-pod", command_id="cmd-1")
+
+        result = asyncio.run(scenario())
+        assert result["success"] and result["truncated"]
+        assert result["output"] == "x" * 100 + "\n... [output truncated at 100 bytes]\n"
+
+    def test_large_output_streams_compressed_chunks(self, agent, agent_module, monkeypatch):
+        monkeypatch.setattr(agent_module, "OUTPUT_CHUNK_BYTES", 64)
+        agent.backend_capabilities = frozenset({agent_module.CHUNKED_OUTPUT_CAPABILITY})
+        text = "".join(f"pod-{i} {i * 7919 % 104729}\n" for i in range(3000)).encode()
+
+        async def scenario():
+            kubectl = _FakeKubectl(output=text)
+            kubectl.release.set()
+            monkeypatch.setattr(asyncio, "create_subprocess_exec", kubectl)
+            return await agent.execute_kubectl_command("get pods -A", command_id="cmd-1")
+
+        result = asyncio.run(scenario())
+        chunks = [m for m in agent.sent if m["type"] == "command_output_chunk"]
+        assert "output" not in result and result["encoding"] == "zlib"
+        assert result["chunks"] == len(chunks) > 1 and not result["truncated"]
+        assert [c["seq"] for c in chunks] == list(range(len(chunks)))
+        assert zlib.decompress(b"".join(base64.b64decode(c["data"]) for c in chunks)) == text
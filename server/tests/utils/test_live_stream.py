@@ -0,0 +1,165 @@
+"""Tests for the Redis Streams live output channel used by background chats."""
+
+import asyncio
+import json
+from unittest.mock import patch
+
+from utils.cache import live_stream
+from utils.cache.live_stream import LiveChannel, live_stream_key, tail_live_stream
+
+
+class _FakeStreams:
+    """In-memory XADD/XREAD with monotonically increasing ids."""
+
+    def __init__(self):
+        self.streams = {}
+        self.expiries = {}
+        self._seq = 0
+        self.closed = False
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+    def xadd(self, key, fields, maxlen=None, approximate=True):
+        self._seq += 1
+        entry_id = f"{self._seq}-0"
+        self.streams.setdefault(key, []).append((entry_id, {k.encode(): v.encode() for k, v in fields.items()}))
+        return entry_id
+
+    def expire(self, key, ttl):
+        self.expiries[key] = ttl
+
+    def delete(self, key):
+        self.streams.pop(key, None)
+
+    def xread(self, streams, block=None, count=None):
+        (key, after), = streams.items()
+        after_seq = int(after.split("-")[0])
+        entries = [
+            (entry_id.encode(), fields) for entry_id, fields in self.streams.get(key, [])
+            if int(entry_id.split("-")[0]) > after_seq
+        ][:count]
+        return [(key.encode(), entries)] if entries else []
+
+    def close(self):
+        self.closed = True
+
+
+class _FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.ops = []
+
+    def xadd(self, *args, **kwargs):
+        self.ops.append(("xadd", args, kwargs))
+
+    def expire(self, *args):
+        self.ops.append(("expire", args, {}))
+
+    def execute(self):
+        for name, args, kwargs in self.ops:
+            getattr(self.client, name)(*args, **kwargs)
+
+
+def _events(fake, key):
+    return [json.loads(fields[b"data"]) for _id, fields in fake.streams.get(key, [])]
+
+
+class TestLiveChannel:
+    def test_deltas_are_coalesced_until_interval_or_discrete_event(self):
+        fake = _FakeStreams()
+        clock = [100.0]
+
+        async def _stream():
+            channel = LiveChannel("session", "s1")
+            channel.append_delta("Hel")      # first delta publishes immediately
+            channel.append_delta("lo ")
+            channel.append_delta("world")
+            clock[0] += 0.5
+            channel.append_delta(".")
+            channel.append_delta(" Next")
+            channel.publish("end", reason="completed")
+
+        with patch.object(live_stream, "get_redis_client", return_value=fake), \
+                patch.object(live_stream.time, "monotonic", lambda: clock[0]):
+            asyncio.run(_stream())
+
+        key = live_stream_key("session", "s1")
+        assert _events(fake, key) == [
+            {"type": "token", "text": "Hel"},
+            {"type": "token", "text": "lo world."},
+            {"type": "token", "text": " Next"},
+            {"type": "end", "reason": "completed"},
+        ]
+        assert fake.expiries[key] == live_stream.LIVE_STREAM_TTL_SECONDS
+
+    def test_buffered_delta_is_published_without_another_token(self, monkeypatch):
+        fake = _FakeStreams()
+        monkeypatch.setattr(live_stream, "LIVE_DELTA_INTERVAL_SECONDS", 0.01)
+
+        async def _stream():
+            channel = LiveChannel("session", "s1")
+            channel.append_delta("Let me check")
+            channel.append_delta(" the pods.")
+            await asyncio.sleep(0.05)  # the model pauses, e.g. before a tool call
+
+        with patch.object(live_stream, "get_redis_client", return_value=fake):
+            asyncio.run(_stream())
+
+        assert _events(fake, live_stream_key("session", "s1")) == [
+            {"type": "token", "text": "Let me check"},
+            {"type": "token", "text": " the pods."},
+        ]
+
+    def test_reset_drops_previous_turn(self):
+        fake = _FakeStreams()
+        with patch.object(live_stream, "get_redis_client", return_value=fake):
+            channel = LiveChannel("incident", "i1")
+            channel.publish("thought", content="old")
+            channel.reset()
+            channel.publish("thought", content="new")
+
+        assert _events(fake, live_stream_key("incident", "i1")) == [{"type": "thought", "content": "new"}]
+
+    def test_redis_unavailable_is_a_no_op(self):
+        with patch.object(live_stream, "get_redis_client", return_value=None):
+            channel = LiveChannel("session", "s1")
+            channel.append_delta("text")
+            channel.publish("end", reason="completed")
+
+
+class TestTailLiveStream:
+    def test_frames_carry_ids_and_resume_after_last_event_id(self):
+        fake = _FakeStreams()
+        key = live_stream_key("session", "s1")
+        for text in ("a", "b", "c"):
+            fake.xadd(key, {"data": json.dumps({"type": "token", "text": text})})
+
+        with patch.object(live_stream.redis, "from_url", return_value=fake):
+            frames = tail_live_stream(key, last_id="1-0")
+            connected = next(frames)
+            resumed = [next(frames), next(frames)]
+            heartbeat = next(frames)
+            frames.close()
+
+        assert json.loads(connected[len("data: "):]) == {"type": "connected"}
+        assert resumed == [
+            'id: 2-0\ndata: {"type": "token", "text": "b"}\n\n',
+            'id: 3-0\ndata: {"type": "token", "text": "c"}\n\n',
+        ]
+        assert heartbeat == ": heartbeat\n\n"
+        assert fake.closed
+
+    def test_tail_returns_after_the_end_event(self):
+        fake = _FakeStreams()
+        key = live_stream_key("session", "s1")
+        for event in ({"type": "token", "text": "a"}, {"type": "end", "reason": "completed"},
+                      {"type": "token", "text": "next turn"}):
+            fake.xadd(key, {"data": json.dumps(event)})
+
+        with patch.object(live_stream.redis, "from_url", return_value=fake):
+            frames = list(tail_live_stream(key))
+
+        assert len(frames) == 3  # connected, token, end
+        assert frames[-1] == 'id: 2-0\ndata: {"type": "end", "reason": "completed"}\n\n'
+        assert fake.closed
@@ -0,0 +1,133 @@
+"""Tests for the shared Redis client: no per-call PING, error backoff,
+fork reset, pipelined helpers and latency histograms."""
+
+import pytest
+
+from utils.cache import redis_client
+
+
+class _FakeClient:
+    def __init__(self):
+        self.pings = 0
+        self.ping_error = None
+        self.values = {}
+        self.pipelines = 0
+
+    def ping(self):
+        self.pings += 1
+        if self.ping_error:
+            raise self.ping_error
+        return True
+
+    def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        self.pipelines += 1
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.queued = []
+
+    def set(self, key, value, ex=None):
+        self.queued.append((key, value, ex))
+
+    def execute(self):
+        for key, value, ex in self.queued:
+            self.client.values[key] = value
+
+    def __exit__(self, *exc_info):
+        self.queued = []
+
+
+@pytest.fixture()
+def fake(monkeypatch):
+    client = _FakeClient()
+    clock = [1000.0]
+    monkeypatch.setattr(redis_client, "_create_client", lambda: client)
+    monkeypatch.setattr(redis_client.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(redis_client, "_redis_client", None)
+    monkeypatch.setattr(redis_client, "_unhealthy_until", 0.0)
+    client.clock = clock
+    yield client
+    redis_client._latency.clear()
+    redis_client._latency_buckets.clear()
+
+
+def test_client_is_pinged_once_not_per_call(fake):
+    for _ in range(5):
+        assert redis_client.get_redis_client() is fake
+    assert fake.pings == 1
+
+
+def test_connection_error_backs_off_then_probes_again(fake):
+    assert redis_client.get_redis_client() is fake
+
+    redis_client.mark_redis_unhealthy()
+    assert redis_client.get_redis_client() is None
+    assert fake.pings == 1
+
+    fake.clock[0] += redis_client.REDIS_RETRY_INTERVAL_SECONDS
+    fake.ping_error = ConnectionError("still down")
+    assert redis_client.get_redis_client() is None
+    assert fake.pings == 2
+
+    fake.clock[0] += redis_client.REDIS_RETRY_INTERVAL_SECONDS
+    fake.ping_error = None
+    assert redis_client.get_redis_client() is fake
+    assert redis_client.get_redis_client() is fake
+    assert fake.pings == 3
+
+
+def test_fork_child_builds_its_own_client(fake):
+    assert redis_client.get_redis_client() is fake
+    redis_client._reset_after_fork()
+    assert redis_client._redis_client is None
+    assert redis_client.get_redis_client() is fake
+    assert fake.pings == 2
+
+
+def test_pipelined_helpers(fake):
+    redis_client.set_many(fake, {"a": "1", "b": "2"}, ttl_seconds=60)
+    assert fake.pipelines == 1
+    assert redis_client.get_many(fake, ["a", "missing", "b"]) == ["1", None, "2"]
+    assert redis_client.get_many(fake, []) == []
+    redis_client.set_many(fake, {}, ttl_seconds=60)
+    assert fake.pipelines == 1
+
+
+def test_latency_histograms(fake):
+    for elapsed in (0.2, 0.8, 3.0, 4000.0):
+        redis_client._record_latency("GET", elapsed)
+    redis_client._record_latency("PIPELINE", 1.0)
+
+    stats = redis_client.get_command_latency_stats()
+    assert stats["GET"]["count"] == 4
+    assert stats["GET"]["max_ms"] == 4000.0
+    assert stats["GET"]["buckets"] == {"<=0.5ms": 1, "<=1ms": 1, "<=5ms": 1, ">1000ms": 1}
+    assert stats["PIPELINE"]["buckets"] == {"<=1ms": 1}
+
+
+def test_wrapper_times_commands_and_pipelines(fake):
+    client = redis_client._InstrumentedRedis(fake)
+    assert client.ping() is True
+    with client.pipeline(transaction=False) as pipe:
+        pipe.set("a", "1", ex=5)
+        pipe.execute()
+    assert client.mget(["a"]) == ["1"]
+
+    stats = redis_client.get_command_latency_stats()
+    assert {name: s["count"] for name, s in stats.items()} == {"PING": 1, "PIPELINE": 1, "MGET": 1}
+
+
+def test_wrapper_marks_redis_down_on_connection_error(fake):
+    connection_error = getattr(redis_client.redis, "ConnectionError", None)
+    if not isinstance(connection_error, type):
+        pytest.skip("redis is stubbed")
+    fake.ping_error = connection_error("refused")
+    with pytest.raises(connection_error):
+        redis_client._InstrumentedRedis(fake).ping()
+    assert redis_client.get_redis_client() is None
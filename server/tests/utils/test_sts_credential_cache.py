@@ -0,0 +1,113 @@
+"""Tests for the shared (Redis) tier of the STS credential cache."""
+
+import time
+from unittest.mock import patch
+
+import pytest
+
+from utils.aws import sts_credential_cache as cache
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.values = {}
+        self.ttls = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        self.ttls[key] = ex
+        return True
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    def __init__(self, client):
+        self._client = client
+        self._ops = []
+
+    def set(self, *args, **kwargs):
+        self._ops.append(("set", args, kwargs))
+
+    def delete(self, *args):
+        self._ops.append(("delete", args, {}))
+
+    def execute(self):
+        for name, args, kwargs in self._ops:
+            getattr(self._client, name)(*args, **kwargs)
+
+
+@pytest.fixture()
+def redis_client():
+    fake = _FakeRedis()
+    with patch.object(cache, "_client", return_value=fake):
+        yield fake
+
+
+@pytest.fixture()
+def fernet(monkeypatch):
+    pytest.importorskip("cryptography")
+    monkeypatch.setenv("FLASK_SECRET_KEY", "test-secret")
+    monkeypatch.delenv("STS_CACHE_ENCRYPTION_KEY", raising=False)
+    monkeypatch.setattr(cache, "_fernet", None)
+    monkeypatch.setattr(cache, "_fernet_resolved", False)
+    yield cache._get_fernet()
+
+
+@pytest.fixture()
+def no_fernet(monkeypatch):
+    monkeypatch.setattr(cache, "_fernet", None)
+    monkeypatch.setattr(cache, "_fernet_resolved", True)
+
+
+def test_needs_refresh_window():
+    now = time.time()
+    assert cache.needs_refresh(int(now + cache.STS_EARLY_REFRESH_SECONDS - 5))
+    assert not cache.needs_refresh(int(now + cache.STS_EARLY_REFRESH_SECONDS + 300))
+
+
+def test_shared_tier_disabled_without_key(redis_client, no_fernet):
+    cache.put_shared_credentials("k", {"accessKeyId": "AKIA"}, int(time.time()) + 3600)
+    assert redis_client.values == {}
+    assert cache.get_shared_credentials("k") is None
+    # Every process refreshes its own cache when nothing is shared.
+    assert cache.claim_refresh("k") and cache.claim_refresh("k")
+
+
+def test_round_trip_is_encrypted_and_hashed(redis_client, fernet):
+    creds = {"accessKeyId": "AKIA123", "secretAccessKey": "s3cr3t", "sessionToken": "tok"}
+    cache.put_shared_credentials("role:arn:aws:iam::1:role/x:ws1", creds, int(time.time()) + 3600)
+
+    (key, token), = redis_client.values.items()
+    assert key.startswith("aws:sts:") and "arn" not in key
+    assert "AKIA123" not in token
+    assert 3400 < redis_client.ttls[key] <= 3600 - cache.STS_MIN_REMAINING_SECONDS
+    assert cache.get_shared_credentials("role:arn:aws:iam::1:role/x:ws1") == creds
+
+
+def test_expired_credentials_are_not_stored(redis_client, fernet):
+    cache.put_shared_credentials("k", {"accessKeyId": "AKIA"}, int(time.time()) + 30)
+    assert redis_client.values == {}
+
+
+def test_single_refresh_claim_until_new_credentials_land(redis_client, fernet):
+    assert cache.claim_refresh("k")
+    assert not cache.claim_refresh("k")
+    cache.put_shared_credentials("k", {"accessKeyId": "AKIA"}, int(time.time()) + 3600)
+    assert cache.claim_refresh("k")
+
+
+def test_key_mismatch_reads_as_miss(redis_client, fernet, monkeypatch):
+    cache.put_shared_credentials("k", {"accessKeyId": "AKIA"}, int(time.time()) + 3600)
+    monkeypatch.setenv("FLASK_SECRET_KEY", "rotated")
+    monkeypatch.setattr(cache, "_fernet_resolved", False)
+    assert cache.get_shared_credentials("k") is None
@@ -16,9 +16,19 @@ template (read-only cloud/k8s/git/system commands allowed; universal deny
 rules for dangerous patterns). Seeding happens at org creation time so every
 org is protected from day one without any admin action.
 Fail-open on DB error: if rules cannot be fetched, commands are allowed.
+
+Each worker keeps a per-org copy of the rules for ``_CACHE_TTL`` seconds.
+Policy edits bump a per-org version in Redis (``invalidate_cache``); workers
+compare it at most every ``_VERSION_CHECK_INTERVAL`` seconds and reload on
+change, first from a Redis snapshot tagged with that version and only then
+from the DB, so an edit costs one DB read rather than one per worker.
+Rule lists are compiled into a ``_CompiledPolicy`` (executable-name dispatch
+for ``^cli`` rules, one combined screen for the rest) that also memoizes
+verdicts, since agents repeat the same commands throughout an investigation.
 """
 
 import collections
+import json
 import logging
 import re
 import shlex
@@ -26,19 +36,37 @@ import time
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple
 
+from cachetools import LRUCache
+
+try:  # Python 3.11+ moved the regex parser under ``re``; ``sre_*`` are deprecated aliases.
+    from re import _constants as _sre
+    from re import _parser as _sre_parse
+except ImportError:  # pragma: no cover - older interpreters
+    import sre_constants as _sre
+    import sre_parse as _sre_parse
+
 from utils.log_sanitizer import sanitize
 
 logger = logging.getLogger(__name__)
 
 _CACHE_TTL = 30  # seconds
 _CACHE_MAX = 512  # max orgs in cache before LRU eviction
+_VERSION_CHECK_INTERVAL = 2  # seconds between Redis version reads per org
+_SNAPSHOT_TTL = 300  # seconds a shared rule snapshot lives in Redis
+_VERDICT_MEMO_MAX = 1024  # memoized verdicts per compiled policy
+_REDIS_PREFIX = "command_policy"
+
+
+@dataclass
+class _CacheEntry:
+    allow: List["PolicyRule"]
+    deny: List["PolicyRule"]
+    states: "ListStates"
+    loaded_at: float              # monotonic timestamp
+    version: Optional[str]        # Redis policy version; None if Redis was unavailable
+    checked_at: float             # last time ``version`` was confirmed
+
 
-_CacheEntry = Tuple[
-    List["PolicyRule"],  # allow rules
-    List["PolicyRule"],  # deny rules
-    "ListStates",
-    float,               # monotonic timestamp
-]
 _cache: "collections.OrderedDict[str, _CacheEntry]" = collections.OrderedDict()
 
 
@@ -131,22 +159,238 @@ def _fetch(org_id: str) -> Tuple[List[PolicyRule], List[PolicyRule], ListStates]
     return allow_rules, deny_rules, states
 
 
+def _get_redis():
+    from utils.cache.redis_client import get_redis_client
+    return get_redis_client()
+
+
+def _version_key(org_id: str) -> str:
+    return f"{_REDIS_PREFIX}:{org_id}:version"
+
+
+def _snapshot_key(org_id: str) -> str:
+    return f"{_REDIS_PREFIX}:{org_id}:snapshot"
+
+
+def _read_version(client, org_id: str) -> Optional[str]:
+    """Current policy version for *org_id* ("0" if never bumped), or None if unknown."""
+    if client is None:
+        return None
+    try:
+        return client.get(_version_key(org_id)) or "0"
+    except Exception as exc:
+        logger.debug("Command policy version read failed for org %s: %s", sanitize(org_id), exc)
+        return None
+
+
+def _read_snapshot(
+    client, org_id: str, version: str,
+) -> Optional[Tuple[List[PolicyRule], List[PolicyRule], ListStates]]:
+    try:
+        raw = client.get(_snapshot_key(org_id))
+        if not raw:
+            return None
+        data = json.loads(raw)
+        if data.get("version") != version:
+            return None
+        rules: Dict[str, List[PolicyRule]] = {"allow": [], "deny": []}
+        for mode in ("allow", "deny"):
+            for rule_id, pattern, description, priority in data[mode]:
+                compiled = _compile_safe(pattern)
+                if compiled is not None:
+                    rules[mode].append(PolicyRule(
+                        id=rule_id, mode=mode, pattern=pattern,
+                        description=description, priority=priority,
+                        compiled=compiled,
+                    ))
+        states = ListStates(
+            allowlist_enabled=bool(data["allowlist_enabled"]),
+            denylist_enabled=bool(data["denylist_enabled"]),
+        )
+        return rules["allow"], rules["deny"], states
+    except Exception as exc:
+        logger.debug("Command policy snapshot read failed for org %s: %s", sanitize(org_id), exc)
+        return None
+
+
+def _publish_snapshot(
+    client, org_id: str, version: str,
+    allow: List[PolicyRule], deny: List[PolicyRule], states: ListStates,
+) -> None:
+    # A fail-open fetch looks exactly like this; never share it.
+    if not allow and not deny and not states.allowlist_enabled and not states.denylist_enabled:
+        return
+    payload = {
+        "version": version,
+        "allow": [[r.id, r.pattern, r.description, r.priority] for r in allow],
+        "deny": [[r.id, r.pattern, r.description, r.priority] for r in deny],
+        "allowlist_enabled": states.allowlist_enabled,
+        "denylist_enabled": states.denylist_enabled,
+    }
+    try:
+        client.setex(_snapshot_key(org_id), _SNAPSHOT_TTL, json.dumps(payload))
+    except Exception as exc:
+        logger.debug("Command policy snapshot write failed for org %s: %s", sanitize(org_id), exc)
+
+
 def _get_cached(org_id: str) -> Tuple[List[PolicyRule], List[PolicyRule], ListStates]:
+    now = time.monotonic()
+    client = None
+    version: Optional[str] = None
     entry = _cache.get(org_id)
-    if entry is not None:
-        allow, deny, states, ts = entry
-        if time.monotonic() - ts < _CACHE_TTL:
+    if entry is not None and now - entry.loaded_at < _CACHE_TTL:
+        if now - entry.checked_at < _VERSION_CHECK_INTERVAL:
             _cache.move_to_end(org_id)
-            return allow, deny, states
-
-    allow, deny, states = _fetch(org_id)
-    _cache[org_id] = (allow, deny, states, time.monotonic())
+            return entry.allow, entry.deny, entry.states
+        client = _get_redis()
+        version = _read_version(client, org_id)
+        if version == entry.version:
+            entry.checked_at = now
+            _cache.move_to_end(org_id)
+            return entry.allow, entry.deny, entry.states
+    else:
+        client = _get_redis()
+        version = _read_version(client, org_id)
+
+    loaded = _read_snapshot(client, org_id, version) if version is not None else None
+    if loaded is None:
+        loaded = _fetch(org_id)
+        if version is not None:
+            _publish_snapshot(client, org_id, version, *loaded)
+    allow, deny, states = loaded
+    _cache[org_id] = _CacheEntry(allow, deny, states, now, version, now)
     _cache.move_to_end(org_id)
     if len(_cache) > _CACHE_MAX:
         _cache.popitem(last=False)  # evict LRU
     return allow, deny, states
 
 
+# ``^cli ...`` / ``^(cli1|cli2) ...`` where the literal is followed by a
+# mandatory token boundary: such a rule can only match commands whose leading
+# word is the literal's leading word, so it is dispatched on that word. An
+# optional separator (``^sudo\s*`` also matches ``sudoedit``) is no boundary.
+_ANCHORED_EXECUTABLES_RE = re.compile(
+    r"\^(?:\((?:\?:)?(?P<alts>[\w-]+(?:\|[\w-]+)*)\)|(?P<word>[\w-]+))(?:\\b|\\s|\\ | |\$)"
+    r"(?![*?]|\{0*,|\{0+\})"
+)
+_LEADING_WORD_RE = re.compile(r"\w*")
+# Backreferences would be renumbered inside a combined alternation.
+_BACKREF_RE = re.compile(r"\\[1-9]|\(\?P=|\(\?\(")
+
+
+def _has_top_level_branch(pattern: str) -> bool:
+    """True if ``pattern`` has a top-level ``|`` (or cannot be analysed).
+
+    ``^rm\\b|mkfs`` is anchored only in its first branch, so it must not be
+    dispatched on ``rm``.
+    """
+    try:
+        return any(op is _sre.BRANCH for op, _av in _sre_parse.parse(pattern))
+    except Exception:
+        return True
+
+
+def _dispatch_words(pattern: str) -> Optional[List[str]]:
+    m = _ANCHORED_EXECUTABLES_RE.match(pattern)
+    if m is None or _has_top_level_branch(pattern):
+        return None
+    literals = m.group("alts").split("|") if m.group("alts") else [m.group("word")]
+    return sorted({_LEADING_WORD_RE.match(lit).group() for lit in literals})
+
+
+class _RuleMatcher:
+    """First matching rule of a priority-ordered list, without trying each regex.
+
+    Anchored ``^cli`` rules are bucketed by executable name, so a command only
+    runs the rules for its own leading word; rules with a top-level ``|`` are
+    never bucketed, since only one branch is anchored. The remaining rules are
+    screened by one combined alternation: if it finds nothing, none of them
+    can match.
+    Rules that cannot be combined (backreferences, inline global flags) are
+    always tried. Candidates are tried in list order, so priority semantics
+    are unchanged.
+    """
+
+    def __init__(self, rules: List[PolicyRule]):
+        by_word: Dict[str, List[int]] = {}
+        general: List[int] = []
+        screened: List[int] = []
+        for index, rule in enumerate(rules):
+            words = _dispatch_words(rule.pattern)
+            if words is None:
+                general.append(index)
+                if not _BACKREF_RE.search(rule.pattern) and _compile_safe(f"(?:{rule.pattern})") is not None:
+                    screened.append(index)
+            else:
+                for word in words:
+                    by_word.setdefault(word, []).append(index)
+
+        self._rules = rules
+        self._general = tuple(rules[i] for i in general)
+        self._by_word = {
+            word: tuple(rules[i] for i in sorted(set(indexes) | set(general)))
+            for word, indexes in by_word.items()
+        }
+        self._screened = frozenset(id(rules[i]) for i in screened)
+        self._screen: Optional[re.Pattern] = None
+        if screened:
+            try:
+                self._screen = re.compile("|".join(f"(?:{rules[i].pattern})" for i in screened))
+            except re.error:
+                # e.g. the same named group in two patterns
+                self._screened = frozenset()
+
+    def first_match(self, command: str) -> Optional[PolicyRule]:
+        word = _LEADING_WORD_RE.match(command).group()
+        screen_hit: Optional[bool] = None
+        for rule in self._by_word.get(word, self._general):
+            if id(rule) in self._screened:
+                if screen_hit is None:
+                    screen_hit = self._screen.search(command) is not None
+                if not screen_hit:
+                    continue
+            if rule.compiled.search(command):
+                return rule
+        return None
+
+
+class _CompiledPolicy:
+    """Matchers for one org's allow/deny lists plus a verdict memo.
+
+    Built once per loaded rule set; a policy edit produces new rule lists and
+    therefore a fresh memo, so memoized verdicts never outlive the rules.
+    """
+
+    def __init__(self, allow: List[PolicyRule], deny: List[PolicyRule]):
+        self.allow = _RuleMatcher(allow)
+        self.deny = _RuleMatcher(deny)
+        self._verdicts: Dict[tuple, CommandVerdict] = {}
+
+    def recall(self, key: tuple) -> Optional[CommandVerdict]:
+        return self._verdicts.get(key)
+
+    def remember(self, key: tuple, verdict: CommandVerdict) -> CommandVerdict:
+        if len(self._verdicts) >= _VERDICT_MEMO_MAX:
+            self._verdicts.pop(next(iter(self._verdicts), None), None)
+        self._verdicts[key] = verdict
+        return verdict
+
+
+# Keyed on the identity of the rule lists ``_get_cached`` hands out; entries
+# hold the lists themselves so the ids cannot be reused while memoized.
+_compiled: "LRUCache[Tuple[int, int], Tuple[list, list, _CompiledPolicy]]" = LRUCache(maxsize=_CACHE_MAX)
+
+
+def _compile_policy(allow: List[PolicyRule], deny: List[PolicyRule]) -> _CompiledPolicy:
+    key = (id(allow), id(deny))
+    hit = _compiled.get(key)
+    if hit is not None and hit[0] is allow and hit[1] is deny:
+        return hit[2]
+    policy = _CompiledPolicy(allow, deny)
+    _compiled[key] = (allow, deny, policy)
+    return policy
+
+
 def evaluate_command(org_id: Optional[str], command: str) -> CommandVerdict:
     """Core gate. Returns whether *command* is allowed for *org_id*.
 
@@ -165,15 +409,17 @@ def evaluate_command(org_id: Optional[str], command: str) -> CommandVerdict:
     if not states.denylist_enabled and not states.allowlist_enabled:
         return CommandVerdict(allowed=True, rule_description="Policy lists are disabled")
 
-    deny_hit = next(
-        (r for r in deny_rules if r.compiled.search(command)),
-        None,
-    ) if states.denylist_enabled else None
+    policy = _compile_policy(allow_rules, deny_rules)
+    memo_key = ("command", command, states)
+    verdict = policy.recall(memo_key)
+    if verdict is None:
+        verdict = policy.remember(memo_key, _evaluate(policy, states, command))
+    return verdict
 
-    allow_hit = next(
-        (r for r in allow_rules if r.compiled.search(command)),
-        None,
-    ) if states.allowlist_enabled else None
+
+def _evaluate(policy: _CompiledPolicy, states: ListStates, command: str) -> CommandVerdict:
+    deny_hit = policy.deny.first_match(command) if states.denylist_enabled else None
+    allow_hit = policy.allow.first_match(command) if states.allowlist_enabled else None
 
     if deny_hit:
         return CommandVerdict(
@@ -307,18 +553,29 @@ def evaluate_compound_command(
         logger.info("policy_check_skipped reason=no_org_context func=evaluate_compound_command")
         return CommandVerdict(allowed=True)
 
+    allow_rules, deny_rules, states = _get_cached(org_id)
+    if not states.denylist_enabled and not states.allowlist_enabled:
+        return CommandVerdict(allowed=True, rule_description="Policy lists are disabled")
+
+    # Memoized whole, so a repeated pipeline skips the shell split as well.
+    policy = _compile_policy(allow_rules, deny_rules)
+    memo_key = ("compound", command, states)
+    cached = policy.recall(memo_key)
+    if cached is not None:
+        return cached
+
     parts = _split_compound_command(command)
     if not parts:
-        return evaluate_command(org_id, command)
+        return policy.remember(memo_key, evaluate_command(org_id, command))
 
     last_verdict = CommandVerdict(allowed=True)
     for part in parts:
         verdict = evaluate_command(org_id, part)
         if not verdict.allowed:
-            return verdict
+            return policy.remember(memo_key, verdict)
         last_verdict = verdict
 
-    return last_verdict
+    return policy.remember(memo_key, last_verdict)
 
 
 _PATTERN_MAX_LEN = 500
@@ -862,7 +1119,16 @@ def get_policy_templates() -> List[dict]:
 
 
 def invalidate_cache(org_id: str) -> None:
+    """Drop this worker's copy of *org_id*'s policy and bump its Redis version
+    so every other worker reloads within ``_VERSION_CHECK_INTERVAL``."""
     _cache.pop(org_id, None)
+    client = _get_redis()
+    if client is None:
+        return
+    try:
+        client.incr(_version_key(org_id))
+    except Exception as exc:
+        logger.warning("Command policy version bump failed for org %s: %s", sanitize(org_id), exc)
 
 
 def seed_default_command_policy(org_id: str, created_by: str) -> None:
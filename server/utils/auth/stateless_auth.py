@@ -46,18 +46,27 @@ def resolve_org_id(user_id: str) -> Optional[str]:
     return None
 
 # ---------------------------------------------------------------------------
-# AWS credential cache (per-process, 55-minute TTL)
+# AWS credential cache (per-process, backed by the shared encrypted Redis tier)
 # ---------------------------------------------------------------------------
 
 _aws_cache: dict[tuple[str, str], dict] = {}
 # structure: {(user_id, account_id): creds_dict}
 
 
+def _shared_aws_cache_key(user_id: str, account_id: str) -> str:
+    return f"stateless:{user_id}:{account_id}"
+
+
 def _get_cached_aws_creds(user_id: str, account_id: str):
+    from utils.aws.sts_credential_cache import get_shared_credentials
+
     key = (user_id, account_id)
     creds = _aws_cache.get(key)
     if not creds:
-        return None
+        creds = get_shared_credentials(_shared_aws_cache_key(user_id, account_id))
+        if not creds:
+            return None
+        _aws_cache[key] = creds
     # 60-second safety margin
     if creds.get("expires_at", 0) <= __import__("time").time() + 60:
         _aws_cache.pop(key, None)
@@ -66,18 +75,26 @@ def _get_cached_aws_creds(user_id: str, account_id: str):
 
 
 def _put_cached_aws_creds(user_id: str, account_id: str, creds: dict):
+    from utils.aws.sts_credential_cache import put_shared_credentials
+
     _aws_cache[(user_id, account_id)] = creds
+    if creds.get("expires_at"):
+        put_shared_credentials(_shared_aws_cache_key(user_id, account_id), creds, int(creds["expires_at"]))
 
 
 def invalidate_cached_aws_creds(user_id: str, account_id: str | None = None):
-    """Remove AWS creds from the in-process cache."""
+    """Remove AWS creds from the in-process cache (and the shared tier for that account)."""
+    from utils.aws.sts_credential_cache import invalidate_shared_credentials
+
     if account_id:
         _aws_cache.pop((user_id, account_id), None)
+        invalidate_shared_credentials(_shared_aws_cache_key(user_id, account_id))
     else:
         # drop all entries for user
         for key in list(_aws_cache):
             if key[0] == user_id:
                 _aws_cache.pop(key, None)
+                invalidate_shared_credentials(_shared_aws_cache_key(*key))
 
 
 def is_valid_user_id(user_id: str) -> bool:
@@ -10,6 +10,13 @@ from botocore.exceptions import ClientError, NoCredentialsError
 from dotenv import load_dotenv
 
 from utils.log_sanitizer import hash_for_log, sanitize
+from utils.aws.sts_credential_cache import (
+    STS_MIN_REMAINING_SECONDS,
+    claim_refresh,
+    get_shared_credentials,
+    needs_refresh,
+    put_shared_credentials,
+)
 load_dotenv()
 
 # ------------------------------------------------------------------
@@ -20,8 +27,8 @@ load_dotenv()
 
 logger = logging.getLogger(__name__)
 
-# In-memory cache for credentials
-# In production, consider using Redis for cross-instance caching
+# In-memory cache for credentials, backed by the shared Redis tier in
+# utils.aws.sts_credential_cache
 _credential_cache: Dict[str, Dict[str, Any]] = {}
 
 
@@ -146,18 +153,46 @@ class STSAssumeRoleClient:
         cache_key = f"{uid}:{role_arn}:{external_id}:{policy_hash}"
         current_time = int(time.time())
         
-        # Check cache first (leave 60s buffer before expiration)
-        if cache_key in _credential_cache:
-            cached_creds = _credential_cache[cache_key]
-            if cached_creds['expiration'] > current_time + 60:
+        # Check the in-process cache, then the shared Redis tier (leave 60s buffer before expiration)
+        cached_creds = _credential_cache.get(cache_key)
+        if not cached_creds or cached_creds['expiration'] <= current_time + STS_MIN_REMAINING_SECONDS:
+            cached_creds = get_shared_credentials(cache_key)
+            if cached_creds:
+                _credential_cache[cache_key] = cached_creds
+        if cached_creds and cached_creds['expiration'] > current_time + STS_MIN_REMAINING_SECONDS:
+            # Inside the early-refresh window one caller re-assumes the role;
+            # everyone else keeps using the still-valid credentials.
+            cached_result = {
+                'accessKeyId': cached_creds['accessKeyId'],
+                'secretAccessKey': cached_creds['secretAccessKey'],
+                'sessionToken': cached_creds['sessionToken'],
+                'expiration': cached_creds['expiration']
+            }
+            if not needs_refresh(cached_creds['expiration']) or not claim_refresh(cache_key):
                 logger.debug(f"Using cached credentials for workspace {workspace_id}")
-                return {
-                    'accessKeyId': cached_creds['accessKeyId'],
-                    'secretAccessKey': cached_creds['secretAccessKey'],
-                    'sessionToken': cached_creds['sessionToken'],
-                    'expiration': cached_creds['expiration']
-                }
-        
+                return cached_result
+            try:
+                return self._assume_and_cache(
+                    cache_key, role_arn, external_id, workspace_id, duration_seconds, session_policy
+                )
+            except Exception as e:
+                logger.warning(f"Early credential refresh failed for workspace {sanitize(workspace_id)}; using cached credentials: {e}")
+                return cached_result
+
+        return self._assume_and_cache(
+            cache_key, role_arn, external_id, workspace_id, duration_seconds, session_policy
+        )
+
+    def _assume_and_cache(
+        self,
+        cache_key: str,
+        role_arn: str,
+        external_id: str,
+        workspace_id: str,
+        duration_seconds: int,
+        session_policy: Optional[str],
+    ) -> Dict[str, Any]:
+        """Call STS AssumeRole, verify the ExternalId requirement and cache the result."""
         # Assume role with STS
         try:
             logger.info(f"Assuming role {sanitize(role_arn)} for workspace {sanitize(workspace_id)} (policy: {'restricted' if session_policy else 'full'})")
@@ -209,6 +244,7 @@ class STSAssumeRoleClient:
             
             # Cache the credentials
             _credential_cache[cache_key] = credential_dict
+            put_shared_credentials(cache_key, credential_dict, expiration)
             
             # Clean up expired entries from cache
             self._cleanup_cache()
@@ -39,7 +39,9 @@ def refresh_aws_credentials():
         logger.debug("No AWS credentials need proactive refresh")
         return {"refreshed": 0, "skipped": 0}
 
-    expiring_role_arns = {k.split(":")[0] for k in expiring_cache_keys}
+    # Cache keys are "{user_id}:{role_arn}:{external_id}:{policy_hash}" and the
+    # role ARN itself contains colons.
+    expiring_role_arns = {k.split(":", 1)[1].rsplit(":", 2)[0] for k in expiring_cache_keys}
 
     from utils.db.connection_pool import db_pool
     from utils.auth.stateless_auth import set_rls_context
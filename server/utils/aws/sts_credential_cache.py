@@ -0,0 +1,146 @@
+"""
+Shared STS credential cache.
+
+Assumed-role credentials were cached per worker process only, so every
+gunicorn/Celery process paid its own AssumeRole round trips (plus the
+ExternalId verification call) for each account. This module adds a second
+tier in Redis that all processes share:
+
+- values are Fernet-encrypted; keys are a SHA-256 of the caller's cache key,
+  so neither role ARNs nor user ids appear in Redis
+- entries expire with the credentials (minus a safety margin)
+- inside the early-refresh window a single caller claims the refresh via
+  ``SET NX`` and re-assumes the role while everyone else keeps using the
+  still-valid credentials
+
+The encryption key comes from STS_CACHE_ENCRYPTION_KEY (a Fernet key) or is
+derived from FLASK_SECRET_KEY. Without either, or without Redis, the shared
+tier is disabled and callers fall back to their in-process caches.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Re-assume this long before expiry so no caller ever blocks on STS.
+STS_EARLY_REFRESH_SECONDS = int(os.getenv("STS_EARLY_REFRESH_SECONDS", "600"))
+# Never hand out credentials closer than this to expiry.
+STS_MIN_REMAINING_SECONDS = 60
+_REFRESH_LOCK_SECONDS = 30
+_KEY_PREFIX = "aws:sts:"
+
+_fernet = None
+_fernet_resolved = False
+
+
+def _get_fernet():
+    global _fernet, _fernet_resolved
+    if _fernet_resolved:
+        return _fernet
+    _fernet_resolved = True
+    try:
+        from cryptography.fernet import Fernet
+    except ImportError:
+        logger.warning("cryptography not installed; shared STS credential cache disabled")
+        return None
+
+    key = os.getenv("STS_CACHE_ENCRYPTION_KEY")
+    if not key:
+        secret = os.getenv("FLASK_SECRET_KEY")
+        if not secret:
+            logger.info("No STS_CACHE_ENCRYPTION_KEY or FLASK_SECRET_KEY; shared STS credential cache disabled")
+            return None
+        digest = hashlib.sha256(b"aurora-sts-cache:" + secret.encode("utf-8")).digest()
+        key = base64.urlsafe_b64encode(digest)
+    try:
+        _fernet = Fernet(key)
+    except Exception as e:
+        logger.error(f"Invalid STS cache encryption key; shared STS credential cache disabled: {e}")
+    return _fernet
+
+
+def _redis_key(cache_key: str, suffix: str = "") -> str:
+    return _KEY_PREFIX + hashlib.sha256(cache_key.encode("utf-8")).hexdigest() + suffix
+
+
+def _client():
+    from utils.cache.redis_client import get_redis_client
+
+    return get_redis_client()
+
+
+def get_shared_credentials(cache_key: str) -> Optional[Dict[str, Any]]:
+    """Return decrypted credentials for ``cache_key`` or None on miss/any failure."""
+    fernet = _get_fernet()
+    if fernet is None:
+        return None
+    try:
+        client = _client()
+        if client is None:
+            return None
+        token = client.get(_redis_key(cache_key))
+        if not token:
+            return None
+        return json.loads(fernet.decrypt(token.encode("ascii") if isinstance(token, str) else token))
+    except Exception as e:
+        # InvalidToken (key rotated / different FLASK_SECRET_KEY) is a plain miss.
+        logger.debug(f"Shared STS cache read failed: {e}")
+        return None
+
+
+def put_shared_credentials(cache_key: str, credentials: Dict[str, Any], expires_at: int) -> None:
+    """Encrypt and store credentials until shortly before ``expires_at``."""
+    fernet = _get_fernet()
+    if fernet is None:
+        return
+    ttl = int(expires_at - time.time()) - STS_MIN_REMAINING_SECONDS
+    if ttl <= 0:
+        return
+    try:
+        client = _client()
+        if client is None:
+            return
+        token = fernet.encrypt(json.dumps(credentials).encode("utf-8")).decode("ascii")
+        pipe = client.pipeline(transaction=False)
+        pipe.set(_redis_key(cache_key), token, ex=ttl)
+        pipe.delete(_redis_key(cache_key, ":refresh"))
+        pipe.execute()
+    except Exception as e:
+        logger.debug(f"Shared STS cache write failed: {e}")
+
+
+def invalidate_shared_credentials(cache_key: str) -> None:
+    try:
+        client = _client()
+        if client is not None:
+            client.delete(_redis_key(cache_key))
+    except Exception as e:
+        logger.debug(f"Shared STS cache invalidation failed: {e}")
+
+
+def needs_refresh(expires_at: int) -> bool:
+    """True when credentials are inside the early-refresh window."""
+    return expires_at <= time.time() + STS_EARLY_REFRESH_SECONDS
+
+
+def claim_refresh(cache_key: str) -> bool:
+    """Claim the right to refresh ``cache_key``; only one caller wins per window.
+
+    Returns True when the shared tier is unavailable so each process still
+    refreshes its own cache.
+    """
+    if _get_fernet() is None:
+        return True
+    try:
+        client = _client()
+        if client is None:
+            return True
+        return bool(client.set(_redis_key(cache_key, ":refresh"), "1", nx=True, ex=_REFRESH_LOCK_SECONDS))
+    except Exception:
+        return True
@@ -6,6 +6,7 @@ Tracks LLM API usage costs for users.
 import logging
 import traceback
 
+from utils.billing.cost_counters import get_cached_total, seed_total
 from utils.db.connection_pool import db_pool
 
 # Configure logging
@@ -15,13 +16,20 @@ logger = logging.getLogger(__name__)
 def get_api_cost(user_id: str) -> float:
     """
     Get the total API usage cost for a user.
-    
+
+    Served from the shared Redis counter when present; otherwise summed from
+    the llm_usage_daily_costs aggregates and used to seed the counter.
+
     Args:
         user_id: The user ID to get costs for
 
     Returns:
         float: Total estimated API cost (raw provider cost)
     """
+    cached = get_cached_total("user", user_id)
+    if cached is not None:
+        return cached
+
     try:
         from utils.auth.stateless_auth import set_rls_context
         with db_pool.get_user_connection() as conn:
@@ -31,16 +39,17 @@ def get_api_cost(user_id: str) -> float:
             cursor.execute(
                 """
                 SELECT COALESCE(SUM(estimated_cost), 0) as total_cost
-                FROM llm_usage_tracking
+                FROM llm_usage_daily_costs
                 WHERE user_id = %s
             """, (user_id,))
-            
+
             result = cursor.fetchone()
             if result and result[0] is not None:
                 api_cost = float(result[0])
             else:
                 api_cost = 0.0
 
+            seed_total("user", user_id, api_cost)
             logger.debug(f"API cost for user {user_id}: ${api_cost:.2f}")
             return api_cost
 
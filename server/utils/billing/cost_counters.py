@@ -0,0 +1,82 @@
+"""
+Running API cost counters for Aurora.
+
+``llm_usage_daily_costs`` keeps per (org, user, model, day) totals that the
+LLM usage writer updates in the same transaction as each usage batch. On top
+of it, Redis holds each user's all-time total so a cost check is a single GET
+shared by all workers.
+
+A missing counter is seeded from the daily table. Writers only increment
+counters that already exist, so a flush can never create a partial total. A
+flush that commits while a seed is being computed can be missed by that
+seed; counters expire after COST_COUNTER_TTL_SECONDS to bound that drift.
+"""
+
+import logging
+import os
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+COST_COUNTER_TTL_SECONDS = int(os.getenv("LLM_COST_COUNTER_TTL_SECONDS", "3600"))
+_KEY_PREFIX = "llm_cost"
+
+# INCRBYFLOAT only when the counter exists; keeps the TTL set by the seed.
+_INCR_IF_EXISTS = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return redis.call('INCRBYFLOAT', KEYS[1], ARGV[1])
+end
+return false
+"""
+
+
+def _client():
+    from utils.cache.redis_client import get_redis_client
+
+    return get_redis_client()
+
+
+def _key(scope: str, ident: str) -> str:
+    return f"{_KEY_PREFIX}:{scope}:{ident}"
+
+
+def get_cached_total(scope: str, ident: str) -> Optional[float]:
+    """Counter value for ``scope`` (e.g. "user"), or None on miss / no Redis."""
+    try:
+        client = _client()
+        if client is None:
+            return None
+        value = client.get(_key(scope, ident))
+        return float(value) if value is not None else None
+    except Exception as e:
+        logger.debug(f"[CostCounters] Read failed for {scope} {ident}: {e}")
+        return None
+
+
+def seed_total(scope: str, ident: str, total: float) -> None:
+    """Store a freshly computed total unless another worker already did."""
+    try:
+        client = _client()
+        if client is None:
+            return
+        client.set(_key(scope, ident), repr(float(total)), ex=COST_COUNTER_TTL_SECONDS, nx=True)
+    except Exception as e:
+        logger.debug(f"[CostCounters] Seed failed for {scope} {ident}: {e}")
+
+
+def add_costs(user_costs: Dict[str, float]) -> None:
+    """Add committed usage costs to the user counters that exist."""
+    increments = [("user", ident, cost) for ident, cost in user_costs.items() if cost]
+    if not increments:
+        return
+    try:
+        client = _client()
+        if client is None:
+            return
+        pipe = client.pipeline(transaction=False)
+        for scope, ident, cost in increments:
+            pipe.eval(_INCR_IF_EXISTS, 1, _key(scope, ident), repr(float(cost)))
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"[CostCounters] Increment failed: {e}")
+
@@ -0,0 +1,165 @@
+"""Live output channels for background chats, backed by Redis Streams.
+
+While a workflow runs, token deltas and incident thoughts are appended to a
+per-session or per-incident stream and tailed by the SSE endpoints in
+routes/chat_routes.py and routes/incidents_sse.py. Durable rows in Postgres
+are only written at sentence/turn boundaries, not on every chunk.
+
+Streams rather than pub/sub so a client that connects mid-turn (or reconnects
+with ``Last-Event-ID``) replays what it missed instead of seeing a gap.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Iterator, Optional
+
+import redis
+
+from utils.cache.redis_client import get_redis_client, get_redis_ssl_kwargs
+
+logger = logging.getLogger(__name__)
+_LOG_PREFIX = "[LiveStream]"
+
+# Approximate cap on entries kept per stream (XADD MAXLEN ~).
+LIVE_STREAM_MAXLEN = int(os.getenv("LIVE_STREAM_MAXLEN", "5000"))
+# Streams expire this long after their last write.
+LIVE_STREAM_TTL_SECONDS = int(os.getenv("LIVE_STREAM_TTL_SECONDS", "3600"))
+# Token deltas are coalesced for at most this long before being published.
+LIVE_DELTA_INTERVAL_SECONDS = float(os.getenv("LIVE_DELTA_INTERVAL_SECONDS", "0.1"))
+# How long an SSE tail blocks on XREAD before sending a heartbeat.
+_TAIL_BLOCK_MS = 15000
+# Event types that end a stream; the tail closes after sending one.
+_TERMINAL_EVENTS = ("end", "error")
+
+
+def live_stream_key(kind: str, ident: str) -> str:
+    """Redis key for a live stream, e.g. ``live:session:<id>`` or ``live:incident:<id>``."""
+    return f"live:{kind}:{ident}"
+
+
+class LiveChannel:
+    """Publisher for one live stream. Failures are logged and never raised."""
+
+    def __init__(self, kind: str, ident: str):
+        self.key = live_stream_key(kind, ident)
+        self._client: Optional[redis.Redis] = None
+        self._pending_delta: list = []
+        self._last_delta_at = 0.0
+        self._flush_timer: Optional[asyncio.TimerHandle] = None
+
+    def _redis(self) -> Optional[redis.Redis]:
+        if self._client is None:
+            self._client = get_redis_client()
+        return self._client
+
+    def _xadd(self, event: dict) -> None:
+        client = self._redis()
+        if client is None:
+            return
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.xadd(self.key, {"data": json.dumps(event)}, maxlen=LIVE_STREAM_MAXLEN, approximate=True)
+            pipe.expire(self.key, LIVE_STREAM_TTL_SECONDS)
+            pipe.execute()
+        except Exception as e:
+            # Drop the cached client so the next publish reconnects.
+            self._client = None
+            logger.warning(f"{_LOG_PREFIX} Failed to publish to {self.key}: {e}")
+
+    def reset(self) -> None:
+        """Drop entries from a previous turn so new subscribers don't replay them."""
+        self._cancel_flush_timer()
+        self._pending_delta.clear()
+        client = self._redis()
+        if client is None:
+            return
+        try:
+            client.delete(self.key)
+        except Exception as e:
+            self._client = None
+            logger.warning(f"{_LOG_PREFIX} Failed to reset {self.key}: {e}")
+
+    def publish(self, event_type: str, **fields) -> None:
+        """Publish a discrete event, flushing any buffered token delta first."""
+        self.flush_delta()
+        self._xadd({"type": event_type, **fields})
+
+    def append_delta(self, text: str) -> None:
+        """Buffer a token delta; it is published within LIVE_DELTA_INTERVAL_SECONDS.
+
+        A timer on the running event loop publishes the buffer even when no
+        further token arrives (e.g. the model pauses before a tool call).
+        Without a running loop the delta is published immediately.
+        """
+        if not text:
+            return
+        self._pending_delta.append(text)
+        wait = LIVE_DELTA_INTERVAL_SECONDS - (time.monotonic() - self._last_delta_at)
+        if wait <= 0:
+            self.flush_delta()
+            return
+        if self._flush_timer is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self.flush_delta()
+                return
+            self._flush_timer = loop.call_later(wait, self.flush_delta)
+
+    def _cancel_flush_timer(self) -> None:
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+    def flush_delta(self) -> None:
+        self._cancel_flush_timer()
+        if not self._pending_delta:
+            return
+        text = "".join(self._pending_delta)
+        self._pending_delta.clear()
+        self._last_delta_at = time.monotonic()
+        self._xadd({"type": "token", "text": text})
+
+
+def _event_type(data: str) -> Optional[str]:
+    try:
+        event = json.loads(data)
+    except ValueError:
+        return None
+    return event.get("type") if isinstance(event, dict) else None
+
+
+def tail_live_stream(key: str, last_id: Optional[str] = None) -> Iterator[str]:
+    """Yield SSE frames for entries of ``key`` after ``last_id`` (from the start if None).
+
+    Each frame carries the stream entry id so EventSource reconnects resume
+    via ``Last-Event-ID``. The generator returns after an ``end`` or ``error``
+    entry.
+    """
+    client = None
+    cursor = last_id or "0-0"
+    try:
+        client = redis.from_url(os.getenv("REDIS_URL", "redis://redis:6379/0"), **get_redis_ssl_kwargs())
+        yield f"data: {json.dumps({'type': 'connected'})}\n\n"
+        while True:
+            result = client.xread({key: cursor}, block=_TAIL_BLOCK_MS, count=200)
+            if not result:
+                yield ": heartbeat\n\n"
+                continue
+            for _stream, entries in result:
+                for entry_id, fields in entries:
+                    entry_id = entry_id.decode("utf-8") if isinstance(entry_id, bytes) else entry_id
+                    data = fields.get(b"data", fields.get("data", b""))
+                    if isinstance(data, bytes):
+                        data = data.decode("utf-8")
+                    cursor = entry_id
+                    yield f"id: {entry_id}\ndata: {data}\n\n"
+                    if _event_type(data) in _TERMINAL_EVENTS:
+                        return
+    except GeneratorExit:
+        pass
+    finally:
+        if client:
+            client.close()
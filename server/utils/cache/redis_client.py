@@ -1,12 +1,40 @@
-"""Centralized Redis client with health checks, reusable across all modules."""
+"""Centralized Redis client with health checks, reusable across all modules.
+
+One pooled client is shared per process. ``get_redis_client()`` does not
+round-trip to Redis: pooled connections are checked by redis-py when they
+have been idle longer than REDIS_HEALTH_CHECK_INTERVAL, and a connection
+error on any command marks Redis down for REDIS_RETRY_INTERVAL_SECONDS,
+during which callers get ``None`` and skip their cache. The first call after
+that window pings once to decide whether Redis is back.
+
+Per-command latencies are kept in small in-process histograms, see
+``get_command_latency_stats()``.
+"""
+import bisect
 import os
 import logging
-from typing import Optional
+import threading
+import time
+from typing import Dict, List, Mapping, Optional
 import redis
 
 logger = logging.getLogger(__name__)
 
+REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", "30"))
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "5"))
+REDIS_RETRY_INTERVAL_SECONDS = float(os.getenv("REDIS_RETRY_INTERVAL_SECONDS", "5"))
+
+# Upper bounds (ms) of the latency histogram buckets; one overflow bucket follows.
+LATENCY_BUCKETS_MS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
 _redis_client: Optional[redis.Redis] = None
+_unhealthy_until = 0.0
+_client_lock = threading.Lock()
+
+_latency_lock = threading.Lock()
+_latency: Dict[str, Dict[str, float]] = {}
+_latency_buckets: Dict[str, List[int]] = {}
 
 
 def get_redis_ssl_kwargs() -> dict:
@@ -29,27 +57,186 @@ def get_redis_ssl_kwargs() -> dict:
     return kwargs
 
 
+def _record_latency(command: str, elapsed_ms: float) -> None:
+    with _latency_lock:
+        stats = _latency.get(command)
+        if stats is None:
+            stats = _latency[command] = {"count": 0, "total_ms": 0.0, "max_ms": 0.0}
+            _latency_buckets[command] = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        stats["count"] += 1
+        stats["total_ms"] += elapsed_ms
+        if elapsed_ms > stats["max_ms"]:
+            stats["max_ms"] = elapsed_ms
+        _latency_buckets[command][bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+
+
+def get_command_latency_stats() -> Dict[str, dict]:
+    """Per-command latency histograms for this process.
+
+    ``{"GET": {"count", "avg_ms", "max_ms", "buckets": {"<=1ms": n, ..., ">1000ms": n}}}``;
+    pipelines are recorded as ``PIPELINE``.
+    """
+    labels = [f"<={bound:g}ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]:g}ms"]
+    with _latency_lock:
+        return {
+            command: {
+                "count": int(stats["count"]),
+                "avg_ms": round(stats["total_ms"] / stats["count"], 3),
+                "max_ms": round(stats["max_ms"], 3),
+                "buckets": {label: n for label, n in zip(labels, _latency_buckets[command]) if n},
+            }
+            for command, stats in _latency.items()
+        }
+
+
+def mark_redis_unhealthy() -> None:
+    """Stop handing out the client until the retry interval has passed."""
+    global _unhealthy_until
+    if time.monotonic() >= _unhealthy_until:
+        logger.warning(f"Redis connection error; retrying in {REDIS_RETRY_INTERVAL_SECONDS:g}s")
+    _unhealthy_until = time.monotonic() + REDIS_RETRY_INTERVAL_SECONDS
+
+
+def _timed(label: str, func):
+    def call(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except (redis.ConnectionError, redis.TimeoutError):
+            mark_redis_unhealthy()
+            raise
+        finally:
+            _record_latency(label, (time.perf_counter() - start) * 1000)
+    return call
+
+
+class _InstrumentedPipeline:
+    """Wraps a redis-py pipeline so ``execute()`` is timed as ``PIPELINE``."""
+
+    def __init__(self, pipeline):
+        self._pipeline = pipeline
+
+    def __getattr__(self, name):
+        attr = getattr(self._pipeline, name)
+        if not callable(attr):
+            return attr
+
+        def queue(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            # Queued commands return the pipeline for chaining; keep the wrapper.
+            return self if result is self._pipeline else result
+        return queue
+
+    def execute(self, *args, **kwargs):
+        return _timed("PIPELINE", self._pipeline.execute)(*args, **kwargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._pipeline.__exit__(*exc_info)
+
+    def __len__(self):
+        return len(self._pipeline)
+
+
+# Client methods that return iterators or helper objects rather than replies.
+_UNTIMED = frozenset(("pubsub", "lock", "register_script", "monitor"))
+
+
+class _InstrumentedRedis:
+    """Wraps a redis.Redis client, timing every command and reporting connection errors.
+
+    Commands are recorded under their method name (``get`` as ``GET``).
+    """
+
+    def __init__(self, client: redis.Redis):
+        self._client = client
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr) or name in _UNTIMED or name.endswith("_iter"):
+            return attr
+        wrapped = _timed(name.upper(), attr)
+        # Cache on the instance so later lookups skip __getattr__.
+        self.__dict__[name] = wrapped
+        return wrapped
+
+    def pipeline(self, *args, **kwargs):
+        return _InstrumentedPipeline(self._client.pipeline(*args, **kwargs))
+
+
+def _create_client() -> _InstrumentedRedis:
+    url = os.getenv("REDIS_URL", "redis://redis:6379/0")
+    return _InstrumentedRedis(redis.from_url(
+        url,
+        decode_responses=True,
+        max_connections=REDIS_MAX_CONNECTIONS,
+        health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+        socket_timeout=REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=REDIS_SOCKET_TIMEOUT,
+        socket_keepalive=True,
+        retry_on_timeout=True,
+        **get_redis_ssl_kwargs(),
+    ))
+
+
 def get_redis_client() -> Optional[redis.Redis]:
-    """Get a healthy Redis client with automatic reconnection."""
-    global _redis_client
-    
-    try:
-        if _redis_client is not None:
-            try:
-                _redis_client.ping()
-                return _redis_client
-            except Exception:
-                logger.warning("Redis client unhealthy, reconnecting...")
-                _redis_client = None
-        
-        url = os.getenv("REDIS_URL", "redis://redis:6379/0")
-        _redis_client = redis.from_url(url, decode_responses=True, **get_redis_ssl_kwargs())
-        
-        _redis_client.ping()
-        logger.debug("Redis client connected")
-        return _redis_client
-        
-    except Exception as e:
-        logger.error(f"Redis unavailable: {e}")
+    """Get the shared Redis client, or None while Redis is unavailable."""
+    global _redis_client, _unhealthy_until
+
+    client = _redis_client
+    if client is not None and not _unhealthy_until:
+        return client
+    if time.monotonic() < _unhealthy_until:
         return None
 
+    # First use in this process, or the retry interval after an error has passed.
+    with _client_lock:
+        if _redis_client is not None and not _unhealthy_until:
+            return _redis_client
+        if time.monotonic() < _unhealthy_until:
+            return None
+        try:
+            if _redis_client is None:
+                _redis_client = _create_client()
+            _redis_client.ping()
+            _unhealthy_until = 0.0
+            logger.debug("Redis client connected")
+            return _redis_client
+        except Exception as e:
+            _unhealthy_until = time.monotonic() + REDIS_RETRY_INTERVAL_SECONDS
+            logger.error(f"Redis unavailable: {e}")
+            return None
+
+
+def get_many(client: redis.Redis, keys: List[str]) -> List[Optional[str]]:
+    """Values for ``keys`` in one round trip (MGET); None for missing keys."""
+    if not keys:
+        return []
+    return client.mget(keys)
+
+
+def set_many(client: redis.Redis, items: Mapping[str, str], ttl_seconds: int) -> None:
+    """SET ``items`` with a TTL in one round trip (non-transactional pipeline)."""
+    if not items:
+        return
+    pipe = client.pipeline(transaction=False)
+    for key, value in items.items():
+        pipe.set(key, value, ex=ttl_seconds)
+    pipe.execute()
+
+
+def _reset_after_fork() -> None:
+    """Children of a prefork worker build their own pool and stats."""
+    global _redis_client, _unhealthy_until, _client_lock, _latency_lock
+    _redis_client = None
+    _unhealthy_until = 0.0
+    _client_lock = threading.Lock()
+    _latency_lock = threading.Lock()
+    _latency.clear()
+    _latency_buckets.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -496,6 +496,16 @@ def initialize_tables():
                         incident_id UUID
                     );
                 """,
+                "chat_context_messages": """
+                    CREATE TABLE IF NOT EXISTS chat_context_messages (
+                        session_id VARCHAR(50) NOT NULL REFERENCES chat_sessions(id) ON DELETE CASCADE,
+                        seq INTEGER NOT NULL,
+                        org_id VARCHAR(255),
+                        message JSONB NOT NULL,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        PRIMARY KEY (session_id, seq)
+                    );
+                """,
                 "llm_usage_tracking": """
                     CREATE TABLE IF NOT EXISTS llm_usage_tracking (
                         id SERIAL PRIMARY KEY,
@@ -519,6 +529,25 @@ def initialize_tables():
                         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                     );
                 """,
+                # Per (org, user, model, day) LLM cost totals, maintained by
+                # chat/backend/agent/utils/llm_usage_writer.py.
+                "llm_usage_daily_costs": """
+                    CREATE TABLE IF NOT EXISTS llm_usage_daily_costs (
+                        org_id VARCHAR(255) NOT NULL,
+                        user_id VARCHAR(1000) NOT NULL,
+                        model_name VARCHAR(255) NOT NULL,
+                        usage_date DATE NOT NULL,
+                        request_count INTEGER NOT NULL DEFAULT 0,
+                        input_tokens BIGINT NOT NULL DEFAULT 0,
+                        output_tokens BIGINT NOT NULL DEFAULT 0,
+                        estimated_cost DECIMAL(14,6) NOT NULL DEFAULT 0,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        PRIMARY KEY (org_id, user_id, model_name, usage_date)
+                    );
+
+                    CREATE INDEX IF NOT EXISTS idx_llm_usage_daily_costs_user
+                        ON llm_usage_daily_costs(user_id, usage_date);
+                """,
                 "cloud_feed_metadata": """
                     CREATE TABLE IF NOT EXISTS cloud_feed_metadata (
                         id SERIAL PRIMARY KEY,
@@ -962,6 +991,48 @@ def initialize_tables():
                     CREATE INDEX IF NOT EXISTS idx_jenkins_deploy_trace ON jenkins_deployment_events(trace_id) WHERE trace_id IS NOT NULL;
                     CREATE UNIQUE INDEX IF NOT EXISTS idx_jenkins_deploy_dedup ON jenkins_deployment_events(user_id, COALESCE(job_name, ''), COALESCE(build_number, -1));
                 """,
+                # SRE metrics rollups, maintained by services/metrics/tasks.py.
+                # Dimension columns not used by a metric are left NULL.
+                "incident_metric_rollups": """
+                    CREATE TABLE IF NOT EXISTS incident_metric_rollups (
+                        id BIGSERIAL PRIMARY KEY,
+                        org_id VARCHAR(255) NOT NULL,
+                        metric VARCHAR(20) NOT NULL,
+                        grain VARCHAR(10) NOT NULL,
+                        bucket_start TIMESTAMP NOT NULL,
+                        severity VARCHAR(20),
+                        service TEXT,
+                        source_type VARCHAR(20),
+                        merged BOOLEAN,
+                        count INTEGER NOT NULL,
+                        sum_seconds DOUBLE PRECISION NOT NULL DEFAULT 0,
+                        sum_to_rca_seconds DOUBLE PRECISION NOT NULL DEFAULT 0,
+                        sum_rca_to_resolve_seconds DOUBLE PRECISION NOT NULL DEFAULT 0,
+                        histogram JSONB NOT NULL DEFAULT '{}'::jsonb
+                    );
+
+                    CREATE INDEX IF NOT EXISTS idx_incident_metric_rollups_lookup
+                        ON incident_metric_rollups(org_id, metric, grain, bucket_start);
+                """,
+                "incident_metric_rollup_state": """
+                    CREATE TABLE IF NOT EXISTS incident_metric_rollup_state (
+                        org_id VARCHAR(255) PRIMARY KEY,
+                        rolled_up_to TIMESTAMP NOT NULL,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    );
+                """,
+                "incident_metric_dirty_buckets": """
+                    CREATE TABLE IF NOT EXISTS incident_metric_dirty_buckets (
+                        id BIGSERIAL PRIMARY KEY,
+                        org_id VARCHAR(255) NOT NULL,
+                        source VARCHAR(20) NOT NULL,
+                        bucket_start TIMESTAMP NOT NULL,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    );
+
+                    CREATE INDEX IF NOT EXISTS idx_incident_metric_dirty_org
+                        ON incident_metric_dirty_buckets(org_id);
+                """,
                 "spinnaker_deployment_events": """
                     CREATE TABLE IF NOT EXISTS spinnaker_deployment_events (
                         id SERIAL PRIMARY KEY,
@@ -1284,6 +1355,7 @@ def initialize_tables():
                         content TEXT,
                         last_edited_by VARCHAR(20) NOT NULL DEFAULT 'agent',
                         current_version_id UUID,
+                        version_count INTEGER NOT NULL DEFAULT 0,
                         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                         updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                     );
@@ -1296,7 +1368,8 @@ def initialize_tables():
                         artifact_id UUID NOT NULL REFERENCES artifacts(id) ON DELETE CASCADE,
                         org_id VARCHAR(255) NOT NULL,
                         user_id VARCHAR(255) NOT NULL,
-                        content TEXT NOT NULL,
+                        content TEXT,             -- full text on snapshot rows, NULL on delta rows
+                        delta BYTEA,              -- compressed diff back from the next version
                         version_number INTEGER NOT NULL DEFAULT 1,
                         source VARCHAR(50) NOT NULL DEFAULT 'agent',
                         generation_session_id VARCHAR(255),
@@ -1497,6 +1570,7 @@ def initialize_tables():
                 "k8s_node_metrics",
                 "deployments",
                 "chat_sessions",
+                "chat_context_messages",
                 "user_preferences",
                 "deployment_tasks",
                 "llm_usage_tracking",
@@ -1556,6 +1630,12 @@ def initialize_tables():
             rls_tables.append("artifacts")
             rls_tables.append("artifact_versions")
             rls_tables.append("hpa_vpa_recommendations")
+            rls_tables.append("incident_metric_rollups")
+            rls_tables.append("incident_metric_rollup_state")
+            rls_tables.append("llm_usage_daily_costs")
+            # incident_metric_dirty_buckets is NOT RLS-protected: its triggers
+            # record OLD.org_id as well as NEW.org_id, which would fail the
+            # insert policy whenever an incident changes org.
 
 
             # Migration: Add rca_celery_task_id column to incidents table if it doesn't exist
@@ -2038,6 +2118,25 @@ def initialize_tables():
                 logging.warning(f"Error adding llm_context_history column: {e}")
                 conn.rollback()
 
+            # Migration: Track the append-only context log (chat_context_messages).
+            # llm_context_length is the number of logged messages and
+            # llm_context_digest fingerprints that prefix; NULL length marks a
+            # session whose history still lives in llm_context_history and is
+            # moved into the log on its next save.
+            try:
+                cursor.execute("""
+                    ALTER TABLE chat_sessions
+                    ADD COLUMN IF NOT EXISTS llm_context_length INTEGER,
+                    ADD COLUMN IF NOT EXISTS llm_context_digest VARCHAR(64);
+                """)
+                logging.info(
+                    "Added llm_context_length/llm_context_digest columns to chat_sessions table (if not exists)."
+                )
+                conn.commit()
+            except Exception as e:
+                logging.warning(f"Error adding llm_context log columns: {e}")
+                conn.rollback()
+
             # Migration: Add status column to chat_sessions if it doesn't exist
             try:
                 cursor.execute("""
@@ -2214,6 +2313,35 @@ def initialize_tables():
                 logging.warning(f"Error backfilling org_id on llm_usage_tracking: {e}")
                 conn.rollback()
 
+            # Migration: Seed llm_usage_daily_costs from llm_usage_tracking for every
+            # (org, day) that has no aggregates yet. The usage writer maintains a day
+            # once it has written to it, so days recorded before it ran are still
+            # seeded even when the writer got to the table first.
+            try:
+                cursor.execute("""
+                    INSERT INTO llm_usage_daily_costs (
+                        org_id, user_id, model_name, usage_date,
+                        request_count, input_tokens, output_tokens, estimated_cost
+                    )
+                    SELECT t.org_id, t.user_id, t.model_name, t.timestamp::date,
+                           COUNT(*), SUM(t.input_tokens), SUM(t.output_tokens),
+                           COALESCE(SUM(t.estimated_cost), 0)
+                    FROM llm_usage_tracking t
+                    WHERE t.org_id IS NOT NULL
+                      AND NOT EXISTS (
+                          SELECT 1 FROM llm_usage_daily_costs d
+                          WHERE d.org_id = t.org_id AND d.usage_date = t.timestamp::date
+                      )
+                    GROUP BY t.org_id, t.user_id, t.model_name, t.timestamp::date
+                    ON CONFLICT (org_id, user_id, model_name, usage_date) DO NOTHING;
+                """)
+                if cursor.rowcount > 0:
+                    logging.info(f"Seeded {cursor.rowcount} llm_usage_daily_costs rows.")
+                conn.commit()
+            except Exception as e:
+                logging.warning(f"Error seeding llm_usage_daily_costs: {e}")
+                conn.rollback()
+
             # Migration: Add secret_ref column to user_tokens for Vault integration
             try:
                 cursor.execute(
@@ -3033,6 +3161,82 @@ def initialize_tables():
                     except Exception:
                         logging.debug(f"ROLLBACK TO SAVEPOINT also failed for sp_trg_{tbl}")
 
+            # DB triggers: record which hour buckets of the SRE metrics rollups
+            # an incident / deployment write invalidates, so the rollup task
+            # only rebuilds those days. Both OLD and NEW timestamps are marked
+            # because an edit can move a row between buckets.
+            try:
+                cursor.execute("SAVEPOINT sp_trg_metric_rollups")
+                cursor.execute("""
+                    CREATE OR REPLACE FUNCTION fn_incidents_mark_metric_buckets()
+                    RETURNS TRIGGER AS $trg$
+                    BEGIN
+                        IF TG_OP = 'UPDATE' AND (
+                            OLD.org_id, OLD.status, OLD.severity, OLD.alert_service,
+                            OLD.source_type, OLD.started_at, OLD.analyzed_at,
+                            OLD.resolved_at, OLD.investigation_started_at
+                        ) IS NOT DISTINCT FROM (
+                            NEW.org_id, NEW.status, NEW.severity, NEW.alert_service,
+                            NEW.source_type, NEW.started_at, NEW.analyzed_at,
+                            NEW.resolved_at, NEW.investigation_started_at
+                        ) THEN
+                            RETURN NULL;
+                        END IF;
+                        IF TG_OP <> 'INSERT' AND OLD.org_id IS NOT NULL THEN
+                            INSERT INTO incident_metric_dirty_buckets (org_id, source, bucket_start)
+                            SELECT DISTINCT OLD.org_id, 'incidents', date_trunc('hour', t)
+                            FROM unnest(ARRAY[OLD.started_at, OLD.analyzed_at, OLD.resolved_at]) AS t
+                            WHERE t IS NOT NULL;
+                        END IF;
+                        IF TG_OP <> 'DELETE' AND NEW.org_id IS NOT NULL THEN
+                            INSERT INTO incident_metric_dirty_buckets (org_id, source, bucket_start)
+                            SELECT DISTINCT NEW.org_id, 'incidents', date_trunc('hour', t)
+                            FROM unnest(ARRAY[NEW.started_at, NEW.analyzed_at, NEW.resolved_at]) AS t
+                            WHERE t IS NOT NULL;
+                        END IF;
+                        RETURN NULL;
+                    END;
+                    $trg$ LANGUAGE plpgsql;
+
+                    DROP TRIGGER IF EXISTS trg_incidents_mark_metric_buckets ON incidents;
+                    CREATE TRIGGER trg_incidents_mark_metric_buckets
+                        AFTER INSERT OR UPDATE OR DELETE ON incidents
+                        FOR EACH ROW
+                        EXECUTE FUNCTION fn_incidents_mark_metric_buckets();
+
+                    CREATE OR REPLACE FUNCTION fn_deploys_mark_metric_buckets()
+                    RETURNS TRIGGER AS $trg$
+                    BEGIN
+                        IF TG_OP = 'UPDATE' AND (OLD.org_id, OLD.service, OLD.received_at)
+                            IS NOT DISTINCT FROM (NEW.org_id, NEW.service, NEW.received_at) THEN
+                            RETURN NULL;
+                        END IF;
+                        IF TG_OP <> 'INSERT' AND OLD.org_id IS NOT NULL THEN
+                            INSERT INTO incident_metric_dirty_buckets (org_id, source, bucket_start)
+                            VALUES (OLD.org_id, 'deploys', date_trunc('hour', OLD.received_at));
+                        END IF;
+                        IF TG_OP <> 'DELETE' AND NEW.org_id IS NOT NULL THEN
+                            INSERT INTO incident_metric_dirty_buckets (org_id, source, bucket_start)
+                            VALUES (NEW.org_id, 'deploys', date_trunc('hour', NEW.received_at));
+                        END IF;
+                        RETURN NULL;
+                    END;
+                    $trg$ LANGUAGE plpgsql;
+
+                    DROP TRIGGER IF EXISTS trg_deploys_mark_metric_buckets ON jenkins_deployment_events;
+                    CREATE TRIGGER trg_deploys_mark_metric_buckets
+                        AFTER INSERT OR UPDATE OR DELETE ON jenkins_deployment_events
+                        FOR EACH ROW
+                        EXECUTE FUNCTION fn_deploys_mark_metric_buckets();
+                """)
+                cursor.execute("RELEASE SAVEPOINT sp_trg_metric_rollups")
+            except Exception as e:
+                logging.warning(f"Error creating metric rollup triggers: {e}")
+                try:
+                    cursor.execute("ROLLBACK TO SAVEPOINT sp_trg_metric_rollups")
+                except Exception:
+                    logging.debug("ROLLBACK TO SAVEPOINT also failed for sp_trg_metric_rollups")
+
             # Add FK from users.org_id -> organizations.id (if not exists)
             try:
                 cursor.execute("SAVEPOINT sp_org_fk")
@@ -3257,6 +3461,25 @@ def initialize_tables():
                 logging.warning(f"Error creating k8s_clusters view: {e}")
                 conn.rollback()
 
+            # Migration: delta-compressed artifact versions with a per-artifact version counter.
+            try:
+                cursor.execute("ALTER TABLE artifacts ADD COLUMN IF NOT EXISTS version_count INTEGER NOT NULL DEFAULT 0;")
+                cursor.execute("ALTER TABLE artifact_versions ADD COLUMN IF NOT EXISTS delta BYTEA;")
+                cursor.execute("ALTER TABLE artifact_versions ALTER COLUMN content DROP NOT NULL;")
+                cursor.execute("""
+                    UPDATE artifacts a SET version_count = v.max_version
+                    FROM (
+                        SELECT artifact_id, MAX(version_number) AS max_version
+                        FROM artifact_versions GROUP BY artifact_id
+                    ) v
+                    WHERE a.id = v.artifact_id AND a.version_count < v.max_version;
+                """)
+                conn.commit()
+                logging.info("Ensured artifact version counter and delta columns exist.")
+            except Exception as e:
+                conn.rollback()
+                logging.warning(f"Migration for artifact version deltas: {e}")
+
             # Migration: De-duplicate organization names from before uniqueness was enforced.
             # Appends a short ID suffix to the newer duplicate(s) so names are unique going forward.
             try:
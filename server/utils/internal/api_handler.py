@@ -32,6 +32,11 @@ async def handle_http_request(reader, writer):
             await _send_response(writer, "HTTP/1.1 200 OK\r\nContent-Type: text/plain\r\nContent-Length: 2\r\nConnection: close\r\n\r\nOK")
             return
         
+        # LLM admission queue depth and wait times
+        if request_line.startswith('GET /internal/metrics/llm-admission'):
+            await _handle_llm_admission_metrics(headers, writer)
+            return
+        
         # Internal kubectl API
         if request_line.startswith('POST /internal/kubectl/execute'):
             await _handle_kubectl_execute(headers, body, writer)
@@ -49,6 +54,21 @@ async def handle_http_request(reader, writer):
             pass
 
 
+async def _handle_llm_admission_metrics(headers, writer):
+    """Report per-model LLM admission stats for agent calls made by this process."""
+    internal_secret = os.getenv('INTERNAL_API_SECRET') or ''
+    provided = headers.get('x-internal-secret') or ''
+    if internal_secret and not hmac.compare_digest(internal_secret, provided):
+        await _send_json_response(writer, {"error": "Unauthorized"}, status="403 Forbidden")
+        return
+
+    from chat.backend.agent.utils.llm_admission import get_admission_stats
+
+    # Queue depth is read from Redis; keep that off the event loop.
+    stats = await asyncio.to_thread(get_admission_stats)
+    await _send_json_response(writer, {"llm_admission": stats})
+
+
 async def _handle_kubectl_execute(headers, body, writer):
     """Handle internal kubectl execution endpoint."""
     internal_secret = os.getenv('INTERNAL_API_SECRET') or ''
@@ -57,7 +77,7 @@ async def _handle_kubectl_execute(headers, body, writer):
         await _send_json_response(writer, {"error": "Unauthorized"}, status="403 Forbidden")
         return
     
-    from utils.kubectl.agent_ws_handler import get_agent_websocket_by_cluster, register_command_response_handler, unregister_command_response_handler
+    from utils.kubectl.agent_ws_handler import cancel_agent_command, get_agent_websocket_by_cluster, register_command_response_handler, unregister_command_response_handler
     
     data = json.loads(body.decode())
     user_id, cluster_id, command = data['user_id'], data['cluster_id'], data['command']
@@ -78,6 +98,8 @@ async def _handle_kubectl_execute(headers, body, writer):
             result = await asyncio.wait_for(future, timeout=timeout)
             await _send_json_response(writer, result)
         except asyncio.TimeoutError:
+            # Free the agent's slot; the command may still be queued or running.
+            await cancel_agent_command(websocket, command_id)
             await _send_json_response(writer, {'success': False, 'error': 'No response from agent'})
         except Exception as e:
             logger.error(f"Error communicating with kubectl agent: {e}", exc_info=True)
@@ -1,19 +1,96 @@
+import base64
+import codecs
 import json
 import logging
 import uuid
 import threading
+import zlib
 from datetime import datetime, timezone
 from typing import Dict, Any
 import websockets
 from utils.db.db_adapters import connect_to_db_as_admin
+from utils.security.config import config as _guardrails_config
+from utils.security.output_redaction import StreamRedactor
 
 logger = logging.getLogger(__name__)
 
 _agent_websockets: Dict[str, Dict[str, Any]] = {}
 _command_handlers: Dict[str, Any] = {}
+# Streamed outputs being reassembled, keyed by command_id.
+_partial_outputs: Dict[str, "_ChunkedOutput"] = {}
 _ws_lock = threading.Lock()
 _handlers_lock = threading.Lock()
 
+# Protocol features this backend understands, advertised to agents in the
+# 'connected' frame. Agents only use a feature the backend lists here, so
+# newer agents keep working against older backends.
+AGENT_CAPABILITIES = ('chunked_output',)
+
+
+class _ChunkedOutput:
+    """Reassembles zlib-compressed ``command_output_chunk`` frames.
+
+    Each chunk is redacted as it arrives, so large outputs are scanned in
+    full rather than cut at the one-shot ``redact()`` size cap.
+    """
+
+    def __init__(self):
+        self._decompressor = zlib.decompressobj()
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self._redactor = StreamRedactor() if _guardrails_config.enabled else None
+        self._parts = []
+        self.next_seq = 0
+
+    def _release(self, data: bytes, final: bool = False) -> None:
+        text = self._decoder.decode(data, final)
+        if self._redactor is not None:
+            text = self._redactor.feed(text)
+            if final:
+                text += self._redactor.finish()
+        self._parts.append(text)
+
+    def add(self, seq: int, data: str) -> None:
+        if seq != self.next_seq:
+            raise ValueError(f"expected chunk {self.next_seq}, got {seq}")
+        self._release(self._decompressor.decompress(base64.b64decode(data)))
+        self.next_seq += 1
+
+    def finish(self, expected_chunks: int) -> str:
+        if expected_chunks != self.next_seq:
+            raise ValueError(f"expected {expected_chunks} chunks, got {self.next_seq}")
+        self._release(self._decompressor.flush(), final=True)
+        if self._redactor is not None and self._redactor.findings:
+            logger.info(f"Redacted {len(self._redactor.findings)} secrets from streamed agent output")
+        return ''.join(self._parts)
+
+
+def _handle_output_chunk(message: Dict[str, Any]) -> None:
+    command_id = message.get('command_id')
+    with _handlers_lock:
+        if command_id not in _command_handlers:
+            return
+        partial = _partial_outputs.setdefault(command_id, _ChunkedOutput())
+    partial.add(message.get('seq', -1), message.get('data', ''))
+
+
+def _assemble_output(command_id: str, message: Dict[str, Any]) -> str:
+    """Return the command's output, joining streamed chunks if it was chunked."""
+    with _handlers_lock:
+        partial = _partial_outputs.pop(command_id, None)
+    if message.get('encoding') != 'zlib':
+        return message.get('output', '')
+    if partial is None:
+        partial = _ChunkedOutput()
+    return partial.finish(message.get('chunks', 0))
+
+def _connected_message(cluster_id: str, cluster_name: str) -> Dict[str, Any]:
+    return {
+        'type': 'connected',
+        'cluster_id': cluster_id,
+        'cluster_name': cluster_name,
+        'capabilities': list(AGENT_CAPABILITIES),
+    }
+
 def _execute_query(query, params):
     conn = connect_to_db_as_admin()
     cursor = None
@@ -80,6 +157,14 @@ def register_command_response_handler(command_id: str, handler: Any):
 def unregister_command_response_handler(command_id: str):
     with _handlers_lock:
         _command_handlers.pop(command_id, None)
+        _partial_outputs.pop(command_id, None)
+
+async def cancel_agent_command(websocket, command_id: str) -> None:
+    """Ask the agent to stop a command whose caller gave up waiting."""
+    try:
+        await websocket.send(json.dumps({'type': 'cancel_command', 'command_id': command_id}))
+    except Exception as e:
+        logger.debug(f"Failed to send cancel for command {command_id}: {e}")
 
 async def handle_kubectl_agent(websocket) -> None:
     cluster_id = None
@@ -126,7 +211,7 @@ async def handle_kubectl_agent(websocket) -> None:
         with _ws_lock:
             _agent_websockets[cluster_id] = {'websocket': websocket, 'user_id': user_id}
         logger.info(f"kubectl agent connected: {cluster_name} ({cluster_id})")
-        await websocket.send(json.dumps({'type': 'connected', 'cluster_id': cluster_id, 'cluster_name': cluster_name}))
+        await websocket.send(json.dumps(_connected_message(cluster_id, cluster_name)))
         
         async for message_text in websocket:
             try:
@@ -142,16 +227,31 @@ async def handle_kubectl_agent(websocket) -> None:
                         (agent_version, cluster_id)
                     )
                     logger.info(f"kubectl agent registered: {cluster_name} v{agent_version}")
+                elif msg_type == 'command_output_chunk':
+                    try:
+                        _handle_output_chunk(message)
+                    except Exception as e:
+                        command_id = message.get('command_id')
+                        logger.error(f"Dropping corrupt output stream for command {command_id}: {e}")
+                        with _handlers_lock:
+                            _partial_outputs.pop(command_id, None)
                 elif msg_type == 'command_response':
                     command_id = message.get('command_id')
                     with _handlers_lock:
                         handler = _command_handlers.get(command_id)
                     if handler:
+                        success, error = message.get('success', False), message.get('error')
+                        try:
+                            output = _assemble_output(command_id, message)
+                        except Exception as e:
+                            logger.error(f"Failed to reassemble output for command {command_id}: {e}")
+                            success, output, error = False, '', f'Incomplete output stream from agent: {e}'
                         result = {
-                            'success': message.get('success', False),
-                            'output': message.get('output', ''),
-                            'error': message.get('error'),
-                            'return_code': message.get('return_code', 1)
+                            'success': success,
+                            'output': output,
+                            'error': error,
+                            'return_code': message.get('return_code', 1),
+                            'truncated': message.get('truncated', False),
                         }
                         if hasattr(handler, 'put_nowait'):
                             handler.put_nowait(('success', result))
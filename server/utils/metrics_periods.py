@@ -5,6 +5,8 @@ PostgreSQL interval equivalents, used by the SRE metrics routes and the
 internal agent's introspection tools so the two never drift apart.
 """
 
+from datetime import timedelta
+
 # Accepted period values mapped to their PostgreSQL interval literal.
 PERIOD_MAP = {
     "7d": "7 days",
@@ -20,3 +22,8 @@ DEFAULT_INTERVAL = "30 days"
 def period_to_interval(period: str) -> str:
     """Return the PostgreSQL interval literal for a period, defaulting to 30 days."""
     return PERIOD_MAP.get(period, DEFAULT_INTERVAL)
+
+
+def period_to_timedelta(period: str) -> timedelta:
+    """Return the period as a timedelta, with the same default as period_to_interval."""
+    return timedelta(days=int(period_to_interval(period).split()[0]))
@@ -1,7 +1,7 @@
 """Redis-based secret caching, shared across all containers."""
 import logging
-from typing import Optional
-from utils.cache.redis_client import get_redis_client
+from typing import Dict, List, Optional
+from utils.cache.redis_client import get_many, get_redis_client, set_many
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +28,23 @@ def get_cached_secret(secret_name: str) -> Optional[str]:
         return None
 
 
+def get_cached_secrets(secret_names: List[str]) -> Dict[str, str]:
+    """Retrieve several secrets from Redis cache in one round trip. Misses are omitted."""
+    redis_client = get_redis_client()
+    if not redis_client:
+        logger.debug("Redis unavailable, skipping cache lookup")
+        return {}
+
+    try:
+        values = get_many(redis_client, [f"secret:{name}" for name in secret_names])
+        found = {name: value for name, value in zip(secret_names, values) if value}
+        logger.debug(f"Cache HIT for {len(found)}/{len(secret_names)} secrets")
+        return found
+    except Exception as e:
+        logger.warning(f"Redis mget failed: {e}")
+        return {}
+
+
 def update_secret_cache(secret_name: str, secret_value: str, ttl_seconds: Optional[int] = None):
     """Store a secret in Redis cache with TTL."""
     redis_client = get_redis_client()
@@ -46,6 +63,23 @@ def update_secret_cache(secret_name: str, secret_value: str, ttl_seconds: Option
         logger.warning(f"Redis set failed: {e}")
 
 
+def update_secret_cache_many(secrets: Dict[str, str], ttl_seconds: Optional[int] = None):
+    """Store several secrets in Redis cache with TTL in one round trip."""
+    redis_client = get_redis_client()
+    if not redis_client:
+        logger.debug("Redis unavailable, skipping cache update")
+        return
+
+    try:
+        if ttl_seconds is None:
+            ttl_seconds = DEFAULT_SECRET_CACHE_TTL_SECONDS
+
+        set_many(redis_client, {f"secret:{name}": value for name, value in secrets.items()}, ttl_seconds)
+        logger.info(f"  Cached {len(secrets)} secrets with TTL {ttl_seconds}s")
+    except Exception as e:
+        logger.warning(f"Redis set failed: {e}")
+
+
 def clear_secret_cache(secret_name: Optional[str] = None):
     """Delete a secret from Redis cache."""
     redis_client = get_redis_client()
@@ -15,7 +15,9 @@ from utils.log_sanitizer import safe_provider
 from utils.db.org_scope import resolve_org, org_read_predicate
 from utils.secrets.secret_cache import (
     get_cached_secret,
+    get_cached_secrets,
     update_secret_cache,
+    update_secret_cache_many,
     clear_secret_cache,
 )
 
@@ -232,7 +234,11 @@ class SecretRefManager:
                 return None
 
             secret_ref, role_arn, external_id_secret_ref = result
-            secret_value = self.get_secret(secret_ref)
+            external_id = None
+            if provider == "aws" and external_id_secret_ref:
+                secret_value, external_id = self._get_aws_secrets(secret_ref, external_id_secret_ref)
+            else:
+                secret_value = self.get_secret(secret_ref)
 
             try:
                 token_data = json.loads(secret_value)
@@ -240,13 +246,8 @@ class SecretRefManager:
                 if provider == "aws":
                     if role_arn:
                         token_data["role_arn"] = role_arn
-                    if external_id_secret_ref:
-                        try:
-                            external_id = self.get_secret(external_id_secret_ref)
-                            if external_id:
-                                token_data["external_id"] = external_id
-                        except Exception as e:
-                            logger.warning("Failed to retrieve AWS external_id: %s", e)
+                    if external_id:
+                        token_data["external_id"] = external_id
 
                 return token_data
 
@@ -276,6 +277,32 @@ class SecretRefManager:
             if conn:
                 conn.close()
 
+    def _get_aws_secrets(self, secret_ref: str, external_id_secret_ref: str) -> Tuple[str, Optional[str]]:
+        """Read an AWS row's token and external ID from the cache in one round trip.
+
+        Misses are fetched from Vault and written back together in one pipelined
+        write. A missing external ID is logged and returned as None.
+        """
+        cached = get_cached_secrets([secret_ref, external_id_secret_ref])
+        fetched: Dict[str, str] = {}
+
+        secret_value = cached.get(secret_ref)
+        if secret_value is None:
+            secret_value = fetched[secret_ref] = self.backend.get_secret(secret_ref)
+
+        external_id = cached.get(external_id_secret_ref)
+        if external_id is None:
+            try:
+                external_id = self.backend.get_secret(external_id_secret_ref)
+                if external_id:
+                    fetched[external_id_secret_ref] = external_id
+            except Exception as e:
+                logger.warning("Failed to retrieve AWS external_id: %s", e)
+
+        if fetched:
+            update_secret_cache_many(fetched)
+        return secret_value, external_id
+
     def migrate_token_to_secret_ref(self, user_id: str, provider: str, secret_name_prefix: str = "aurora-dev") -> bool:
         """Migrate an existing token from token_data column to Vault."""
         org_id = resolve_org(user_id)
@@ -25,6 +25,15 @@ Design notes
   prefilter -> regex -> entropy -> allowlist. Rules without a keyword hit
   skip the regex entirely, which matches how Gitleaks itself gets its
   throughput.
+* The keyword prefilter is a single pass: every rule keyword is folded into
+  one prefix-factored alternation (a trie, so the C regex engine rejects a
+  position on its first character) run over the lowered text. Each hit
+  names its candidate rules and a candidate region; a rule's regex then
+  only runs over line-aligned windows around its own hits, sized from the
+  longest match the rule can produce. Rules with an unbounded repeat that
+  can cross a line fall back to a whole-text scan.
+* ``StreamRedactor`` applies the same scan to chunked output, holding back
+  a carry window so secrets split across chunk boundaries are still caught.
 * ``redact()`` is idempotent: ``[REDACTED:<rule>]`` placeholders contain no
   rule keywords, so re-scanning already-redacted text is a near-no-op.
 * Inputs larger than ``MAX_SCAN_CHARS`` are truncated before scanning to
@@ -43,6 +52,13 @@ import re
 from collections import Counter
 from dataclasses import dataclass
 
+try:  # Python 3.11+ moved the regex parser under ``re``; ``sre_*`` are deprecated aliases.
+    from re import _constants as _sre
+    from re import _parser as _sre_parse
+except ImportError:  # pragma: no cover - older interpreters
+    import sre_constants as _sre
+    import sre_parse as _sre_parse
+
 from utils.security._generated_patterns import (
     GLOBAL_ALLOWLIST_REGEXES,
     GLOBAL_STOPWORDS,
@@ -52,6 +68,13 @@ from utils.security._generated_patterns import (
 
 logger = logging.getLogger(__name__)
 
+# Opcodes added in Python 3.11; absent ones never match a parsed op.
+_REPEAT_OPS = tuple(
+    getattr(_sre, name) for name in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT")
+    if hasattr(_sre, name)
+)
+_ATOMIC_GROUP = getattr(_sre, "ATOMIC_GROUP", None)
+
 _REDACTION_FMT = "[REDACTED:{rule_id}]"
 _REDACTION_SCAN = re.compile(r"\[REDACTED:[a-z0-9][a-z0-9-]{0,64}\]")
 
@@ -135,7 +158,32 @@ def _line_for(text: str, start: int, end: int) -> str:
     return text[lo:] if hi == -1 else text[lo:hi]
 
 
-def _scan_unsafe(text: str) -> list[Finding]:
+def _record(rule: Rule, match: re.Match[str], text: str,
+            seen: set[tuple[int, int]], findings: list[Finding]) -> None:
+    value, start, end = _capture(match)
+    span = (start, end)
+    if span in seen:
+        return
+    if rule.entropy_min and _shannon_entropy(value) < rule.entropy_min:
+        return
+    if _is_allowed(value, _line_for(text, start, end), rule):
+        return
+    seen.add(span)
+    findings.append(Finding(
+        rule_id=rule.id,
+        start=start,
+        end=end,
+        value_hash=hashlib.sha256(value.encode("utf-8")).hexdigest()[:16],
+    ))
+
+
+def _scan_full(text: str) -> list[Finding]:
+    """Reference scan: substring prefilter per rule, regex over the whole text.
+
+    Used when lowering changes the text length (keyword offsets would not
+    map back onto ``text``) and as the baseline the windowed scan is
+    checked against.
+    """
     lowered = text.lower()
     seen: set[tuple[int, int]] = set()
     findings: list[Finding] = []
@@ -143,21 +191,274 @@ def _scan_unsafe(text: str) -> list[Finding]:
         if rule.keywords and not any(k in lowered for k in rule.keywords):
             continue
         for match in rule.regex.finditer(text):
-            value, start, end = _capture(match)
-            span = (start, end)
-            if span in seen:
-                continue
-            if rule.entropy_min and _shannon_entropy(value) < rule.entropy_min:
-                continue
-            if _is_allowed(value, _line_for(text, start, end), rule):
-                continue
-            seen.add(span)
-            findings.append(Finding(
-                rule_id=rule.id,
-                start=start,
-                end=end,
-                value_hash=hashlib.sha256(value.encode("utf-8")).hexdigest()[:16],
-            ))
+            _record(rule, match, text, seen, findings)
+    findings.sort(key=lambda f: (f.start, f.end))
+    return findings
+
+
+# -- keyword prefilter ------------------------------------------------------
+
+# Rules whose matches can reach further than this from a keyword hit are
+# scanned over the whole text instead of windows.
+_MAX_REACH_CHARS = 4096
+
+_LINE_SAFE_CATEGORIES = frozenset({
+    _sre.CATEGORY_DIGIT, _sre.CATEGORY_WORD, _sre.CATEGORY_NOT_SPACE,
+    _sre.CATEGORY_NOT_LINEBREAK, _sre.CATEGORY_UNI_DIGIT,
+    _sre.CATEGORY_UNI_WORD, _sre.CATEGORY_UNI_NOT_SPACE,
+    _sre.CATEGORY_UNI_NOT_LINEBREAK,
+})
+
+
+def _matches_newline(items, dotall: bool) -> bool:
+    """Conservatively: can any single-char item in ``items`` match ``\\n``?"""
+    for op, av in items:
+        if op is _sre.LITERAL:
+            if av == 10:
+                return True
+        elif op is _sre.NOT_LITERAL:
+            if av != 10:
+                return True
+        elif op is _sre.ANY:
+            if dotall:
+                return True
+        elif op is _sre.IN:
+            for set_op, set_av in av:
+                if set_op is _sre.LITERAL and set_av != 10:
+                    continue
+                if set_op is _sre.RANGE and not set_av[0] <= 10 <= set_av[1]:
+                    continue
+                if set_op is _sre.CATEGORY and set_av in _LINE_SAFE_CATEGORIES:
+                    continue
+                return True
+        elif op is _sre.SUBPATTERN:
+            _group, add_flags, del_flags, sub = av
+            sub_dotall = (dotall or bool(add_flags & _sre.SRE_FLAG_DOTALL)) \
+                and not del_flags & _sre.SRE_FLAG_DOTALL
+            if _matches_newline(sub, sub_dotall):
+                return True
+        elif op is _sre.BRANCH:
+            if any(_matches_newline(sub, dotall) for sub in av[1]):
+                return True
+        elif op in _REPEAT_OPS:
+            if _matches_newline(av[2], dotall):
+                return True
+        elif _ATOMIC_GROUP is not None and op is _ATOMIC_GROUP:
+            if _matches_newline(av, dotall):
+                return True
+        elif op is not _sre.AT:
+            return True
+    return False
+
+
+def _bounded_width(items, dotall: bool) -> int | None:
+    """Longest match of ``items`` counting unbounded repeats at their minimum.
+
+    Returns None when an unbounded repeat can cross a line (or the pattern
+    uses a construct this walker does not model): such a match is not
+    confined to a window around its keyword.
+    """
+    width = 0
+    for op, av in items:
+        if op in (_sre.LITERAL, _sre.NOT_LITERAL, _sre.ANY, _sre.IN):
+            width += 1
+        elif op is _sre.AT:
+            continue
+        elif op in (_sre.ASSERT, _sre.ASSERT_NOT):
+            # Lookarounds consume nothing but read past the match edge.
+            inner = _bounded_width(av[1], dotall)
+            if inner is None:
+                return None
+            width += inner
+        elif op is _sre.SUBPATTERN:
+            _group, add_flags, del_flags, sub = av
+            sub_dotall = (dotall or bool(add_flags & _sre.SRE_FLAG_DOTALL)) \
+                and not del_flags & _sre.SRE_FLAG_DOTALL
+            inner = _bounded_width(sub, sub_dotall)
+            if inner is None:
+                return None
+            width += inner
+        elif op is _sre.BRANCH:
+            widths = [_bounded_width(sub, dotall) for sub in av[1]]
+            if None in widths:
+                return None
+            width += max(widths)
+        elif op in _REPEAT_OPS:
+            low, high, sub = av
+            inner = _bounded_width(sub, dotall)
+            if inner is None:
+                return None
+            if high is _sre.MAXREPEAT:
+                if _matches_newline(sub, dotall):
+                    return None
+                width += low * inner
+            else:
+                width += high * inner
+        elif _ATOMIC_GROUP is not None and op is _ATOMIC_GROUP:
+            inner = _bounded_width(av, dotall)
+            if inner is None:
+                return None
+            width += inner
+        else:
+            return None
+    return width
+
+
+def _rule_reach(rule: Rule) -> int | None:
+    """Chars a match may extend past either side of a keyword hit, or None
+    if the rule has to scan the whole text.
+
+    Unbounded repeats that stay on one line add nothing here: windows are
+    widened to whole lines, and a window match is re-run against the full
+    text before it is recorded.
+    """
+    try:
+        parsed = _sre_parse.parse(rule.regex.pattern, rule.regex.flags)
+        width = _bounded_width(parsed, bool(parsed.state.flags & _sre.SRE_FLAG_DOTALL))
+    except Exception:
+        # The parse tree is a private interface; if it changes shape, the
+        # rule simply keeps scanning the whole text.
+        return None
+    if width is None or width > _MAX_REACH_CHARS:
+        return None
+    return width
+
+
+# Gitleaks' semi-generic rules open with a lazy identifier lead, e.g.
+# ``[\w.-]{0,50}?(?:secret|token)...``. Tried at every position, that lead
+# dominates scan time, so such rules first locate the rest of the pattern
+# (the "anchor") and only then run the full regex from up to N chars back.
+_LAZY_LEAD = re.compile(r"\[\\w\.-\]\{0,(\d+)\}\?")
+
+
+def _rule_anchor(rule: Rule) -> tuple[re.Pattern[str], int] | None:
+    """``(anchor, lead)`` for a rule opening with a lazy identifier lead."""
+    pattern = rule.regex.pattern
+    inline = re.match(r"\(\?[a-zA-Z]+\)", pattern)
+    offset = inline.end() if inline else 0
+    lead = _LAZY_LEAD.match(pattern, offset)
+    if lead is None:
+        return None
+    rest = pattern[lead.end():]
+    # A top-level ``|`` would bind the lead to the first branch only; the
+    # parse trees must agree that the lead prefixes the whole pattern.
+    try:
+        whole = list(_sre_parse.parse(pattern, rule.regex.flags))
+        if repr(whole[1:]) != repr(list(_sre_parse.parse(rest, rule.regex.flags))):
+            return None
+    except Exception:
+        return None
+    return re.compile(rest, rule.regex.flags), int(lead.group(1))
+
+
+def _keyword_pattern(keywords: list[str]) -> str:
+    """Prefix-factored alternation of ``keywords``, preferring the longest."""
+    trie: dict = {}
+    for keyword in keywords:
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+def _build_prefilter() -> tuple[re.Pattern[str], dict[str, tuple[int, ...]]]:
+    by_keyword: dict[str, set[int]] = {}
+    for index, rule in enumerate(RULES):
+        for keyword in rule.keywords:
+            by_keyword.setdefault(keyword, set()).add(index)
+    # The lookahead reports one keyword per position (the longest); credit
+    # the rules of every keyword that is a prefix of it as well.
+    hit_rules = {
+        keyword: tuple(sorted(set().union(*(
+            rules for other, rules in by_keyword.items() if keyword.startswith(other)
+        ))))
+        for keyword in by_keyword
+    }
+    scanner = re.compile("(?=(" + _keyword_pattern(sorted(by_keyword)) + "))")
+    return scanner, hit_rules
+
+
+_KEYWORD_SCAN, _KEYWORD_RULES = _build_prefilter()
+_RULE_REACH = tuple(_rule_reach(rule) for rule in RULES)
+_RULE_ANCHORS = tuple(_rule_anchor(rule) for rule in RULES)
+# Every shipped rule has keywords; a keyword-less rule would run everywhere.
+_ALWAYS_RULES = tuple(i for i, rule in enumerate(RULES) if not rule.keywords)
+
+
+def _windows(text: str, hits: list[tuple[int, int]], reach: int) -> list[tuple[int, int]]:
+    """Merged, line-aligned ``[lo, hi)`` windows around keyword ``hits``."""
+    n = len(text)
+    windows: list[tuple[int, int]] = []
+    for start, end in hits:
+        lo = text.rfind("\n", 0, max(start - reach, 0)) + 1
+        newline = text.find("\n", min(end + reach, n))
+        hi = n if newline == -1 else min(newline + 1 + reach, n)
+        if windows and lo <= windows[-1][1]:
+            if hi > windows[-1][1]:
+                windows[-1] = (windows[-1][0], hi)
+        else:
+            windows.append((lo, hi))
+    return windows
+
+
+def _anchored_windows(text: str, windows: list[tuple[int, int]],
+                      anchor: re.Pattern[str], lead: int) -> list[tuple[int, int]]:
+    """Narrow ``windows`` to ``[start - lead, end)`` around each anchor match."""
+    narrowed: list[tuple[int, int]] = []
+    for lo, hi in windows:
+        for match in anchor.finditer(text, lo, hi):
+            start = max(match.start() - lead, 0)
+            if narrowed and start <= narrowed[-1][1]:
+                narrowed[-1] = (narrowed[-1][0], max(match.end(), narrowed[-1][1]))
+            else:
+                narrowed.append((start, match.end()))
+    return narrowed
+
+
+def _scan_unsafe(text: str) -> list[Finding]:
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        return _scan_full(text)
+
+    hits: dict[int, list[tuple[int, int]]] = {i: [(0, len(text))] for i in _ALWAYS_RULES}
+    for match in _KEYWORD_SCAN.finditer(lowered):
+        keyword = match.group(1)
+        span = (match.start(), match.start() + len(keyword))
+        for index in _KEYWORD_RULES[keyword]:
+            hits.setdefault(index, []).append(span)
+
+    n = len(text)
+    seen: set[tuple[int, int]] = set()
+    findings: list[Finding] = []
+    # RULES order decides which rule claims a span, as in the full scan.
+    for index in sorted(hits):
+        rule = RULES[index]
+        reach = _RULE_REACH[index]
+        windows = [(0, n)] if reach is None else _windows(text, hits[index], reach)
+        if _RULE_ANCHORS[index] is not None:
+            windows = _anchored_windows(text, windows, *_RULE_ANCHORS[index])
+        resume = 0
+        for lo, hi in windows:
+            for match in rule.regex.finditer(text, max(lo, resume), hi):
+                if match.start() < resume:
+                    continue
+                if hi < n:
+                    # ``endpos`` fakes an end of string for ``$``/``\b`` and
+                    # cuts greedy tails; take the match the full text gives.
+                    match = rule.regex.match(text, match.start())
+                    if match is None:
+                        continue
+                _record(rule, match, text, seen, findings)
+                resume = match.end()
     findings.sort(key=lambda f: (f.start, f.end))
     return findings
 
@@ -235,6 +536,77 @@ def redact(text: str) -> tuple[str, list[Finding]]:
         return text, []
 
 
+# Chars ``StreamRedactor`` holds back between chunks. Must cover the widest
+# windowed rule match (``_MAX_REACH_CHARS``) plus its left context; PEM
+# blocks up to RSA-4096 also fit.
+_STREAM_CARRY_CHARS = 4096
+
+
+class StreamRedactor:
+    """Incremental ``redact()`` for output that arrives in chunks.
+
+    ``feed()`` returns the redacted text that is safe to release so far; the
+    last ``carry`` chars are held back, and kept afterwards as left context
+    for the next scan, so a secret split across chunks is still caught.
+    ``finish()`` flushes the rest. ``findings`` accumulates hits with offsets
+    into the concatenated input. There is no ``MAX_SCAN_CHARS`` cap: each
+    scan covers at most one chunk plus two carry windows.
+    """
+
+    def __init__(self, carry: int = _STREAM_CARRY_CHARS):
+        self._carry = carry
+        self._buffer = ""
+        self._base = 0       # stream offset of ``_buffer[0]``
+        self._released = 0   # chars of ``_buffer`` already returned
+        self.findings: list[Finding] = []
+
+    def feed(self, chunk: str) -> str:
+        if not chunk:
+            return ""
+        self._buffer += chunk
+        return self._drain(len(self._buffer) - self._carry)
+
+    def finish(self) -> str:
+        return self._drain(len(self._buffer))
+
+    def _drain(self, limit: int) -> str:
+        buffer, released = self._buffer, self._released
+        if limit <= released:
+            return ""
+        try:
+            found = _drop_overlaps(_scan_unsafe(buffer))
+        except Exception:
+            logger.warning("output_redaction.StreamRedactor scan failed; passing through", exc_info=True)
+            found = []
+        # Findings starting in context text were settled by an earlier drain.
+        pending = [f for f in found if f.start >= released]
+        cut = limit
+        for f in pending:
+            if f.start < cut < f.end:
+                cut = f.start
+                break
+        parts: list[str] = []
+        cursor = released
+        for f in pending:
+            if f.end > cut:
+                break
+            parts.append(buffer[cursor:f.start])
+            parts.append(_REDACTION_FMT.format(rule_id=f.rule_id))
+            cursor = f.end
+            self.findings.append(Finding(
+                rule_id=f.rule_id,
+                start=f.start + self._base,
+                end=f.end + self._base,
+                value_hash=f.value_hash,
+            ))
+        parts.append(buffer[cursor:cut])
+        keep = max(cut - self._carry, 0)
+        self._buffer = buffer[keep:]
+        self._base += keep
+        self._released = cut - keep
+        return "".join(parts)
+
+
 def already_redacted(text: str) -> bool:
     """True iff ``text`` contains any redaction placeholder."""
     return bool(_REDACTION_SCAN.search(text or ""))